@@ -0,0 +1,53 @@
+"""Add keyset pagination indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add composite indexes matching the list endpoints' filter + sort keys"""
+    
+    # API Definition: project filter, ordered by (create_time, id)
+    op.create_index(
+        'idx_api_def_project_list', 'api_definition',
+        ['project_id', 'deleted', 'create_time', 'id'],
+    )
+    
+    # Functional Case: project filter on latest versions, ordered by (pos, create_time, id)
+    op.create_index(
+        'idx_func_case_project_list', 'functional_case',
+        ['project_id', 'deleted', 'latest', 'pos', 'create_time', 'id'],
+    )
+    
+    # Bug: project filter, ordered by (pos, create_time, id)
+    op.create_index(
+        'idx_bug_project_list', 'bug',
+        ['project_id', 'deleted', 'pos', 'create_time', 'id'],
+    )
+    
+    # Test Plan: project filter, ordered by (pos, create_time, id)
+    op.create_index(
+        'idx_test_plan_project_list', 'test_plan',
+        ['project_id', 'deleted', 'pos', 'create_time', 'id'],
+    )
+
+
+def downgrade():
+    """Remove keyset pagination indexes"""
+    
+    op.drop_index('idx_test_plan_project_list', table_name='test_plan')
+    op.drop_index('idx_bug_project_list', table_name='bug')
+    op.drop_index('idx_func_case_project_list', table_name='functional_case')
+    op.drop_index('idx_api_def_project_list', table_name='api_definition')
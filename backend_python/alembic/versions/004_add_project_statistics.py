@@ -0,0 +1,68 @@
+"""Add materialized project statistics
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import time
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+# Counter column -> (source table, filter, comment)
+COUNTED_TABLES = {
+    'bug_count': ('bug', 'deleted = FALSE', '缺陷数'),
+    'api_definition_count': ('api_definition', 'deleted = FALSE', '接口定义数'),
+    'api_test_case_count': ('api_test_case', 'deleted = FALSE', '接口用例数'),
+    'api_scenario_count': ('api_scenario', 'deleted = FALSE', '场景数'),
+    'functional_case_count': ('functional_case', 'deleted = FALSE AND latest = TRUE', '功能用例数'),
+    'test_plan_count': ('test_plan', 'deleted = FALSE', '测试计划数'),
+}
+
+
+def upgrade():
+    """Create project_statistics and backfill it from the source tables"""
+
+    op.create_table(
+        'project_statistics',
+        sa.Column('project_id', sa.String(50), primary_key=True, comment='项目ID'),
+        *(
+            sa.Column(field, sa.BigInteger(), nullable=False, server_default='0', comment=comment)
+            for field, (_, _, comment) in COUNTED_TABLES.items()
+        ),
+        sa.Column('update_time', sa.BigInteger(), comment='更新时间'),
+    )
+
+    # One UNION ALL over all counted tables, folded into one row per project
+    fields = list(COUNTED_TABLES)
+    branches = []
+    for field, (table, condition, _) in COUNTED_TABLES.items():
+        columns = ', '.join(
+            f"COUNT(*) AS {other}" if other == field else f"0 AS {other}"
+            for other in fields
+        )
+        branches.append(
+            f"SELECT project_id, {columns} FROM {table} WHERE {condition} GROUP BY project_id"
+        )
+    # Timestamp bound from Python: the SQL for "now in milliseconds" differs per dialect
+    op.execute(
+        sa.text(
+            f"INSERT INTO project_statistics (project_id, {', '.join(fields)}, update_time) "
+            f"SELECT project_id, {', '.join(f'SUM({field})' for field in fields)}, :now "
+            f"FROM ({' UNION ALL '.join(branches)}) counts GROUP BY project_id"
+        ).bindparams(now=int(time.time() * 1000))
+    )
+
+
+def downgrade():
+    """Drop project_statistics"""
+
+    op.drop_table('project_statistics')
@@ -0,0 +1,69 @@
+"""Add execution rollup tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# Upper bounds (ms) of the latency histogram columns; the last one is unbounded
+LATENCY_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+def upgrade():
+    """Create rollup buckets, consumption watermarks and report scan indexes"""
+
+    latency_columns = [
+        sa.Column(
+            f'latency_b{i:02d}', sa.BigInteger(), nullable=False, server_default='0',
+            comment=f'耗时≤{bound}ms' if bound else f'耗时>{LATENCY_BOUNDS_MS[-1]}ms',
+        )
+        for i, bound in enumerate((*LATENCY_BOUNDS_MS, None))
+    ]
+    op.create_table(
+        'execution_rollup',
+        sa.Column('resolution', sa.String(10), primary_key=True, comment='粒度：minute/hour/day'),
+        sa.Column('project_id', sa.String(50), primary_key=True, comment='项目ID'),
+        sa.Column('subject_id', sa.String(50), primary_key=True, comment='用例/计划ID，空字符串表示项目汇总'),
+        sa.Column('source', sa.String(30), primary_key=True, comment='来源：api_report/test_plan_report'),
+        sa.Column('bucket_start', sa.BigInteger(), primary_key=True, comment='时间桶起点'),
+        sa.Column('total', sa.BigInteger(), nullable=False, server_default='0', comment='执行次数'),
+        sa.Column('passed', sa.BigInteger(), nullable=False, server_default='0', comment='通过次数'),
+        sa.Column('failed', sa.BigInteger(), nullable=False, server_default='0', comment='失败次数'),
+        sa.Column('duration_sum', sa.BigInteger(), nullable=False, server_default='0', comment='总耗时'),
+        sa.Column('duration_max', sa.BigInteger(), nullable=False, server_default='0', comment='最大耗时'),
+        *latency_columns,
+    )
+    op.create_index('idx_execution_rollup_bucket', 'execution_rollup', ['resolution', 'bucket_start'])
+
+    op.create_table(
+        'execution_rollup_state',
+        sa.Column('source', sa.String(30), primary_key=True, comment='来源'),
+        sa.Column('watermark_time', sa.BigInteger(), nullable=False, server_default='0', comment='已处理的最后结束时间'),
+        sa.Column('watermark_id', sa.String(50), nullable=False, server_default='', comment='已处理的最后报告ID'),
+        sa.Column('update_time', sa.BigInteger(), comment='更新时间'),
+    )
+
+    # Watermark scans read finished reports in (end_time, id) order
+    op.create_index('idx_api_report_end_time', 'api_report', ['end_time', 'id'])
+    op.create_index('idx_test_plan_report_end_time', 'test_plan_report', ['end_time', 'id'])
+
+
+def downgrade():
+    """Drop rollup tables and report scan indexes"""
+
+    op.drop_index('idx_test_plan_report_end_time', table_name='test_plan_report')
+    op.drop_index('idx_api_report_end_time', table_name='api_report')
+    op.drop_table('execution_rollup_state')
+    op.drop_index('idx_execution_rollup_bucket', table_name='execution_rollup')
+    op.drop_table('execution_rollup')
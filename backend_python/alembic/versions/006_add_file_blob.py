@@ -0,0 +1,50 @@
+"""Add content-addressed file blob table and widen attachment file ids
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the blob reference-count table"""
+
+    op.create_table(
+        'file_blob',
+        sa.Column('sha256', sa.String(64), primary_key=True, comment='内容SHA-256'),
+        sa.Column('size', sa.BigInteger(), nullable=False, server_default='0', comment='文件大小'),
+        sa.Column('file_path', sa.String(255), nullable=False, comment='MinIO路径'),
+        sa.Column('content_type', sa.String(100), comment='MIME类型'),
+        sa.Column('ref_count', sa.BigInteger(), nullable=False, server_default='0', comment='引用次数'),
+        sa.Column('create_time', sa.BigInteger(), comment='创建时间'),
+        sa.Column('update_time', sa.BigInteger(), comment='引用变更时间'),
+    )
+    # Garbage collection scans unreferenced blobs by age
+    op.create_index('idx_file_blob_unreferenced', 'file_blob', ['ref_count', 'update_time'])
+
+    # Attachments store the blob path (blob/xx/<sha256>) as file id
+    op.alter_column(
+        'bug_local_attachment', 'file_id',
+        type_=sa.String(255), existing_type=sa.String(50), existing_nullable=False,
+    )
+
+
+def downgrade():
+    """Drop the blob table"""
+
+    op.alter_column(
+        'bug_local_attachment', 'file_id',
+        type_=sa.String(50), existing_type=sa.String(255), existing_nullable=False,
+    )
+    op.drop_index('idx_file_blob_unreferenced', table_name='file_blob')
+    op.drop_table('file_blob')
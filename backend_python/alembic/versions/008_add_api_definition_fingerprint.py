@@ -0,0 +1,31 @@
+"""Add import fingerprint to API definitions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Store the spec fingerprint of imported definitions so re-imports skip unchanged ones"""
+
+    op.add_column(
+        'api_definition',
+        sa.Column('fingerprint', sa.String(64), nullable=True, comment='导入指纹（方法、路径与结构的SHA-256）'),
+    )
+
+
+def downgrade():
+    """Drop the import fingerprint"""
+
+    op.drop_column('api_definition', 'fingerprint')
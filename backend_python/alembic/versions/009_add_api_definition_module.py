@@ -0,0 +1,45 @@
+"""Add API definition module table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the module tree table that imported collection folders map to"""
+
+    op.create_table(
+        'api_definition_module',
+        sa.Column('id', sa.String(50), primary_key=True, comment='ID'),
+        sa.Column('project_id', sa.String(50), nullable=False, comment='项目ID'),
+        sa.Column('name', sa.String(255), nullable=False, comment='名称'),
+        sa.Column('parent_id', sa.String(50), nullable=False, server_default='NONE', comment='父节点ID'),
+        sa.Column('pos', sa.BigInteger(), nullable=False, server_default='0', comment='同一节点下的顺序'),
+        sa.Column('create_time', sa.BigInteger(), comment='创建时间'),
+        sa.Column('update_time', sa.BigInteger(), comment='更新时间'),
+        sa.Column('create_user', sa.String(50), comment='创建人'),
+        sa.Column('update_user', sa.String(50), comment='修改人'),
+    )
+    op.create_index('ix_api_definition_module_project_id', 'api_definition_module', ['project_id'])
+    op.create_index(
+        'uq_api_module_name_project_parent', 'api_definition_module', ['project_id', 'name', 'parent_id'], unique=True,
+    )
+
+
+def downgrade():
+    """Drop the module tree table"""
+
+    op.drop_index('uq_api_module_name_project_parent', table_name='api_definition_module')
+    op.drop_index('ix_api_definition_module_project_id', table_name='api_definition_module')
+    op.drop_table('api_definition_module')
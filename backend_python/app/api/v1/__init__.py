@@ -20,6 +20,7 @@ from app.api.v1.endpoints import (
     ai,
     i18n,
     batch_operations,
+    executions,
     health,
 )
 
@@ -42,5 +43,6 @@ api_router.include_router(jmeter_generate.router, prefix="/jmeter", tags=["JMete
 api_router.include_router(ai.router, prefix="/ai", tags=["AI功能"])
 api_router.include_router(i18n.router, prefix="/i18n", tags=["国际化"])
 api_router.include_router(batch_operations.router, prefix="/batch", tags=["批量操作"])
+api_router.include_router(executions.router, prefix="/executions", tags=["执行进度"])
 api_router.include_router(health.router, prefix="", tags=["健康檢查"])
 
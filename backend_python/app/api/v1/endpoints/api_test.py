@@ -1,31 +1,45 @@
 """
 API Test Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-import json
-import io
 
-from app.core.database import get_db
+from app.core.database import ReadSessionLocal, get_db, get_read_db
 from app.schemas.api_test import ApiDefinition, ApiTestCase, ApiScenario, ApiDefinitionCreate, ApiDefinitionUpdate
-from app.services.api_test_service import ApiTestService
+from app.core.database_optimization import KeysetPaginationHelper
+from app.services.api_test_service import (
+    ApiTestService,
+    API_DEFINITION_LIST_KEYS,
+    API_DEFINITION_EXPORT_TYPES,
+    API_SCENARIO_EXPORT_TYPES,
+    check_export_request,
+)
 
 router = APIRouter()
 
 
 @router.get("/definitions", response_model=List[ApiDefinition])
 async def get_api_definitions(
+    response: Response,
     project_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get API definitions"""
     service = ApiTestService(db)
-    return await service.get_api_definitions(project_id, skip, limit, keyword)
+    try:
+        items = await service.get_api_definitions(project_id, skip, limit, keyword, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = KeysetPaginationHelper.next_cursor(items, API_DEFINITION_LIST_KEYS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/definitions/{definition_id}", response_model=ApiDefinition)
@@ -99,7 +113,7 @@ async def get_api_test_cases(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get API test cases"""
     service = ApiTestService(db)
@@ -174,7 +188,7 @@ async def get_api_scenarios(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get API scenarios"""
     service = ApiTestService(db)
@@ -271,7 +285,7 @@ async def import_api_definitions(
     project_id: str = Form(...),
     module_id: Optional[str] = Form(None),
     platform: str = Form("Swagger3", description="Import platform: Swagger3, Postman, Har, Metersphere"),
-    cover_data: bool = Form(False, description="Whether to cover existing data"),
+    cover_data: bool = Form(False, description="Whether to cover existing data (update changed and delete removed operations)"),
     sync_case: bool = Form(False, description="Whether to sync test cases"),
     db: AsyncSession = Depends(get_db),
 ):
@@ -288,34 +302,47 @@ async def import_api_definitions(
             cover_data=cover_data,
             sync_case=sync_case,
         )
-        return {"message": "Import completed", "imported_count": result.get("imported_count", 0), "updated_count": result.get("updated_count", 0)}
+        return {"message": "Import completed", **result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
 
 
+async def _stream_export(method: str, *args):
+    """
+    Run an ApiTestService export generator with its own session
+
+    The request session is closed before a StreamingResponse body is sent,
+    so the export reads through a session that lives as long as the stream.
+    """
+    async with ReadSessionLocal() as session:
+        async for chunk in getattr(ApiTestService(session), method)(*args):
+            yield chunk
+
+
+def _export_response(method: str, ids: Optional[List[str]], project_id: Optional[str], export_type: str, filename: str):
+    headers = {}
+    if export_type != "json":
+        # Swagger/Postman/NDJSON as file download
+        headers["Content-Disposition"] = f"attachment; filename={filename}.{export_type}"
+    return StreamingResponse(
+        _stream_export(method, ids, export_type, project_id),
+        media_type="application/x-ndjson" if export_type == "ndjson" else "application/json",
+        headers=headers,
+    )
+
+
 @router.post("/definitions/export")
 async def export_api_definitions(
-    definition_ids: List[str],
-    export_type: str = Query("json", description="Export type: json, swagger, postman"),
-    db: AsyncSession = Depends(get_db),
+    definition_ids: Optional[List[str]] = Body(None),
+    project_id: Optional[str] = Query(None, description="Export all definitions of a project"),
+    export_type: str = Query("json", description="Export type: json, ndjson, swagger, postman"),
 ):
-    """Export API definitions to file"""
-    service = ApiTestService(db)
+    """Export API definitions (selected definitions, or a project), streamed as JSON or NDJSON"""
     try:
-        export_data = await service.export_api_definitions(definition_ids, export_type)
-        
-        if export_type == "json":
-            return JSONResponse(content=export_data)
-        else:
-            # For Swagger/Postman, return as file download
-            file_content = json.dumps(export_data, indent=2, ensure_ascii=False).encode('utf-8')
-            return StreamingResponse(
-                io.BytesIO(file_content),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename=api_definitions.{export_type}"}
-            )
-    except Exception as e:
+        check_export_request(definition_ids, project_id, export_type, API_DEFINITION_EXPORT_TYPES)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Export failed: {str(e)}")
+    return _export_response("export_api_definitions", definition_ids, project_id, export_type, "api_definitions")
 
 
 @router.post("/scenarios/import")
@@ -324,7 +351,7 @@ async def import_api_scenarios(
     project_id: str = Form(...),
     module_id: Optional[str] = Form(None),
     platform: str = Form("Metersphere", description="Import platform: Metersphere, Postman"),
-    cover_data: bool = Form(False, description="Whether to cover existing data"),
+    cover_data: bool = Form(False, description="Whether to cover existing data (update changed and delete removed operations)"),
     db: AsyncSession = Depends(get_db),
 ):
     """Import API scenarios from file"""
@@ -346,26 +373,16 @@ async def import_api_scenarios(
 
 @router.post("/scenarios/export")
 async def export_api_scenarios(
-    scenario_ids: List[str],
-    export_type: str = Query("json", description="Export type: json, postman"),
-    db: AsyncSession = Depends(get_db),
+    scenario_ids: Optional[List[str]] = Body(None),
+    project_id: Optional[str] = Query(None, description="Export all scenarios of a project"),
+    export_type: str = Query("json", description="Export type: json, ndjson, postman"),
 ):
-    """Export API scenarios to file"""
-    service = ApiTestService(db)
+    """Export API scenarios (selected scenarios, or a project), streamed as JSON or NDJSON"""
     try:
-        export_data = await service.export_api_scenarios(scenario_ids, export_type)
-        
-        if export_type == "json":
-            return JSONResponse(content=export_data)
-        else:
-            file_content = json.dumps(export_data, indent=2, ensure_ascii=False).encode('utf-8')
-            return StreamingResponse(
-                io.BytesIO(file_content),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename=api_scenarios.{export_type}"}
-            )
-    except Exception as e:
+        check_export_request(scenario_ids, project_id, export_type, API_SCENARIO_EXPORT_TYPES)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Export failed: {str(e)}")
+    return _export_response("export_api_scenarios", scenario_ids, project_id, export_type, "api_scenarios")
 
 
 @router.post("/mock")
@@ -3,75 +3,90 @@ Batch Operations API Endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from typing import List, Dict
+from pydantic import BaseModel, Field
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.utils.batch_operations import BatchProcessor, BulkInsert
-from app.schemas.user import UserCreate, UserResponse
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+from app.services.user_service import UserService
 
 router = APIRouter()
 
+# Upper bound on IDs/items per request
+MAX_BATCH_SIZE = 1000
+
 
 class BatchGetRequest(BaseModel):
     """Batch get request"""
-    ids: List[str]
+    ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
 
 
 class BatchCreateRequest(BaseModel):
     """Batch create request"""
-    items: List[Dict[str, Any]]
+    items: List[UserCreate] = Field(..., max_length=MAX_BATCH_SIZE)
 
 
 class BatchUpdateRequest(BaseModel):
     """Batch update request"""
-    updates: Dict[str, str]  # ID -> update data JSON string
+    updates: Dict[str, UserUpdate]  # ID -> changed fields
 
 
 class BatchDeleteRequest(BaseModel):
     """Batch delete request"""
-    ids: List[str]
+    ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
 
 
-@router.post("/users/batch-get", response_model=Dict[str, UserResponse])
+@router.post("/users/batch-get", response_model=Dict[str, UserSchema])
 async def batch_get_users(
     request: BatchGetRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Batch get users by IDs (optimized)"""
-    from app.services.user_service import UserService
-    
+    """Batch get users by IDs (one IN query per chunk)"""
     user_service = UserService(db)
-    processor = BatchProcessor(batch_size=100)
-    
-    async def get_user(id: str):
-        return await user_service.get_user_by_id(id)
-    
-    users = await processor.batch_get(get_user, request.ids)
-    return {id: user for id, user in users.items() if user}
+    return await user_service.get_users_by_ids(request.ids)
 
 
-@router.post("/users/batch-create", response_model=List[UserResponse])
+@router.post("/users/batch-create", response_model=List[UserSchema])
 async def batch_create_users(
     request: BatchCreateRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Batch create users (optimized)"""
-    from app.services.user_service import UserService
-    
+    """Batch create users (multi-row insert)"""
     user_service = UserService(db)
-    processor = BatchProcessor(batch_size=50)
-    
-    async def create_user(item: Dict[str, Any]):
-        user_data = UserCreate(**item)
-        return await user_service.create_user(user_data)
-    
-    users = await processor.batch_create(create_user, request.items)
-    return users
+    items = [item.model_dump(exclude={"create_user"}) for item in request.items]
+    try:
+        return await user_service.create_users_bulk(items, create_user=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/users/batch-update")
+async def batch_update_users(
+    request: BatchUpdateRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Batch update users (executemany UPDATE)"""
+    if len(request.updates) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_SIZE} users can be updated per request"
+        )
+
+    user_service = UserService(db)
+    updates = {
+        user_id: data.model_dump(exclude_unset=True, exclude={"update_user"})
+        for user_id, data in request.updates.items()
+    }
+    try:
+        updated_count = await user_service.update_users_bulk(updates, update_user=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"updated_count": updated_count, "total": len(request.updates)}
 
 
 @router.post("/users/batch-delete")
@@ -80,16 +95,7 @@ async def batch_delete_users(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Batch delete users (optimized)"""
-    from app.services.user_service import UserService
-    
+    """Batch delete users (single-statement soft delete)"""
     user_service = UserService(db)
-    processor = BatchProcessor(batch_size=100)
-    
-    async def delete_user(id: str):
-        await user_service.delete_user(id)
-        return True
-    
-    deleted_count = await processor.batch_delete(delete_user, request.ids)
+    deleted_count = await user_service.delete_users_bulk(request.ids, delete_user=current_user.id)
     return {"deleted_count": deleted_count, "total": len(request.ids)}
-
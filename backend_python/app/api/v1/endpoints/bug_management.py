@@ -1,32 +1,51 @@
 """
 Bug Management Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import io
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.minio import UploadTooLargeError
 from app.schemas.bug_management import Bug, BugCreate, BugUpdate
-from app.services.bug_management_service import BugManagementService
+from app.core.database_optimization import KeysetPaginationHelper
+from app.services.bug_management_service import BugManagementService, BUG_LIST_KEYS
 
 router = APIRouter()
 
 
 @router.get("/bugs", response_model=List[Bug])
 async def get_bugs(
+    response: Response,
     project_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     handle_user: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get bugs with pagination and filters"""
+    """
+    Get bugs with pagination and filters
+    
+    The total of all matching bugs is sent in X-Total-Count; X-Total-Exact
+    is "false" when it is an estimate.
+    """
     service = BugManagementService(db)
-    return await service.get_bugs(project_id, skip, limit, keyword, status, handle_user)
+    try:
+        items = await service.get_bugs(project_id, skip, limit, keyword, status, handle_user, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total, total_exact = await service.count_bugs(project_id, keyword, status, handle_user)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Total-Exact"] = "true" if total_exact else "false"
+    next_cursor = KeysetPaginationHelper.next_cursor(items, BUG_LIST_KEYS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/bugs/{bug_id}", response_model=Bug)
@@ -185,22 +204,42 @@ async def get_bug_attachments(
 @router.post("/bugs/{bug_id}/attachments")
 async def upload_bug_attachment(
     bug_id: str,
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    sha256: Optional[str] = Form(None, description="Digest of content already attached in this project, instead of file"),
+    file_name: Optional[str] = Form(None, description="Attachment name; defaults to the uploaded file name"),
     source: str = Form("LOCAL", description="Attachment source: LOCAL, MINIO"),
     create_user: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Upload bug attachment"""
+    """
+    Upload bug attachment
+    
+    Identical content is stored once. Content already attached to a bug of
+    the same project can be attached again by sending sha256 and file_name
+    instead of the file; any other content must be uploaded.
+    """
+    if file is None and not sha256:
+        raise HTTPException(status_code=400, detail="Either file or sha256 is required")
+    if file is None and not file_name:
+        raise HTTPException(status_code=400, detail="file_name is required with sha256")
+    
     service = BugManagementService(db)
-    file_content = await file.read()
-    attachment = await service.upload_bug_attachment(
-        bug_id=bug_id,
-        file_name=file.filename,
-        file_content=file_content,
-        file_size=len(file_content),
-        source=source,
-        create_user=create_user,
-    )
+    try:
+        attachment = await service.upload_bug_attachment(
+            bug_id=bug_id,
+            file_name=file_name or file.filename,
+            file=file.file if file is not None else None,
+            sha256=sha256,
+            content_type=file.content_type if file is not None else None,
+            source=source,
+            create_user=create_user,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if attachment is None:
+        raise HTTPException(status_code=404, detail="Content not attached in this project, upload the file instead")
     return attachment
 
 
@@ -1,29 +1,39 @@
 """
 Case Management Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.schemas.case_management import FunctionalCase, FunctionalCaseCreate, FunctionalCaseUpdate
-from app.services.case_management_service import CaseManagementService
+from app.core.database_optimization import KeysetPaginationHelper
+from app.services.case_management_service import CaseManagementService, FUNCTIONAL_CASE_LIST_KEYS
 
 router = APIRouter()
 
 
 @router.get("/cases", response_model=List[FunctionalCase])
 async def get_functional_cases(
+    response: Response,
     project_id: Optional[str] = Query(None),
     module_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get functional cases"""
     service = CaseManagementService(db)
-    return await service.get_functional_cases(project_id, skip, limit, keyword, module_id)
+    try:
+        items = await service.get_functional_cases(project_id, skip, limit, keyword, module_id, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = KeysetPaginationHelper.next_cursor(items, FUNCTIONAL_CASE_LIST_KEYS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/cases/{case_id}", response_model=FunctionalCase)
@@ -100,63 +110,98 @@ async def delete_functional_case(
 async def import_cases_from_excel(
     file: UploadFile = File(...),
     project_id: str = Form(...),
+    version_id: str = Form(...),
     module_id: Optional[str] = Form(None),
+    template_id: Optional[str] = Form(None, description="Template of rows without 模板ID"),
+    create_user: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Import functional cases from Excel file"""
+    """Import functional cases from Excel file (invalid rows are reported, not fatal)"""
     service = CaseManagementService(db)
     try:
-        file_content = await file.read()
+        # Parse the spooled upload directly instead of copying it into memory
         result = await service.import_cases_from_excel(
-            file_content=file_content,
+            file_content=file.file,
             file_name=file.filename,
             project_id=project_id,
             module_id=module_id,
+            version_id=version_id,
+            template_id=template_id,
+            create_user=create_user,
         )
-        return {"message": "Import completed", "imported_count": result.get("imported_count", 0), "errors": result.get("errors", [])}
+        return {
+            "message": "Import completed",
+            "imported_count": result.get("imported_count", 0),
+            "fail_count": result.get("fail_count", 0),
+            "errors": result.get("errors", []),
+        }
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
 
 
+def _iter_and_close(file, chunk_size: int = 256 * 1024):
+    """Stream a temporary file in chunks, closing it when done"""
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
+
+
 @router.post("/cases/export/excel")
 async def export_cases_to_excel(
-    case_ids: List[str],
+    case_ids: Optional[List[str]] = Body(None),
+    project_id: Optional[str] = Query(None, description="Export all latest cases of a project"),
+    module_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Export functional cases to Excel file"""
+    """Export functional cases to Excel file (selected cases, or a project/module)"""
     from fastapi.responses import StreamingResponse
-    import io
     
     service = CaseManagementService(db)
     try:
-        excel_data = await service.export_cases_to_excel(case_ids)
-        return StreamingResponse(
-            io.BytesIO(excel_data),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=functional_cases.xlsx"}
-        )
+        output = await service.export_cases_to_excel(case_ids, project_id=project_id, module_id=module_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Export failed: {str(e)}")
+    return StreamingResponse(
+        _iter_and_close(output),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": "attachment; filename=functional_cases.xlsx"}
+    )
 
 
 @router.post("/cases/import/xmind")
 async def import_cases_from_xmind(
     file: UploadFile = File(...),
     project_id: str = Form(...),
-    module_id: Optional[str] = Form(None),
+    version_id: str = Form(...),
+    template_id: str = Form(...),
+    module_id: Optional[str] = Form(None, description="Parent module of the map's modules"),
+    create_user: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Import functional cases from XMind file"""
+    """Import functional cases from XMind file (Zen or Classic)"""
     service = CaseManagementService(db)
     try:
-        file_content = await file.read()
         result = await service.import_cases_from_xmind(
-            file_content=file_content,
+            file_content=file.file,
             file_name=file.filename,
             project_id=project_id,
             module_id=module_id,
+            version_id=version_id,
+            template_id=template_id,
+            create_user=create_user,
         )
-        return {"message": "Import completed", "imported_count": result.get("imported_count", 0), "errors": result.get("errors", [])}
+        return {
+            "message": "Import completed",
+            "imported_count": result.get("imported_count", 0),
+            "fail_count": result.get("fail_count", 0),
+            "module_count": result.get("module_count", 0),
+            "errors": result.get("errors", []),
+        }
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
 
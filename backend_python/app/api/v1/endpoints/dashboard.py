@@ -1,21 +1,33 @@
 """
 Dashboard Endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, Tuple
+import time
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.services.dashboard_service import DashboardService
+from app.services.execution_rollup_service import ExecutionRollupService, DEFAULT_MAX_POINTS, SOURCES
 
 router = APIRouter()
 
+# Default trend/summary window when no start is given
+DEFAULT_RANGE_MS = 30 * 24 * 60 * 60 * 1000
+
+
+def _time_range(start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+    """Resolve an optional [start, end) range in ms, defaulting to the last 30 days"""
+    end = end if end is not None else int(time.time() * 1000)
+    start = start if start is not None else end - DEFAULT_RANGE_MS
+    return start, end
+
 
 @router.get("/statistics")
 async def get_dashboard_statistics(
     project_id: Optional[str] = Query(None),
     organization_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get dashboard statistics"""
     service = DashboardService(db)
@@ -25,7 +37,7 @@ async def get_dashboard_statistics(
 @router.get("/projects/{project_id}/statistics")
 async def get_project_statistics(
     project_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get project-specific statistics"""
     service = DashboardService(db)
@@ -35,7 +47,7 @@ async def get_project_statistics(
 @router.get("/projects/{project_id}/coverage")
 async def get_test_coverage(
     project_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get test coverage statistics"""
     service = DashboardService(db)
@@ -46,9 +58,45 @@ async def get_test_coverage(
 async def get_recent_activities(
     project_id: Optional[str] = Query(None),
     limit: int = Query(10, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get recent activities"""
     service = DashboardService(db)
     return await service.get_recent_activities(project_id, limit)
 
+
+@router.get("/projects/{project_id}/execution-trend")
+async def get_execution_trend(
+    project_id: str,
+    start: Optional[int] = Query(None, description="Range start (ms, inclusive)"),
+    end: Optional[int] = Query(None, description="Range end (ms, exclusive)"),
+    case_id: Optional[str] = Query(None, description="Case/plan ID (project-level if omitted)"),
+    source: Optional[str] = Query(None, description=f"One of {', '.join(SOURCES)}"),
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=1, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get execution pass rate and latency trend from the rollup buckets"""
+    start, end = _time_range(start, end)
+    service = ExecutionRollupService(db)
+    try:
+        return await service.get_trend(project_id, start, end, case_id, source, max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/projects/{project_id}/execution-summary")
+async def get_execution_summary(
+    project_id: str,
+    start: Optional[int] = Query(None, description="Range start (ms, inclusive)"),
+    end: Optional[int] = Query(None, description="Range end (ms, exclusive)"),
+    case_id: Optional[str] = Query(None, description="Case/plan ID (project-level if omitted)"),
+    source: Optional[str] = Query(None, description=f"One of {', '.join(SOURCES)}"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get execution totals over a time range from the rollup buckets"""
+    start, end = _time_range(start, end)
+    service = ExecutionRollupService(db)
+    try:
+        return await service.get_summary(project_id, start, end, case_id, source)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
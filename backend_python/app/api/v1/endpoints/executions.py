@@ -0,0 +1,52 @@
+"""
+Execution Progress Endpoints
+"""
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+import json
+
+from app.core.execution_progress import progress_hub
+
+router = APIRouter()
+
+
+async def _sse_stream(execution_id: str) -> AsyncIterator[str]:
+    """Format progress events as Server-Sent Events"""
+    # Tell EventSource to reconnect after 3s if the connection drops
+    yield "retry: 3000\n\n"
+    async for event in progress_hub.watch(execution_id):
+        if event is None:
+            yield ": keep-alive\n\n"
+            continue
+        yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.get("/{execution_id}/events")
+async def stream_execution_events(execution_id: str):
+    """
+    Stream live progress of an execution as Server-Sent Events
+
+    Events: snapshot (when joining a known execution), started, step,
+    progress, steps_skipped and finished; the stream ends after finished.
+    """
+    return StreamingResponse(
+        _sse_stream(execution_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx proxy buffering
+        },
+    )
+
+
+@router.websocket("/{execution_id}/ws")
+async def execution_events_websocket(websocket: WebSocket, execution_id: str):
+    """Stream live progress of an execution over a WebSocket (same events as SSE)"""
+    await websocket.accept()
+    try:
+        async for event in progress_hub.watch(execution_id):
+            await websocket.send_json(event if event is not None else {"type": "heartbeat"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -1,16 +1,17 @@
 """
 File Management Endpoints
 """
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
-from fastapi.responses import StreamingResponse, Response
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, status
+from fastapi.responses import RedirectResponse, StreamingResponse, Response
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
-from app.services.file_service import FileService
-from app.schemas.file import FileUploadResponse, FileInfoResponse
+from app.services.file_service import FileService, content_disposition
+from app.services.blob_storage_service import BlobStorageService
+from app.schemas.file import FileUploadResponse, FileInfoResponse, BatchDownloadRequest
 
 router = APIRouter()
 
@@ -42,23 +43,96 @@ async def upload_file(
 @router.get("/download/{file_path:path}")
 async def download_file(
     file_path: str,
+    request: Request,
+    redirect: Optional[bool] = None,
+    expires: int = Query(3600, ge=1, le=FileService.PRESIGNED_URL_MAX_EXPIRES),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Download file"""
+    """
+    Download file
+    
+    Streams the file from MinIO with Range (206) and conditional
+    (ETag / Last-Modified, 304) support. With ``redirect=true``, or for files
+    of at least FILE_DOWNLOAD_REDIRECT_SIZE bytes, redirects to a presigned
+    MinIO URL valid for ``expires`` seconds instead.
+    """
+    file_service = FileService()
+    
+    info = await file_service.stat_file(file_path)
+    
+    if file_service.use_presigned_redirect(info, redirect):
+        url = await file_service.get_presigned_url(file_path, expires, file_name=info["file_name"])
+        return RedirectResponse(url)
+    
+    plan = file_service.plan_download(
+        info,
+        range_header=request.headers.get("range"),
+        if_none_match=request.headers.get("if-none-match"),
+        if_modified_since=request.headers.get("if-modified-since"),
+        if_range=request.headers.get("if-range"),
+    )
+    if plan["status_code"] == status.HTTP_304_NOT_MODIFIED:
+        return Response(status_code=plan["status_code"], headers=plan["headers"])
+    
+    return StreamingResponse(
+        file_service.stream_file(file_path, plan["offset"], plan["length"]),
+        status_code=plan["status_code"],
+        media_type=info["content_type"],
+        headers={
+            **plan["headers"],
+            "Content-Disposition": content_disposition(info["file_name"]),
+        }
+    )
+
+
+@router.post("/batch-download")
+async def batch_download(
+    request: BatchDownloadRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download many files as one zip archive
+    
+    The archive is assembled while streaming, reading one file at a time
+    from MinIO, without temporary files. Total size is limited by
+    BATCH_DOWNLOAD_MAX.
+    """
     file_service = FileService()
     
-    file_data, file_name, content_type = await file_service.download_file(file_path)
+    entries = await file_service.prepare_batch_download(request.file_paths, request.folder)
     
-    return Response(
-        content=file_data,
-        media_type=content_type,
+    return StreamingResponse(
+        file_service.stream_zip(entries),
+        media_type="application/zip",
         headers={
-            "Content-Disposition": f'attachment; filename="{file_name}"',
+            "Content-Disposition": content_disposition(request.file_name),
         }
     )
 
 
+@router.head("/blobs/{sha256}")
+async def check_blob(
+    sha256: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Check whether the server already stores content with this SHA-256
+    
+    200 (with the blob size as Content-Length) when it does, so clients can
+    reference the digest instead of uploading; 404 otherwise.
+    """
+    try:
+        blob = await BlobStorageService(db).get(sha256)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if blob is None:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    return Response(headers={"Content-Length": str(blob.size), "ETag": f'"{blob.sha256}"'})
+
+
 @router.get("/info/{file_path:path}", response_model=FileInfoResponse)
 async def get_file_info(
     file_path: str,
@@ -88,7 +162,7 @@ async def delete_file(
 @router.get("/presigned-url/{file_path:path}")
 async def get_presigned_url(
     file_path: str,
-    expires: int = 3600,
+    expires: int = Query(3600, ge=1, le=FileService.PRESIGNED_URL_MAX_EXPIRES),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -1,139 +1,69 @@
 """
 Health Check and Monitoring Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from typing import Dict, Any
 from datetime import datetime
-import time
 
-from app.core.database import get_db
-from app.core.redis import redis_client
-from app.core.minio import minio_client
-from app.core.kafka import kafka_producer
 from app.core.config import settings
+from app.core.health import health_checker, UNHEALTHY
 from app.core.logging import logger
+from app.core.metrics import metrics_collector
+from app.core.metrics_registry import metrics_registry, CONTENT_TYPE_LATEST
 
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check() -> Dict[str, Any]:
+async def health_check() -> JSONResponse:
     """
     Health check endpoint
     
+    Served from the background refresher's cached report; each dependency
+    entry includes its status, message and probe latency.
+    
     Returns:
         Health status of the application
     """
-    health_status = {
-        "status": "healthy",
+    report = await health_checker.get_report()
+    return JSONResponse(content=jsonable_encoder(report))
+
+
+async def _readiness_response() -> JSONResponse:
+    """Build the readiness response (503 when a critical dependency is down)"""
+    report = await health_checker.get_report()
+    ready = report["status"] != UNHEALTHY
+    if not ready:
+        logger.error(f"Readiness check failed: {dict(report['checks'])}")
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "timestamp": report["timestamp"],
+            "checks": jsonable_encoder(report["checks"]),
+        },
+    )
+
+
+def _liveness_response() -> Dict[str, Any]:
+    """Build the liveness response (process only, no dependency I/O)"""
+    return {
+        "status": "alive",
         "timestamp": datetime.utcnow().isoformat(),
-        "version": "3.0.0",
-        "checks": {},
     }
-    
-    # Check database
-    try:
-        from app.core.database import get_db
-        async for db in get_db():
-            await db.execute("SELECT 1")
-            health_status["checks"]["database"] = {
-                "status": "healthy",
-                "message": "Database connection successful",
-            }
-            break
-    except Exception as e:
-        health_status["status"] = "unhealthy"
-        health_status["checks"]["database"] = {
-            "status": "unhealthy",
-            "message": str(e),
-        }
-    
-    # Check Redis
-    try:
-        client = await redis_client.get_client()
-        await client.ping()
-        health_status["checks"]["redis"] = {
-            "status": "healthy",
-            "message": "Redis connection successful",
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["checks"]["redis"] = {
-            "status": "unhealthy",
-            "message": str(e),
-        }
-    
-    # Check MinIO
-    try:
-        minio_client.get_client()
-        health_status["checks"]["minio"] = {
-            "status": "healthy",
-            "message": "MinIO connection successful",
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["checks"]["minio"] = {
-            "status": "unhealthy",
-            "message": str(e),
-        }
-    
-    # Check Kafka (optional)
-    try:
-        # Kafka producer is lazy-initialized, just check if it can be created
-        if kafka_producer:
-            health_status["checks"]["kafka"] = {
-                "status": "healthy",
-                "message": "Kafka producer available",
-            }
-        else:
-            health_status["checks"]["kafka"] = {
-                "status": "unknown",
-                "message": "Kafka not configured",
-            }
-    except Exception as e:
-        health_status["checks"]["kafka"] = {
-            "status": "unhealthy",
-            "message": str(e),
-        }
-    
-    # Determine overall status
-    if health_status["status"] == "healthy":
-        # Check if any critical service is unhealthy
-        critical_services = ["database"]
-        for service in critical_services:
-            if health_status["checks"].get(service, {}).get("status") != "healthy":
-                health_status["status"] = "unhealthy"
-                break
-    
-    return health_status
 
 
 @router.get("/health/ready")
-async def readiness_check() -> Dict[str, Any]:
+async def readiness_check() -> JSONResponse:
     """
     Readiness check endpoint (Kubernetes readiness probe)
     
     Returns:
         Readiness status
     """
-    try:
-        # Check database
-        from sqlalchemy import text
-        from app.core.database import engine
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
-        
-        return {
-            "status": "ready",
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-    except Exception as e:
-        logger.error(f"Readiness check failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Service not ready: {str(e)}"
-        )
+    return await _readiness_response()
 
 
 @router.get("/health/live")
@@ -144,87 +74,25 @@ async def liveness_check() -> Dict[str, Any]:
     Returns:
         Liveness status
     """
-    return {
-        "status": "alive",
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    return _liveness_response()
 
 
 @router.get("/metrics")
-async def get_metrics() -> Dict[str, Any]:
+async def get_metrics() -> JSONResponse:
     """
     Get application metrics
     
+    Served from the background sampler's latest snapshot.
+    
     Returns:
         Application metrics
     """
-    metrics = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "application": {
-            "name": settings.APP_NAME,
-            "version": "3.0.0",
-            "environment": "production" if not settings.DEBUG else "development",
-        },
-        "database": {},
-        "redis": {},
-        "cache": {},
-    }
-    
-    # Database metrics
-    try:
-        from app.core.database import engine
-        pool = engine.pool
-        metrics["database"] = {
-            "pool_size": pool.size() if hasattr(pool, 'size') else None,
-            "checked_in": pool.checkedin() if hasattr(pool, 'checkedin') else None,
-            "checked_out": pool.checkedout() if hasattr(pool, 'checkedout') else None,
-            "overflow": pool.overflow() if hasattr(pool, 'overflow') else None,
-        }
-    except Exception as e:
-        logger.warning(f"Error getting database metrics: {e}")
-    
-    # Redis metrics
-    try:
-        client = await redis_client.get_client()
-        info = await client.info()
-        metrics["redis"] = {
-            "connected_clients": info.get("connected_clients", 0),
-            "used_memory": info.get("used_memory", 0),
-            "used_memory_human": info.get("used_memory_human", "0B"),
-            "keyspace_hits": info.get("keyspace_hits", 0),
-            "keyspace_misses": info.get("keyspace_misses", 0),
-        }
-        
-        # Calculate cache hit rate
-        hits = info.get("keyspace_hits", 0)
-        misses = info.get("keyspace_misses", 0)
-        total = hits + misses
-        hit_rate = (hits / total * 100) if total > 0 else 0
-        
-        metrics["cache"] = {
-            "hit_rate": round(hit_rate, 2),
-            "hits": hits,
-            "misses": misses,
-            "total_requests": total,
-        }
-    except Exception as e:
-        logger.warning(f"Error getting Redis metrics: {e}")
-    
-    return metrics
+    return JSONResponse(content=jsonable_encoder(await metrics_collector.get_snapshot()))
 
 
-@router.get("/metrics/prometheus")
-async def get_prometheus_metrics() -> str:
-    """
-    Get metrics in Prometheus format
-    
-    Returns:
-        Prometheus metrics in text format
-    """
-    from app.core.metrics import MetricsCollector
-    
-    collector = MetricsCollector()
-    metrics = await collector.collect_all_metrics()
+async def _render_prometheus_text() -> bytes:
+    """Render request metrics and infrastructure gauges in Prometheus text format"""
+    metrics = await metrics_collector.get_snapshot()
     
     # Format as Prometheus text format
     lines = []
@@ -257,5 +125,65 @@ async def get_prometheus_metrics() -> str:
         lines.append(f'metersphere_cache_hits {cache.get("hits", 0)}')
         lines.append(f'metersphere_cache_misses {cache.get("misses", 0)}')
     
-    return "\n".join(lines) + "\n"
+    # System metrics
+    if metrics.get("system"):
+        system = metrics["system"]
+        lines.append(f'metersphere_system_cpu_percent {system.get("cpu_percent", 0)}')
+        lines.append(f'metersphere_system_memory_used_mb {system.get("memory_used_mb", 0)}')
+        lines.append(f'metersphere_system_num_threads {system.get("num_threads", 0)}')
+    
+    # Kafka producer metrics
+    for name, value in (metrics.get("kafka") or {}).items():
+        lines.append(f'metersphere_kafka_producer_{name} {value}')
+    
+    # Kafka batch consumer counters and per-partition lag
+    for group, consumer in (metrics.get("kafka_consumers") or {}).items():
+        for name in ("processed", "batches", "failed_batches", "dead_lettered", "in_flight"):
+            lines.append(f'metersphere_kafka_consumer_{name}{{group="{group}"}} {consumer[name]}')
+        for partition, lag in consumer["lag"].items():
+            topic, _, number = partition.rpartition(":")
+            lines.append(
+                f'metersphere_kafka_consumer_lag{{group="{group}",topic="{topic}",partition="{number}"}} {lag}'
+            )
+    
+    # Event bus publish counters
+    if metrics.get("event_bus"):
+        bus = metrics["event_bus"]
+        for name in ("published", "failed", "dropped", "buffered"):
+            lines.append(f'metersphere_event_bus_{name}{{backend="{bus["backend"]}"}} {bus.get(name, 0)}')
+    
+    # Per-route request counters and latency histograms
+    return metrics_registry.render() + ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@router.get("/metrics/prometheus")
+async def get_prometheus_metrics() -> Response:
+    """
+    Get metrics in Prometheus format
+    
+    Returns:
+        Prometheus metrics in text format
+    """
+    return Response(content=await _render_prometheus_text(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Mounted at the application root for the conventional /metrics, /livez and /readyz paths
+root_router = APIRouter()
+
+
+@root_router.get("/livez", include_in_schema=False)
+async def livez() -> Dict[str, Any]:
+    """Liveness probe (process only)"""
+    return _liveness_response()
+
+
+@root_router.get("/readyz", include_in_schema=False)
+async def readyz() -> JSONResponse:
+    """Readiness probe (critical dependencies)"""
+    return await _readiness_response()
+
 
+@root_router.get("/metrics", include_in_schema=False)
+async def prometheus_scrape() -> Response:
+    """Prometheus scrape endpoint"""
+    return Response(content=await _render_prometheus_text(), media_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,7 @@
 """
 Import/Export Endpoints
 """
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
+from app.core.redis import redis_client
 from app.services.import_export_service import ImportExportService
+from app.services.import_job_service import ImportJobService, ImportJobStore
 
 router = APIRouter()
 
@@ -19,6 +21,8 @@ async def import_excel(
     file: UploadFile = File(...),
     project_id: str = None,
     import_type: str = "functional_case",
+    version_id: Optional[str] = None,
+    template_id: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -29,6 +33,10 @@ async def import_excel(
         file=file,
         project_id=project_id,
         import_type=import_type,
+        db=db,
+        version_id=version_id,
+        template_id=template_id,
+        create_user=current_user.id,
     )
     
     return result
@@ -66,15 +74,23 @@ async def export_excel(
 async def import_xmind(
     file: UploadFile = File(...),
     project_id: str = None,
+    module_id: Optional[str] = None,
+    version_id: Optional[str] = None,
+    template_id: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Import data from XMind file"""
+    """Import functional cases from an XMind file"""
     service = ImportExportService()
     
     result = await service.import_xmind(
         file=file,
         project_id=project_id,
+        db=db,
+        module_id=module_id,
+        version_id=version_id,
+        template_id=template_id,
+        create_user=current_user.id,
     )
     
     return result
@@ -84,6 +100,7 @@ async def import_xmind(
 async def import_postman(
     file: UploadFile = File(...),
     project_id: str = None,
+    module_id: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -93,6 +110,9 @@ async def import_postman(
     result = await service.import_postman(
         file=file,
         project_id=project_id,
+        db=db,
+        module_id=module_id,
+        create_user=current_user.id,
     )
     
     return result
@@ -102,15 +122,21 @@ async def import_postman(
 async def import_swagger(
     file: UploadFile = File(...),
     project_id: str = None,
+    module_id: Optional[str] = None,
+    cover_data: bool = Query(False, description="Update changed and delete removed operations"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Import Swagger/OpenAPI specification"""
+    """Import Swagger/OpenAPI specification; unchanged operations are not rewritten"""
     service = ImportExportService()
     
     result = await service.import_swagger(
         file=file,
         project_id=project_id,
+        db=db,
+        module_id=module_id,
+        cover_data=cover_data,
+        create_user=current_user.id,
     )
     
     return result
@@ -133,3 +159,79 @@ async def import_jmeter(
     
     return result
 
+
+async def get_import_job_service() -> ImportJobService:
+    """Import job service on the shared Redis client"""
+    return ImportJobService(ImportJobStore(await redis_client.get_client()))
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_import_job(
+    file: UploadFile = File(...),
+    import_type: str = Form(..., description="functional_case_excel, api_test_excel, xmind, postman, swagger or jmeter"),
+    project_id: str = Form(...),
+    version_id: Optional[str] = Form(None),
+    template_id: Optional[str] = Form(None),
+    module_id: Optional[str] = Form(None),
+    cover_data: bool = Form(False, description="swagger: update changed and delete removed operations"),
+    current_user: User = Depends(get_current_user),
+    service: ImportJobService = Depends(get_import_job_service),
+):
+    """Store the file and import it in the background; poll the returned job"""
+    params = {
+        "version_id": version_id,
+        "template_id": template_id,
+        "module_id": module_id,
+        "cover_data": cover_data or None,
+    }
+    return await service.submit(
+        file,
+        import_type,
+        project_id,
+        params={name: value for name, value in params.items() if value is not None},
+        create_user=current_user.id,
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(
+    job_id: str,
+    error_offset: int = Query(0, ge=0),
+    error_limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    service: ImportJobService = Depends(get_import_job_service),
+):
+    """Get import job progress and row errors"""
+    job = await service.get(job_id, error_offset, error_limit)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_import_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    service: ImportJobService = Depends(get_import_job_service),
+):
+    """Cancel an import job (a running job stops after its current chunk)"""
+    job = await service.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_import_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    service: ImportJobService = Depends(get_import_job_service),
+):
+    """Re-queue a failed or stalled import job from its last checkpoint"""
+    try:
+        job = await service.resume(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
@@ -14,7 +14,7 @@ from app.core.security import get_current_user
 from app.models.user import User
 from app.services.jmeter_service import JMeterService
 from app.services.file_service import FileService
-from app.core.kafka import notify_test_execution_result
+from app.core.event_bus import notify_test_execution_result
 
 router = APIRouter()
 
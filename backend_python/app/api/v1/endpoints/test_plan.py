@@ -1,30 +1,40 @@
 """
 Test Plan Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.schemas.test_plan import TestPlan, TestPlanCreate, TestPlanUpdate, TestPlanReport
-from app.services.test_plan_service import TestPlanService
+from app.core.database_optimization import KeysetPaginationHelper
+from app.services.test_plan_service import TestPlanService, TEST_PLAN_LIST_KEYS
 
 router = APIRouter()
 
 
 @router.get("/plans", response_model=List[TestPlan])
 async def get_test_plans(
+    response: Response,
     project_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     keyword: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get test plans"""
     service = TestPlanService(db)
-    return await service.get_test_plans(project_id, skip, limit, keyword, status, type)
+    try:
+        items = await service.get_test_plans(project_id, skip, limit, keyword, status, type, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = KeysetPaginationHelper.next_cursor(items, TEST_PLAN_LIST_KEYS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/plans/{plan_id}", response_model=TestPlan)
@@ -97,7 +107,7 @@ async def get_test_plan_reports(
     plan_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get test plan reports"""
     service = TestPlanService(db)
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from app.services.user_service import UserService
 from app.utils.pagination import PaginationParams, PaginatedResponse, get_pagination_params
@@ -19,7 +19,7 @@ async def get_users(
     limit: int = Query(100, ge=1, le=1000),
     organization_id: Optional[str] = Query(None),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get users with pagination (optimized with caching)"""
     service = UserService(db)
@@ -32,7 +32,7 @@ async def get_users_paginated(
     pagination: PaginationParams = Depends(get_pagination_params),
     organization_id: Optional[str] = Query(None),
     keyword: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get users with pagination (optimized)"""
     service = UserService(db)
@@ -48,6 +48,7 @@ async def get_users_paginated(
         page=result["page"],
         page_size=result["page_size"],
         pages=result["pages"],
+        total_exact=result["total_exact"],
     )
 
 
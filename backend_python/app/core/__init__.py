@@ -3,7 +3,13 @@ Core modules
 """
 from app.core.config import settings, get_settings
 from app.core.redis import redis_client, get_redis
-from app.core.kafka import kafka_producer, send_kafka_message, notify_test_execution_result
+from app.core.kafka import (
+    kafka_producer,
+    kafka_async_producer,
+    send_kafka_message,
+    publish_kafka_message,
+)
+from app.core.event_bus import event_bus, notify_test_execution_result
 from app.core.minio import minio_client, get_minio
 from app.core.celery_app import celery_app, get_celery_app
 
@@ -13,7 +19,10 @@ __all__ = [
     "redis_client",
     "get_redis",
     "kafka_producer",
+    "kafka_async_producer",
     "send_kafka_message",
+    "publish_kafka_message",
+    "event_bus",
     "notify_test_execution_result",
     "minio_client",
     "get_minio",
@@ -17,6 +17,7 @@ celery_app = Celery(
         "app.tasks.test_execution",
         "app.tasks.report_generation",
         "app.tasks.scheduled_tasks",
+        "app.tasks.import_jobs",
     ]
 )
 
@@ -53,6 +54,21 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.scheduled_tasks.generate_daily_statistics",
         "schedule": crontab(hour=1, minute=0),  # Daily at 1 AM
     },
+    # Fold finished reports into execution rollups
+    "rollup-execution-history": {
+        "task": "app.tasks.scheduled_tasks.rollup_execution_history",
+        "schedule": crontab(minute="*"),  # Every minute
+    },
+    # Delete unreferenced content-addressed file blobs
+    "collect-file-blobs": {
+        "task": "app.tasks.scheduled_tasks.collect_file_blobs",
+        "schedule": crontab(hour=3, minute=0),  # Daily at 3 AM
+    },
+    # Re-queue import jobs whose worker died
+    "resume-stalled-import-jobs": {
+        "task": "app.tasks.import_jobs.resume_stalled_import_jobs",
+        "schedule": crontab(minute="*/5"),  # Every 5 minutes
+    },
 }
 
 
@@ -23,6 +23,8 @@ class Settings(BaseSettings):
     DATABASE_POOL_MAX_OVERFLOW: int = 20
     DATABASE_POOL_TIMEOUT: int = 30
     DATABASE_POOL_RECYCLE: int = 1800
+    READ_REPLICA_URLS: List[str] = []  # read-only replicas used by get_read_db
+    READ_REPLICA_EJECT_SECONDS: int = 30  # seconds a failed replica is skipped
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -35,6 +37,24 @@ class Settings(BaseSettings):
     KAFKA_GROUP_ID: str = "metersphere_group_id"
     KAFKA_MAX_REQUEST_SIZE: int = 1073741824  # 1GB
     KAFKA_BATCH_SIZE: int = 16384
+    KAFKA_LINGER_MS: int = 20  # Wait up to this long to fill a batch
+    KAFKA_COMPRESSION_TYPE: Optional[str] = "gzip"  # gzip or None; snappy, lz4 and zstd need cramjam
+    KAFKA_BUFFER_MAX_MESSAGES: int = 10000  # Messages buffered before producers wait / drop
+    KAFKA_FLUSH_TIMEOUT: float = 10.0  # seconds
+    KAFKA_CONSUMER_MAX_POLL_RECORDS: int = 2000  # Records per poll (batch consumers)
+    KAFKA_CONSUMER_WORKERS: int = 8  # Partitions processed concurrently (batch consumers)
+    KAFKA_CONSUMER_MAX_RETRIES: int = 5  # Redeliveries of a failing batch before its bad messages are dead-lettered
+    KAFKA_CONSUMER_RETRY_BACKOFF_MS: int = 1000  # First retry delay, doubled per attempt (capped at 60s)
+    KAFKA_DEAD_LETTER_TOPIC_SUFFIX: str = ".dlq"  # Dead-letter topic: <topic><suffix>
+    
+    # Event bus (execution results and progress)
+    EVENT_BUS_BACKEND: str = "kafka"  # memory, redis or kafka
+    EVENT_BUS_BUFFER_MAX_EVENTS: int = 10000  # Events buffered before publishers wait / drop
+    EVENT_BUS_BATCH_SIZE: int = 500  # Events forwarded to the backend per round trip
+    EVENT_BUS_REDIS_MAXLEN: int = 100000  # Approximate length cap of each Redis stream
+    PROGRESS_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive interval of progress streams
+    PROGRESS_MAX_PENDING_EVENTS: int = 100  # Per-client backlog before step events are skipped
+    PROGRESS_RECENT_EXECUTIONS: int = 1000  # Executions whose latest state is kept for late joiners
     
     # MinIO
     MINIO_ENDPOINT: str = "localhost:9000"
@@ -42,11 +62,31 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "metersphere"
+    MINIO_PART_SIZE: int = 16 * 1024 * 1024  # Multipart upload part size (min 5MB)
+    MINIO_UPLOAD_CONCURRENCY: int = 3  # Parts uploaded in parallel per upload
+    MINIO_DOWNLOAD_CHUNK_SIZE: int = 256 * 1024  # Chunk size of streamed downloads
+    FILE_DOWNLOAD_REDIRECT_SIZE: int = 0  # Redirect downloads this large to a presigned URL (0 = never)
+    FILE_BLOB_GC_GRACE_SECONDS: int = 3600  # Keep unreferenced blobs this long before deleting them
+    MINIO_BULK_CONCURRENCY: int = 8  # Requests in flight for bulk copy/delete/stat
+    
+    # Listing counts
+    COUNT_CACHE_TTL: int = 60  # seconds a cached exact count is served
+    COUNT_ESTIMATE_THRESHOLD: int = 100000  # rows above which an EXPLAIN estimate is returned
+    
+    # Sequences (num/pos allocation)
+    SEQUENCE_LEASE_SIZE: int = 1  # numbers leased per process per Redis call
+    SEQUENCE_VERIFY_SECONDS: int = 10  # counters are checked against the table this often
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 1024 * 1024 * 1024  # 1GB
     BATCH_DOWNLOAD_MAX: str = "600MB"
     
+    # Background import jobs
+    IMPORT_JOB_TTL: int = 7 * 24 * 3600  # seconds job state and errors are kept in Redis
+    IMPORT_JOB_STALL_SECONDS: int = 300  # heartbeat age after which a running job is resumed elsewhere
+    IMPORT_JOB_MAX_ATTEMPTS: int = 3  # runs (first + resumes) before a job is failed
+    IMPORT_JOB_MAX_ERRORS: int = 1000  # row errors kept per job
+    
     # JMeter
     JMETER_HOME: str = "/opt/jmeter"
     
@@ -66,6 +106,12 @@ class Settings(BaseSettings):
     QUARTZ_ENABLED: bool = True
     QUARTZ_THREAD_COUNT: int = 10
     
+    # Monitoring
+    PROMETHEUS_MULTIPROC_DIR: Optional[str] = None  # Shared dir for multi-worker metrics
+    METRICS_SAMPLE_INTERVAL: int = 15  # seconds between background metric samples
+    HEALTH_CHECK_INTERVAL: int = 5  # seconds between background health probes
+    HEALTH_CHECK_TIMEOUT: float = 2.0  # per-dependency probe timeout in seconds
+
     # AI Configuration
     AI_ENABLED: bool = False
     OPENAI_API_KEY: Optional[str] = None
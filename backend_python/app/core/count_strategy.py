@@ -0,0 +1,287 @@
+"""
+Count Strategies for Paginated Listings
+
+`SELECT count(*)` over a filtered subquery is usually the most expensive part
+of a list request on large project tables. This module offers cheaper ways to
+produce the total:
+
+- exact:    run the count every time
+- cached:   exact count cached in Redis per (table, filter hash); any write to
+            the table bumps a generation number, which invalidates all of its
+            cached counts at once without scanning keys
+- counter:  per-project row counters kept up to date on create/delete; only
+            valid for the plain "project_id + not deleted" listing
+- estimate: the optimizer's EXPLAIN row estimate when it is above a threshold,
+            exact count below it (MySQL only, other dialects count exactly)
+
+Every strategy returns (total, exact) so responses can say whether the total
+is exact.
+"""
+from typing import Any, Optional, Tuple
+import hashlib
+import json
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.redis import redis_client
+from app.core.config import settings
+from app.core.logging import logger
+
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_COUNTER = "counter"
+COUNT_ESTIMATE = "estimate"
+
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_COUNTER, COUNT_ESTIMATE)
+
+# Per-project counters are rebuilt from an exact count after this many seconds,
+# which bounds drift from writes that bypass the service layer
+COUNTER_TTL = 86400
+
+# Seeds still pending after this many seconds are abandoned
+SEED_TTL = 60
+
+# Store a counter counted while KEYS[2][project] held this seed's token
+# (ARGV: project, token, total, counter TTL); returns 0 when a write cancelled
+# the seed, since its count may have missed that write
+SEED_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[3])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# Adjust a seeded counter by ARGV[2]; an unseeded one instead cancels any
+# seed in progress (ARGV: project, delta)
+ADJUST_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+return nil
+"""
+
+
+def get_table_name(query: Select) -> str:
+    """Name of the table a listing query selects from"""
+    return query.get_final_froms()[0].name
+
+
+def get_filter_hash(query: Select) -> str:
+    """Stable hash of a query's SQL and bound parameters"""
+    compiled = query.compile()
+    key_data = {
+        "sql": str(compiled),
+        "params": compiled.params,
+    }
+    key_str = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.md5(key_str.encode()).hexdigest()
+
+
+class CountStrategy:
+    """Count strategy layer"""
+
+    def __init__(
+        self,
+        ttl: int = settings.COUNT_CACHE_TTL,
+        estimate_threshold: int = settings.COUNT_ESTIMATE_THRESHOLD,
+        key_prefix: str = "count",
+    ):
+        """
+        Initialize count strategy
+
+        Args:
+            ttl: Cached count time to live in seconds
+            estimate_threshold: Minimum estimated rows before an estimate is returned
+            key_prefix: Prefix for Redis keys
+        """
+        self.ttl = ttl
+        self.estimate_threshold = estimate_threshold
+        self.key_prefix = key_prefix
+
+    async def count(
+        self,
+        db: AsyncSession,
+        query: Select,
+        mode: str = COUNT_CACHED,
+        project_id: Optional[str] = None,
+    ) -> Tuple[int, bool]:
+        """
+        Count rows of a listing query
+
+        Args:
+            db: Database session
+            query: SQLAlchemy select query (filters only)
+            mode: One of exact, cached, counter, estimate
+            project_id: Project of the listing (required for counter mode)
+
+        Returns:
+            Tuple of (total, whether the total is exact)
+        """
+        if mode == COUNT_CACHED:
+            return await self.cached_count(db, query), True
+        if mode == COUNT_COUNTER and project_id:
+            return await self.counter_count(db, query, project_id), True
+        if mode == COUNT_ESTIMATE:
+            return await self.estimate_count(db, query)
+        return await self.exact_count(db, query), True
+
+    async def exact_count(self, db: AsyncSession, query: Select) -> int:
+        """Run an exact count of the query"""
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        result = await db.execute(count_query)
+        return result.scalar() or 0
+
+    async def cached_count(self, db: AsyncSession, query: Select) -> int:
+        """Exact count cached per (table, filter hash, table generation)"""
+        table = get_table_name(query)
+        try:
+            client = await redis_client.get_client()
+            generation = await client.get(self._generation_key(table)) or "0"
+            cache_key = f"{self.key_prefix}:{table}:{generation}:{get_filter_hash(query)}"
+            cached = await client.get(cache_key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Count cache get error: {e}")
+            return await self.exact_count(db, query)
+
+        total = await self.exact_count(db, query)
+        try:
+            await client.setex(cache_key, self.ttl, total)
+        except Exception as e:
+            logger.warning(f"Count cache set error: {e}")
+        return total
+
+    async def counter_count(self, db: AsyncSession, query: Select, project_id: str) -> int:
+        """
+        Per-project counter, seeded from an exact count when missing
+
+        A token is registered as a pending seed before counting. Creates and
+        deletes of the project clear it, so a count that may have missed a
+        concurrent write is returned but never stored.
+        """
+        table = get_table_name(query)
+        counter_key, seed_key = self._counter_key(table), self._seed_key(table)
+        try:
+            client = await redis_client.get_client()
+            value = await client.hget(counter_key, project_id)
+            if value is not None:
+                return int(value)
+            token = uuid.uuid4().hex
+            await client.hset(seed_key, project_id, token)
+            await client.expire(seed_key, SEED_TTL)
+        except Exception as e:
+            logger.warning(f"Count counter get error: {e}")
+            return await self.exact_count(db, query)
+
+        total = await self.exact_count(db, query)
+        try:
+            # Doesn't overwrite a counter seeded concurrently by another request
+            await client.eval(SEED_SCRIPT, 2, counter_key, seed_key, project_id, token, total, COUNTER_TTL)
+        except Exception as e:
+            logger.warning(f"Count counter seed error: {e}")
+        return total
+
+    async def estimate_count(self, db: AsyncSession, query: Select) -> Tuple[int, bool]:
+        """
+        Optimizer row estimate for large results, exact count for small ones
+
+        Unlike information_schema.tables.table_rows, the EXPLAIN estimate
+        honors the query's filters and the indexes they use.
+        """
+        try:
+            estimate = await self._explain_rows(db, query)
+        except Exception as e:
+            logger.warning(f"Count estimate error: {e}")
+            estimate = None
+
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate, False
+        return await self.exact_count(db, query), True
+
+    async def _explain_rows(self, db: AsyncSession, query: Select) -> Optional[int]:
+        """Get the EXPLAIN row estimate of a query (None if unsupported)"""
+        conn = await db.connection()
+        if conn.dialect.name != "mysql":
+            return None
+
+        compiled = query.order_by(None).compile(dialect=conn.dialect)
+        if compiled.positional:
+            params: Any = tuple(compiled.params[name] for name in compiled.positiontup)
+        else:
+            params = compiled.params
+        result = await conn.exec_driver_sql(f"EXPLAIN {compiled}", params)
+        rows = [row._mapping.get("rows") for row in result]
+        rows = [int(value) for value in rows if value is not None]
+        return max(rows) if rows else None
+
+    async def invalidate(self, table: str):
+        """Invalidate all cached counts of a table"""
+        try:
+            client = await redis_client.get_client()
+            await client.incr(self._generation_key(table))
+        except Exception as e:
+            logger.warning(f"Count cache invalidation error: {e}")
+
+    async def on_created(self, table: str, project_id: Optional[str] = None, count: int = 1):
+        """
+        Record created rows
+
+        Args:
+            table: Table name
+            project_id: Project of the rows
+            count: Number of rows created
+        """
+        await self.invalidate(table)
+        if project_id:
+            await self._adjust_counter(table, project_id, count)
+
+    async def on_deleted(self, table: str, project_id: Optional[str] = None, count: int = 1):
+        """
+        Record deleted rows
+
+        Args:
+            table: Table name
+            project_id: Project of the rows
+            count: Number of rows deleted
+        """
+        await self.invalidate(table)
+        if project_id:
+            await self._adjust_counter(table, project_id, -count)
+
+    async def _adjust_counter(self, table: str, project_id: str, delta: int):
+        """Adjust a per-project counter if it has been seeded, else cancel its seed"""
+        try:
+            client = await redis_client.get_client()
+            await client.eval(
+                ADJUST_SCRIPT, 2, self._counter_key(table), self._seed_key(table), project_id, delta
+            )
+        except Exception as e:
+            logger.warning(f"Count counter update error: {e}")
+
+    def _generation_key(self, table: str) -> str:
+        """Redis key of a table's cache generation"""
+        return f"{self.key_prefix}:gen:{table}"
+
+    def _counter_key(self, table: str) -> str:
+        """Redis hash key of a table's per-project counters"""
+        # Hash tag keeps the counters and their seeds in one cluster slot
+        return f"{self.key_prefix}:project:{{{table}}}"
+
+    def _seed_key(self, table: str) -> str:
+        """Redis hash key of a table's pending counter seeds"""
+        return f"{self.key_prefix}:seed:{{{table}}}"
+
+
+# Global count strategy instance
+count_strategy = CountStrategy()
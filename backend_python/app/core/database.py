@@ -7,10 +7,17 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 from typing import AsyncGenerator
 
 from app.core.config import settings
+from app.core.read_replica import ReadReplicaRouter, begin_request_scope
+
+
+def _async_url(url: str) -> str:
+    """Use the async driver for a configured database URL"""
+    return url.replace("mysql+pymysql://", "mysql+aiomysql://")
+
 
 # Create async engine
 async_engine = create_async_engine(
-    settings.DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://"),
+    _async_url(settings.DATABASE_URL),
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
@@ -19,6 +26,28 @@ async_engine = create_async_engine(
     future=True,
 )
 
+# Create async engines for read replicas (none configured: reads use the primary)
+read_replica_engines = [
+    create_async_engine(
+        _async_url(url),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    for url in settings.READ_REPLICA_URLS
+]
+
+read_replica_router = ReadReplicaRouter(
+    async_engine,
+    read_replica_engines,
+    eject_seconds=settings.READ_REPLICA_EJECT_SECONDS,
+    # Finish within the health checker's own timeout so failed probes still eject
+    probe_timeout=settings.HEALTH_CHECK_TIMEOUT / 2,
+)
+
 # Create sync engine for migrations
 sync_engine = create_engine(
     settings.DATABASE_URL,
@@ -38,6 +67,11 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = read_replica_router.sessionmaker(
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 SessionLocal = sessionmaker(
     bind=sync_engine,
     autocommit=False,
@@ -50,6 +84,7 @@ Base = declarative_base()
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting database session"""
+    begin_request_scope()
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -61,6 +96,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting a read-mostly database session
+
+    Queries go to a read replica unless the request has already written;
+    writes made through this session still go to the primary.
+    """
+    begin_request_scope()
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
 async def init_db():
     """Initialize database (create tables if not exist)"""
     # Import all models here to ensure they are registered
@@ -2,11 +2,14 @@
 Database optimization utilities
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, Index, text
-from typing import List, Optional, Dict, Any
+from sqlalchemy import select, func, Index, text, and_, or_
+from typing import List, Optional, Dict, Any, Sequence
 from sqlalchemy.sql import Select
+import base64
+import json
 
 from app.core.logging import logger
+from app.core.count_strategy import count_strategy, COUNT_CACHED
 
 
 class QueryOptimizer:
@@ -59,16 +62,9 @@ class QueryOptimizer:
             Count of records
         """
         if use_approximate:
-            # For MySQL, use approximate count from information_schema
-            # This is faster but less accurate
-            table_name = query.column_descriptions[0]['entity'].__tablename__
-            count_query = text(
-                f"SELECT table_rows FROM information_schema.tables "
-                f"WHERE table_schema = DATABASE() AND table_name = :table_name"
-            )
-            result = await db.execute(count_query, {"table_name": table_name})
-            row = result.fetchone()
-            return row[0] if row else 0
+            # EXPLAIN row estimate (honors the query's filters), exact when small
+            total, _ = await count_strategy.estimate_count(db, query)
+            return total
         else:
             # Use exact count
             count_query = select(func.count()).select_from(query.subquery())
@@ -86,6 +82,8 @@ class PaginationHelper:
         page: int = 1,
         page_size: int = 10,
         max_page_size: int = 100,
+        count_mode: str = COUNT_CACHED,
+        project_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Paginate query results
@@ -96,9 +94,11 @@ class PaginationHelper:
             page: Page number (1-based)
             page_size: Number of items per page
             max_page_size: Maximum page size
+            count_mode: Count strategy (exact, cached, counter, estimate)
+            project_id: Project of the listing (used by the counter strategy)
         
         Returns:
-            Dictionary with items, total, page, page_size, pages
+            Dictionary with items, total, total_exact, page, page_size, pages
         """
         # Validate and adjust page size
         page_size = min(page_size, max_page_size)
@@ -108,7 +108,7 @@ class PaginationHelper:
         offset = (page - 1) * page_size
         
         # Get total count (optimized)
-        total = await QueryOptimizer.get_count_optimized(db, query)
+        total, total_exact = await count_strategy.count(db, query, count_mode, project_id)
         
         # Get items
         optimized_query = QueryOptimizer.optimize_select_query(
@@ -125,12 +125,166 @@ class PaginationHelper:
         return {
             "items": items,
             "total": total,
+            "total_exact": total_exact,
             "page": page,
             "page_size": page_size,
             "pages": pages,
         }
 
 
+class KeysetPaginationHelper:
+    """
+    Keyset (cursor) pagination helper
+    
+    Pages are addressed by the sort key of the last row seen instead of an
+    OFFSET, so the database seeks straight to the next row through a matching
+    composite index and page N costs the same as page 1. Keys are sorted
+    descending and must end with a unique column (the primary key) to make
+    the order total. Nullable keys may hold NULL, which sorts as the smallest
+    value (MySQL, SQLite), i.e. after every other value.
+    """
+    
+    @staticmethod
+    def encode_cursor(item: Any, keys: Sequence[Any]) -> str:
+        """
+        Build an opaque cursor pointing after an item
+        
+        Args:
+            item: Last item of the current page
+            keys: Sort key columns
+        
+        Returns:
+            URL-safe cursor string
+        """
+        values = [getattr(item, column.key) for column in keys]
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+        """
+        Decode a cursor into sort key values
+        
+        Args:
+            cursor: Cursor produced by encode_cursor
+            keys: Sort key columns
+        
+        Returns:
+            Sort key values
+        
+        Raises:
+            ValueError: If the cursor is malformed or does not match the keys
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("Invalid cursor: key mismatch")
+        return values
+    
+    @staticmethod
+    def apply(
+        query: Select,
+        keys: Sequence[Any],
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Select:
+        """
+        Order a query by the keyset and seek past a cursor
+        
+        Args:
+            query: SQLAlchemy select query (filters only, no ordering)
+            keys: Sort key columns, most significant first
+            cursor: Cursor of the previous page's last item
+            limit: Page size
+        
+        Returns:
+            Paginated query
+        """
+        if cursor:
+            values = KeysetPaginationHelper.decode_cursor(cursor, keys)
+            # (k1 < v1) OR (k1 = v1 AND k2 < v2) OR ... - expanded form keeps
+            # the leading column as an index range on MySQL
+            conditions = []
+            for i, column in enumerate(keys):
+                if values[i] is None:
+                    # Nothing sorts after NULL
+                    continue
+                equal_prefix = [
+                    keys[j].is_(None) if values[j] is None else keys[j] == values[j]
+                    for j in range(i)
+                ]
+                after = column < values[i]
+                if column.expression.nullable:
+                    # column < value never matches NULL
+                    after = or_(after, column.is_(None))
+                conditions.append(and_(*equal_prefix, after))
+            query = query.where(or_(*conditions))
+        
+        query = query.order_by(*[column.desc() for column in keys])
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+    
+    @staticmethod
+    def next_cursor(items: Sequence[Any], keys: Sequence[Any], limit: int) -> Optional[str]:
+        """
+        Get the cursor of the following page
+        
+        Args:
+            items: Items of the current page
+            keys: Sort key columns
+            limit: Requested page size
+        
+        Returns:
+            Cursor string, or None if this was the last page
+        """
+        if len(items) < limit or not items:
+            return None
+        return KeysetPaginationHelper.encode_cursor(items[-1], keys)
+    
+    @staticmethod
+    async def paginate(
+        db: AsyncSession,
+        query: Select,
+        keys: Sequence[Any],
+        cursor: Optional[str] = None,
+        page_size: int = 10,
+        max_page_size: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Paginate query results by cursor
+        
+        Args:
+            db: Database session
+            query: SQLAlchemy select query (filters only, no ordering)
+            keys: Sort key columns, most significant first
+            cursor: Cursor of the previous page's last item
+            page_size: Number of items per page
+            max_page_size: Maximum page size
+        
+        Returns:
+            Dictionary with items, next_cursor, page_size
+        """
+        page_size = max(1, min(page_size, max_page_size))
+        
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(
+            KeysetPaginationHelper.apply(query, keys, cursor, page_size + 1)
+        )
+        items = list(result.scalars().all())
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        
+        return {
+            "items": items,
+            "next_cursor": KeysetPaginationHelper.encode_cursor(items[-1], keys) if has_more else None,
+            "page_size": page_size,
+        }
+
+
 class IndexManager:
     """Database index management"""
     
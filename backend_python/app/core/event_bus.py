@@ -0,0 +1,506 @@
+"""
+Event Bus
+
+Execution events (test results, progress) are published to a pluggable
+backend selected by ``EVENT_BUS_BACKEND``:
+
+- ``memory``: in-process asyncio fan-out, for single-node installs and tests
+- ``redis``: Redis Streams (XADD / XREADGROUP), shared by all processes
+  without running a broker
+- ``kafka``: the Kafka producer and aiokafka consumers
+
+Publishing never waits on the backend: events go to a bounded buffer and a
+background task forwards them in batches (one pipeline or producer batch per
+flush). Subscribers receive lists of events.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Sequence
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Topic of test execution results (kept from the Kafka-only notifications)
+TEST_EXECUTION_RESULTS_TOPIC = "test_execution_results"
+
+
+class Event(NamedTuple):
+    """Event on a topic"""
+    topic: str
+    value: Dict[str, Any]
+    key: Optional[str] = None
+    id: Optional[str] = None
+
+
+class EventBackend(ABC):
+    """Transport for published events"""
+
+    name = ""
+
+    async def start(self):
+        """Connect the backend"""
+
+    async def stop(self):
+        """Disconnect the backend"""
+
+    @abstractmethod
+    async def publish_batch(self, events: Sequence[Event]):
+        """Publish events in one round trip where the backend allows"""
+
+    def publish_blocking(self, events: Sequence[Event]) -> bool:
+        """Publish from code without an event loop (False if unsupported)"""
+        return False
+
+    @abstractmethod
+    def subscribe(
+        self,
+        topics: Sequence[str],
+        group: Optional[str] = None,
+        max_batch: int = 100,
+        block_ms: int = 1000,
+    ) -> AsyncIterator[List[Event]]:
+        """
+        Iterate over batches of new events
+
+        Subscribers sharing a ``group`` split the events between them; without
+        a group every subscriber sees every event published after it started.
+        """
+
+
+class InMemoryBackend(EventBackend):
+    """Fans events out to subscribers in this process"""
+
+    name = "memory"
+
+    def __init__(self, max_queued: int = 10000):
+        self.max_queued = max_queued
+        # topic -> subscription key (group or private id) -> queue
+        self._queues: Dict[str, Dict[str, asyncio.Queue]] = {}
+        self._members: Dict[str, int] = {}
+        self.dropped = 0
+
+    async def publish_batch(self, events: Sequence[Event]):
+        for event in events:
+            for queue in self._queues.get(event.topic, {}).values():
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+    def subscribe(
+        self,
+        topics: Sequence[str],
+        group: Optional[str] = None,
+        max_batch: int = 100,
+        block_ms: int = 1000,
+    ) -> AsyncIterator[List[Event]]:
+        # Registered immediately: events published from here on are delivered
+        subscription = f"group:{group}" if group else f"private:{uuid.uuid4().hex}"
+        queue = self._register(topics, subscription)
+        return self._iterate(queue, topics, subscription, max_batch)
+
+    async def _iterate(
+        self, queue: asyncio.Queue, topics: Sequence[str], subscription: str, max_batch: int
+    ) -> AsyncIterator[List[Event]]:
+        """Yield everything queued for a subscription, waiting for the first event"""
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                yield batch
+        finally:
+            self._unregister(topics, subscription)
+
+    def _register(self, topics: Sequence[str], subscription: str) -> asyncio.Queue:
+        """Attach a subscription queue (shared within a group) to the topics"""
+        queue = None
+        for topic in topics:
+            queue = queue or self._queues.get(topic, {}).get(subscription)
+        queue = queue or asyncio.Queue(maxsize=self.max_queued)
+        for topic in topics:
+            self._queues.setdefault(topic, {})[subscription] = queue
+        self._members[subscription] = self._members.get(subscription, 0) + 1
+        return queue
+
+    def _unregister(self, topics: Sequence[str], subscription: str):
+        """Detach a subscription once its last member leaves"""
+        self._members[subscription] -= 1
+        if self._members[subscription]:
+            return
+        del self._members[subscription]
+        for topic in topics:
+            self._queues.get(topic, {}).pop(subscription, None)
+
+
+class RedisStreamsBackend(EventBackend):
+    """Stores events in one Redis stream per topic"""
+
+    name = "redis"
+
+    def __init__(self, prefix: str = "events:", maxlen: Optional[int] = None):
+        self.prefix = prefix
+        self.maxlen = maxlen or settings.EVENT_BUS_REDIS_MAXLEN
+        # Connection pool for publishers without an event loop (Celery workers)
+        self._sync_client = None
+
+    def _stream(self, topic: str) -> str:
+        return f"{self.prefix}{topic}"
+
+    def _fields(self, event: Event) -> Dict[str, str]:
+        return {"key": event.key or "", "value": json.dumps(event.value)}
+
+    async def _client(self):
+        from app.core.redis import redis_client
+        return await redis_client.get_client()
+
+    async def publish_batch(self, events: Sequence[Event]):
+        client = await self._client()
+        pipe = client.pipeline(transaction=False)
+        for event in events:
+            # Approximate trimming keeps XADD O(1)
+            pipe.xadd(self._stream(event.topic), self._fields(event), maxlen=self.maxlen, approximate=True)
+        await pipe.execute()
+
+    def publish_blocking(self, events: Sequence[Event]) -> bool:
+        if self._sync_client is None:
+            from redis import Redis
+            self._sync_client = Redis.from_url(
+                settings.REDIS_URL, password=settings.REDIS_PASSWORD, db=settings.REDIS_DB
+            )
+        pipe = self._sync_client.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(self._stream(event.topic), self._fields(event), maxlen=self.maxlen, approximate=True)
+        pipe.execute()
+        return True
+
+    def _parse(self, stream: str, entries) -> List[Event]:
+        topic = stream[len(self.prefix):]
+        return [
+            Event(topic, json.loads(fields["value"]), fields.get("key") or None, entry_id)
+            for entry_id, fields in entries
+        ]
+
+    def subscribe(
+        self,
+        topics: Sequence[str],
+        group: Optional[str] = None,
+        max_batch: int = 100,
+        block_ms: int = 1000,
+    ) -> AsyncIterator[List[Event]]:
+        streams = [self._stream(topic) for topic in topics]
+        if group is None:
+            return self._read_new(streams, max_batch, block_ms)
+        return self._read_group(streams, group, max_batch, block_ms)
+
+    async def _read_new(self, streams: List[str], max_batch: int, block_ms: int) -> AsyncIterator[List[Event]]:
+        """XREAD events published after the subscription started"""
+        client = await self._client()
+        # Resolve "$" once; repeating it per XREAD would skip events on idle streams
+        last_ids = {}
+        for stream in streams:
+            latest = await client.xrevrange(stream, count=1)
+            last_ids[stream] = latest[0][0] if latest else "0-0"
+        while True:
+            response = await client.xread(last_ids, count=max_batch, block=block_ms)
+            for stream, entries in response or []:
+                last_ids[stream] = entries[-1][0]
+                yield self._parse(stream, entries)
+
+    async def _read_group(
+        self, streams: List[str], group: str, max_batch: int, block_ms: int
+    ) -> AsyncIterator[List[Event]]:
+        """XREADGROUP events as one consumer of a group, acknowledging each batch"""
+        from redis.exceptions import ResponseError
+
+        client = await self._client()
+        for stream in streams:
+            try:
+                await client.xgroup_create(stream, group, id="$", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        consumer = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        while True:
+            response = await client.xreadgroup(
+                group, consumer, {stream: ">" for stream in streams}, count=max_batch, block=block_ms
+            )
+            for stream, entries in response or []:
+                if not entries:
+                    continue
+                yield self._parse(stream, entries)
+                # Acknowledged once the subscriber asks for the next batch
+                await client.xack(stream, group, *(entry_id for entry_id, _ in entries))
+
+
+class KafkaBackend(EventBackend):
+    """Publishes through the async Kafka producer"""
+
+    name = "kafka"
+
+    async def publish_batch(self, events: Sequence[Event]):
+        from app.core.kafka import kafka_async_producer
+
+        if not kafka_async_producer.started:
+            # The producer failed to start: send with the blocking client off the loop
+            loop = asyncio.get_event_loop()
+            if not await loop.run_in_executor(None, self.publish_blocking, events):
+                raise ConnectionError("Kafka did not acknowledge every event")
+            return
+        for event in events:
+            await kafka_async_producer.send(event.topic, event.value, event.key)
+
+    def publish_blocking(self, events: Sequence[Event]) -> bool:
+        from app.core.kafka import send_kafka_message
+        return all([send_kafka_message(event.topic, event.value, event.key) for event in events])
+
+    async def subscribe(
+        self,
+        topics: Sequence[str],
+        group: Optional[str] = None,
+        max_batch: int = 100,
+        block_ms: int = 1000,
+    ) -> AsyncIterator[List[Event]]:
+        from aiokafka import AIOKafkaConsumer
+
+        consumer = AIOKafkaConsumer(
+            *topics,
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(','),
+            group_id=group,
+            value_deserializer=lambda m: json.loads(m.decode('utf-8')),
+            key_deserializer=lambda k: k.decode('utf-8') if k else None,
+            auto_offset_reset="latest",
+            enable_auto_commit=False,
+        )
+        await consumer.start()
+        try:
+            while True:
+                records = await consumer.getmany(timeout_ms=block_ms, max_records=max_batch)
+                for messages in records.values():
+                    yield [
+                        Event(message.topic, message.value, message.key, f"{message.partition}-{message.offset}")
+                        for message in messages
+                    ]
+                if records and group:
+                    await consumer.commit()
+        finally:
+            await consumer.stop()
+
+
+BACKENDS = {
+    InMemoryBackend.name: InMemoryBackend,
+    RedisStreamsBackend.name: RedisStreamsBackend,
+    KafkaBackend.name: KafkaBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> EventBackend:
+    """Instantiate a backend by name (EVENT_BUS_BACKEND by default)"""
+    name = name or settings.EVENT_BUS_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown event bus backend: {name}")
+    return BACKENDS[name]()
+
+
+class EventBus:
+    """Buffers published events and forwards them to the backend in batches"""
+
+    def __init__(
+        self,
+        backend: Optional[EventBackend] = None,
+        max_buffered: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self._backend = backend
+        self._max_buffered = max_buffered or settings.EVENT_BUS_BUFFER_MAX_EVENTS
+        self._batch_size = batch_size or settings.EVENT_BUS_BATCH_SIZE
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"published": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def backend(self) -> EventBackend:
+        """Configured backend (created on first use)"""
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    @property
+    def started(self) -> bool:
+        """Whether publishes are buffered and flushed in the background"""
+        return self._flusher is not None
+
+    @property
+    def buffered(self) -> int:
+        """Events waiting to be forwarded"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the backend and the background flusher"""
+        if self.started:
+            return
+        await self.backend.start()
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._max_buffered)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"Event bus started ({self.backend.name} backend)")
+
+    async def publish(self, topic: str, value: Dict[str, Any], key: Optional[str] = None):
+        """Publish an event, waiting while the buffer is full (backpressure)"""
+        await self.publish_many([Event(topic, value, key)])
+
+    async def publish_many(self, events: Iterable[Event]):
+        """Publish several events, waiting while the buffer is full"""
+        events = list(events)
+        if not self.started:
+            await self._forward(events)
+            return
+        for event in events:
+            await self._queue.put(event)
+
+    def publish_nowait(self, topic: str, value: Dict[str, Any], key: Optional[str] = None) -> bool:
+        """
+        Publish an event without waiting (fire-and-forget)
+
+        Safe to call from any thread. On the bus's loop a full buffer drops
+        the event and returns False. Code without an event loop (Celery
+        workers) publishes synchronously when the backend supports it.
+        """
+        event = Event(topic, value, key)
+        if not self.started:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return self._publish_blocking([event])
+            logger.warning(f"Event bus is not started, dropped event for topic {topic}")
+            self.stats["dropped"] += 1
+            return False
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            return self._offer(event)
+        try:
+            self._loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            # Loop closed during shutdown
+            return False
+        return True
+
+    def _offer(self, event: Event) -> bool:
+        """Buffer an event if there is room, otherwise drop it"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Event bus buffer full, dropped event for topic {event.topic}")
+            return False
+
+    def _publish_blocking(self, events: List[Event]) -> bool:
+        """Publish without a loop through the backend's blocking path"""
+        try:
+            published = self.backend.publish_blocking(events)
+        except Exception as e:
+            logger.error(f"Failed to publish events to {self.backend.name}: {e}")
+            published = False
+        self.stats["published" if published else "failed"] += len(events)
+        return published
+
+    async def _forward(self, events: List[Event]):
+        """Hand a batch to the backend, counting the outcome"""
+        try:
+            await self.backend.publish_batch(events)
+            self.stats["published"] += len(events)
+        except Exception as e:
+            self.stats["failed"] += len(events)
+            logger.error(f"Failed to publish {len(events)} events to {self.backend.name}: {e}")
+
+    async def _flush_loop(self):
+        """Forward buffered events, everything available at once"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._forward(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def subscribe(
+        self,
+        topics: Sequence[str],
+        group: Optional[str] = None,
+        max_batch: int = 100,
+        block_ms: int = 1000,
+    ) -> AsyncIterator[List[Event]]:
+        """Iterate over batches of events (see EventBackend.subscribe)"""
+        return self.backend.subscribe(list(topics), group=group, max_batch=max_batch, block_ms=block_ms)
+
+    async def flush(self):
+        """Wait until every buffered event has been forwarded"""
+        if self.started:
+            await self._queue.join()
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Forward buffered events (up to ``timeout`` seconds) and stop"""
+        if not self.started:
+            return
+        timeout = timeout if timeout is not None else settings.KAFKA_FLUSH_TIMEOUT
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Event bus flush timed out, {self.buffered} buffered events discarded")
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self.backend.stop()
+        finally:
+            self._flusher = None
+            self._queue = None
+            self._loop = None
+            logger.info("Event bus stopped")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get publish counters"""
+        return {"backend": self.backend.name, **self.stats, "buffered": self.buffered}
+
+
+# Global event bus instance
+event_bus = EventBus()
+
+
+# Test execution result notification
+def notify_test_execution_result(
+    test_id: str,
+    test_type: str,
+    status: str,
+    result: Dict[str, Any],
+    project_id: Optional[str] = None
+) -> bool:
+    """Publish a test execution result event (fire-and-forget)"""
+    message = {
+        "test_id": test_id,
+        "test_type": test_type,  # api_test, api_scenario, functional_case, test_plan, jmeter
+        "status": status,  # success, failed, running
+        "result": result,
+        "project_id": project_id,
+        "timestamp": time.time()
+    }
+    return event_bus.publish_nowait(TEST_EXECUTION_RESULTS_TOPIC, message, key=test_id)
@@ -0,0 +1,248 @@
+"""
+Execution Progress
+
+Live progress of executions (API tests, scenarios, plans, JMeter runs) for
+SSE/WebSocket clients. Executors publish events through the event bus;
+each worker runs one ``ProgressHub`` that holds a single bus subscription
+and fans events out to the clients watching an execution id.
+
+Event types: ``started``, ``step`` (one step result), ``progress`` (rolling
+aggregate) and ``finished``. A slow client's pending ``progress`` events are
+coalesced into the latest one, and step details beyond its backlog limit are
+skipped (reported as a ``steps_skipped`` count); ``started`` and
+``finished`` are always delivered.
+"""
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.event_bus import Event, EventBus, TEST_EXECUTION_RESULTS_TOPIC, event_bus
+from app.core.logging import logger
+
+
+EXECUTION_PROGRESS_TOPIC = "execution_progress"
+
+STARTED = "started"
+STEP = "step"
+PROGRESS = "progress"
+FINISHED = "finished"
+STEPS_SKIPPED = "steps_skipped"
+SNAPSHOT = "snapshot"
+
+
+def publish_execution_event(execution_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> bool:
+    """Publish a progress event of an execution (fire-and-forget)"""
+    message = {
+        "execution_id": execution_id,
+        "type": event_type,
+        "data": data or {},
+        "timestamp": time.time(),
+    }
+    return event_bus.publish_nowait(EXECUTION_PROGRESS_TOPIC, message, key=execution_id)
+
+
+class ExecutionProgressReporter:
+    """Publishes step results and throttled rolling aggregates of one execution"""
+
+    def __init__(self, execution_id: str, total: Optional[int] = None, interval: float = 0.5):
+        self.execution_id = execution_id
+        self.interval = interval
+        self.aggregate = {"total": total, "completed": 0, "passed": 0, "failed": 0, "duration_sum": 0}
+        self._last_progress = 0.0
+
+    def started(self, **data):
+        publish_execution_event(self.execution_id, STARTED, data)
+
+    def step(self, name: str, status: str, duration: int = 0, **data):
+        """Report one step result; an aggregate goes out at most every ``interval`` seconds"""
+        aggregate = self.aggregate
+        aggregate["completed"] += 1
+        aggregate["passed" if status == "success" else "failed"] += 1
+        aggregate["duration_sum"] += duration
+        publish_execution_event(
+            self.execution_id, STEP, {"name": name, "status": status, "duration": duration, **data}
+        )
+        now = time.monotonic()
+        if now - self._last_progress >= self.interval:
+            self._last_progress = now
+            publish_execution_event(self.execution_id, PROGRESS, dict(aggregate))
+
+    def finished(self, status: str, **data):
+        publish_execution_event(self.execution_id, PROGRESS, dict(self.aggregate))
+        publish_execution_event(self.execution_id, FINISHED, {"status": status, **self.aggregate, **data})
+
+
+def _to_progress_event(event: Event) -> Optional[Dict[str, Any]]:
+    """Normalize a bus event to a progress event (None if unrelated)"""
+    value = event.value
+    if event.topic == EXECUTION_PROGRESS_TOPIC:
+        return value
+    if event.topic == TEST_EXECUTION_RESULTS_TOPIC and value.get("test_id"):
+        # Result notifications mark the start ("running") and end of executions
+        return {
+            "execution_id": value["test_id"],
+            "type": STARTED if value.get("status") == "running" else FINISHED,
+            "data": {
+                "status": value.get("status"),
+                "test_type": value.get("test_type"),
+                "project_id": value.get("project_id"),
+                "result": value.get("result") or {},
+            },
+            "timestamp": value.get("timestamp"),
+        }
+    return None
+
+
+class _Watcher:
+    """Pending events of one client, coalesced while the client is slow"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.skipped = 0
+        self.wakeup = asyncio.Event()
+
+    def push(self, event: Dict[str, Any]):
+        event_type = event.get("type")
+        if event_type == PROGRESS and self.pending and self.pending[-1].get("type") == PROGRESS:
+            # Only the latest aggregate matters
+            self.pending[-1] = event
+        elif event_type in (STEP, PROGRESS) and len(self.pending) >= self.max_pending:
+            self.skipped += event_type == STEP
+        else:
+            self.pending.append(event)
+        self.wakeup.set()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        events = list(self.pending)
+        self.pending.clear()
+        self.wakeup.clear()
+        if self.skipped:
+            events.insert(0, {"type": STEPS_SKIPPED, "data": {"count": self.skipped}})
+            self.skipped = 0
+        return events
+
+
+class ProgressHub:
+    """Fans bus events out to the watchers of each execution in this worker"""
+
+    def __init__(
+        self,
+        bus: EventBus = event_bus,
+        max_pending: Optional[int] = None,
+        max_recent: Optional[int] = None,
+    ):
+        self.bus = bus
+        self.max_pending = max_pending or settings.PROGRESS_MAX_PENDING_EVENTS
+        self.max_recent = max_recent or settings.PROGRESS_RECENT_EXECUTIONS
+        self._watchers: Dict[str, Set[_Watcher]] = {}
+        # Latest state per execution for clients that join mid-run (LRU)
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._subscription = None
+
+    @property
+    def watcher_count(self) -> int:
+        return sum(len(watchers) for watchers in self._watchers.values())
+
+    def start(self):
+        """Open this worker's bus subscription (idempotent)"""
+        if self._task is None:
+            # Subscribe before returning so no event published afterwards is missed
+            self._subscription = self.bus.subscribe(
+                [EXECUTION_PROGRESS_TOPIC, TEST_EXECUTION_RESULTS_TOPIC], max_batch=1000
+            )
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Close the subscription"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._subscription = None
+
+    async def _run(self):
+        """Dispatch batches from the bus until cancelled"""
+        while True:
+            try:
+                async for batch in self._subscription:
+                    for event in batch:
+                        progress = _to_progress_event(event)
+                        if progress is not None:
+                            self.dispatch(progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress subscription failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+                self._subscription = self.bus.subscribe(
+                    [EXECUTION_PROGRESS_TOPIC, TEST_EXECUTION_RESULTS_TOPIC], max_batch=1000
+                )
+
+    def dispatch(self, event: Dict[str, Any]):
+        """Remember an execution's state and forward the event to its watchers"""
+        execution_id = event.get("execution_id")
+        if not execution_id:
+            return
+        self._remember(execution_id, event)
+        for watcher in self._watchers.get(execution_id, ()):
+            watcher.push(event)
+
+    def _remember(self, execution_id: str, event: Dict[str, Any]):
+        """Track status and latest aggregate of recent executions"""
+        state = self._recent.pop(execution_id, None) or {"status": "running", "progress": None, "finished": False}
+        event_type = event.get("type")
+        if event_type == PROGRESS:
+            state["progress"] = event.get("data")
+        elif event_type == FINISHED:
+            state["finished"] = True
+            state["status"] = (event.get("data") or {}).get("status", "finished")
+            state["result"] = event.get("data")
+        self._recent[execution_id] = state
+        while len(self._recent) > self.max_recent:
+            self._recent.popitem(last=False)
+
+    async def watch(self, execution_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Iterate over the progress events of an execution
+
+        Starts with a ``snapshot`` when the execution is already known and
+        ends after ``finished``. Yields None every ``heartbeat`` seconds
+        without events so callers can keep connections alive.
+        """
+        self.start()
+        heartbeat = heartbeat or settings.PROGRESS_HEARTBEAT_SECONDS
+        watcher = _Watcher(self.max_pending)
+        self._watchers.setdefault(execution_id, set()).add(watcher)
+        try:
+            state = self._recent.get(execution_id)
+            if state is not None:
+                yield {"execution_id": execution_id, "type": SNAPSHOT, "data": dict(state)}
+                if state["finished"]:
+                    return
+            while True:
+                try:
+                    await asyncio.wait_for(watcher.wakeup.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                for event in watcher.drain():
+                    yield event
+                    if event.get("type") == FINISHED:
+                        return
+        finally:
+            watchers = self._watchers.get(execution_id)
+            if watchers is not None:
+                watchers.discard(watcher)
+                if not watchers:
+                    del self._watchers[execution_id]
+
+
+# Global progress hub instance
+progress_hub = ProgressHub()
@@ -0,0 +1,45 @@
+"""
+GZip middleware that leaves downloads and event streams alone
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Already compressed, or must reach the client as each chunk is written
+UNCOMPRESSED_MEDIA_TYPES = frozenset({"application/zip", "text/event-stream"})
+
+
+def skip_compression(headers: Headers) -> bool:
+    """
+    Whether a response must be sent as is
+
+    Ranged downloads (Accept-Ranges / Content-Range) keep their byte offsets
+    and Content-Length, attachments are streamed unchanged, and zip archives
+    and Server-Sent Events are neither recompressed nor buffered.
+    """
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (
+        media_type in UNCOMPRESSED_MEDIA_TYPES
+        or "accept-ranges" in headers
+        or "content-range" in headers
+        or headers.get("content-disposition", "").lower().startswith("attachment")
+    )
+
+
+class SelectiveGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start" and skip_compression(Headers(raw=message["headers"])):
+            # Passes the body through the same way as an already encoded response
+            self.content_encoding_set = True
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that skips the responses matched by ``skip_compression``"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = SelectiveGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,211 @@
+"""
+Dependency Health Checks
+
+Probes run concurrently with a per-dependency timeout. A background refresher
+keeps the latest report cached, so health endpoints hit by Kubernetes probes
+on every pod do not open database sessions or Redis round trips per request.
+"""
+from typing import Dict, Any, Mapping, Optional, Callable, Awaitable
+from types import MappingProxyType
+from datetime import datetime
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.database import async_engine, read_replica_router
+from app.core.redis import redis_client
+from app.core.minio import minio_client
+from app.core.kafka import kafka_producer, kafka_async_producer
+from app.core.config import settings
+from app.core.logging import logger
+
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+DEGRADED = "degraded"
+UNKNOWN = "unknown"
+
+# Dependencies that make the instance unready when they fail
+CRITICAL_DEPENDENCIES = ("database",)
+
+
+async def check_database():
+    """Run a trivial query on a pooled connection"""
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_redis():
+    """Ping Redis"""
+    client = await redis_client.get_client()
+    await client.ping()
+
+
+async def check_minio():
+    """Check the configured bucket is reachable (blocking SDK runs in the executor)"""
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(
+        None, lambda: minio_client.get_client().bucket_exists(minio_client.bucket)
+    )
+
+
+async def check_kafka() -> Optional[str]:
+    """Check broker connectivity of the producers without forcing them to initialize"""
+    connected = kafka_async_producer.is_connected()
+    if connected is None:
+        loop = asyncio.get_event_loop()
+        connected = await loop.run_in_executor(None, kafka_producer.is_connected)
+    if connected is None:
+        return UNKNOWN
+    if not connected:
+        raise ConnectionError("Kafka producer is not connected to any bootstrap broker")
+    return None
+
+
+async def check_read_replicas():
+    """Probe read replicas; failed ones are ejected from read routing"""
+    results = await read_replica_router.check()
+    failed = [url for url, healthy in results.items() if not healthy]
+    if failed:
+        raise ConnectionError(f"Read replicas unavailable: {', '.join(failed)}")
+
+
+DEFAULT_CHECKS: Dict[str, Callable[[], Awaitable[Optional[str]]]] = {
+    "database": check_database,
+    "redis": check_redis,
+    "minio": check_minio,
+    "kafka": check_kafka,
+}
+
+if read_replica_router.replicas:
+    DEFAULT_CHECKS["read_replicas"] = check_read_replicas
+
+
+class HealthChecker:
+    """Concurrent dependency health checker with a cached report"""
+
+    def __init__(
+        self,
+        checks: Optional[Dict[str, Callable[[], Awaitable[Optional[str]]]]] = None,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        timeout: float = settings.HEALTH_CHECK_TIMEOUT,
+    ):
+        """
+        Initialize checker
+
+        Args:
+            checks: Mapping of dependency name to async probe; a probe raises on
+                failure and may return a status (e.g. "unknown") to override "healthy"
+            interval: Seconds between background refreshes
+            timeout: Per-dependency timeout in seconds
+        """
+        self.checks = checks if checks is not None else DEFAULT_CHECKS
+        self.interval = interval
+        self.timeout = timeout
+        self._report: Optional[Mapping[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background refresher"""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresher"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        """Refresh the report until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error refreshing health checks: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> Mapping[str, Any]:
+        """
+        Probe all dependencies concurrently and cache the report
+
+        Returns:
+            The new health report
+        """
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._probe(name) for name in names))
+        checks = dict(zip(names, results))
+
+        report = {
+            "status": self._overall_status(checks),
+            "timestamp": datetime.utcnow().isoformat(),
+            "version": "3.0.0",
+            "checks": checks,
+        }
+        self._report = MappingProxyType(report)
+        self._checked_at = time.monotonic()
+        return self._report
+
+    async def get_report(self) -> Mapping[str, Any]:
+        """
+        Get the cached report, probing inline only if it is missing or stale
+
+        Concurrent callers share a single inline probe.
+
+        Returns:
+            Health report
+        """
+        if self._is_fresh():
+            return self._report
+        async with self._lock:
+            if self._is_fresh():
+                return self._report
+            return await self.refresh()
+
+    def _is_fresh(self) -> bool:
+        """Whether the cached report is recent enough to serve"""
+        # Allow a missed refresh before falling back to probing inline
+        max_age = self.interval * 2 + self.timeout
+        return self._report is not None and time.monotonic() - self._checked_at < max_age
+
+    async def _probe(self, name: str) -> Dict[str, Any]:
+        """Run one probe with a timeout and measure its latency"""
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(self.checks[name](), timeout=self.timeout)
+            result = {"status": status or HEALTHY, "message": "OK"}
+        except asyncio.TimeoutError:
+            result = {"status": UNHEALTHY, "message": f"Timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"status": UNHEALTHY, "message": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def _overall_status(self, checks: Dict[str, Dict[str, Any]]) -> str:
+        """Derive the overall status from per-dependency results"""
+        for name in CRITICAL_DEPENDENCIES:
+            if name in checks and checks[name]["status"] != HEALTHY:
+                return UNHEALTHY
+        if any(check["status"] == UNHEALTHY for check in checks.values()):
+            return DEGRADED
+        return HEALTHY
+
+    async def is_ready(self) -> bool:
+        """Whether all critical dependencies are healthy"""
+        report = await self.get_report()
+        return report["status"] != UNHEALTHY
+
+
+# Global health checker instance
+health_checker = HealthChecker()
@@ -1,14 +1,30 @@
 """
 Kafka Producer and Consumer
+
+``KafkaProducerClient`` is the blocking kafka-python producer for code
+without an event loop (Celery workers, scripts). Request handling publishes
+through ``AsyncKafkaProducer``: messages are appended to a bounded in-memory
+buffer and a background task hands them to aiokafka, which batches them per
+partition (linger + compression), so callers never wait on the broker.
+
+``KafkaConsumerClient`` consumes one message at a time, or in batch mode
+hands each partition's records to a worker pool and commits per partition.
+A failing batch is retried with backoff; once its retries are exhausted it
+is handled one message at a time and the failing messages go to a
+dead-letter topic, so one bad message can't block its partition.
 """
-from kafka import KafkaProducer, KafkaConsumer
+from kafka import KafkaProducer, KafkaConsumer, ConsumerRebalanceListener, TopicPartition
 from kafka.errors import KafkaError
-from typing import Optional, Dict, Any, Callable
+from kafka.structs import OffsetAndMetadata
+from aiokafka import AIOKafkaProducer
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, Callable, FrozenSet, List, NamedTuple, Set
 import json
 import asyncio
 from functools import wraps
 import threading
 import time
+import weakref
 
 from app.core.config import settings
 from app.core.logging import logger
@@ -60,6 +76,18 @@ class KafkaProducerClient:
             logger.error(f"Failed to send message to Kafka: {e}")
             return False
     
+    def is_connected(self) -> Optional[bool]:
+        """Whether the producer reaches a bootstrap broker (None if never initialized)"""
+        if self._producer is None:
+            return None
+        return self._producer.bootstrap_connected()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get producer metrics (empty if the producer was never initialized)"""
+        if self._producer is None:
+            return {}
+        return self._producer.metrics()
+    
     def close(self):
         """Close producer"""
         if self._producer:
@@ -67,6 +95,50 @@ class KafkaProducerClient:
             self._producer = None
 
 
+# Longest delay between retries of a failing batch
+MAX_RETRY_BACKOFF_MS = 60000
+
+
+class _PartitionBatch(NamedTuple):
+    """Records of one partition being processed by a worker"""
+    future: Future
+    messages: List[Any]
+    first_offset: int
+    next_offset: int
+    size: int
+    isolated: bool  # Handled one message at a time; the future returns the failures
+    dead_lettered: FrozenSet[int]  # Offsets sent to the dead-letter topic by earlier attempts
+
+
+class _Retry(NamedTuple):
+    """Failed batch of a partition, paused until it is due again"""
+    offset: int
+    attempts: int
+    due: float  # time.monotonic()
+    dead_lettered: FrozenSet[int] = frozenset()
+
+
+class _BatchRebalanceListener(ConsumerRebalanceListener):
+    """Commits finished batches before partitions move to another consumer"""
+    
+    def __init__(self, client: "KafkaConsumerClient"):
+        self.client = client
+    
+    def on_partitions_revoked(self, revoked):
+        # Runs inside poll() on the consuming thread
+        if self.client._in_flight:
+            self.client._finish_batches(self.client._consumer, wait_all=True)
+        for topic_partition in revoked:
+            self.client._retries.pop(topic_partition, None)
+    
+    def on_partitions_assigned(self, assigned):
+        pass
+
+
+# Running consumers, reported by consumer_metrics()
+_active_consumers: "weakref.WeakSet[KafkaConsumerClient]" = weakref.WeakSet()
+
+
 class KafkaConsumerClient:
     """Kafka consumer client"""
     
@@ -76,22 +148,28 @@ class KafkaConsumerClient:
         self._consumer: Optional[KafkaConsumer] = None
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        self._in_flight: Dict[TopicPartition, _PartitionBatch] = {}
+        self._retries: Dict[TopicPartition, _Retry] = {}
+        self._max_retries = settings.KAFKA_CONSUMER_MAX_RETRIES
+        self._retry_backoff_ms = settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS
+        self._lag: Dict[str, int] = {}
+        self.stats = {"processed": 0, "batches": 0, "failed_batches": 0, "dead_lettered": 0}
     
     def get_consumer(self) -> KafkaConsumer:
         """Get or create Kafka consumer"""
         if self._consumer is None:
             self._consumer = KafkaConsumer(
-                *self.topics,
                 bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(','),
                 group_id=self.group_id,
                 value_deserializer=lambda m: json.loads(m.decode('utf-8')),
                 key_deserializer=lambda k: k.decode('utf-8') if k else None,
                 auto_offset_reset='earliest',
                 enable_auto_commit=False,
-                max_poll_records=100,
+                max_poll_records=settings.KAFKA_CONSUMER_MAX_POLL_RECORDS,
                 max_poll_interval_ms=900000,
                 heartbeat_interval_ms=5000,
             )
+            self._consumer.subscribe(topics=self.topics, listener=_BatchRebalanceListener(self))
         return self._consumer
     
     def start_consuming(self, message_handler: Callable[[Dict[str, Any]], None]):
@@ -119,48 +197,556 @@ class KafkaConsumerClient:
                 logger.error(f"Consumer error: {e}")
             finally:
                 consumer.close()
+                self._consumer = None
         
         self._thread = threading.Thread(target=consume_loop, daemon=True)
         self._thread.start()
         logger.info(f"Started Kafka consumer for topics: {self.topics}")
     
-    def stop_consuming(self):
-        """Stop consuming messages"""
+    def start_batch_consuming(
+        self,
+        batch_handler: Callable[[List[Dict[str, Any]]], None],
+        max_workers: Optional[int] = None,
+        max_records: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_ms: Optional[int] = None,
+    ):
+        """
+        Start consuming messages in batches in a separate thread
+        
+        Each poll's records are split by partition and every partition's
+        records go to ``batch_handler`` as one list, in offset order, on a
+        worker pool. Partitions are processed concurrently while messages
+        with the same key (same partition) keep their order: a partition is
+        paused until its batch finishes, then its offset is committed.
+        
+        A batch whose handler raises is rewound and its partition stays
+        paused for retry_backoff_ms, doubled per attempt. After max_retries
+        redeliveries the batch is handled one message at a time; messages
+        that still fail are sent to ``<topic>`` + KAFKA_DEAD_LETTER_TOPIC_SUFFIX
+        and the partition moves past them.
+        
+        Args:
+            batch_handler: Called with the message values of one partition
+            max_workers: Partitions processed concurrently
+            max_records: Maximum records per poll
+            max_retries: Redeliveries of a failing batch before dead-lettering
+            retry_backoff_ms: Delay before the first redelivery
+        """
+        if self._running:
+            logger.warning("Consumer is already running")
+            return
+        
+        self._running = True
+        max_workers = max_workers or settings.KAFKA_CONSUMER_WORKERS
+        max_records = max_records or settings.KAFKA_CONSUMER_MAX_POLL_RECORDS
+        if max_retries is not None:
+            self._max_retries = max_retries
+        if retry_backoff_ms is not None:
+            self._retry_backoff_ms = retry_backoff_ms
+        
+        def batch_loop():
+            consumer = self.get_consumer()
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kafka-batch")
+            try:
+                while self._running:
+                    self._finish_batches(consumer)
+                    self._resume_due(consumer)
+                    # Poll briefly while batches run or wait for a retry so they proceed promptly
+                    message_pack = consumer.poll(
+                        timeout_ms=100 if self._in_flight or self._retries else 1000,
+                        max_records=max_records,
+                    )
+                    for topic_partition, messages in message_pack.items():
+                        if not messages:
+                            continue
+                        consumer.pause(topic_partition)
+                        retry = self._retries.get(topic_partition)
+                        isolated = (
+                            retry is not None
+                            and retry.offset == messages[0].offset
+                            and retry.attempts > self._max_retries
+                        )
+                        dead_lettered = retry.dead_lettered if isolated else frozenset()
+                        if isolated:
+                            # Messages already dead-lettered are not handled or sent again
+                            pending = [message for message in messages if message.offset not in dead_lettered]
+                            future = executor.submit(_handle_each, batch_handler, pending)
+                        else:
+                            future = executor.submit(batch_handler, [message.value for message in messages])
+                        self._in_flight[topic_partition] = _PartitionBatch(
+                            future=future,
+                            messages=messages,
+                            first_offset=messages[0].offset,
+                            next_offset=messages[-1].offset + 1,
+                            size=len(messages),
+                            isolated=isolated,
+                            dead_lettered=dead_lettered,
+                        )
+                    self._update_lag(consumer)
+                self._finish_batches(consumer, wait_all=True)
+            except Exception as e:
+                logger.error(f"Consumer error: {e}")
+            finally:
+                executor.shutdown(wait=True)
+                self._in_flight.clear()
+                self._retries.clear()
+                _active_consumers.discard(self)
+                # Only this thread uses the consumer (kafka-python consumers aren't thread-safe)
+                consumer.close()
+                self._consumer = None
+        
+        _active_consumers.add(self)
+        self._thread = threading.Thread(target=batch_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Started Kafka batch consumer for topics: {self.topics}")
+    
+    def _finish_batches(self, consumer: KafkaConsumer, wait_all: bool = False):
+        """Commit finished partition batches and rewind failed ones for a retry"""
+        if wait_all and self._in_flight:
+            wait([batch.future for batch in self._in_flight.values()])
+        finished = {
+            topic_partition: batch
+            for topic_partition, batch in self._in_flight.items()
+            if batch.future.done()
+        }
+        if not finished:
+            return
+        
+        offsets = {}
+        for topic_partition, batch in finished.items():
+            del self._in_flight[topic_partition]
+            error = batch.future.exception()
+            failures = batch.future.result() if error is None and batch.isolated else []
+            dead_lettered = set(batch.dead_lettered)
+            if failures and not self._dead_letter(topic_partition, failures, dead_lettered):
+                error = failures[0][1]
+            if error is None:
+                offsets[topic_partition] = OffsetAndMetadata(batch.next_offset, None)
+                self.stats["processed"] += batch.size - len(dead_lettered)
+                self.stats["batches"] += 1
+                self._retries.pop(topic_partition, None)
+            else:
+                self.stats["failed_batches"] += 1
+                self._schedule_retry(consumer, topic_partition, batch, error, frozenset(dead_lettered))
+        
+        if offsets:
+            consumer.commit(offsets)
+        assigned = consumer.assignment()
+        resumable = [
+            topic_partition for topic_partition in finished
+            if topic_partition in assigned and topic_partition not in self._retries
+        ]
+        if resumable:
+            consumer.resume(*resumable)
+        self._update_lag(consumer)
+    
+    def _schedule_retry(
+        self,
+        consumer: KafkaConsumer,
+        topic_partition: TopicPartition,
+        batch: _PartitionBatch,
+        error: BaseException,
+        dead_lettered: FrozenSet[int] = frozenset(),
+    ):
+        """Rewind a failed batch; its partition stays paused until the retry is due"""
+        previous = self._retries.get(topic_partition)
+        attempts = previous.attempts + 1 if previous and previous.offset == batch.first_offset else 1
+        delay_ms = min(self._retry_backoff_ms * 2 ** min(attempts - 1, 16), MAX_RETRY_BACKOFF_MS)
+        logger.error(
+            f"Error processing batch of {batch.size} messages from "
+            f"{topic_partition.topic}[{topic_partition.partition}] (attempt {attempts}), "
+            f"retrying in {delay_ms} ms: {error}"
+        )
+        self._retries[topic_partition] = _Retry(
+            batch.first_offset, attempts, time.monotonic() + delay_ms / 1000, dead_lettered
+        )
+        consumer.seek(topic_partition, batch.first_offset)
+    
+    def _resume_due(self, consumer: KafkaConsumer):
+        """Resume paused partitions whose retry is due"""
+        if not self._retries:
+            return
+        now = time.monotonic()
+        assigned = consumer.assignment()
+        due = [
+            topic_partition for topic_partition, retry in self._retries.items()
+            if retry.due <= now and topic_partition not in self._in_flight and topic_partition in assigned
+        ]
+        if due:
+            consumer.resume(*due)
+    
+    def _dead_letter(self, topic_partition: TopicPartition, failures: List[Any], dead_lettered: Set[int]) -> bool:
+        """
+        Send messages that failed on their own to the dead-letter topic
+
+        Adds each sent offset to ``dead_lettered`` as it goes, so a retry after
+        a failed send (False) skips the messages that already made it.
+        """
+        topic = f"{topic_partition.topic}{settings.KAFKA_DEAD_LETTER_TOPIC_SUFFIX}"
+        for message, error in failures:
+            record = {
+                "topic": topic_partition.topic,
+                "partition": topic_partition.partition,
+                "offset": message.offset,
+                "error": str(error),
+                "value": message.value,
+            }
+            if not send_kafka_message(topic, record, message.key):
+                logger.error(f"Failed to dead-letter message {topic_partition.topic}[{topic_partition.partition}]@{message.offset}")
+                return False
+            dead_lettered.add(message.offset)
+            self.stats["dead_lettered"] += 1
+            logger.warning(
+                f"Moved message {topic_partition.topic}[{topic_partition.partition}]@{message.offset} to {topic}: {error}"
+            )
+        return True
+    
+    def _update_lag(self, consumer: KafkaConsumer):
+        """Snapshot per-partition lag (high watermark minus next unprocessed offset)"""
+        lag = {}
+        for topic_partition in consumer.assignment():
+            highwater = consumer.highwater(topic_partition)
+            if highwater is None:
+                continue
+            batch = self._in_flight.get(topic_partition)
+            position = batch.first_offset if batch else consumer.position(topic_partition)
+            lag[f"{topic_partition.topic}:{topic_partition.partition}"] = max(highwater - position, 0)
+        self._lag = lag
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batch counters and per-partition lag"""
+        lag = dict(self._lag)
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "lag": lag,
+            "total_lag": sum(lag.values()),
+        }
+    
+    def stop_consuming(self, timeout: Optional[float] = 30.0):
+        """
+        Stop consuming messages
+        
+        Signals the consuming thread, which finishes its current poll (at
+        most a second) and in-flight batches, then closes the consumer
+        itself. Waits up to ``timeout`` seconds (forever if None).
+        """
         self._running = False
         if self._thread:
-            self._thread.join(timeout=5)
-        if self._consumer:
-            self._consumer.close()
-            self._consumer = None
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning("Kafka consumer is still finishing its batches; it closes when done")
+                return
+            self._thread = None
+        _active_consumers.discard(self)
         logger.info("Stopped Kafka consumer")
 
 
-# Global producer instance
+def _handle_each(batch_handler: Callable[[List[Dict[str, Any]]], None], messages: List[Any]) -> List[Any]:
+    """Run a batch one message at a time; returns (message, error) of the failures"""
+    failures = []
+    for message in messages:
+        try:
+            batch_handler([message.value])
+        except Exception as e:
+            failures.append((message, e))
+    return failures
+
+
+def consumer_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of running batch consumers, merged per consumer group"""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for client in list(_active_consumers):
+        metrics = client.get_metrics()
+        group = groups.setdefault(
+            client.group_id,
+            {"processed": 0, "batches": 0, "failed_batches": 0, "dead_lettered": 0, "in_flight": 0, "lag": {}, "total_lag": 0},
+        )
+        for name in ("processed", "batches", "failed_batches", "dead_lettered", "in_flight", "total_lag"):
+            group[name] += metrics[name]
+        group["lag"].update(metrics["lag"])
+    return groups
+
+
+# Delivery callback: (record metadata, None) on success, (None, exception) on failure
+DeliveryCallback = Callable[[Any, Optional[BaseException]], None]
+
+
+class _Record(NamedTuple):
+    """Message waiting in the producer buffer"""
+    topic: str
+    value: Dict[str, Any]
+    key: Optional[str]
+    callback: Optional[DeliveryCallback]
+
+
+def _create_aiokafka_producer() -> AIOKafkaProducer:
+    """Build the aiokafka producer from settings"""
+    return AIOKafkaProducer(
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(','),
+        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+        key_serializer=lambda k: k.encode('utf-8') if k else None,
+        max_request_size=settings.KAFKA_MAX_REQUEST_SIZE,
+        max_batch_size=settings.KAFKA_BATCH_SIZE,
+        linger_ms=settings.KAFKA_LINGER_MS,
+        compression_type=settings.KAFKA_COMPRESSION_TYPE,
+        acks=1,  # Wait for leader acknowledgment
+    )
+
+
+class AsyncKafkaProducer:
+    """Batched, non-blocking Kafka producer bound to one event loop"""
+    
+    def __init__(
+        self,
+        producer_factory: Callable[[], Any] = _create_aiokafka_producer,
+        max_buffered: Optional[int] = None,
+    ):
+        self._producer_factory = producer_factory
+        self._max_buffered = max_buffered or settings.KAFKA_BUFFER_MAX_MESSAGES
+        self._producer = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Future] = set()
+        self.stats = {"sent": 0, "failed": 0, "dropped": 0}
+    
+    @property
+    def started(self) -> bool:
+        """Whether the producer accepts messages"""
+        return self._sender is not None
+    
+    @property
+    def buffered(self) -> int:
+        """Messages waiting to be handed to the broker client"""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    async def start(self):
+        """Connect to the brokers and start the background sender"""
+        if self.started:
+            return
+        producer = self._producer_factory()
+        try:
+            await producer.start()
+        except Exception:
+            await producer.stop()
+            raise
+        self._producer = producer
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._max_buffered)
+        self._sender = asyncio.create_task(self._send_loop())
+        logger.info("Kafka async producer started")
+    
+    async def send(
+        self,
+        topic: str,
+        message: Dict[str, Any],
+        key: Optional[str] = None,
+        callback: Optional[DeliveryCallback] = None,
+    ):
+        """
+        Buffer a message, waiting while the buffer is full (backpressure)
+        
+        Returns once the message is buffered, not when it is delivered; pass
+        ``callback`` to learn the delivery outcome.
+        """
+        if not self.started:
+            raise RuntimeError("Kafka async producer is not started")
+        await self._queue.put(_Record(topic, message, key, callback))
+    
+    def publish(
+        self,
+        topic: str,
+        message: Dict[str, Any],
+        key: Optional[str] = None,
+        callback: Optional[DeliveryCallback] = None,
+    ) -> bool:
+        """
+        Buffer a message without waiting (fire-and-forget)
+        
+        Safe to call from any thread. On the producer's loop a full buffer
+        drops the message and returns False; from other threads the message
+        is handed to the loop and True means it was accepted for buffering.
+        """
+        if not self.started:
+            return False
+        record = _Record(topic, message, key, callback)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            return self._offer(record)
+        try:
+            self._loop.call_soon_threadsafe(self._offer, record)
+        except RuntimeError:
+            # Loop closed during shutdown
+            return False
+        return True
+    
+    def _offer(self, record: _Record) -> bool:
+        """Buffer a record if there is room, otherwise drop it"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Kafka buffer full, dropped message for topic {record.topic}")
+            self._complete(record, None, BufferError("Kafka producer buffer is full"))
+            return False
+    
+    async def _send_loop(self):
+        """Hand buffered records to the broker client in order"""
+        while True:
+            record = await self._queue.get()
+            try:
+                # Waits only when the partition's pending batches are full
+                delivery = await self._producer.send(record.topic, value=record.value, key=record.key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._complete(record, None, e)
+            else:
+                self._in_flight.add(delivery)
+                delivery.add_done_callback(lambda future, record=record: self._on_delivery(record, future))
+            finally:
+                self._queue.task_done()
+    
+    def _on_delivery(self, record: _Record, future: asyncio.Future):
+        """Account for a finished delivery and run its callback"""
+        self._in_flight.discard(future)
+        if future.cancelled():
+            self._complete(record, None, asyncio.CancelledError())
+        elif future.exception() is not None:
+            self._complete(record, None, future.exception())
+        else:
+            self._complete(record, future.result(), None)
+    
+    def _complete(self, record: _Record, metadata: Any, error: Optional[BaseException]):
+        """Record the outcome of a message"""
+        if error is None:
+            self.stats["sent"] += 1
+        else:
+            self.stats["failed"] += 1
+            if not isinstance(error, BufferError):
+                logger.error(f"Failed to send message to Kafka topic {record.topic}: {error}")
+        if record.callback is not None:
+            try:
+                record.callback(metadata, error)
+            except Exception as e:
+                logger.error(f"Kafka delivery callback failed: {e}")
+    
+    async def flush(self):
+        """Wait until every buffered message is delivered or failed"""
+        if not self.started:
+            return
+        await self._queue.join()
+        await self._producer.flush()
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+    
+    async def stop(self, timeout: Optional[float] = None):
+        """Flush buffered messages (up to ``timeout`` seconds) and disconnect"""
+        if not self.started:
+            return
+        timeout = timeout if timeout is not None else settings.KAFKA_FLUSH_TIMEOUT
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Kafka flush timed out, {self.buffered} buffered messages discarded")
+        
+        self._sender.cancel()
+        try:
+            await self._sender
+        except asyncio.CancelledError:
+            pass
+        try:
+            await self._producer.stop()
+        finally:
+            self._producer = None
+            self._sender = None
+            self._queue = None
+            self._loop = None
+            logger.info("Kafka async producer stopped")
+    
+    def is_connected(self) -> Optional[bool]:
+        """Whether the producer knows a live broker (None if not started)"""
+        if not self.started:
+            return None
+        client = getattr(self._producer, "client", None)
+        if client is None:
+            return True
+        return bool(client.cluster.brokers())
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get buffering and delivery counters"""
+        return {
+            **self.stats,
+            "buffered": self.buffered,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Global producer instances
 kafka_producer = KafkaProducerClient()
+kafka_async_producer = AsyncKafkaProducer()
 
 
 # Message sending helper
 def send_kafka_message(topic: str, message: Dict[str, Any], key: Optional[str] = None) -> bool:
-    """Send message to Kafka topic"""
+    """Send message to Kafka topic and wait for the acknowledgment (blocking)"""
     return kafka_producer.send_message(topic, message, key)
 
 
-# Test execution result notification
-def notify_test_execution_result(
-    test_id: str,
-    test_type: str,
-    status: str,
-    result: Dict[str, Any],
-    project_id: Optional[str] = None
+def publish_kafka_message(
+    topic: str,
+    message: Dict[str, Any],
+    key: Optional[str] = None,
+    callback: Optional[DeliveryCallback] = None,
+) -> bool:
+    """
+    Publish a message without waiting for delivery
+    
+    Goes through the async producer when it is running. Without it, code
+    without a loop (Celery workers) sends with the blocking producer, and
+    code on an event loop runs that blocking send in the default executor
+    so the loop never waits on the broker (True means it was scheduled).
+    """
+    if kafka_async_producer.started:
+        return kafka_async_producer.publish(topic, message, key, callback)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        sent = send_kafka_message(topic, message, key)
+        _report_blocking_send(topic, callback, sent, None)
+        return sent
+    delivery = loop.run_in_executor(None, send_kafka_message, topic, message, key)
+    delivery.add_done_callback(
+        lambda future: _report_blocking_send(
+            topic, callback, not future.exception() and future.result(), future.exception()
+        )
+    )
+    return True
+
+
+def _report_blocking_send(
+    topic: str,
+    callback: Optional[DeliveryCallback],
+    sent: bool,
+    error: Optional[BaseException],
 ):
-    """Send test execution result notification to Kafka"""
-    message = {
-        "test_id": test_id,
-        "test_type": test_type,  # api_test, functional_case, test_plan
-        "status": status,  # success, failed, running
-        "result": result,
-        "project_id": project_id,
-        "timestamp": time.time()
-    }
-    return send_kafka_message("test_execution_results", message, key=test_id)
+    """Run a delivery callback for a message sent by the blocking producer"""
+    if error is not None:
+        logger.error(f"Failed to send message to Kafka topic {topic}: {error}")
+    if callback is None:
+        return
+    if not sent and error is None:
+        error = KafkaError(f"Failed to send message to topic {topic}")
+    try:
+        callback(None, error)
+    except Exception as e:
+        logger.error(f"Kafka delivery callback failed: {e}")
 
@@ -1,21 +1,116 @@
 """
 Metrics Collection
+
+A background sampler refreshes infrastructure metrics on an interval and
+publishes them as a read-only snapshot, so metrics endpoints never query
+Redis/the database or block on psutil while serving a scrape.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
+from types import MappingProxyType
 from datetime import datetime
+import asyncio
 import time
 import psutil
 import os
 
 from app.core.redis import redis_client
-from app.core.database import engine
+from app.core.database import async_engine
+from app.core.kafka import kafka_producer, kafka_async_producer, consumer_metrics
+from app.core.event_bus import event_bus
 from app.core.config import settings
 from app.core.logging import logger
 
 
+# Kafka producer metrics exposed in the snapshot (kafka-python "producer-metrics" group)
+KAFKA_PRODUCER_METRICS = (
+    "record-send-rate",
+    "record-error-rate",
+    "request-latency-avg",
+    "batch-size-avg",
+    "buffer-available-bytes",
+)
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dictionaries in read-only mapping proxies"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
 class MetricsCollector:
     """Collect application metrics"""
     
+    def __init__(self, interval: float = settings.METRICS_SAMPLE_INTERVAL, timeout: float = 5.0):
+        """
+        Initialize collector
+        
+        Args:
+            interval: Seconds between background samples
+            timeout: Per-source timeout in seconds for a single sample
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self._process = psutil.Process(os.getpid())
+        self._snapshot: Mapping[str, Any] = _freeze({})
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def snapshot(self) -> Mapping[str, Any]:
+        """Latest published snapshot (read-only, replaced as a whole on refresh)"""
+        return self._snapshot
+    
+    async def start(self):
+        """Start the background sampler"""
+        if self._task is not None and not self._task.done():
+            return
+        # Prime the CPU counter so the first sample reports usage since now
+        self._process.cpu_percent(interval=None)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background sampler"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self):
+        """Refresh the snapshot until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error sampling metrics: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def refresh(self) -> Mapping[str, Any]:
+        """
+        Take a new sample and publish it as the current snapshot
+        
+        Returns:
+            The published snapshot
+        """
+        self._snapshot = _freeze(await self.collect_all_metrics())
+        return self._snapshot
+    
+    async def get_snapshot(self) -> Mapping[str, Any]:
+        """
+        Get the latest snapshot, sampling once if nothing was published yet
+        
+        Returns:
+            Read-only metrics snapshot
+        """
+        if not self._snapshot:
+            return await self.refresh()
+        return self._snapshot
+    
     async def collect_all_metrics(self) -> Dict[str, Any]:
         """
         Collect all application metrics
@@ -23,18 +118,27 @@ class MetricsCollector:
         Returns:
             Dictionary of metrics
         """
+        redis_info, system = await asyncio.gather(
+            self._fetch_redis_info(),
+            self._collect_system_metrics(),
+        )
+        
         metrics = {
             "timestamp": datetime.utcnow().isoformat(),
-            "application": await self._collect_application_metrics(),
-            "database": await self._collect_database_metrics(),
-            "redis": await self._collect_redis_metrics(),
-            "system": await self._collect_system_metrics(),
-            "cache": await self._collect_cache_metrics(),
+            "application": self._collect_application_metrics(),
+            "database": self._collect_database_metrics(),
+            "redis": self._collect_redis_metrics(redis_info),
+            "system": system,
+            "cache": self._collect_cache_metrics(redis_info),
+            "kafka": self._collect_kafka_metrics(),
+            "kafka_consumers": consumer_metrics(),
+            "event_bus": event_bus.get_metrics(),
+            "requests": request_metrics.get_stats(),
         }
         
         return metrics
     
-    async def _collect_application_metrics(self) -> Dict[str, Any]:
+    def _collect_application_metrics(self) -> Dict[str, Any]:
         """Collect application-level metrics"""
         return {
             "name": settings.APP_NAME,
@@ -43,10 +147,10 @@ class MetricsCollector:
             "uptime": self._get_uptime(),
         }
     
-    async def _collect_database_metrics(self) -> Dict[str, Any]:
-        """Collect database metrics"""
+    def _collect_database_metrics(self) -> Dict[str, Any]:
+        """Collect database connection pool metrics"""
         try:
-            pool = engine.pool
+            pool = async_engine.pool
             return {
                 "pool_size": pool.size() if hasattr(pool, 'size') else None,
                 "checked_in": pool.checkedin() if hasattr(pool, 'checkedin') else None,
@@ -57,68 +161,93 @@ class MetricsCollector:
             logger.warning(f"Error collecting database metrics: {e}")
             return {}
     
-    async def _collect_redis_metrics(self) -> Dict[str, Any]:
-        """Collect Redis metrics"""
+    async def _fetch_redis_info(self) -> Dict[str, Any]:
+        """Fetch Redis INFO once per sample"""
         try:
             client = await redis_client.get_client()
-            info = await client.info()
-            
-            return {
-                "connected_clients": info.get("connected_clients", 0),
-                "used_memory": info.get("used_memory", 0),
-                "used_memory_human": info.get("used_memory_human", "0B"),
-                "used_memory_peak": info.get("used_memory_peak", 0),
-                "keyspace_hits": info.get("keyspace_hits", 0),
-                "keyspace_misses": info.get("keyspace_misses", 0),
-                "total_commands_processed": info.get("total_commands_processed", 0),
-                "instantaneous_ops_per_sec": info.get("instantaneous_ops_per_sec", 0),
-            }
+            return await asyncio.wait_for(client.info(), timeout=self.timeout)
         except Exception as e:
-            logger.warning(f"Error collecting Redis metrics: {e}")
+            logger.warning(f"Error fetching Redis INFO: {e}")
+            return {}
+    
+    def _collect_redis_metrics(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect Redis metrics from an INFO reply"""
+        if not info:
             return {}
+        return {
+            "connected_clients": info.get("connected_clients", 0),
+            "used_memory": info.get("used_memory", 0),
+            "used_memory_human": info.get("used_memory_human", "0B"),
+            "used_memory_peak": info.get("used_memory_peak", 0),
+            "keyspace_hits": info.get("keyspace_hits", 0),
+            "keyspace_misses": info.get("keyspace_misses", 0),
+            "total_commands_processed": info.get("total_commands_processed", 0),
+            "instantaneous_ops_per_sec": info.get("instantaneous_ops_per_sec", 0),
+        }
     
-    async def _collect_cache_metrics(self) -> Dict[str, Any]:
-        """Collect cache metrics"""
+    def _collect_cache_metrics(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect cache metrics from an INFO reply"""
+        if not info:
+            return {}
+        hits = info.get("keyspace_hits", 0)
+        misses = info.get("keyspace_misses", 0)
+        total = hits + misses
+        hit_rate = (hits / total * 100) if total > 0 else 0
+        
+        return {
+            "hit_rate": round(hit_rate, 2),
+            "hits": hits,
+            "misses": misses,
+            "total_requests": total,
+        }
+    
+    def _collect_kafka_metrics(self) -> Dict[str, Any]:
+        """Collect Kafka producer metrics (without forcing a broker connection)"""
         try:
-            client = await redis_client.get_client()
-            info = await client.info()
-            
-            hits = info.get("keyspace_hits", 0)
-            misses = info.get("keyspace_misses", 0)
-            total = hits + misses
-            hit_rate = (hits / total * 100) if total > 0 else 0
-            
-            return {
-                "hit_rate": round(hit_rate, 2),
-                "hits": hits,
-                "misses": misses,
-                "total_requests": total,
+            producer_metrics = kafka_producer.get_metrics().get("producer-metrics", {})
+            metrics = {
+                name.replace("-", "_"): producer_metrics[name]
+                for name in KAFKA_PRODUCER_METRICS
+                if name in producer_metrics
             }
+            if kafka_async_producer.started:
+                metrics.update(
+                    {f"async_{name}": value for name, value in kafka_async_producer.get_metrics().items()}
+                )
+            return metrics
         except Exception as e:
-            logger.warning(f"Error collecting cache metrics: {e}")
+            logger.warning(f"Error collecting Kafka metrics: {e}")
             return {}
     
     async def _collect_system_metrics(self) -> Dict[str, Any]:
         """Collect system metrics"""
         try:
-            process = psutil.Process(os.getpid())
-            
+            loop = asyncio.get_event_loop()
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, self._sample_process),
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            logger.warning(f"Error collecting system metrics: {e}")
+            return {}
+    
+    def _sample_process(self) -> Dict[str, Any]:
+        """Sample process statistics (runs in a worker thread)"""
+        process = self._process
+        with process.oneshot():
             return {
-                "cpu_percent": process.cpu_percent(interval=0.1),
+                # Non-blocking: CPU usage since the previous sample
+                "cpu_percent": process.cpu_percent(interval=None),
                 "memory_used_mb": round(process.memory_info().rss / 1024 / 1024, 2),
                 "memory_percent": process.memory_percent(),
                 "num_threads": process.num_threads(),
                 "open_files": len(process.open_files()),
             }
-        except Exception as e:
-            logger.warning(f"Error collecting system metrics: {e}")
-            return {}
     
     def _get_uptime(self) -> float:
         """Get application uptime in seconds"""
         try:
-            process = psutil.Process(os.getpid())
-            return time.time() - process.create_time()
+            return time.time() - self._process.create_time()
         except Exception:
             return 0.0
 
@@ -179,3 +308,6 @@ class RequestMetrics:
 # Global request metrics instance
 request_metrics = RequestMetrics()
 
+# Global metrics collector instance
+metrics_collector = MetricsCollector()
+
@@ -2,42 +2,61 @@
 Metrics Middleware for Request Tracking
 """
 from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 
 from app.core.metrics import request_metrics
+from app.core.metrics_registry import metrics_registry, UNMATCHED_ROUTE
 from app.core.logging import logger
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware to track request metrics"""
+class MetricsMiddleware:
+    """
+    Middleware to track request metrics
+
+    Implemented as a plain ASGI middleware (no BaseHTTPMiddleware task/stream
+    wrapping) so the per-request cost is two timer reads and one registry update.
+    """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Record start time
-        start_time = time.time()
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add response time header
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Response-Time", f"{time.perf_counter() - start_time:.3f}")
+            await send(message)
         
-        # Process request
         try:
-            response = await call_next(request)
-            
-            # Calculate response time
-            response_time = time.time() - start_time
-            
-            # Record metrics
-            is_error = response.status_code >= 400
-            request_metrics.record_request(response_time, is_error=is_error)
-            
-            # Add response time header
-            response.headers["X-Response-Time"] = f"{response_time:.3f}"
-            
-            return response
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Calculate response time even on error
-            response_time = time.time() - start_time
-            request_metrics.record_request(response_time, is_error=True)
             logger.error(f"Request error: {e}")
             raise
+        finally:
+            # Calculate response time even on error
+            response_time = time.perf_counter() - start_time
+            
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            route_template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            
+            # Record metrics
+            request_metrics.record_request(response_time, is_error=status_code >= 400)
+            metrics_registry.observe(route_template, scope["method"], status_code, response_time)
 
 
 class StructuredLoggingMiddleware(BaseHTTPMiddleware):
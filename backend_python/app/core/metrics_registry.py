@@ -0,0 +1,119 @@
+"""
+Prometheus Metrics Registry
+
+Per-route request counters and latency histograms. For multi-worker
+deployments (uvicorn --workers / gunicorn) set PROMETHEUS_MULTIPROC_DIR to an
+empty directory shared by all workers: every worker writes its samples to
+mmap'd files there and the exposition endpoint merges them on scrape.
+"""
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# The value backend is chosen when prometheus_client is first imported
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Label used for requests that did not match any route, to bound cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Latency buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+)
+
+
+def is_multiprocess_mode() -> bool:
+    """Whether samples are shared across worker processes"""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+class RequestMetricsRegistry:
+    """
+    Request metrics registry
+
+    Label children are cached in plain dicts keyed by label tuple, so the hot
+    path is a dict lookup plus one counter increment and one histogram observe.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[CollectorRegistry] = None,
+        buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        """
+        Initialize registry
+
+        Args:
+            registry: Collector registry to register metrics in
+            buckets: Latency histogram buckets in seconds
+        """
+        self.registry = registry or CollectorRegistry()
+        self._requests = Counter(
+            "metersphere_http_requests_total",
+            "Total HTTP requests",
+            ["route", "method", "status"],
+            registry=self.registry,
+        )
+        self._latency = Histogram(
+            "metersphere_http_request_duration_seconds",
+            "HTTP request latency in seconds",
+            ["route", "method"],
+            buckets=buckets,
+            registry=self.registry,
+        )
+        self._counter_children: Dict[Tuple[str, str, int], Any] = {}
+        self._histogram_children: Dict[Tuple[str, str], Any] = {}
+
+    def observe(self, route: str, method: str, status_code: int, duration: float):
+        """
+        Record a finished request
+
+        Args:
+            route: Route template (e.g. "/api/v1/bug/bugs/{bug_id}")
+            method: HTTP method
+            status_code: Response status code
+            duration: Request duration in seconds
+        """
+        counter_key = (route, method, status_code)
+        counter = self._counter_children.get(counter_key)
+        if counter is None:
+            counter = self._requests.labels(route, method, str(status_code))
+            self._counter_children[counter_key] = counter
+
+        histogram_key = (route, method)
+        histogram = self._histogram_children.get(histogram_key)
+        if histogram is None:
+            histogram = self._latency.labels(route, method)
+            self._histogram_children[histogram_key] = histogram
+
+        counter.inc()
+        histogram.observe(duration)
+
+    def render(self) -> bytes:
+        """Render all request metrics in Prometheus text format"""
+        if is_multiprocess_mode():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(self.registry)
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """Clean up live samples of an exiting worker (multiprocess mode only)"""
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+# Global metrics registry instance
+metrics_registry = RequestMetricsRegistry()
@@ -28,7 +28,8 @@ async def redis_example():
 # Kafka Usage Example
 def kafka_example():
     """Example of using Kafka for message sending"""
-    from app.core.kafka import send_kafka_message, notify_test_execution_result
+    from app.core.kafka import send_kafka_message
+    from app.core.event_bus import notify_test_execution_result
     
     # Send general message
     send_kafka_message(
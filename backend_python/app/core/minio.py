@@ -2,8 +2,12 @@
 MinIO Client for File Storage
 """
 from minio import Minio
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
-from typing import Optional, BinaryIO, List
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, BinaryIO, Iterator, List, Tuple
+from itertools import islice
+import asyncio
+import hashlib
 import io
 from datetime import timedelta
 
@@ -11,6 +15,37 @@ from app.core.config import settings
 from app.core.logging import logger
 
 
+# Keys per S3 multi-object delete request
+DELETE_BATCH_SIZE = 1000
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when a streamed upload exceeds its size limit"""
+
+
+class MeteredReader:
+    """Read-through wrapper that counts and hashes bytes, enforcing a size limit"""
+    
+    def __init__(self, stream: BinaryIO, max_size: Optional[int] = None):
+        self._stream = stream
+        self.max_size = max_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise UploadTooLargeError(f"Upload exceeds {self.max_size} bytes")
+        self._sha256.update(data)
+        return data
+    
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the bytes read so far"""
+        return self._sha256.hexdigest()
+
+
 class MinIOClient:
     """MinIO client wrapper"""
     
@@ -79,6 +114,59 @@ class MinIOClient:
             logger.error(f"Error uploading file to MinIO: {e}")
             raise
     
+    def upload_stream(
+        self,
+        file_path: str,
+        stream: BinaryIO,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        max_size: Optional[int] = None,
+    ) -> dict:
+        """Upload a file-like object without reading it into memory
+        
+        The stream is sent as a multipart upload of MINIO_PART_SIZE parts,
+        MINIO_UPLOAD_CONCURRENCY of them in parallel, so memory use stays at
+        a few parts whatever the file size. Size and SHA-256 are computed
+        while reading; exceeding ``max_size`` aborts the upload. Blocking:
+        call from a worker thread.
+        
+        Args:
+            file_path: Path in bucket
+            stream: Binary file-like object positioned at the start
+            content_type: MIME type
+            metadata: Optional metadata dict
+            max_size: Maximum accepted size in bytes
+        
+        Returns:
+            Dict with file_path, size, sha256 and etag
+        
+        Raises:
+            UploadTooLargeError: The stream is larger than ``max_size``
+        """
+        reader = MeteredReader(stream, max_size)
+        try:
+            client = self.get_client()
+            result = client.put_object(
+                bucket_name=self.bucket,
+                object_name=file_path,
+                data=reader,
+                length=-1,
+                part_size=settings.MINIO_PART_SIZE,
+                num_parallel_uploads=settings.MINIO_UPLOAD_CONCURRENCY,
+                content_type=content_type or "application/octet-stream",
+                metadata=metadata,
+            )
+            logger.info(f"Uploaded file to MinIO: {file_path} ({reader.size} bytes)")
+            return {
+                "file_path": file_path,
+                "size": reader.size,
+                "sha256": reader.sha256,
+                "etag": result.etag,
+            }
+        except S3Error as e:
+            logger.error(f"Error uploading file to MinIO: {e}")
+            raise
+    
     def download_file(self, file_path: str) -> bytes:
         """Download file from MinIO
         
@@ -100,6 +188,58 @@ class MinIOClient:
             logger.error(f"Error downloading file from MinIO: {e}")
             raise
     
+    def stat_file(self, file_path: str) -> dict:
+        """Get object metadata without downloading it
+        
+        Args:
+            file_path: Path in bucket
+        
+        Returns:
+            Dict with size, etag, last_modified and content_type
+        """
+        try:
+            client = self.get_client()
+            stat = client.stat_object(self.bucket, file_path)
+            return {
+                "size": stat.size,
+                "etag": stat.etag,
+                "last_modified": stat.last_modified,
+                "content_type": stat.content_type,
+            }
+        except S3Error as e:
+            logger.error(f"Error getting file stat from MinIO: {e}")
+            raise
+    
+    def iter_file(
+        self,
+        file_path: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """Iterate over an object's bytes in chunks
+        
+        The object is requested on the first iteration and the connection
+        is released when the iterator finishes or is closed. Blocking:
+        iterate from a worker thread.
+        
+        Args:
+            file_path: Path in bucket
+            offset: First byte to read
+            length: Number of bytes to read (None reads to the end)
+            chunk_size: Size of yielded chunks
+        
+        Yields:
+            Chunks of file content
+        """
+        client = self.get_client()
+        response = client.get_object(self.bucket, file_path, offset=offset, length=length or 0)
+        try:
+            yield from response.stream(chunk_size or settings.MINIO_DOWNLOAD_CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
+    
     def delete_file(self, file_path: str):
         """Delete file from MinIO
         
@@ -127,13 +267,31 @@ class MinIOClient:
                 prefix=folder_path,
                 recursive=True
             )
-            for obj in objects:
-                client.remove_object(self.bucket, obj.object_name)
+            failed = self.delete_files(obj.object_name for obj in objects)
+            if failed:
+                raise RuntimeError(f"Failed to delete {len(failed)} objects under {folder_path}")
             logger.info(f"Deleted folder from MinIO: {folder_path}")
         except S3Error as e:
             logger.error(f"Error deleting folder from MinIO: {e}")
             raise
     
+    def delete_files(self, file_paths: Iterable[str]) -> List[str]:
+        """Delete objects with multi-object delete requests
+        
+        Args:
+            file_paths: Paths in bucket (consumed lazily, up to 1000 per request)
+        
+        Returns:
+            Paths that could not be deleted
+        """
+        client = self.get_client()
+        failed = []
+        # Errors are reported lazily; iterating sends the requests
+        for error in client.remove_objects(self.bucket, (DeleteObject(path) for path in file_paths)):
+            logger.error(f"Error deleting {error.name} from MinIO: {error.code} {error.message}")
+            failed.append(error.name)
+        return failed
+    
     def list_files(
         self,
         folder_path: str = "",
@@ -155,15 +313,7 @@ class MinIOClient:
                 prefix=folder_path,
                 recursive=recursive
             )
-            files = []
-            for obj in objects:
-                files.append({
-                    "name": obj.object_name,
-                    "size": obj.size,
-                    "last_modified": obj.last_modified,
-                    "etag": obj.etag
-                })
-            return files
+            return [_object_info(obj) for obj in objects]
         except S3Error as e:
             logger.error(f"Error listing files from MinIO: {e}")
             raise
@@ -171,13 +321,16 @@ class MinIOClient:
     def get_presigned_url(
         self,
         file_path: str,
-        expires: timedelta = timedelta(hours=1)
+        expires: timedelta = timedelta(hours=1),
+        response_headers: Optional[dict] = None
     ) -> str:
         """Get presigned URL for file access
         
         Args:
             file_path: Path in bucket
             expires: URL expiration time
+            response_headers: Response header overrides, e.g.
+                {"response-content-disposition": "attachment; ..."}
         
         Returns:
             Presigned URL
@@ -187,7 +340,8 @@ class MinIOClient:
             url = client.presigned_get_object(
                 self.bucket,
                 file_path,
-                expires=expires
+                expires=expires,
+                response_headers=response_headers
             )
             return url
         except S3Error as e:
@@ -231,6 +385,140 @@ class MinIOClient:
             raise
 
 
+    # Bulk operations: blocking SDK calls run on the default executor with at
+    # most MINIO_BULK_CONCURRENCY in flight (urllib3 pools 10 connections)
+    
+    async def iter_objects(
+        self,
+        prefix: str = "",
+        recursive: bool = True,
+        page_size: int = 1000,
+    ) -> AsyncIterator[List[dict]]:
+        """List objects page by page without blocking the event loop
+        
+        Args:
+            prefix: Folder path in bucket
+            recursive: Whether to list recursively
+            page_size: Objects per yielded page
+        
+        Yields:
+            Lists of file info dicts (name, size, last_modified, etag)
+        """
+        loop = asyncio.get_event_loop()
+        objects = await loop.run_in_executor(
+            None,
+            lambda: iter(self.get_client().list_objects(self.bucket, prefix=prefix, recursive=recursive)),
+        )
+        while True:
+            page = await loop.run_in_executor(
+                None, lambda: [_object_info(obj) for obj in islice(objects, page_size)]
+            )
+            if not page:
+                return
+            yield page
+    
+    async def stat_many(self, file_paths: List[str], concurrency: Optional[int] = None) -> Dict[str, Optional[dict]]:
+        """Stat objects concurrently
+        
+        Returns:
+            Path -> stat dict (see stat_file), None for missing objects
+        """
+        def stat(path: str) -> Optional[dict]:
+            try:
+                return self.stat_file(path)
+            except S3Error as e:
+                if e.code in ("NoSuchKey", "NoSuchObject"):
+                    return None
+                raise
+        
+        results = await _run_bounded(stat, file_paths, concurrency)
+        return dict(zip(file_paths, results))
+    
+    async def copy_many(
+        self,
+        pairs: List[Tuple[str, str]],
+        concurrency: Optional[int] = None,
+    ) -> List[Tuple[str, str]]:
+        """Server-side copy many objects concurrently
+        
+        Args:
+            pairs: (source_path, target_path) tuples
+        
+        Returns:
+            Pairs that failed to copy
+        """
+        def copy(pair: Tuple[str, str]) -> bool:
+            try:
+                self.copy_file(*pair)
+                return True
+            except S3Error:
+                return False
+        
+        results = await _run_bounded(copy, pairs, concurrency)
+        return [pair for pair, copied in zip(pairs, results) if not copied]
+    
+    async def delete_many(self, file_paths: List[str], concurrency: Optional[int] = None) -> List[str]:
+        """Delete objects with concurrent multi-object delete requests
+        
+        Returns:
+            Paths that could not be deleted
+        """
+        batches = [file_paths[i:i + DELETE_BATCH_SIZE] for i in range(0, len(file_paths), DELETE_BATCH_SIZE)]
+        results = await _run_bounded(self.delete_files, batches, concurrency)
+        return [path for failed in results for path in failed]
+    
+    async def delete_prefix(self, prefix: str, concurrency: Optional[int] = None) -> int:
+        """Delete all objects under a prefix, deleting listed pages while listing continues
+        
+        Returns:
+            Number of objects deleted
+        """
+        concurrency = concurrency or settings.MINIO_BULK_CONCURRENCY
+        loop = asyncio.get_event_loop()
+        pending = set()
+        deleted = 0
+        
+        def count(tasks) -> int:
+            return sum(task.result() for task in tasks)
+        
+        async for page in self.iter_objects(prefix, page_size=DELETE_BATCH_SIZE):
+            paths = [obj["name"] for obj in page]
+            pending.add(asyncio.ensure_future(loop.run_in_executor(
+                None, lambda paths=paths: len(paths) - len(self.delete_files(paths))
+            )))
+            if len(pending) >= concurrency:
+                # Keep listing at most a few pages ahead of deletion
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                deleted += count(done)
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            deleted += count(done)
+        logger.info(f"Deleted {deleted} objects under {prefix} from MinIO")
+        return deleted
+
+
+def _object_info(obj) -> dict:
+    """File info dict of a listed object"""
+    return {
+        "name": obj.object_name,
+        "size": obj.size,
+        "last_modified": obj.last_modified,
+        "etag": obj.etag,
+    }
+
+
+async def _run_bounded(func: Callable[[Any], Any], items: List[Any], concurrency: Optional[int] = None) -> List[Any]:
+    """Run a blocking function over items on the executor, limiting calls in flight"""
+    semaphore = asyncio.Semaphore(concurrency or settings.MINIO_BULK_CONCURRENCY)
+    loop = asyncio.get_event_loop()
+    
+    async def run(item):
+        async with semaphore:
+            return await loop.run_in_executor(None, func, item)
+    
+    return await asyncio.gather(*(run(item) for item in items))
+
+
 # Global MinIO client instance
 minio_client = MinIOClient()
 
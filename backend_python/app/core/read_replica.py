@@ -0,0 +1,209 @@
+"""
+Read Replica Routing
+
+Sessions from `get_read_db` send read-only statements to a read replica and
+everything else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw
+SQL that is not a query) to the primary. Each session sticks to one replica,
+picked round-robin among the replicas that are not ejected, so a session
+never spreads one transaction over several servers.
+
+A replica is ejected for `eject_seconds` after a connection-level error or
+a failed health probe; with no healthy replica, reads go to the primary.
+
+Read-your-writes: once anything in the current request has written (through
+any session), later reads of that request go to the primary.
+"""
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import itertools
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.logging import logger
+
+
+# Statements raw SQL may start with and still be routed to a replica
+READ_ONLY_PREFIXES = ("SELECT", "WITH", "SHOW", "EXPLAIN")
+
+# Per-request write flag; a mutable holder so writes in child tasks are seen
+_request_writes: ContextVar[Optional[List[bool]]] = ContextVar("request_writes", default=None)
+
+
+def begin_request_scope():
+    """Start tracking writes for the current request (no-op if already started)"""
+    if _request_writes.get() is None:
+        _request_writes.set([False])
+
+
+def mark_request_write():
+    """Record that the current request has written to the primary"""
+    state = _request_writes.get()
+    if state is not None:
+        state[0] = True
+
+
+def request_has_written() -> bool:
+    """Whether the current request has written to the primary"""
+    state = _request_writes.get()
+    return bool(state and state[0])
+
+
+def is_write_statement(clause: Any) -> bool:
+    """Whether a statement must run on the primary"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, Select):
+        return clause._for_update_arg is not None
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(READ_ONLY_PREFIXES)
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session: Session, flush_context: Any):
+    """Pin the session and request to the primary after a flush"""
+    session.info["wrote"] = True
+    mark_request_write()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_execute(orm_execute_state: ORMExecuteState):
+    """Pin the session and request to the primary on DML statements"""
+    if is_write_statement(orm_execute_state.statement):
+        orm_execute_state.session.info["wrote"] = True
+        mark_request_write()
+
+
+class RoutingSession(Session):
+    """Session that routes reads to a replica and writes to the primary"""
+
+    def __init__(self, router: Optional["ReadReplicaRouter"] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.router = router
+        self._replica: Optional[AsyncEngine] = None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs) -> Engine:
+        """Choose the engine for a statement"""
+        if self.router is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        if (
+            self._flushing
+            or is_write_statement(clause)
+            or self.info.get("wrote")
+            or request_has_written()
+        ):
+            return self.router.primary.sync_engine
+
+        if self._replica is None:
+            self._replica = self.router.choose()
+        return self._replica.sync_engine
+
+
+class ReadReplicaRouter:
+    """Round-robin read replica selection with ejection"""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        eject_seconds: float = 30.0,
+        probe_timeout: float = 2.0,
+    ):
+        """
+        Initialize router
+
+        Args:
+            primary: Primary (read-write) engine
+            replicas: Read replica engines
+            eject_seconds: Seconds a failed replica is skipped
+            probe_timeout: Health probe timeout in seconds
+        """
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.eject_seconds = eject_seconds
+        self.probe_timeout = probe_timeout
+        self._ejected_until: Dict[AsyncEngine, float] = {}
+        self._counter = itertools.count()
+
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", partial(self._on_error, replica))
+
+    def healthy_replicas(self) -> List[AsyncEngine]:
+        """Replicas that are not currently ejected"""
+        now = time.monotonic()
+        return [replica for replica in self.replicas if self._ejected_until.get(replica, 0) <= now]
+
+    def choose(self) -> AsyncEngine:
+        """Pick the next healthy replica, or the primary if there is none"""
+        healthy = self.healthy_replicas()
+        if not healthy:
+            return self.primary
+        return healthy[next(self._counter) % len(healthy)]
+
+    def eject(self, replica: AsyncEngine, reason: str = ""):
+        """Skip a replica for eject_seconds"""
+        if self._ejected_until.get(replica, 0) <= time.monotonic():
+            logger.warning(f"Ejecting read replica {replica.url!r}: {reason}")
+        self._ejected_until[replica] = time.monotonic() + self.eject_seconds
+
+    def reinstate(self, replica: AsyncEngine):
+        """Return an ejected replica to rotation"""
+        if self._ejected_until.pop(replica, None) is not None:
+            logger.info(f"Read replica {replica.url!r} reinstated")
+
+    async def check(self) -> Dict[str, bool]:
+        """
+        Probe every replica, ejecting failed ones and reinstating recovered ones
+
+        Returns:
+            Dictionary mapping replica URL (password hidden) to health
+        """
+        results = await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+        return {
+            replica.url.render_as_string(hide_password=True): healthy
+            for replica, healthy in zip(self.replicas, results)
+        }
+
+    async def _probe(self, replica: AsyncEngine) -> bool:
+        """Run SELECT 1 on a replica"""
+        async def ping():
+            async with replica.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            await asyncio.wait_for(ping(), timeout=self.probe_timeout)
+        except Exception as e:
+            self.eject(replica, f"health probe failed: {e}")
+            return False
+        self.reinstate(replica)
+        return True
+
+    def _on_error(self, replica: AsyncEngine, context: ExceptionContext):
+        """Eject a replica on connect failures and dropped connections"""
+        if context.is_disconnect or context.connection is None:
+            self.eject(replica, str(context.original_exception))
+
+    def sessionmaker(self, **kwargs) -> async_sessionmaker:
+        """Create a session factory whose sessions route through this router"""
+        return async_sessionmaker(
+            self.primary,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            router=self,
+            **kwargs,
+        )
+
+    async def dispose(self):
+        """Dispose replica connection pools"""
+        for replica in self.replicas:
+            await replica.dispose()
@@ -0,0 +1,241 @@
+"""
+Per-Project Sequence Allocator
+
+Allocates the user-facing `num` and the sort `pos` (interval 5000) of
+project-scoped entities (functional cases, bugs, test plans) from Redis
+counters instead of `SELECT max(...)` per insert. Both counters advance in a
+single atomic script call, so concurrent creates never get duplicate
+numbers and a bulk import gets a contiguous range in one round trip.
+
+Counters are seeded once per project from the table's current maximum. If
+Redis is unavailable the allocator falls back to the max() queries. Values
+handed out that way are remembered as floors by the process that used them,
+and its next successful call raises the counters past them and past the
+table's maximum. Other processes don't know about the outage, so the
+counters are also raised to the table's maximum whenever a shared
+`:verified` key (SEQUENCE_VERIFY_SECONDS) has expired. Numbers committed
+during an outage can therefore be handed out again only if another process
+allocates within SEQUENCE_VERIFY_SECONDS of the last check, before the
+process that fell back reaches Redis again.
+"""
+from typing import Any, Dict, List, Tuple
+import asyncio
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import redis_client
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Interval between consecutive pos values
+POS_STEP = 5000
+
+# Advance num and pos together, first raising each counter to at least its
+# floor (ARGV[3], ARGV[4]); returns nil when a counter has not been seeded.
+# Without a verify TTL (ARGV[5] = 0) returns 0 when the :verified key (KEYS[3])
+# has expired, so the caller retries with the table's maximum as floor; with
+# one the key is renewed.
+ALLOCATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('EXISTS', KEYS[2]) == 0 then
+    return nil
+end
+if ARGV[5] == '0' then
+    if redis.call('EXISTS', KEYS[3]) == 0 then
+        return 0
+    end
+else
+    redis.call('SET', KEYS[3], 1, 'EX', ARGV[5])
+end
+for i = 1, 2 do
+    if tonumber(redis.call('GET', KEYS[i])) < tonumber(ARGV[i + 2]) then
+        redis.call('SET', KEYS[i], ARGV[i + 2])
+    end
+end
+return {redis.call('INCRBY', KEYS[1], ARGV[1]), redis.call('INCRBY', KEYS[2], ARGV[2])}
+"""
+
+
+class SequenceAllocator:
+    """Per-project num/pos allocator"""
+
+    def __init__(
+        self,
+        lease_size: int = settings.SEQUENCE_LEASE_SIZE,
+        key_prefix: str = "seq",
+        verify_seconds: int = settings.SEQUENCE_VERIFY_SECONDS,
+    ):
+        """
+        Initialize allocator
+
+        Args:
+            lease_size: Numbers reserved per Redis call for single creates. With
+                a lease above 1 each process hands out its block locally, which
+                saves round trips but leaves gaps on restart and lets numbers
+                from different processes interleave out of creation order.
+            key_prefix: Prefix for Redis keys
+            verify_seconds: How long a check of the counters against the
+                table's maximum holds for all processes
+        """
+        self.lease_size = max(1, lease_size)
+        self.key_prefix = key_prefix
+        self.verify_seconds = max(1, verify_seconds)
+        # key -> [next num, next pos, remaining]
+        self._leases: Dict[str, List[int]] = {}
+        self._lease_locks: Dict[str, asyncio.Lock] = {}
+        # key -> (last num, last pos) handed out by the max() fallback
+        self._floors: Dict[str, Tuple[int, int]] = {}
+        self._fallback_locks: Dict[str, asyncio.Lock] = {}
+
+    async def next(self, db: AsyncSession, model: Any, project_id: str) -> Tuple[int, int]:
+        """
+        Allocate the num and pos of one new row
+
+        Args:
+            db: Database session (used only to seed counters)
+            model: Model class with project_id, num and pos columns
+            project_id: Project ID
+
+        Returns:
+            Tuple of (num, pos)
+        """
+        if self.lease_size == 1:
+            return await self.allocate(db, model, project_id, 1)
+
+        key = self._key(model, project_id)
+        lock = self._lease_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            lease = self._leases.get(key)
+            if not lease or lease[2] == 0:
+                try:
+                    num, pos = await self._reserve(db, model, project_id, self.lease_size)
+                except Exception as e:
+                    # Never lease a block derived from max(): other processes can't see it
+                    logger.warning(f"Sequence allocation via Redis failed, using max(): {e}")
+                    return await self._allocate_from_table(db, model, project_id, 1)
+                lease = [num, pos, self.lease_size]
+                self._leases[key] = lease
+            num, pos = lease[0], lease[1]
+            lease[0] += 1
+            lease[1] += POS_STEP
+            lease[2] -= 1
+            return num, pos
+
+    async def allocate(
+        self,
+        db: AsyncSession,
+        model: Any,
+        project_id: str,
+        count: int,
+    ) -> Tuple[int, int]:
+        """
+        Allocate a contiguous range of nums and pos values
+
+        Row i (0-based) of the range gets num + i and pos + i * POS_STEP.
+
+        Args:
+            db: Database session (used only to seed counters)
+            model: Model class with project_id, num and pos columns
+            project_id: Project ID
+            count: Number of rows
+
+        Returns:
+            Tuple of (first num, first pos)
+        """
+        try:
+            return await self._reserve(db, model, project_id, count)
+        except Exception as e:
+            logger.warning(f"Sequence allocation via Redis failed, using max(): {e}")
+            return await self._allocate_from_table(db, model, project_id, count)
+
+    async def _reserve(
+        self,
+        db: AsyncSession,
+        model: Any,
+        project_id: str,
+        count: int,
+    ) -> Tuple[int, int]:
+        """
+        Reserve a range from the Redis counters, seeding them on first use
+
+        The counters are raised to the table's maximum after seeding, after
+        this process used the max() fallback, and when the shared :verified
+        key has expired (rows another process inserted during an outage).
+        """
+        key = self._key(model, project_id)
+        client = await redis_client.get_client()
+        keys = [f"{key}:num", f"{key}:pos", f"{key}:verified"]
+        floors = self._floors.get(key)
+        # Recovering from an outage: other processes may have used max() too
+        verify = floors is not None
+
+        async def reserve():
+            floor_num, floor_pos = floors or (0, 0)
+            if verify:
+                max_num, max_pos = await self._current_max(db, model, project_id)
+                floor_num, floor_pos = max(floor_num, max_num), max(floor_pos, max_pos)
+            args = [count, count * POS_STEP, floor_num, floor_pos, self.verify_seconds if verify else 0]
+            return await client.eval(ALLOCATE_SCRIPT, 3, *keys, *args)
+
+        result = await reserve()
+        if result is None:
+            await self._seed(db, model, project_id, keys[:2])
+            verify = True
+            result = await reserve()
+        elif result == 0:
+            verify = True
+            result = await reserve()
+        if floors is not None and self._floors.get(key) == floors:
+            del self._floors[key]
+        last_num, last_pos = int(result[0]), int(result[1])
+        return last_num - count + 1, last_pos - (count - 1) * POS_STEP
+
+    async def _allocate_from_table(
+        self,
+        db: AsyncSession,
+        model: Any,
+        project_id: str,
+        count: int,
+    ) -> Tuple[int, int]:
+        """
+        Fallback: a range after the table's maximum and this process's floor
+
+        Ranges handed out here but not yet inserted are covered by the floor,
+        so concurrent imports in one process don't get the same range.
+        """
+        key = self._key(model, project_id)
+        lock = self._fallback_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            max_num, max_pos = await self._current_max(db, model, project_id)
+            floor_num, floor_pos = self._floors.get(key, (0, 0))
+            num = max(max_num, floor_num) + 1
+            pos = max(max_pos, floor_pos) + POS_STEP
+            self._floors[key] = (num + count - 1, pos + (count - 1) * POS_STEP)
+            return num, pos
+
+    async def _seed(self, db: AsyncSession, model: Any, project_id: str, keys: List[str]):
+        """Initialize counters from the table (no-op if another process won)"""
+        max_num, max_pos = await self._current_max(db, model, project_id)
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.set(keys[0], max_num, nx=True)
+        pipe.set(keys[1], max_pos, nx=True)
+        await pipe.execute()
+        logger.info(f"Seeded sequence {keys[0]} at num={max_num} pos={max_pos}")
+
+    async def _current_max(self, db: AsyncSession, model: Any, project_id: str) -> Tuple[int, int]:
+        """Get the current max num and pos of a project in one query"""
+        result = await db.execute(
+            select(func.max(model.num), func.max(model.pos)).where(model.project_id == project_id)
+        )
+        max_num, max_pos = result.one()
+        return max_num or 0, max_pos or 0
+
+    def _key(self, model: Any, project_id: str) -> str:
+        """Counter key prefix (hash tag keeps num and pos in one cluster slot)"""
+        return f"{self.key_prefix}:{{{model.__tablename__}:{project_id}}}"
+
+
+# Global sequence allocator instance
+sequence_allocator = SequenceAllocator()
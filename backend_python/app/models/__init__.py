@@ -10,11 +10,14 @@ from app.models.user_role_relation import UserRoleRelation
 from app.models.bug import Bug
 from app.models.bug_comment import BugComment
 from app.models.bug_attachment import BugLocalAttachment
-from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario, ApiDefinitionModule
 from app.models.api_scenario_step import ApiScenarioStep
 from app.models.api_report import ApiReport
-from app.models.functional_case import FunctionalCase, FunctionalCaseBlob
+from app.models.functional_case import FunctionalCase, FunctionalCaseBlob, FunctionalCaseModule
 from app.models.test_plan import TestPlan, TestPlanReport
+from app.models.project_statistics import ProjectStatistics
+from app.models.execution_rollup import ExecutionRollup, ExecutionRollupState
+from app.models.file_blob import FileBlob
 
 __all__ = [
     "User",
@@ -28,11 +31,17 @@ __all__ = [
     "ApiDefinition",
     "ApiTestCase",
     "ApiScenario",
+    "ApiDefinitionModule",
     "ApiScenarioStep",
     "ApiReport",
     "FunctionalCase",
     "FunctionalCaseBlob",
+    "FunctionalCaseModule",
     "TestPlan",
     "TestPlanReport",
+    "ProjectStatistics",
+    "ExecutionRollup",
+    "ExecutionRollupState",
+    "FileBlob",
 ]
 
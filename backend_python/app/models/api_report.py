@@ -1,7 +1,8 @@
 """
 API Report Model
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, ForeignKey, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
 
@@ -1,7 +1,8 @@
 """
 API Test Models
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, Text, ForeignKey, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.mysql import LONGTEXT
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
@@ -21,6 +22,7 @@ class ApiDefinition(Base, TimestampMixin, SoftDeleteMixin, AuditMixin):
     response_body = Column("response_body", LONGTEXT, nullable=True, comment="响应体")
     status = Column(String(50), nullable=True, comment="状态")
     module_id = Column("module_id", String(50), nullable=True, comment="模块ID")
+    fingerprint = Column(String(64), nullable=True, comment="导入指纹（方法、路径与结构的SHA-256）")
 
     # Relationships
     # project = relationship("Project", back_populates="api_definitions")
@@ -69,3 +71,19 @@ class ApiScenario(Base, TimestampMixin, SoftDeleteMixin, AuditMixin):
     def __repr__(self):
         return f"<ApiScenario(id={self.id}, name={self.name})>"
 
+
+class ApiDefinitionModule(Base, TimestampMixin, AuditMixin):
+    """API Definition Module model (module tree of a project)"""
+    __tablename__ = "api_definition_module"
+    __table_args__ = (
+        Index("uq_api_module_name_project_parent", "project_id", "name", "parent_id", unique=True),
+    )
+
+    id = Column(String(50), primary_key=True, comment="ID")
+    project_id = Column("project_id", String(50), nullable=False, index=True, comment="项目ID")
+    name = Column(String(255), nullable=False, comment="名称")
+    parent_id = Column("parent_id", String(50), nullable=False, default="NONE", comment="父节点ID")
+    pos = Column(BigInteger, nullable=False, default=0, comment="同一节点下的顺序")
+
+    def __repr__(self):
+        return f"<ApiDefinitionModule(id={self.id}, name={self.name}, parent_id={self.parent_id})>"
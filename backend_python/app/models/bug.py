@@ -1,7 +1,8 @@
 """
 Bug Model
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, Integer, ForeignKey, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger, Integer, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
 
@@ -1,7 +1,8 @@
 """
 Bug Attachment Model
 """
-from sqlalchemy import Column, String, BigInteger, ForeignKey, relationship
+from sqlalchemy import Column, String, BigInteger, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, AuditMixin
 
@@ -12,7 +13,7 @@ class BugLocalAttachment(Base, TimestampMixin, AuditMixin):
 
     id = Column(String(255), primary_key=True, comment="ID")
     bug_id = Column("bug_id", String(50), ForeignKey("bug.id"), nullable=False, comment="缺陷ID")
-    file_id = Column("file_id", String(50), nullable=False, comment="文件ID")
+    file_id = Column("file_id", String(255), nullable=False, comment="文件ID")
     file_name = Column("file_name", String(255), nullable=False, comment="文件名称")
     size = Column(BigInteger, nullable=False, default=0, comment="文件大小")
     source = Column(String(255), nullable=False, comment="文件来源")
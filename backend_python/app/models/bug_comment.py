@@ -1,7 +1,8 @@
 """
 Bug Comment Model
 """
-from sqlalchemy import Column, String, BigInteger, Text, ForeignKey, relationship
+from sqlalchemy import Column, String, BigInteger, Text, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, AuditMixin
 
@@ -0,0 +1,59 @@
+"""
+Execution Rollup Models
+"""
+from sqlalchemy import Column, String, BigInteger, Index
+import time
+
+from app.core.database import Base
+
+
+class ExecutionRollup(Base):
+    """Pre-aggregated execution results per time bucket"""
+    __tablename__ = "execution_rollup"
+    __table_args__ = (
+        Index("idx_execution_rollup_bucket", "resolution", "bucket_start"),
+    )
+
+    resolution = Column(String(10), primary_key=True, comment="粒度：minute/hour/day")
+    project_id = Column(String(50), primary_key=True, comment="项目ID")
+    subject_id = Column(String(50), primary_key=True, comment="用例/计划ID，空字符串表示项目汇总")
+    source = Column(String(30), primary_key=True, comment="来源：api_report/test_plan_report")
+    bucket_start = Column(BigInteger, primary_key=True, comment="时间桶起点")
+    total = Column(BigInteger, default=0, nullable=False, comment="执行次数")
+    passed = Column(BigInteger, default=0, nullable=False, comment="通过次数")
+    failed = Column(BigInteger, default=0, nullable=False, comment="失败次数")
+    duration_sum = Column(BigInteger, default=0, nullable=False, comment="总耗时")
+    duration_max = Column(BigInteger, default=0, nullable=False, comment="最大耗时")
+    # Latency histogram: execution counts per duration bucket (see LATENCY_BOUNDS_MS)
+    latency_b00 = Column(BigInteger, default=0, nullable=False, comment="耗时≤10ms")
+    latency_b01 = Column(BigInteger, default=0, nullable=False, comment="耗时≤25ms")
+    latency_b02 = Column(BigInteger, default=0, nullable=False, comment="耗时≤50ms")
+    latency_b03 = Column(BigInteger, default=0, nullable=False, comment="耗时≤100ms")
+    latency_b04 = Column(BigInteger, default=0, nullable=False, comment="耗时≤250ms")
+    latency_b05 = Column(BigInteger, default=0, nullable=False, comment="耗时≤500ms")
+    latency_b06 = Column(BigInteger, default=0, nullable=False, comment="耗时≤1s")
+    latency_b07 = Column(BigInteger, default=0, nullable=False, comment="耗时≤2.5s")
+    latency_b08 = Column(BigInteger, default=0, nullable=False, comment="耗时≤5s")
+    latency_b09 = Column(BigInteger, default=0, nullable=False, comment="耗时≤10s")
+    latency_b10 = Column(BigInteger, default=0, nullable=False, comment="耗时≤30s")
+    latency_b11 = Column(BigInteger, default=0, nullable=False, comment="耗时≤60s")
+    latency_b12 = Column(BigInteger, default=0, nullable=False, comment="耗时>60s")
+
+    def __repr__(self):
+        return (
+            f"<ExecutionRollup(resolution={self.resolution}, project_id={self.project_id}, "
+            f"subject_id={self.subject_id}, bucket_start={self.bucket_start})>"
+        )
+
+
+class ExecutionRollupState(Base):
+    """Consumption watermark of a rollup source"""
+    __tablename__ = "execution_rollup_state"
+
+    source = Column(String(30), primary_key=True, comment="来源")
+    watermark_time = Column(BigInteger, default=0, nullable=False, comment="已处理的最后结束时间")
+    watermark_id = Column(String(50), default="", nullable=False, comment="已处理的最后报告ID")
+    update_time = Column(BigInteger, default=lambda: int(time.time() * 1000), comment="更新时间")
+
+    def __repr__(self):
+        return f"<ExecutionRollupState(source={self.source}, watermark_time={self.watermark_time})>"
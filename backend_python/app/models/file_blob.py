@@ -0,0 +1,26 @@
+"""
+File Blob Model
+"""
+from sqlalchemy import Column, String, BigInteger, Index
+import time
+
+from app.core.database import Base
+
+
+class FileBlob(Base):
+    """File content stored once per SHA-256 digest, shared by reference"""
+    __tablename__ = "file_blob"
+    __table_args__ = (
+        Index("idx_file_blob_unreferenced", "ref_count", "update_time"),
+    )
+
+    sha256 = Column(String(64), primary_key=True, comment="内容SHA-256")
+    size = Column(BigInteger, nullable=False, default=0, comment="文件大小")
+    file_path = Column(String(255), nullable=False, comment="MinIO路径")
+    content_type = Column(String(100), comment="MIME类型")
+    ref_count = Column(BigInteger, nullable=False, default=0, comment="引用次数")
+    create_time = Column(BigInteger, default=lambda: int(time.time() * 1000), comment="创建时间")
+    update_time = Column(BigInteger, default=lambda: int(time.time() * 1000), comment="引用变更时间")
+
+    def __repr__(self):
+        return f"<FileBlob(sha256={self.sha256}, size={self.size}, ref_count={self.ref_count})>"
@@ -1,7 +1,8 @@
 """
 Functional Case Model
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, ForeignKey, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
 
@@ -52,3 +53,20 @@ class FunctionalCaseBlob(Base):
     def __repr__(self):
         return f"<FunctionalCaseBlob(id={self.id})>"
 
+
+
+class FunctionalCaseModule(Base, TimestampMixin, AuditMixin):
+    """Functional Case Module model (module tree of a project)"""
+    __tablename__ = "functional_case_module"
+    __table_args__ = (
+        Index("uq_name_project_parent", "project_id", "name", "parent_id", unique=True),
+    )
+
+    id = Column(String(50), primary_key=True, comment="ID")
+    project_id = Column("project_id", String(50), nullable=False, index=True, comment="项目ID")
+    name = Column(String(255), nullable=False, comment="名称")
+    parent_id = Column("parent_id", String(50), nullable=False, default="NONE", comment="父节点ID")
+    pos = Column(BigInteger, nullable=False, default=0, comment="同一节点下的顺序")
+
+    def __repr__(self):
+        return f"<FunctionalCaseModule(id={self.id}, name={self.name}, parent_id={self.parent_id})>"
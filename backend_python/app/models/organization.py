@@ -1,7 +1,8 @@
 """
 Organization Model
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
 
@@ -0,0 +1,24 @@
+"""
+Project Statistics Model
+"""
+from sqlalchemy import Column, String, BigInteger
+import time
+
+from app.core.database import Base
+
+
+class ProjectStatistics(Base):
+    """Materialized per-project resource counts"""
+    __tablename__ = "project_statistics"
+
+    project_id = Column(String(50), primary_key=True, comment="项目ID")
+    bug_count = Column(BigInteger, default=0, nullable=False, comment="缺陷数")
+    api_definition_count = Column(BigInteger, default=0, nullable=False, comment="接口定义数")
+    api_test_case_count = Column(BigInteger, default=0, nullable=False, comment="接口用例数")
+    api_scenario_count = Column(BigInteger, default=0, nullable=False, comment="场景数")
+    functional_case_count = Column(BigInteger, default=0, nullable=False, comment="功能用例数")
+    test_plan_count = Column(BigInteger, default=0, nullable=False, comment="测试计划数")
+    update_time = Column(BigInteger, default=lambda: int(time.time() * 1000), comment="更新时间")
+
+    def __repr__(self):
+        return f"<ProjectStatistics(project_id={self.project_id})>"
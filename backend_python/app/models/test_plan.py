@@ -1,7 +1,8 @@
 """
 Test Plan Models
 """
-from sqlalchemy import Column, String, Boolean, BigInteger, Text, ForeignKey, relationship
+from sqlalchemy import Column, String, Boolean, BigInteger, Text, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.base import TimestampMixin, SoftDeleteMixin, AuditMixin
 
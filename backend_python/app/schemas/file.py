@@ -1,8 +1,8 @@
 """
 File Schemas
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -13,6 +13,7 @@ class FileUploadResponse(BaseModel):
     file_name: str
     file_size: int
     content_type: Optional[str] = None
+    checksum: Optional[str] = None  # SHA-256 hex
 
 
 class FileInfoResponse(BaseModel):
@@ -32,3 +33,10 @@ class FileDeleteRequest(BaseModel):
     """File delete request"""
     file_paths: list[str]
 
+
+class BatchDownloadRequest(BaseModel):
+    """Batch download request: explicit files and/or everything under a folder"""
+    file_paths: List[str] = Field(default_factory=list, max_length=1000)
+    folder: Optional[str] = None
+    # Sent in Content-Disposition: no quotes, slashes or control characters
+    file_name: str = Field("files.zip", min_length=1, max_length=255, pattern=r'^[^"\\/\x00-\x1f\x7f]+$')
@@ -2,14 +2,80 @@
 API Test Service
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List, Optional, Dict
+from sqlalchemy import select, func, and_, or_
+from typing import Any, AsyncIterator, List, Optional, Dict, Sequence, Tuple
+from functools import partial
+import asyncio
 import uuid
 import time
 import json
 
-from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.api_test import ApiDefinition, ApiDefinitionModule, ApiTestCase, ApiScenario
 from app.schemas.api_test import ApiDefinition as ApiDefinitionSchema, ApiTestCase as ApiTestCaseSchema, ApiScenario as ApiScenarioSchema
+from app.core.database_optimization import KeysetPaginationHelper
+from app.core.count_strategy import count_strategy
+from app.services.project_statistics_service import ProjectStatisticsService
+from app.services.module_tree import ModuleTree, MODULE_ROOT_PARENT
+from app.services.openapi_parser import OpenApiParser, SpecOperation, load_spec
+from app.services.postman_parser import ROOT_FOLDER, parse_collection
+from app.services.export_stream import encode_export, encode_object, iter_rows
+from app.utils.batch_operations import BulkOperations
+
+# List order; backed by idx_api_def_project_list
+API_DEFINITION_LIST_KEYS = (ApiDefinition.create_time, ApiDefinition.id)
+
+# Import platforms handled by the OpenAPI importer
+SPEC_IMPORT_PLATFORMS = ("Swagger", "Swagger2", "Swagger3", "OpenAPI")
+
+
+# Export formats: a JSON document ({"export_type", "<items>": [...]}) or one object per line
+API_DEFINITION_EXPORT_TYPES = ("json", "ndjson", "swagger", "postman")
+API_SCENARIO_EXPORT_TYPES = ("json", "ndjson", "postman")
+
+API_DEFINITION_EXPORT_COLUMNS = (
+    ApiDefinition.id, ApiDefinition.name, ApiDefinition.method, ApiDefinition.path,
+    ApiDefinition.request_body, ApiDefinition.response_body,
+)
+API_SCENARIO_EXPORT_COLUMNS = (ApiScenario.id, ApiScenario.name, ApiScenario.description, ApiScenario.status)
+
+
+def check_export_request(
+    ids: Optional[List[str]], project_id: Optional[str], export_type: str, export_types: Sequence[str]
+) -> None:
+    """
+    Validate export arguments before a streamed response starts
+
+    Raises:
+        ValueError: If the arguments are invalid
+    """
+    if not ids and not project_id:
+        raise ValueError("IDs or project_id is required")
+    if export_type not in export_types:
+        raise ValueError(f"Unsupported export type: {export_type}")
+
+
+def _encode_definition(row: Any, single_line: bool) -> str:
+    return encode_object(
+        {"id": row.id, "name": row.name, "method": row.method, "path": row.path},
+        {"request_body": row.request_body, "response_body": row.response_body},
+        single_line,
+    )
+
+
+def _encode_scenario(row: Any, single_line: bool) -> str:
+    return encode_object(
+        {"id": row.id, "name": row.name, "description": row.description, "status": row.status}, {},
+    )
+
+
+def _parse_spec(spec: Dict[str, Any]) -> Tuple[List[SpecOperation], List[str]]:
+    """Fingerprint the operations of a spec (CPU bound)"""
+    return OpenApiParser(spec).operations()
+
+
+def _expand_operations(operations: List[SpecOperation]) -> List[Dict[str, Any]]:
+    """Build the definition fields of operations that are written (CPU bound)"""
+    return [operation.to_definition() for operation in operations]
 
 
 class ApiTestService:
@@ -17,12 +83,23 @@ class ApiTestService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.statistics = ProjectStatisticsService(db)
     
     # API Definition methods
     async def get_api_definitions(
-        self, project_id: Optional[str] = None, skip: int = 0, limit: int = 100, keyword: Optional[str] = None
+        self,
+        project_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[ApiDefinition]:
-        """Get API definitions"""
+        """
+        Get API definitions
+        
+        When a cursor is given, skip is ignored and the page starts right
+        after the cursor (keyset pagination).
+        """
         query = select(ApiDefinition).where(ApiDefinition.deleted == False)
         
         if project_id:
@@ -34,7 +111,10 @@ class ApiTestService:
                 (ApiDefinition.path.like(f"%{keyword}%"))
             )
         
-        query = query.offset(skip).limit(limit).order_by(ApiDefinition.create_time.desc())
+        if cursor:
+            query = KeysetPaginationHelper.apply(query, API_DEFINITION_LIST_KEYS, cursor, limit)
+        else:
+            query = KeysetPaginationHelper.apply(query, API_DEFINITION_LIST_KEYS, limit=limit).offset(skip)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -85,8 +165,10 @@ class ApiTestService:
         )
         
         self.db.add(definition)
+        await self.statistics.adjust(project_id, "api_definition_count", 1)
         await self.db.commit()
         await self.db.refresh(definition)
+        await count_strategy.on_created(ApiDefinition.__tablename__, project_id)
         return definition
     
     async def update_api_definition(
@@ -115,6 +197,7 @@ class ApiTestService:
         
         await self.db.commit()
         await self.db.refresh(definition)
+        await count_strategy.invalidate(ApiDefinition.__tablename__)
         return definition
     
     async def delete_api_definition(self, definition_id: str, delete_user: Optional[str] = None) -> bool:
@@ -126,8 +209,10 @@ class ApiTestService:
         definition.deleted = True
         definition.delete_time = int(time.time() * 1000)
         definition.delete_user = delete_user
+        await self.statistics.adjust(definition.project_id, "api_definition_count", -1)
         
         await self.db.commit()
+        await count_strategy.on_deleted(ApiDefinition.__tablename__, definition.project_id)
         return True
     
     # API Test Case methods
@@ -193,6 +278,7 @@ class ApiTestService:
         )
         
         self.db.add(test_case)
+        await self.statistics.adjust(project_id, "api_test_case_count", 1)
         await self.db.commit()
         await self.db.refresh(test_case)
         return test_case
@@ -234,6 +320,7 @@ class ApiTestService:
         test_case.deleted = True
         test_case.delete_time = int(time.time() * 1000)
         test_case.delete_user = delete_user
+        await self.statistics.adjust(test_case.project_id, "api_test_case_count", -1)
         
         await self.db.commit()
         return True
@@ -287,6 +374,7 @@ class ApiTestService:
         )
         
         self.db.add(scenario)
+        await self.statistics.adjust(project_id, "api_scenario_count", 1)
         await self.db.commit()
         await self.db.refresh(scenario)
         return scenario
@@ -322,13 +410,14 @@ class ApiTestService:
         scenario.deleted = True
         scenario.delete_time = int(time.time() * 1000)
         scenario.delete_user = delete_user
+        await self.statistics.adjust(scenario.project_id, "api_scenario_count", -1)
         
         await self.db.commit()
         return True
     
     async def execute_api_test(self, test_case_id: str, environment_id: Optional[str] = None, is_scenario: bool = False) -> Dict:
         """Execute API test case"""
-        from app.core.kafka import notify_test_execution_result
+        from app.core.event_bus import notify_test_execution_result
         from app.tasks.test_execution import execute_api_test_task
         from app.utils.task_running_cache import task_running_cache
         
@@ -373,35 +462,302 @@ class ApiTestService:
         platform: str = "Swagger3",
         cover_data: bool = False,
         sync_case: bool = False,
+        create_user: Optional[str] = None,
     ) -> Dict:
-        """Import API definitions from file"""
-        # TODO: Implement actual import logic based on platform
-        return {
-            "imported_count": 0,
-            "updated_count": 0,
-            "errors": []
+        """Import API definitions from a Swagger/OpenAPI spec or a Postman collection"""
+        loop = asyncio.get_event_loop()
+        if platform == "Postman":
+            collection = await loop.run_in_executor(None, json.loads, file_content)
+            return await self.import_postman_collection(collection, project_id, module_id, create_user)
+        if platform not in SPEC_IMPORT_PLATFORMS:
+            raise ValueError(f"Unsupported import platform: {platform}")
+        spec = await loop.run_in_executor(None, load_spec, file_content)
+        return await self.import_openapi_spec(spec, project_id, module_id, cover_data, create_user)
+    
+    async def import_openapi_spec(
+        self,
+        spec: Dict[str, Any],
+        project_id: str,
+        module_id: Optional[str] = None,
+        cover_data: bool = False,
+        create_user: Optional[str] = None,
+    ) -> Dict:
+        """
+        Sync a Swagger 2 / OpenAPI 3 spec into the project's API definitions
+        
+        Operations are matched to definitions by (method, path) with one query
+        over the project's definitions, comparing stored fingerprints instead
+        of bodies. New operations are inserted (reusing a deleted imported
+        definition). With cover_data, changed operations are updated and
+        imported definitions of the target module that are no longer in the
+        spec are soft deleted. Unchanged operations are not written, so
+        re-importing the same spec commits nothing.
+        
+        Args:
+            spec: Parsed spec
+            project_id: Project ID
+            module_id: Module of new definitions; scope of deletions
+            cover_data: Update changed and delete removed operations
+            create_user: User recorded on written rows
+        
+        Returns:
+            Dict with imported_count, updated_count, deleted_count,
+            skipped_count (matched but not written) and errors
+        """
+        loop = asyncio.get_event_loop()
+        operations, errors = await loop.run_in_executor(None, _parse_spec, spec)
+        
+        result = await self.db.execute(
+            select(
+                ApiDefinition.id,
+                ApiDefinition.method,
+                ApiDefinition.path,
+                ApiDefinition.module_id,
+                ApiDefinition.fingerprint,
+                ApiDefinition.deleted,
+            ).where(
+                ApiDefinition.project_id == project_id,
+                or_(ApiDefinition.deleted == False, ApiDefinition.fingerprint.isnot(None)),
+            )
+        )
+        existing: Dict[Tuple[str, str], Any] = {}
+        live_rows = []
+        for row in result.all():
+            if not row.deleted:
+                live_rows.append(row)
+            key = (row.method.upper(), row.path)
+            # Prefer a live definition over a deleted one
+            if key not in existing or (existing[key].deleted and not row.deleted):
+                existing[key] = row
+        
+        inserts: List[SpecOperation] = []
+        revived: List[Tuple[str, SpecOperation]] = []
+        changed: List[Tuple[str, SpecOperation]] = []
+        matched = set()
+        for operation in operations:
+            row = existing.get((operation.method, operation.path))
+            if row is None:
+                inserts.append(operation)
+                continue
+            matched.add(row.id)
+            if row.deleted:
+                revived.append((row.id, operation))
+            elif row.fingerprint != operation.fingerprint and cover_data:
+                changed.append((row.id, operation))
+        
+        stale_ids = []
+        if cover_data:
+            stale_ids = [
+                row.id for row in live_rows
+                if row.fingerprint is not None and row.module_id == module_id and row.id not in matched
+            ]
+        
+        summary = {
+            "imported_count": len(inserts) + len(revived),
+            "updated_count": len(changed),
+            "deleted_count": len(stale_ids),
+            "skipped_count": len(operations) - len(inserts) - len(revived) - len(changed),
+            "errors": errors,
         }
+        if not (inserts or revived or changed or stale_ids):
+            return summary
+        
+        written = inserts + [operation for _, operation in revived + changed]
+        definitions = await loop.run_in_executor(None, partial(_expand_operations, written))
+        now = int(time.time() * 1000)
+        
+        insert_rows = []
+        for operation, fields in zip(inserts, definitions):
+            insert_rows.append({
+                **fields,
+                "id": str(uuid.uuid4()),
+                "project_id": project_id,
+                "status": "PROCESSING",
+                "module_id": module_id,
+                "fingerprint": operation.fingerprint,
+                "deleted": False,
+                "create_time": now,
+                "update_time": now,
+                "create_user": create_user,
+                "update_user": create_user,
+            })
+        
+        update_rows = []
+        for index, ((definition_id, operation), fields) in enumerate(zip(revived + changed, definitions[len(inserts):])):
+            update = {
+                **fields,
+                "id": definition_id,
+                "fingerprint": operation.fingerprint,
+                "update_time": now,
+                "update_user": create_user,
+            }
+            if index < len(revived):
+                update.update(deleted=False, delete_time=None, delete_user=None, module_id=module_id)
+            update_rows.append(update)
+        
+        try:
+            await BulkOperations.bulk_insert(self.db, ApiDefinition, insert_rows, commit=False)
+            await BulkOperations.bulk_update(self.db, ApiDefinition, update_rows, commit=False)
+            await BulkOperations.bulk_soft_delete(self.db, ApiDefinition, stale_ids, create_user, commit=False)
+            delta = summary["imported_count"] - summary["deleted_count"]
+            if delta:
+                await self.statistics.adjust(project_id, "api_definition_count", delta)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        
+        if summary["imported_count"]:
+            await count_strategy.on_created(ApiDefinition.__tablename__, project_id, summary["imported_count"])
+        if stale_ids:
+            await count_strategy.on_deleted(ApiDefinition.__tablename__, project_id, len(stale_ids))
+        if changed:
+            await count_strategy.invalidate(ApiDefinition.__tablename__)
+        return summary
     
-    async def export_api_definitions(self, definition_ids: List[str], export_type: str = "json") -> Dict:
-        """Export API definitions to file"""
-        definitions = []
-        for definition_id in definition_ids:
-            definition = await self.get_api_definition_by_id(definition_id)
-            if definition:
-                definitions.append({
-                    "id": definition.id,
-                    "name": definition.name,
-                    "method": definition.method,
-                    "path": definition.path,
-                    "request_body": json.loads(definition.request_body) if definition.request_body else None,
-                    "response_body": json.loads(definition.response_body) if definition.response_body else None,
-                })
+    async def import_postman_collection(
+        self,
+        collection: Dict[str, Any],
+        project_id: str,
+        module_id: Optional[str] = None,
+        create_user: Optional[str] = None,
+    ) -> Dict:
+        """
+        Import a Postman v2.0 / v2.1 collection
+        
+        Folders become API definition modules (below module_id when given)
+        and every request a test case. Requests share one definition per
+        method + path, including definitions already in the project, which
+        are looked up with a single query. Modules, definitions and test
+        cases are bulk inserted in one transaction.
+        
+        Args:
+            collection: Parsed collection
+            project_id: Project ID
+            module_id: Parent module of the collection's folders
+            create_user: Creator of imported rows
+        
+        Returns:
+            Dict with imported_count (definitions), updated_count,
+            case_count, module_count and errors
+        """
+        loop = asyncio.get_event_loop()
+        folders, requests, errors = await loop.run_in_executor(None, parse_collection, collection)
+        
+        modules = await ModuleTree.load(self.db, ApiDefinitionModule, project_id, create_user)
+        if module_id is not None and module_id not in modules.ids:
+            raise ValueError(f"Module not found: {module_id}")
+        root_module = module_id or MODULE_ROOT_PARENT
+        folder_modules: List[str] = []
+        for parent, name in folders:
+            folder_modules.append(modules.child(folder_modules[parent] if parent != ROOT_FOLDER else root_module, name))
         
+        result = await self.db.execute(
+            select(ApiDefinition.id, ApiDefinition.method, ApiDefinition.path).where(
+                ApiDefinition.project_id == project_id,
+                ApiDefinition.deleted == False,
+            )
+        )
+        definitions: Dict[Tuple[str, str], str] = {}
+        for row in result.all():
+            definitions.setdefault((row.method.upper(), row.path), row.id)
+        
+        now = int(time.time() * 1000)
+        definition_rows = []
+        case_rows = []
+        for request in requests:
+            request_module = folder_modules[request["folder"]] if request["folder"] != ROOT_FOLDER else module_id
+            key = (request["method"], request["path"])
+            definition_id = definitions.get(key)
+            if definition_id is None:
+                definition_id = definitions[key] = str(uuid.uuid4())
+                definition_rows.append({
+                    "id": definition_id,
+                    "project_id": project_id,
+                    "name": request["name"],
+                    "method": request["method"],
+                    "path": request["path"],
+                    "description": request["description"],
+                    "request_body": request["request_body"],
+                    "response_body": request["response_body"],
+                    "status": "PROCESSING",
+                    "module_id": request_module,
+                    "deleted": False,
+                    "create_time": now,
+                    "update_time": now,
+                    "create_user": create_user,
+                    "update_user": create_user,
+                })
+            case_rows.append({
+                "id": str(uuid.uuid4()),
+                "project_id": project_id,
+                "api_definition_id": definition_id,
+                "name": request["name"],
+                "request": request["case_request"],
+                "expected_response": request["expected_response"],
+                "status": "PROCESSING",
+                "priority": "P0",
+                "deleted": False,
+                "create_time": now,
+                "update_time": now,
+                "create_user": create_user,
+                "update_user": create_user,
+            })
+        
+        new_modules = modules.take_pending()
+        try:
+            await BulkOperations.bulk_insert(self.db, ApiDefinitionModule, new_modules, commit=False)
+            await BulkOperations.bulk_insert(self.db, ApiDefinition, definition_rows, commit=False)
+            await BulkOperations.bulk_insert(self.db, ApiTestCase, case_rows, commit=False)
+            if definition_rows:
+                await self.statistics.adjust(project_id, "api_definition_count", len(definition_rows))
+            if case_rows:
+                await self.statistics.adjust(project_id, "api_test_case_count", len(case_rows))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        
+        if definition_rows:
+            await count_strategy.on_created(ApiDefinition.__tablename__, project_id, len(definition_rows))
         return {
-            "definitions": definitions,
-            "export_type": export_type
+            "imported_count": len(definition_rows),
+            "updated_count": 0,
+            "case_count": len(case_rows),
+            "module_count": len(new_modules),
+            "errors": errors,
         }
     
+    async def export_api_definitions(
+        self,
+        definition_ids: Optional[List[str]] = None,
+        export_type: str = "json",
+        project_id: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Export API definitions as a streamed JSON document or NDJSON
+        
+        Selected definitions are fetched EXPORT_BATCH_SIZE IDs per IN (...)
+        query, in request order; a project export reads all its definitions
+        from one server-side cursor. Each batch is encoded and yielded
+        before the next is fetched, and stored request/response bodies are
+        spliced in as raw JSON (see export_stream.json_fragment).
+        
+        Args:
+            definition_ids: Definitions to export
+            project_id: Export all definitions of a project
+            export_type: One of API_DEFINITION_EXPORT_TYPES
+        
+        Yields:
+            Encoded chunks of the export
+        """
+        check_export_request(definition_ids, project_id, export_type, API_DEFINITION_EXPORT_TYPES)
+        batches = self._iter_export_rows(
+            ApiDefinition, API_DEFINITION_EXPORT_COLUMNS, definition_ids, project_id, API_DEFINITION_LIST_KEYS
+        )
+        async for chunk in encode_export(batches, _encode_definition, "definitions", export_type):
+            yield chunk
+    
     async def import_api_scenarios(
         self,
         file_content: bytes,
@@ -418,21 +774,32 @@ class ApiTestService:
             "errors": []
         }
     
-    async def export_api_scenarios(self, scenario_ids: List[str], export_type: str = "json") -> Dict:
-        """Export API scenarios to file"""
-        scenarios = []
-        for scenario_id in scenario_ids:
-            scenario = await self.get_api_scenario_by_id(scenario_id)
-            if scenario:
-                scenarios.append({
-                    "id": scenario.id,
-                    "name": scenario.name,
-                    "description": scenario.description,
-                    "status": scenario.status,
-                })
-        
-        return {
-            "scenarios": scenarios,
-            "export_type": export_type
-        }
+    async def export_api_scenarios(
+        self,
+        scenario_ids: Optional[List[str]] = None,
+        export_type: str = "json",
+        project_id: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Export API scenarios as a streamed JSON document or NDJSON (see export_api_definitions)"""
+        check_export_request(scenario_ids, project_id, export_type, API_SCENARIO_EXPORT_TYPES)
+        batches = self._iter_export_rows(
+            ApiScenario, API_SCENARIO_EXPORT_COLUMNS, scenario_ids, project_id,
+            (ApiScenario.create_time, ApiScenario.id),
+        )
+        async for chunk in encode_export(batches, _encode_scenario, "scenarios", export_type):
+            yield chunk
+    
+    def _iter_export_rows(
+        self,
+        model: type,
+        columns: Sequence[Any],
+        ids: Optional[List[str]],
+        project_id: Optional[str],
+        order_by: Sequence[Any],
+    ) -> AsyncIterator[Sequence[Any]]:
+        """Batches of live rows by ID (chunked IN, request order) or of a whole project (server-side cursor)"""
+        query = select(*columns).where(model.deleted == False)
+        if project_id:
+            query = query.where(model.project_id == project_id)
+        return iter_rows(self.db, query, model.id, ids, order_by)
 
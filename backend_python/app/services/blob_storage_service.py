@@ -0,0 +1,250 @@
+"""
+Blob Storage Service
+
+Content-addressed file storage: identical bytes are stored once in MinIO
+under their SHA-256 digest and shared through a reference count. Records
+pointing at a blob (such as bug attachments) keep their own user-visible
+file name, take a reference when created and release it when deleted;
+blobs left without references are removed by ``collect_garbage`` after a
+grace period.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from typing import BinaryIO, Optional, Tuple
+from functools import partial
+import asyncio
+import re
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.minio import minio_client, MeteredReader
+from app.models.file_blob import FileBlob
+
+BLOB_PREFIX = "blob/"
+# Uploads land here and are copied to their digest path once verified
+STAGING_PREFIX = f"{BLOB_PREFIX}staging/"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def blob_path(digest: str) -> str:
+    """MinIO path of a blob"""
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest}"
+
+
+def blob_digest(file_path: str) -> Optional[str]:
+    """Digest of a blob path (None for other paths)"""
+    if not file_path.startswith(BLOB_PREFIX):
+        return None
+    return file_path.rsplit("/", 1)[-1]
+
+
+def normalize_digest(digest: str) -> str:
+    """Validate a hex SHA-256 digest"""
+    digest = digest.strip().lower()
+    if not _DIGEST_PATTERN.match(digest):
+        raise ValueError("sha256 must be 64 hexadecimal characters")
+    return digest
+
+
+def hash_stream(stream: BinaryIO, max_size: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Hash a seekable stream in chunks and rewind it
+
+    Raises:
+        UploadTooLargeError: The stream is larger than ``max_size``
+    """
+    stream.seek(0)
+    reader = MeteredReader(stream, max_size)
+    while reader.read(HASH_CHUNK_SIZE):
+        pass
+    stream.seek(0)
+    return reader.sha256, reader.size
+
+
+class BlobStorageService:
+    """Content-addressed blob storage with reference counting"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, digest: str) -> Optional[FileBlob]:
+        """Get a stored blob by digest"""
+        return await self.db.get(FileBlob, normalize_digest(digest))
+
+    async def store(
+        self,
+        stream: BinaryIO,
+        content_type: Optional[str] = None,
+        max_size: Optional[int] = None,
+    ) -> FileBlob:
+        """
+        Store a seekable stream and take a reference to its blob
+
+        The stream is hashed first; content the server already has is not
+        uploaded again. Uploads go to a staging key and are copied to the
+        digest path only if the uploaded bytes match the digest. A new blob's
+        row is committed with no references
+        before its object is uploaded, so an object whose caller never
+        commits is still collected by ``collect_garbage``. The reference
+        becomes durable when the caller commits.
+
+        Raises:
+            UploadTooLargeError: The stream is larger than ``max_size``
+        """
+        loop = asyncio.get_event_loop()
+        digest, size = await loop.run_in_executor(None, partial(hash_stream, stream, max_size))
+        file_path = blob_path(digest)
+
+        while True:
+            created = await self._reserve(digest, size, file_path, content_type)
+            # An existing row may belong to an upload that failed or is still running
+            if created or not await loop.run_in_executor(None, minio_client.file_exists, file_path):
+                await self._upload(stream, digest, file_path, content_type, max_size)
+            else:
+                logger.info(f"Reused stored blob {digest} ({size} bytes)")
+
+            blob = await self._acquire(digest)
+            if blob is not None:
+                return blob
+            # An unreferenced row was collected meanwhile: store the content anew
+            stream.seek(0)
+
+    async def _upload(
+        self,
+        stream: BinaryIO,
+        digest: str,
+        file_path: str,
+        content_type: Optional[str],
+        max_size: Optional[int],
+    ) -> None:
+        """Upload a stream to a staging key and copy it to the blob path if its digest matches"""
+        loop = asyncio.get_event_loop()
+        staging_path = f"{STAGING_PREFIX}{uuid.uuid4()}"
+        try:
+            uploaded = await loop.run_in_executor(
+                None,
+                partial(minio_client.upload_stream, staging_path, stream, content_type=content_type, max_size=max_size),
+            )
+            if uploaded["sha256"] != digest:
+                raise ValueError("File content changed while uploading")
+            await loop.run_in_executor(None, minio_client.copy_file, staging_path, file_path)
+        finally:
+            try:
+                await loop.run_in_executor(None, minio_client.delete_file, staging_path)
+            except Exception as e:
+                # Swept by collect_garbage
+                logger.warning(f"Error deleting staged upload {staging_path}: {e}")
+
+    async def add_reference(self, digest: str) -> Optional[FileBlob]:
+        """Take a reference to an already stored blob (None if unknown)"""
+        return await self._acquire(normalize_digest(digest))
+
+    async def release(self, digest: str) -> None:
+        """Drop a reference; the blob is collected once none are left"""
+        await self.db.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == digest, FileBlob.ref_count > 0)
+            .values(ref_count=FileBlob.ref_count - 1, update_time=int(time.time() * 1000))
+        )
+
+    async def _acquire(self, digest: str) -> Optional[FileBlob]:
+        """Increment the reference count of an existing blob"""
+        # The row lock keeps garbage collection from removing the blob meanwhile
+        blob = await self.db.get(FileBlob, digest, with_for_update=True, populate_existing=True)
+        if blob is None:
+            return None
+        blob.ref_count += 1
+        blob.update_time = int(time.time() * 1000)
+        await self.db.flush()
+        return blob
+
+    async def _reserve(self, digest: str, size: int, file_path: str, content_type: Optional[str]) -> bool:
+        """
+        Commit an unreferenced row for a blob about to be uploaded
+
+        Runs in its own transaction so the row outlives a caller that rolls
+        back. Returns False if the blob already has a row.
+        """
+        table = FileBlob.__table__
+        now = int(time.time() * 1000)
+        row = {
+            "sha256": digest,
+            "size": size,
+            "file_path": file_path,
+            "content_type": content_type,
+            "ref_count": 0,
+            "create_time": now,
+            "update_time": now,
+        }
+
+        dialect = self.db.bind.dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+            statement = insert(table).values(row).prefix_with("IGNORE")
+        else:
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            statement = insert(table).values(row).on_conflict_do_nothing(index_elements=[table.c.sha256])
+        async with AsyncSession(self.db.bind) as session:
+            result = await session.execute(statement)
+            await session.commit()
+        return result.rowcount == 1
+
+    async def collect_garbage(self, grace_seconds: Optional[int] = None, limit: int = 1000) -> int:
+        """
+        Delete blobs that have had no references for longer than the grace period
+
+        Each blob is removed in its own transaction under its row lock, so a
+        concurrent upload either re-references it first or uploads it anew.
+        Staged uploads older than the grace period (left by a crashed
+        process) are deleted too.
+
+        Returns:
+            Number of blobs deleted
+        """
+        if grace_seconds is None:
+            grace_seconds = settings.FILE_BLOB_GC_GRACE_SECONDS
+        cutoff = int(time.time() * 1000) - grace_seconds * 1000
+        await self._sweep_staging(cutoff)
+        result = await self.db.execute(
+            select(FileBlob.sha256)
+            .where(FileBlob.ref_count == 0, FileBlob.update_time < cutoff)
+            .limit(limit)
+        )
+        digests = result.scalars().all()
+
+        loop = asyncio.get_event_loop()
+        removed = 0
+        for digest in digests:
+            blob = await self.db.get(FileBlob, digest, with_for_update=True, populate_existing=True)
+            if blob is None or blob.ref_count > 0:
+                await self.db.rollback()
+                continue
+            try:
+                await self.db.delete(blob)
+                await self.db.flush()
+                await loop.run_in_executor(None, minio_client.delete_file, blob.file_path)
+                await self.db.commit()
+                removed += 1
+            except Exception as e:
+                await self.db.rollback()
+                logger.error(f"Error deleting blob {digest}: {e}")
+        return removed
+
+    async def _sweep_staging(self, cutoff: int) -> None:
+        """Delete staged uploads last modified before cutoff (ms)"""
+        stale = []
+        async for page in minio_client.iter_objects(STAGING_PREFIX):
+            stale.extend(
+                obj["name"] for obj in page
+                if obj["last_modified"] is not None and obj["last_modified"].timestamp() * 1000 < cutoff
+            )
+        if stale:
+            failed = await minio_client.delete_many(stale)
+            logger.info(f"Deleted {len(stale) - len(failed)} stale staged uploads")
@@ -2,8 +2,9 @@
 Bug Management Service
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from typing import BinaryIO, List, Optional, Tuple
 import uuid
 import time
 
@@ -11,6 +12,15 @@ from app.models.bug import Bug
 from app.models.bug_comment import BugComment
 from app.models.bug_attachment import BugLocalAttachment
 from app.schemas.bug_management import Bug as BugSchema
+from app.core.config import settings
+from app.core.database_optimization import KeysetPaginationHelper
+from app.core.sequence import sequence_allocator
+from app.core.count_strategy import count_strategy, COUNT_CACHED, COUNT_COUNTER
+from app.services.project_statistics_service import ProjectStatisticsService
+from app.services.blob_storage_service import BlobStorageService, blob_digest, blob_path, normalize_digest
+
+# List order; backed by idx_bug_project_list
+BUG_LIST_KEYS = (Bug.pos, Bug.create_time, Bug.id)
 
 
 class BugManagementService:
@@ -18,6 +28,7 @@ class BugManagementService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.statistics = ProjectStatisticsService(db)
     
     async def get_bugs(
         self,
@@ -26,9 +37,15 @@ class BugManagementService:
         limit: int = 100,
         keyword: Optional[str] = None,
         status: Optional[str] = None,
-        handle_user: Optional[str] = None
+        handle_user: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[Bug]:
-        """Get bugs with pagination and filters"""
+        """
+        Get bugs with pagination and filters
+        
+        When a cursor is given, skip is ignored and the page starts right
+        after the cursor (keyset pagination).
+        """
         query = select(Bug).where(Bug.deleted == False)
         
         if project_id:
@@ -43,7 +60,10 @@ class BugManagementService:
         if handle_user:
             query = query.where(Bug.handle_user == handle_user)
         
-        query = query.offset(skip).limit(limit).order_by(Bug.pos.desc(), Bug.create_time.desc())
+        if cursor:
+            query = KeysetPaginationHelper.apply(query, BUG_LIST_KEYS, cursor, limit)
+        else:
+            query = KeysetPaginationHelper.apply(query, BUG_LIST_KEYS, limit=limit).offset(skip)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -58,10 +78,19 @@ class BugManagementService:
         self,
         project_id: Optional[str] = None,
         keyword: Optional[str] = None,
-        status: Optional[str] = None
-    ) -> int:
-        """Count bugs"""
-        query = select(func.count(Bug.id)).where(Bug.deleted == False)
+        status: Optional[str] = None,
+        handle_user: Optional[str] = None
+    ) -> Tuple[int, bool]:
+        """
+        Count bugs matching the get_bugs filters
+        
+        The plain per-project count is served from the project counter,
+        filtered counts from the count cache.
+        
+        Returns:
+            Tuple of (total, whether the total is exact)
+        """
+        query = select(Bug.id).where(Bug.deleted == False)
         
         if project_id:
             query = query.where(Bug.project_id == project_id)
@@ -72,8 +101,12 @@ class BugManagementService:
         if status:
             query = query.where(Bug.status == status)
         
-        result = await self.db.execute(query)
-        return result.scalar_one()
+        if handle_user:
+            query = query.where(Bug.handle_user == handle_user)
+        
+        plain = project_id and not keyword and not status and not handle_user
+        mode = COUNT_COUNTER if plain else COUNT_CACHED
+        return await count_strategy.count(self.db, query, mode, project_id)
     
     async def create_bug(
         self,
@@ -89,19 +122,8 @@ class BugManagementService:
         """Create bug"""
         bug_id = str(uuid.uuid4())
         
-        # Get next num (bug number) for the project
-        result = await self.db.execute(
-            select(func.max(Bug.num)).where(Bug.project_id == project_id)
-        )
-        max_num = result.scalar_one_or_none() or 0
-        next_num = max_num + 1
-        
-        # Get next pos (position) for sorting
-        result = await self.db.execute(
-            select(func.max(Bug.pos)).where(Bug.project_id == project_id)
-        )
-        max_pos = result.scalar_one_or_none() or 0
-        next_pos = max_pos + 5000  # Interval of 5000
+        # Allocate num (display number) and pos (sort order, interval 5000)
+        next_num, next_pos = await sequence_allocator.next(self.db, Bug, project_id)
         
         # Parse tags if provided as list
         tags = kwargs.get("tags")
@@ -126,8 +148,10 @@ class BugManagementService:
         )
         
         self.db.add(bug)
+        await self.statistics.adjust(project_id, "bug_count", 1)
         await self.db.commit()
         await self.db.refresh(bug)
+        await count_strategy.on_created(Bug.__tablename__, project_id)
         return bug
     
     async def update_bug(
@@ -153,6 +177,7 @@ class BugManagementService:
         bug.update_time = int(time.time() * 1000)
         
         await self.db.commit()
+        await count_strategy.invalidate(Bug.__tablename__)
         await self.db.refresh(bug)
         return bug
     
@@ -165,8 +190,10 @@ class BugManagementService:
         bug.deleted = True
         bug.delete_time = int(time.time() * 1000)
         bug.delete_user = delete_user
+        await self.statistics.adjust(bug.project_id, "bug_count", -1)
         
         await self.db.commit()
+        await count_strategy.on_deleted(Bug.__tablename__, bug.project_id)
         return True
     
     async def sync_bug_to_platform(self, bug_id: str, platform: str) -> bool:
@@ -276,35 +303,38 @@ class BugManagementService:
         self,
         bug_id: str,
         file_name: str,
-        file_content: bytes,
-        file_size: int,
+        file: Optional[BinaryIO] = None,
+        sha256: Optional[str] = None,
+        content_type: Optional[str] = None,
         source: str = "LOCAL",
         create_user: Optional[str] = None,
-    ) -> BugLocalAttachment:
-        """Upload bug attachment"""
-        from app.core.minio import minio_client
-        
-        attachment_id = str(uuid.uuid4())
+    ) -> Optional[BugLocalAttachment]:
+        """
+        Upload bug attachment
         
-        # Save file to MinIO
-        file_path = f"bug/{bug_id}/{attachment_id}/{file_name}"
-        try:
-            minio_client.upload_file(
-                file_path=file_path,
-                file_data=file_content,
-                content_type=None,  # Auto-detect or pass from request
-            )
-            file_id = file_path  # Use file path as file_id
-        except Exception as e:
-            # Fallback: use attachment_id as file_id if MinIO fails
-            file_id = attachment_id
+        The content is stored once per digest and shared between attachments.
+        Instead of ``file``, pass the ``sha256`` of content already attached
+        to a bug of the same project to attach it without uploading (returns
+        None otherwise). Knowing a digest is not proof of having the bytes,
+        so content from other projects has to be uploaded.
+        """
+        blobs = BlobStorageService(self.db)
+        if file is not None:
+            blob = await blobs.store(file, content_type=content_type, max_size=settings.MAX_UPLOAD_SIZE)
+        else:
+            digest = normalize_digest(sha256)
+            if not await self._project_has_blob(bug_id, digest):
+                return None
+            blob = await blobs.add_reference(digest)
+            if blob is None:
+                return None
         
         attachment = BugLocalAttachment(
-            id=attachment_id,
+            id=str(uuid.uuid4()),
             bug_id=bug_id,
-            file_id=file_id,
+            file_id=blob.file_path,
             file_name=file_name,
-            size=file_size,
+            size=blob.size,
             source=source,
             create_user=create_user,
         )
@@ -313,6 +343,18 @@ class BugManagementService:
         await self.db.refresh(attachment)
         return attachment
     
+    async def _project_has_blob(self, bug_id: str, digest: str) -> bool:
+        """Whether a bug of the bug's project already has an attachment with this content"""
+        owner = aliased(Bug)
+        result = await self.db.execute(
+            select(BugLocalAttachment.id)
+            .join(Bug, Bug.id == BugLocalAttachment.bug_id)
+            .join(owner, owner.project_id == Bug.project_id)
+            .where(owner.id == bug_id, BugLocalAttachment.file_id == blob_path(digest))
+            .limit(1)
+        )
+        return result.first() is not None
+    
     async def download_bug_attachment(self, attachment_id: str) -> Optional[Tuple[bytes, str]]:
         """Download bug attachment"""
         from app.core.minio import minio_client
@@ -343,12 +385,17 @@ class BugManagementService:
         if not attachment:
             return False
         
-        # Delete file from MinIO
-        try:
-            minio_client.delete_file(attachment.file_id)
-        except Exception as e:
-            # Continue with database deletion even if MinIO deletion fails
-            pass
+        digest = blob_digest(attachment.file_id)
+        if digest:
+            # Shared content: the blob is collected once no attachment uses it
+            await BlobStorageService(self.db).release(digest)
+        else:
+            # Delete file from MinIO
+            try:
+                minio_client.delete_file(attachment.file_id)
+            except Exception as e:
+                # Continue with database deletion even if MinIO deletion fails
+                pass
         
         await self.db.delete(attachment)
         await self.db.commit()
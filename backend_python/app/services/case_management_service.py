@@ -2,14 +2,164 @@
 Case Management Service
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import select
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Union
+from collections import deque
+from datetime import datetime
+from functools import partial
+from itertools import islice
+import asyncio
+import io
+import re
+import tempfile
 import uuid
 import time
 import json
 
-from app.models.functional_case import FunctionalCase, FunctionalCaseBlob
+from app.models.functional_case import FunctionalCase, FunctionalCaseBlob, FunctionalCaseModule
 from app.schemas.case_management import FunctionalCase as FunctionalCaseSchema
+from app.core.database_optimization import KeysetPaginationHelper
+from app.core.sequence import sequence_allocator, POS_STEP
+from app.core.count_strategy import count_strategy
+from app.core.logging import logger
+from app.services.module_tree import ModuleTree, MODULE_ROOT_PARENT
+from app.services.project_statistics_service import ProjectStatisticsService
+from app.services.xmind_parser import ROOT as XMIND_ROOT, read_xmind
+from app.utils.batch_operations import BulkOperations
+
+# List order; backed by idx_func_case_project_list
+FUNCTIONAL_CASE_LIST_KEYS = (FunctionalCase.pos, FunctionalCase.create_time, FunctionalCase.id)
+
+# Excel sheet layout of exported cases: (header, column)
+CASE_EXCEL_COLUMNS = (
+    ("ID", FunctionalCase.id),
+    ("编号", FunctionalCase.num),
+    ("名称", FunctionalCase.name),
+    ("模块ID", FunctionalCase.module_id),
+    ("模板ID", FunctionalCase.template_id),
+    ("编辑模式", FunctionalCase.case_edit_type),
+    ("评审结果", FunctionalCase.review_status),
+    ("标签", FunctionalCase.tags),
+    ("最近执行结果", FunctionalCase.last_execute_result),
+    ("前置条件", FunctionalCaseBlob.prerequisite),
+    ("步骤", FunctionalCaseBlob.steps),
+    ("步骤描述", FunctionalCaseBlob.text_description),
+    ("预期结果", FunctionalCaseBlob.expected_result),
+    ("备注", FunctionalCaseBlob.description),
+    ("创建人", FunctionalCase.create_user),
+    ("创建时间", FunctionalCase.create_time),
+)
+EXPORT_BATCH_SIZE = 1000  # Rows fetched from the server-side cursor per round trip
+EXPORT_SPOOL_SIZE = 16 * 1024 * 1024  # Exported workbooks larger than this are kept on disk
+EXCEL_CELL_MAX_LENGTH = 32767
+
+# Excel headers read on import -> case field; exported sheets import as-is
+CASE_IMPORT_HEADERS = {
+    "名称": "name",
+    "所属模块": "module_path",
+    "模块ID": "module_id",
+    "模板ID": "template_id",
+    "编辑模式": "case_edit_type",
+    "评审结果": "review_status",
+    "标签": "tags",
+    "前置条件": "prerequisite",
+    "步骤": "steps",
+    "步骤描述": "text_description",
+    "预期结果": "expected_result",
+    "备注": "description",
+}
+IMPORT_BATCH_SIZE = 1000  # Rows validated and inserted per transaction
+IMPORT_MAX_ERRORS = 1000  # Row errors returned; further failures are only counted
+CASE_EDIT_TYPES = {"STEP", "TEXT"}
+REVIEW_STATUSES = {"UN_REVIEWED", "UNDER_REVIEWED", "PASS", "UN_PASS", "RE_REVIEWED"}
+DEFAULT_MODULE_ID = "root"
+TAG_SEPARATORS = re.compile(r"[,;，；]")
+# Case IDs of job imports derive from (job, row), so a re-run batch is recognized
+IMPORT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "metersphere:functional-case-import")
+
+
+def _excel_value(value: Any) -> Any:
+    """Make a value safe for an Excel cell"""
+    if isinstance(value, str):
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        return ILLEGAL_CHARACTERS_RE.sub("", value)[:EXCEL_CELL_MAX_LENGTH]
+    return value
+
+
+def _append_case_rows(sheet, rows: Sequence[Sequence[Any]]) -> None:
+    """Write exported case rows to a write-only sheet"""
+    for row in rows:
+        values = [_excel_value(value) for value in row]
+        if values[-1] is not None:
+            values[-1] = datetime.fromtimestamp(values[-1] / 1000)
+        sheet.append(values)
+
+
+def _read_rows(rows: Iterator, size: int) -> list:
+    """Read the next rows of a read-only sheet"""
+    return list(islice(rows, size))
+
+
+def _skip_rows(rows: Iterator, count: int) -> None:
+    """Advance a read-only sheet past rows without keeping them"""
+    deque(islice(rows, count), maxlen=0)
+
+
+def _parse_case_row(values: Sequence[Any], columns: Dict[int, str]) -> Optional[Dict[str, Any]]:
+    """
+    Validate one imported row
+
+    Returns:
+        Case fields, or None for a blank row
+
+    Raises:
+        ValueError: If the row is invalid
+    """
+    case = dict.fromkeys(CASE_IMPORT_HEADERS.values())
+    for index, field in columns.items():
+        value = values[index] if index < len(values) else None
+        if value is not None:
+            case[field] = str(value).strip() or None
+    if not any(case.values()):
+        return None
+
+    if not case["name"]:
+        raise ValueError("Name is required")
+    if len(case["name"]) > 255:
+        raise ValueError("Name exceeds 255 characters")
+    for field in ("module_id", "template_id"):
+        if case[field] and len(case[field]) > 50:
+            raise ValueError(f"{field} exceeds 50 characters")
+
+    case["case_edit_type"] = (case["case_edit_type"] or "STEP").upper()
+    if case["case_edit_type"] not in CASE_EDIT_TYPES:
+        raise ValueError(f"Invalid edit type: {case['case_edit_type']}")
+    case["review_status"] = (case["review_status"] or "UN_REVIEWED").upper()
+    if case["review_status"] not in REVIEW_STATUSES:
+        raise ValueError(f"Invalid review status: {case['review_status']}")
+
+    if case["tags"]:
+        if case["tags"].startswith("["):
+            try:
+                tags = json.loads(case["tags"])
+            except json.JSONDecodeError:
+                raise ValueError("Tags are not a valid JSON list")
+            if not isinstance(tags, list):
+                raise ValueError("Tags are not a valid JSON list")
+        else:
+            tags = [tag.strip() for tag in TAG_SEPARATORS.split(case["tags"]) if tag.strip()]
+        case["tags"] = json.dumps([str(tag) for tag in tags], ensure_ascii=False)
+        if len(case["tags"]) > 500:
+            raise ValueError("Tags exceed 500 characters")
+
+    if case["steps"]:
+        try:
+            steps = json.loads(case["steps"])
+        except json.JSONDecodeError:
+            steps = None
+        if not isinstance(steps, list):
+            raise ValueError("Steps must be a JSON list")
+    return case
 
 
 class CaseManagementService:
@@ -17,6 +167,7 @@ class CaseManagementService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.statistics = ProjectStatisticsService(db)
     
     async def get_functional_cases(
         self,
@@ -24,9 +175,15 @@ class CaseManagementService:
         skip: int = 0,
         limit: int = 100,
         keyword: Optional[str] = None,
-        module_id: Optional[str] = None
+        module_id: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[FunctionalCase]:
-        """Get functional cases"""
+        """
+        Get functional cases
+        
+        When a cursor is given, skip is ignored and the page starts right
+        after the cursor (keyset pagination).
+        """
         query = select(FunctionalCase).where(FunctionalCase.deleted == False, FunctionalCase.latest == True)
         
         if project_id:
@@ -38,7 +195,10 @@ class CaseManagementService:
         if keyword:
             query = query.where(FunctionalCase.name.like(f"%{keyword}%"))
         
-        query = query.offset(skip).limit(limit).order_by(FunctionalCase.pos.desc(), FunctionalCase.create_time.desc())
+        if cursor:
+            query = KeysetPaginationHelper.apply(query, FUNCTIONAL_CASE_LIST_KEYS, cursor, limit)
+        else:
+            query = KeysetPaginationHelper.apply(query, FUNCTIONAL_CASE_LIST_KEYS, limit=limit).offset(skip)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -67,19 +227,8 @@ class CaseManagementService:
         """Create functional case"""
         case_id = str(uuid.uuid4())
         
-        # Get next num (case number) for the project
-        result = await self.db.execute(
-            select(func.max(FunctionalCase.num)).where(FunctionalCase.project_id == project_id)
-        )
-        max_num = result.scalar_one_or_none() or 0
-        next_num = max_num + 1
-        
-        # Get next pos (position) for sorting
-        result = await self.db.execute(
-            select(func.max(FunctionalCase.pos)).where(FunctionalCase.project_id == project_id)
-        )
-        max_pos = result.scalar_one_or_none() or 0
-        next_pos = max_pos + 5000  # Interval of 5000
+        # Allocate num (display number) and pos (sort order, interval 5000)
+        next_num, next_pos = await sequence_allocator.next(self.db, FunctionalCase, project_id)
         
         # Parse tags if provided as list
         tags = kwargs.get("tags")
@@ -121,8 +270,10 @@ class CaseManagementService:
             )
             self.db.add(blob)
         
+        await self.statistics.adjust(project_id, "functional_case_count", 1)
         await self.db.commit()
         await self.db.refresh(functional_case)
+        await count_strategy.on_created(FunctionalCase.__tablename__, project_id)
         return functional_case
     
     async def update_functional_case(
@@ -171,6 +322,7 @@ class CaseManagementService:
         
         await self.db.commit()
         await self.db.refresh(functional_case)
+        await count_strategy.invalidate(FunctionalCase.__tablename__)
         return functional_case
     
     async def delete_functional_case(self, case_id: str, delete_user: Optional[str] = None) -> bool:
@@ -182,43 +334,381 @@ class CaseManagementService:
         functional_case.deleted = True
         functional_case.delete_time = int(time.time() * 1000)
         functional_case.delete_user = delete_user
+        await self.statistics.adjust(functional_case.project_id, "functional_case_count", -1)
         
         await self.db.commit()
+        await count_strategy.on_deleted(FunctionalCase.__tablename__, functional_case.project_id)
         return True
     
     async def import_cases_from_excel(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         file_name: str,
         project_id: str,
         module_id: Optional[str] = None,
+        version_id: Optional[str] = None,
+        template_id: Optional[str] = None,
+        create_user: Optional[str] = None,
+        start_row: int = 0,
+        job_id: Optional[str] = None,
+        on_batch: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> dict:
-        """Import cases from Excel file"""
-        # TODO: Implement Excel import logic using openpyxl or pandas
+        """
+        Import cases from Excel file
+
+        The sheet is parsed in read-only mode and processed in batches of
+        IMPORT_BATCH_SIZE rows: each batch is validated, gets a contiguous
+        num/pos range and is inserted with multi-row INSERTs in its own
+        transaction. Invalid rows are reported and skipped.
+
+        Background jobs resume with start_row (data rows already processed)
+        and pass their job_id: case IDs are then derived from job and row,
+        and rows of the first batch that already exist (committed by a run
+        that died before reporting) are not inserted again.
+
+        Args:
+            file_content: Workbook bytes or a binary file object
+            file_name: Uploaded file name
+            project_id: Project ID
+            module_id: Module of rows without 所属模块/模块ID (default: root)
+            version_id: Version ID of the imported cases
+            template_id: Template of rows without 模板ID
+            create_user: Creator
+            start_row: Data rows to skip
+            job_id: Import job ID
+            on_batch: Awaited after each committed batch with processed (data
+                rows so far), total (None if the sheet doesn't say), imported
+                and failures ([(row, message)]) of the batch; may raise to stop
+
+        Returns:
+            Dict with imported_count, fail_count and errors ({row, message})
+        """
+        from openpyxl import load_workbook
+
+        if not version_id:
+            raise ValueError("version_id is required")
+        source = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+        loop = asyncio.get_event_loop()
+        workbook = await loop.run_in_executor(None, partial(load_workbook, source, read_only=True, data_only=True))
+        imported_count = 0
+        fail_count = 0
+        errors = []
+        try:
+            sheet = workbook.active
+            total = sheet.max_row - 1 if sheet.max_row else None
+            rows = sheet.iter_rows(values_only=True)
+            header = await loop.run_in_executor(None, next, rows, None)
+            columns = {
+                index: CASE_IMPORT_HEADERS[str(title).strip()]
+                for index, title in enumerate(header or ())
+                if title is not None and str(title).strip() in CASE_IMPORT_HEADERS
+            }
+            if "name" not in columns.values():
+                raise ValueError("Missing required column: 名称")
+
+            modules = await ModuleTree.load(
+                self.db, FunctionalCaseModule, project_id, create_user, root_ids=(DEFAULT_MODULE_ID,)
+            )
+            default_module_id = module_id or DEFAULT_MODULE_ID
+            if default_module_id not in modules.ids:
+                raise ValueError(f"Module not found: {default_module_id}")
+
+            if start_row:
+                await loop.run_in_executor(None, _skip_rows, rows, start_row)
+            row_number = 1 + start_row
+            processed = start_row
+            check_existing = job_id is not None
+            while True:
+                batch = await loop.run_in_executor(None, _read_rows, rows, IMPORT_BATCH_SIZE)
+                if not batch:
+                    break
+                cases = []
+                failures = []
+                batch_imported = 0
+                for values in batch:
+                    row_number += 1
+                    try:
+                        case = _parse_case_row(values, columns)
+                        if case is None:
+                            continue
+                        case["template_id"] = case["template_id"] or template_id
+                        if not case["template_id"]:
+                            raise ValueError("Template ID is required")
+                        # Last, so rejected rows don't create modules
+                        if case["module_path"]:
+                            case["module_id"] = modules.resolve(case["module_path"])
+                        elif case["module_id"]:
+                            if case["module_id"] not in modules.ids:
+                                raise ValueError(f"Module not found: {case['module_id']}")
+                        else:
+                            case["module_id"] = default_module_id
+                    except ValueError as e:
+                        failures.append((row_number, str(e)))
+                        continue
+                    case["row"] = row_number
+                    if job_id:
+                        case["id"] = str(uuid.uuid5(IMPORT_ID_NAMESPACE, f"{job_id}:{row_number}"))
+                    else:
+                        case["id"] = str(uuid.uuid4())
+                    cases.append(case)
+
+                if cases and check_existing:
+                    existing = await self.db.execute(
+                        select(FunctionalCase.id).where(FunctionalCase.id.in_([case["id"] for case in cases]))
+                    )
+                    existing_ids = set(existing.scalars())
+                    if existing_ids:
+                        cases = [case for case in cases if case["id"] not in existing_ids]
+                        batch_imported += len(existing_ids)
+                    check_existing = False
+                if cases:
+                    try:
+                        await self._insert_imported_cases(project_id, version_id, create_user, cases, modules)
+                        batch_imported += len(cases)
+                    except Exception as e:
+                        logger.error(f"Functional case import batch failed: {e}")
+                        message = f"Insert failed: {str(e).splitlines()[0][:200]}"
+                        failures.extend((case["row"], message) for case in cases)
+                imported_count += batch_imported
+                fail_count += len(failures)
+                errors.extend(
+                    {"row": row, "message": message}
+                    for row, message in failures[:max(0, IMPORT_MAX_ERRORS - len(errors))]
+                )
+                processed += len(batch)
+                if on_batch is not None:
+                    await on_batch({
+                        "processed": processed,
+                        "total": total,
+                        "imported": batch_imported,
+                        "failures": failures,
+                    })
+        finally:
+            workbook.close()
+            # Also when on_batch stopped the import: earlier batches are committed
+            if imported_count:
+                await count_strategy.on_created(FunctionalCase.__tablename__, project_id, imported_count)
+
         return {
-            "imported_count": 0,
-            "errors": []
+            "imported_count": imported_count,
+            "fail_count": fail_count,
+            "errors": errors,
         }
-    
-    async def export_cases_to_excel(self, case_ids: List[str]) -> bytes:
-        """Export cases to Excel file"""
-        # TODO: Implement Excel export logic using openpyxl or pandas
-        # For now, return empty bytes
-        return b""
-    
+
     async def import_cases_from_xmind(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         file_name: str,
         project_id: str,
         module_id: Optional[str] = None,
+        version_id: Optional[str] = None,
+        template_id: Optional[str] = None,
+        create_user: Optional[str] = None,
     ) -> dict:
-        """Import cases from XMind file"""
-        # TODO: Implement XMind import logic
+        """
+        Import cases from an XMind (Zen or Classic) file
+
+        The whole map is parsed into modules and cases in memory (see
+        xmind_parser for the topic mapping). Missing modules are created in
+        one bulk insert below module_id, then cases are inserted in batches
+        of IMPORT_BATCH_SIZE with pre-allocated num/pos ranges; nothing is
+        queried per topic.
+
+        Args:
+            file_content: .xmind bytes or a binary file object
+            file_name: Uploaded file name
+            project_id: Project ID
+            module_id: Parent module of the map's modules (default: root)
+            version_id: Version ID of the imported cases
+            template_id: Template of the imported cases
+            create_user: Creator
+
+        Returns:
+            Dict with imported_count, fail_count, module_count and errors
+            ({topic, message})
+        """
+        if not version_id:
+            raise ValueError("version_id is required")
+        if not template_id:
+            raise ValueError("template_id is required")
+        loop = asyncio.get_event_loop()
+        map_modules, cases, errors = await loop.run_in_executor(None, read_xmind, file_content)
+        fail_count = len(errors)
+
+        modules = await ModuleTree.load(
+            self.db, FunctionalCaseModule, project_id, create_user, root_ids=(DEFAULT_MODULE_ID,)
+        )
+        default_module_id = module_id or DEFAULT_MODULE_ID
+        if default_module_id not in modules.ids:
+            raise ValueError(f"Module not found: {default_module_id}")
+        parent_id = MODULE_ROOT_PARENT if default_module_id == DEFAULT_MODULE_ID else default_module_id
+
+        # Parents come first, so each module's parent is already resolved
+        module_ids: List[str] = []
+        for parent, name in map_modules:
+            module_ids.append(modules.child(module_ids[parent] if parent != XMIND_ROOT else parent_id, name))
+        new_modules = modules.take_pending()
+        if new_modules:
+            try:
+                await BulkOperations.bulk_insert(self.db, FunctionalCaseModule, new_modules, commit=False)
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                raise
+
+        for case in cases:
+            module = case.pop("module")
+            case["module_id"] = module_ids[module] if module != XMIND_ROOT else default_module_id
+            case["template_id"] = template_id
+            case["id"] = str(uuid.uuid4())
+
+        imported_count = 0
+        try:
+            for start in range(0, len(cases), IMPORT_BATCH_SIZE):
+                batch = cases[start:start + IMPORT_BATCH_SIZE]
+                try:
+                    await self._insert_imported_cases(project_id, version_id, create_user, batch, modules)
+                    imported_count += len(batch)
+                except Exception as e:
+                    logger.error(f"XMind case import batch failed: {e}")
+                    message = f"Insert failed: {str(e).splitlines()[0][:200]}"
+                    fail_count += len(batch)
+                    errors.extend({"topic": case["name"], "message": message} for case in batch)
+        finally:
+            if imported_count:
+                await count_strategy.on_created(FunctionalCase.__tablename__, project_id, imported_count)
+
         return {
-            "imported_count": 0,
-            "errors": []
+            "imported_count": imported_count,
+            "fail_count": fail_count,
+            "module_count": len(new_modules),
+            "errors": errors[:IMPORT_MAX_ERRORS],
         }
+
+    async def _insert_imported_cases(
+        self,
+        project_id: str,
+        version_id: str,
+        create_user: Optional[str],
+        cases: List[Dict[str, Any]],
+        modules: ModuleTree,
+    ):
+        """Insert one validated batch (and the modules it created) in one transaction"""
+        num, pos = await sequence_allocator.allocate(self.db, FunctionalCase, project_id, len(cases))
+        now = int(time.time() * 1000)
+        case_rows = []
+        blob_rows = []
+        for offset, case in enumerate(cases):
+            case_id = case["id"]
+            case_rows.append({
+                "id": case_id,
+                "num": num + offset,
+                "module_id": case["module_id"],
+                "project_id": project_id,
+                "template_id": case["template_id"],
+                "name": case["name"],
+                "review_status": case["review_status"],
+                "tags": case["tags"],
+                "case_edit_type": case["case_edit_type"],
+                "pos": pos + offset * POS_STEP,
+                "version_id": version_id,
+                "ref_id": case_id,
+                "last_execute_result": "UN_EXECUTED",
+                "ai_create": False,
+                "public_case": False,
+                "latest": True,
+                "deleted": False,
+                "create_time": now,
+                "update_time": now,
+                "create_user": create_user,
+                "update_user": create_user,
+            })
+            blob_rows.append({
+                "id": case_id,
+                "steps": case["steps"],
+                "text_description": case["text_description"],
+                "expected_result": case["expected_result"],
+                "prerequisite": case["prerequisite"],
+                "description": case["description"],
+            })
+
+        new_modules = modules.take_pending()
+        try:
+            await BulkOperations.bulk_insert(self.db, FunctionalCaseModule, new_modules, commit=False)
+            await BulkOperations.bulk_insert(self.db, FunctionalCase, case_rows, commit=False)
+            await BulkOperations.bulk_insert(self.db, FunctionalCaseBlob, blob_rows, commit=False)
+            await self.statistics.adjust(project_id, "functional_case_count", len(cases))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            modules.discard(new_modules)
+            raise
+    
+    async def export_cases_to_excel(
+        self,
+        case_ids: Optional[List[str]] = None,
+        project_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+    ) -> BinaryIO:
+        """
+        Export cases to an Excel file
+        
+        Rows are read from a server-side cursor EXPORT_BATCH_SIZE at a time,
+        with their blobs joined in the same query, and appended to a
+        write-only workbook, so memory stays flat whatever the case count.
+        
+        Args:
+            case_ids: Cases to export
+            project_id: Export the latest versions of a project's cases
+            module_id: Restrict a project export to a module
+        
+        Returns:
+            Temporary file holding the workbook, positioned at the start;
+            the caller closes it
+        """
+        if not case_ids and not project_id:
+            raise ValueError("case_ids or project_id is required")
+        
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("用例")
+        header_cells = []
+        for header, _ in CASE_EXCEL_COLUMNS:
+            cell = WriteOnlyCell(sheet, header)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        sheet.append(header_cells)
+        
+        query = (
+            select(*(column for _, column in CASE_EXCEL_COLUMNS))
+            .outerjoin(FunctionalCaseBlob, FunctionalCaseBlob.id == FunctionalCase.id)
+            .where(FunctionalCase.deleted == False)
+        )
+        if case_ids:
+            query = query.where(FunctionalCase.id.in_(case_ids))
+        if project_id:
+            query = query.where(FunctionalCase.project_id == project_id, FunctionalCase.latest == True)
+        if module_id:
+            query = query.where(FunctionalCase.module_id == module_id)
+        query = query.order_by(*FUNCTIONAL_CASE_LIST_KEYS).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        
+        loop = asyncio.get_event_loop()
+        result = await self.db.stream(query)
+        async for rows in result.partitions():
+            # Cell conversion and XML writing are CPU work; keep them off the event loop
+            await loop.run_in_executor(None, _append_case_rows, sheet, rows)
+        
+        output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+        try:
+            await loop.run_in_executor(None, workbook.save, output)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return output
     
     async def execute_functional_case(
         self,
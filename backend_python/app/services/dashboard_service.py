@@ -2,13 +2,23 @@
 Dashboard Service
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Dict, Optional, List
+from sqlalchemy import select, func, literal, union_all
+from typing import Dict, Optional, List, Any
 from datetime import datetime, timedelta
 
 from app.models.project import Project
-from app.models.bug import Bug
-from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.project_statistics import ProjectStatistics
+from app.services.project_statistics_service import COUNTED_RESOURCES, counted_filters
+
+# Counter column -> dashboard statistics key
+STATISTICS_KEYS = {
+    "bug_count": "total_bugs",
+    "api_definition_count": "total_api_definitions",
+    "api_test_case_count": "total_api_test_cases",
+    "api_scenario_count": "total_api_scenarios",
+    "functional_case_count": "total_functional_cases",
+    "test_plan_count": "total_test_plans",
+}
 
 
 class DashboardService:
@@ -22,65 +32,82 @@ class DashboardService:
         project_id: Optional[str] = None,
         organization_id: Optional[str] = None
     ) -> Dict:
-        """Get dashboard statistics"""
-        stats = {}
+        """
+        Get dashboard statistics
         
-        # Count projects
-        project_query = select(func.count(Project.id)).where(Project.deleted == False)
+        Served from the materialized project_statistics counters in one query;
+        falls back to counting the source tables in one UNION ALL query when
+        the counters have not been populated.
+        """
+        stats = await self._get_materialized_statistics(project_id, organization_id)
+        if stats is None:
+            stats = await self._count_statistics(project_id, organization_id)
+        return stats
+    
+    def _project_filters(self, project_id: Optional[str], organization_id: Optional[str]) -> List[Any]:
+        """Filters selecting the projects counted by the dashboard"""
+        filters = [Project.deleted == False]
         if organization_id:
-            project_query = project_query.where(Project.organization_id == organization_id)
-        if project_id:
-            project_query = project_query.where(Project.id == project_id)
-        result = await self.db.execute(project_query)
-        stats["total_projects"] = result.scalar_one() or 0
-        
-        # Count bugs
-        bug_query = select(func.count(Bug.id)).where(Bug.deleted == False)
+            filters.append(Project.organization_id == organization_id)
         if project_id:
-            bug_query = bug_query.where(Bug.project_id == project_id)
-        result = await self.db.execute(bug_query)
-        stats["total_bugs"] = result.scalar_one() or 0
-        
-        # Count API definitions
-        api_def_query = select(func.count(ApiDefinition.id)).where(ApiDefinition.deleted == False)
-        if project_id:
-            api_def_query = api_def_query.where(ApiDefinition.project_id == project_id)
-        result = await self.db.execute(api_def_query)
-        stats["total_api_definitions"] = result.scalar_one() or 0
-        
-        # Count API test cases
-        api_case_query = select(func.count(ApiTestCase.id)).where(ApiTestCase.deleted == False)
-        if project_id:
-            api_case_query = api_case_query.where(ApiTestCase.project_id == project_id)
-        result = await self.db.execute(api_case_query)
-        stats["total_api_test_cases"] = result.scalar_one() or 0
+            filters.append(Project.id == project_id)
+        return filters
+    
+    async def _get_materialized_statistics(
+        self,
+        project_id: Optional[str],
+        organization_id: Optional[str]
+    ) -> Optional[Dict]:
+        """Read statistics from the counters (None if they are missing)"""
+        total_projects = (
+            select(func.count(Project.id))
+            .where(*self._project_filters(project_id, organization_id))
+            .scalar_subquery()
+        )
         
-        # Count API scenarios
-        api_scenario_query = select(func.count(ApiScenario.id)).where(ApiScenario.deleted == False)
         if project_id:
-            api_scenario_query = api_scenario_query.where(ApiScenario.project_id == project_id)
-        result = await self.db.execute(api_scenario_query)
-        stats["total_api_scenarios"] = result.scalar_one() or 0
+            # Primary key lookup of one counter row
+            query = select(
+                total_projects.label("total_projects"),
+                *(getattr(ProjectStatistics, field).label(key) for field, key in STATISTICS_KEYS.items()),
+            ).where(ProjectStatistics.project_id == project_id)
+        else:
+            query = select(
+                total_projects.label("total_projects"),
+                func.count(ProjectStatistics.project_id).label("counted_projects"),
+                *(func.sum(getattr(ProjectStatistics, field)).label(key) for field, key in STATISTICS_KEYS.items()),
+            )
         
-        # Count functional cases
-        from app.models.functional_case import FunctionalCase
-        func_case_query = select(func.count(FunctionalCase.id)).where(
-            FunctionalCase.deleted == False,
-            FunctionalCase.latest == True
-        )
-        if project_id:
-            func_case_query = func_case_query.where(FunctionalCase.project_id == project_id)
-        result = await self.db.execute(func_case_query)
-        stats["total_functional_cases"] = result.scalar_one() or 0
+        row = (await self.db.execute(query)).one_or_none()
+        if row is None or (not project_id and not row.counted_projects):
+            return None
         
-        # Count test plans
-        from app.models.test_plan import TestPlan
-        test_plan_query = select(func.count(TestPlan.id)).where(TestPlan.deleted == False)
-        if project_id:
-            test_plan_query = test_plan_query.where(TestPlan.project_id == project_id)
-        result = await self.db.execute(test_plan_query)
-        stats["total_test_plans"] = result.scalar_one() or 0
+        stats = {"total_projects": row.total_projects or 0}
+        for key in STATISTICS_KEYS.values():
+            stats[key] = int(row._mapping[key] or 0)
+        return stats
+    
+    async def _count_statistics(
+        self,
+        project_id: Optional[str],
+        organization_id: Optional[str]
+    ) -> Dict:
+        """Count statistics from the source tables in one UNION ALL query"""
+        branches = [
+            select(literal("total_projects").label("name"), func.count(Project.id).label("total"))
+            .where(*self._project_filters(project_id, organization_id))
+        ]
+        for field, key in STATISTICS_KEYS.items():
+            model, _ = COUNTED_RESOURCES[field]
+            branch = select(literal(key).label("name"), func.count(model.id).label("total")).where(*counted_filters(field))
+            if project_id:
+                branch = branch.where(model.project_id == project_id)
+            branches.append(branch)
         
+        result = await self.db.execute(union_all(*branches))
+        stats: Dict[str, Any] = {"total_projects": 0, **{key: 0 for key in STATISTICS_KEYS.values()}}
+        for name, total in result:
+            stats[name] = total or 0
         return stats
     
     async def get_project_statistics(self, project_id: str) -> Dict:
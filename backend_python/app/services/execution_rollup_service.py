@@ -0,0 +1,490 @@
+"""
+Execution Rollup Service
+
+Pre-aggregates execution results (API reports, test plan reports) into
+minute, hour and day buckets per project and per case/plan, so trend charts
+read a few hundred bucket rows instead of scanning reports.
+
+Every bucket column is additive (counts, duration sum, fixed-bound latency
+histogram) or a max, so buckets merge with plain SUM/MAX: coarser views,
+multi-source totals and incremental upserts all use the same arithmetic.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, or_, and_
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+from bisect import bisect_left
+import time
+
+from app.models.execution_rollup import ExecutionRollup, ExecutionRollupState
+from app.utils.batch_operations import chunked, get_chunk_size
+from app.core.logging import logger
+
+
+# Bucket widths in ms, finest first
+RESOLUTIONS = {
+    "minute": 60 * 1000,
+    "hour": 60 * 60 * 1000,
+    "day": 24 * 60 * 60 * 1000,
+}
+
+# How long each resolution is kept (None: forever)
+RETENTION_MS = {
+    "minute": 7 * 24 * 60 * 60 * 1000,
+    "hour": 180 * 24 * 60 * 60 * 1000,
+    "day": None,
+}
+
+# Upper bounds of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+LATENCY_COLUMNS = tuple(f"latency_b{i:02d}" for i in range(len(LATENCY_BOUNDS_MS) + 1))
+
+SUM_COLUMNS = ("total", "passed", "failed", "duration_sum", *LATENCY_COLUMNS)
+MAX_COLUMNS = ("duration_max",)
+
+SOURCE_API_REPORT = "api_report"
+SOURCE_TEST_PLAN_REPORT = "test_plan_report"
+SOURCES = (SOURCE_API_REPORT, SOURCE_TEST_PLAN_REPORT)
+
+# subject_id of project-level buckets
+PROJECT_SUBJECT = ""
+
+PASSED_STATUSES = ("SUCCESS",)
+FAILED_STATUSES = ("ERROR", "FAKE_ERROR")
+
+DEFAULT_MAX_POINTS = 500
+
+# Reports ending in the last minute are left for the next run, so rows
+# committed slightly out of end_time order are not skipped by the watermark
+CONSUME_LAG_MS = 60 * 1000
+CONSUME_BATCH_SIZE = 5000
+
+
+class ExecutionSample(NamedTuple):
+    """One finished execution"""
+    project_id: str
+    source: str
+    subject_id: str
+    timestamp: int
+    status: str
+    duration: int
+
+
+def bucket_start(timestamp: int, resolution: str) -> int:
+    """Start of the bucket containing a timestamp"""
+    return timestamp - timestamp % RESOLUTIONS[resolution]
+
+
+def latency_column(duration: int) -> str:
+    """Histogram column counting a duration"""
+    return LATENCY_COLUMNS[bisect_left(LATENCY_BOUNDS_MS, max(duration, 0))]
+
+
+def aggregate(samples: Iterable[ExecutionSample]) -> Dict[Tuple, Dict[str, int]]:
+    """
+    Aggregate samples into bucket rows
+
+    Each sample lands in one bucket per resolution, both for its subject and
+    for the project-level subject.
+
+    Returns:
+        Dictionary mapping (resolution, project_id, subject_id, source,
+        bucket_start) to column values
+    """
+    rows: Dict[Tuple, Dict[str, int]] = {}
+    for sample in samples:
+        duration = max(sample.duration or 0, 0)
+        passed = int(sample.status in PASSED_STATUSES)
+        failed = int(sample.status in FAILED_STATUSES)
+        histogram = latency_column(duration)
+        subjects = {PROJECT_SUBJECT, sample.subject_id or PROJECT_SUBJECT}
+        for resolution in RESOLUTIONS:
+            start = bucket_start(sample.timestamp, resolution)
+            for subject_id in subjects:
+                key = (resolution, sample.project_id, subject_id, sample.source, start)
+                row = rows.get(key)
+                if row is None:
+                    row = rows[key] = dict.fromkeys((*SUM_COLUMNS, *MAX_COLUMNS), 0)
+                row["total"] += 1
+                row["passed"] += passed
+                row["failed"] += failed
+                row["duration_sum"] += duration
+                row["duration_max"] = max(row["duration_max"], duration)
+                row[histogram] += 1
+    return rows
+
+
+def estimate_percentile(row: Mapping[str, Any], percentile: float) -> Optional[int]:
+    """
+    Estimate a latency percentile from a bucket's histogram
+
+    Returns the upper bound of the histogram bucket holding the percentile
+    (the observed max for the unbounded bucket), or None without data.
+    """
+    total = sum(int(row[column] or 0) for column in LATENCY_COLUMNS)
+    if not total:
+        return None
+    rank = percentile / 100 * total
+    seen = 0
+    for index, column in enumerate(LATENCY_COLUMNS):
+        seen += int(row[column] or 0)
+        if seen >= rank:
+            if index < len(LATENCY_BOUNDS_MS):
+                return min(LATENCY_BOUNDS_MS[index], int(row["duration_max"] or 0))
+            return int(row["duration_max"] or 0)
+    return int(row["duration_max"] or 0)
+
+
+def available_resolutions(start: int, now: Optional[int] = None) -> List[str]:
+    """Resolutions still retained at a point in time, finest first"""
+    now = now if now is not None else int(time.time() * 1000)
+    return [
+        resolution for resolution, retention in RETENTION_MS.items()
+        if retention is None or start >= now - retention
+    ]
+
+
+def choose_resolution(start: int, end: int, max_points: int = DEFAULT_MAX_POINTS, now: Optional[int] = None) -> str:
+    """
+    Finest retained resolution that serves a range in at most max_points buckets
+
+    A year at the default max_points is served from day buckets, a week from
+    hour buckets, a few hours from minute buckets.
+    """
+    candidates = available_resolutions(start, now)
+    for resolution in candidates:
+        width = RESOLUTIONS[resolution]
+        if (end - bucket_start(start, resolution) + width - 1) // width <= max_points:
+            return resolution
+    return candidates[-1]
+
+
+def plan_segments(start: int, end: int, now: Optional[int] = None) -> List[Tuple[str, int, int]]:
+    """
+    Cover [start, end) with the fewest buckets
+
+    Whole days come from day buckets, the partial days at the edges from hour
+    buckets, and the partial hours from the finest retained resolution (rounded
+    outward to its bucket boundaries).
+
+    Returns:
+        List of (resolution, bucket_start from, bucket_start to) ranges
+    """
+    levels = list(reversed(available_resolutions(start, now)))
+    segments: List[Tuple[str, int, int]] = []
+
+    def cover(low: int, high: int, depth: int):
+        resolution = levels[depth]
+        width = RESOLUTIONS[resolution]
+        if depth == len(levels) - 1:
+            segments.append((resolution, low - low % width, high))
+            return
+        first = -(-low // width) * width
+        last = high - high % width
+        if first >= last:
+            cover(low, high, depth + 1)
+            return
+        segments.append((resolution, first, last))
+        if low < first:
+            cover(low, first, depth + 1)
+        if last < high:
+            cover(last, high, depth + 1)
+
+    if start < end:
+        cover(start, end, 0)
+    return segments
+
+
+class ExecutionRollupService:
+    """Execution rollup service"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, samples: Iterable[ExecutionSample]) -> int:
+        """
+        Add samples to their buckets (does not commit)
+
+        Returns:
+            Number of bucket rows written
+        """
+        rows = [
+            dict(zip(("resolution", "project_id", "subject_id", "source", "bucket_start"), key), **values)
+            for key, values in aggregate(samples).items()
+        ]
+        if rows:
+            await self._upsert_additive(rows)
+        return len(rows)
+
+    async def _upsert_additive(self, rows: List[Dict[str, Any]]):
+        """Insert bucket rows, adding to existing buckets"""
+        table = ExecutionRollup.__table__
+        dialect = self.db.bind.dialect.name
+
+        for chunk in chunked(rows, get_chunk_size(self.db, len(table.columns))):
+            if dialect == "mysql":
+                from sqlalchemy.dialects.mysql import insert
+                statement = insert(table).values(list(chunk))
+                incoming = statement.inserted
+                greatest = func.greatest
+            else:
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                    greatest = func.greatest
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                    # SQLite's multi-argument max() is a scalar function
+                    greatest = func.max
+                statement = insert(table).values(list(chunk))
+                incoming = statement.excluded
+
+            merged = {column: table.c[column] + incoming[column] for column in SUM_COLUMNS}
+            merged.update({column: greatest(table.c[column], incoming[column]) for column in MAX_COLUMNS})
+
+            if dialect == "mysql":
+                statement = statement.on_duplicate_key_update(merged)
+            else:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[column for column in table.primary_key.columns],
+                    set_=merged,
+                )
+            await self.db.execute(statement)
+
+    async def consume(self, source: str, until: Optional[int] = None, batch_size: int = CONSUME_BATCH_SIZE) -> int:
+        """
+        Roll up reports of a source finished since its watermark
+
+        Each batch is recorded and the watermark advanced in one transaction
+        holding the watermark row lock, so a report is counted exactly once
+        even if a run is interrupted or two runs overlap.
+
+        Args:
+            source: One of SOURCES
+            until: Latest end_time to consume (default: now minus CONSUME_LAG_MS)
+            batch_size: Reports per batch/transaction
+
+        Returns:
+            Number of reports consumed
+        """
+        until = until if until is not None else int(time.time() * 1000) - CONSUME_LAG_MS
+        query, to_sample = self._source_query(source)
+        model = query.get_final_froms()[0]
+
+        consumed = 0
+        while True:
+            state = await self._lock_state(source)
+            batch_query = query.where(
+                model.c.end_time <= until,
+                or_(
+                    model.c.end_time > state.watermark_time,
+                    and_(model.c.end_time == state.watermark_time, model.c.id > state.watermark_id),
+                ),
+            ).order_by(model.c.end_time, model.c.id).limit(batch_size)
+            reports = (await self.db.execute(batch_query)).all()
+            if not reports:
+                await self.db.commit()
+                break
+
+            await self.record(to_sample(report) for report in reports)
+            state.watermark_time = reports[-1].end_time
+            state.watermark_id = reports[-1].id
+            state.update_time = int(time.time() * 1000)
+            await self.db.commit()
+            consumed += len(reports)
+            if len(reports) < batch_size:
+                break
+
+        if consumed:
+            logger.info(f"Rolled up {consumed} {source} executions")
+        return consumed
+
+    async def _lock_state(self, source: str) -> ExecutionRollupState:
+        """Load a source's watermark, locking it until the batch commits"""
+        state = await self.db.get(
+            ExecutionRollupState, source, with_for_update=True, populate_existing=True
+        )
+        if state is None:
+            state = ExecutionRollupState(source=source, watermark_time=0, watermark_id="")
+            self.db.add(state)
+            await self.db.flush()
+        return state
+
+    async def consume_all(self, until: Optional[int] = None) -> Dict[str, int]:
+        """Roll up all sources"""
+        return {source: await self.consume(source, until) for source in SOURCES}
+
+    def _source_query(self, source: str):
+        """Query of a source's finished reports and its row-to-sample mapping"""
+        if source == SOURCE_API_REPORT:
+            from app.models.api_report import ApiReport
+            query = select(
+                ApiReport.id, ApiReport.project_id, ApiReport.test_plan_case_id.label("subject_id"),
+                ApiReport.end_time, ApiReport.status, ApiReport.request_duration.label("duration"),
+            ).where(ApiReport.deleted == False, ApiReport.end_time.isnot(None))
+        elif source == SOURCE_TEST_PLAN_REPORT:
+            from app.models.test_plan import TestPlanReport
+            query = select(
+                TestPlanReport.id, TestPlanReport.project_id, TestPlanReport.test_plan_id.label("subject_id"),
+                TestPlanReport.end_time, TestPlanReport.result_status.label("status"),
+                (TestPlanReport.end_time - func.coalesce(TestPlanReport.start_time, TestPlanReport.end_time)).label("duration"),
+            ).where(TestPlanReport.deleted == False, TestPlanReport.end_time.isnot(None))
+        else:
+            raise ValueError(f"Unknown rollup source: {source}")
+
+        def to_sample(row) -> ExecutionSample:
+            return ExecutionSample(
+                project_id=row.project_id,
+                source=source,
+                subject_id=row.subject_id or PROJECT_SUBJECT,
+                timestamp=row.end_time,
+                status=row.status,
+                duration=int(row.duration or 0),
+            )
+
+        return query, to_sample
+
+    async def prune(self, now: Optional[int] = None) -> int:
+        """
+        Delete buckets past their resolution's retention (does not commit)
+
+        Returns:
+            Number of deleted rows
+        """
+        now = now if now is not None else int(time.time() * 1000)
+        deleted = 0
+        for resolution, retention in RETENTION_MS.items():
+            if retention is None:
+                continue
+            result = await self.db.execute(
+                delete(ExecutionRollup).where(
+                    ExecutionRollup.resolution == resolution,
+                    ExecutionRollup.bucket_start < now - retention,
+                )
+            )
+            deleted += result.rowcount
+        return deleted
+
+    def _filters(
+        self,
+        project_id: Optional[str],
+        subject_id: Optional[str],
+        source: Optional[str],
+    ) -> List[Any]:
+        """Filters selecting the buckets of a project/subject/source"""
+        if source and source not in SOURCES:
+            raise ValueError(f"Unknown source: {source}")
+        filters = [ExecutionRollup.subject_id == (subject_id or PROJECT_SUBJECT)]
+        if project_id:
+            filters.append(ExecutionRollup.project_id == project_id)
+        if source:
+            filters.append(ExecutionRollup.source == source)
+        return filters
+
+    def _merged_columns(self) -> List[Any]:
+        """Aggregates merging bucket rows"""
+        return [
+            *(func.sum(getattr(ExecutionRollup, column)).label(column) for column in SUM_COLUMNS),
+            *(func.max(getattr(ExecutionRollup, column)).label(column) for column in MAX_COLUMNS),
+        ]
+
+    async def get_trend(
+        self,
+        project_id: str,
+        start: int,
+        end: int,
+        subject_id: Optional[str] = None,
+        source: Optional[str] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+    ) -> Dict[str, Any]:
+        """
+        Get execution trend points over a time range
+
+        Args:
+            project_id: Project ID
+            start: Range start (ms, inclusive)
+            end: Range end (ms, exclusive)
+            subject_id: Case/plan ID (project-level if None)
+            source: One of SOURCES (all sources if None)
+            max_points: Maximum number of buckets
+
+        Returns:
+            Dictionary with resolution and points (one per non-empty bucket)
+        """
+        if start >= end:
+            raise ValueError("start must be before end")
+        resolution = choose_resolution(start, end, max_points)
+
+        query = (
+            select(ExecutionRollup.bucket_start, *self._merged_columns())
+            .where(
+                ExecutionRollup.resolution == resolution,
+                *self._filters(project_id, subject_id, source),
+                ExecutionRollup.bucket_start >= bucket_start(start, resolution),
+                ExecutionRollup.bucket_start < end,
+            )
+            .group_by(ExecutionRollup.bucket_start)
+            .order_by(ExecutionRollup.bucket_start)
+        )
+        result = await self.db.execute(query)
+        points = [
+            {"time": row.bucket_start, **self._summarize(row._mapping)}
+            for row in result
+        ]
+        return {"resolution": resolution, "points": points}
+
+    async def get_summary(
+        self,
+        project_id: Optional[str],
+        start: int,
+        end: int,
+        subject_id: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get execution totals over a time range in one query
+
+        The range is covered by day buckets in the middle and finer buckets at
+        the edges (see plan_segments).
+
+        Args:
+            project_id: Project ID (all projects if None)
+            start: Range start (ms, inclusive)
+            end: Range end (ms, exclusive)
+            subject_id: Case/plan ID (project-level if None)
+            source: One of SOURCES (all sources if None)
+
+        Returns:
+            Summary dictionary
+        """
+        if start >= end:
+            raise ValueError("start must be before end")
+        segments = plan_segments(start, end)
+        query = select(*self._merged_columns()).where(
+            *self._filters(project_id, subject_id, source),
+            or_(*(
+                and_(
+                    ExecutionRollup.resolution == resolution,
+                    ExecutionRollup.bucket_start >= low,
+                    ExecutionRollup.bucket_start < high,
+                )
+                for resolution, low, high in segments
+            )),
+        )
+        row = (await self.db.execute(query)).one()
+        return {"start": start, "end": end, **self._summarize(row._mapping)}
+
+    def _summarize(self, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """Turn merged bucket columns into chart values"""
+        total = int(row["total"] or 0)
+        passed = int(row["passed"] or 0)
+        return {
+            "total": total,
+            "passed": passed,
+            "failed": int(row["failed"] or 0),
+            "pass_rate": round(passed / total * 100, 2) if total else None,
+            "avg_duration": round(int(row["duration_sum"] or 0) / total, 2) if total else None,
+            "max_duration": int(row["duration_max"] or 0) if total else None,
+            "p50_duration": estimate_percentile(row, 50),
+            "p95_duration": estimate_percentile(row, 95),
+            "p99_duration": estimate_percentile(row, 99),
+            "latency_histogram": [int(row[column] or 0) for column in LATENCY_COLUMNS],
+        }
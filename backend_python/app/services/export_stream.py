@@ -0,0 +1,111 @@
+"""
+Export Stream - Encode query results as a streamed JSON document or NDJSON
+
+Rows are fetched in batches, either by ID with one IN (...) query per chunk
+(in request order) or from one server-side cursor. Each batch is encoded and
+yielded before the next one is fetched. Stored JSON bodies are checked and
+spliced in as raw fragments instead of being decoded and re-encoded.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.batch_operations import chunked, get_chunk_size
+
+EXPORT_BATCH_SIZE = 1000  # IDs per IN (...) query / rows per server-side cursor round trip
+NDJSON = "ndjson"
+
+# Encodes one row; the flag asks for a single line (NDJSON)
+RowEncoder = Callable[[Any, bool], str]
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def json_fragment(text: Optional[str], single_line: bool = False) -> str:
+    """
+    A stored JSON body as a raw JSON fragment
+
+    Bodies that are a valid JSON object or array are passed through as they
+    are (with line breaks turned into spaces for a single line, which is
+    safe because valid JSON has no raw line breaks inside strings). Anything
+    else, such as a template like {{token}}, is emitted as a JSON string.
+    """
+    if text is None:
+        return "null"
+    stripped = text.strip()
+    if stripped[:1] in ("{", "[") and stripped[-1:] in ("}", "]"):
+        try:
+            json.loads(stripped, parse_constant=_reject_constant)
+        except ValueError:
+            pass
+        else:
+            if single_line and ("\n" in stripped or "\r" in stripped):
+                stripped = stripped.replace("\r", " ").replace("\n", " ")
+            return stripped
+    return json.dumps(text, ensure_ascii=False)
+
+
+def encode_object(fields: Dict[str, Any], raw_fields: Dict[str, Optional[str]], single_line: bool = False) -> str:
+    """Encode fields as a JSON object, appending raw_fields as JSON fragments"""
+    encoded = json.dumps(fields, ensure_ascii=False)
+    if not raw_fields:
+        return encoded
+    fragments = ",".join(
+        f"{json.dumps(name)}:{json_fragment(text, single_line)}" for name, text in raw_fields.items()
+    )
+    return f"{encoded[:-1]},{fragments}}}" if fields else f"{{{fragments}}}"
+
+
+async def iter_rows(
+    db: AsyncSession,
+    query: Any,
+    id_column: Any,
+    ids: Optional[List[str]],
+    order_by: Sequence[Any] = (),
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Batches of rows of a select
+
+    Args:
+        db: Database session
+        query: Select of the exported columns (including id_column)
+        id_column: Primary key column
+        ids: Rows to fetch, in this order (duplicates and unknown IDs are
+            skipped); None streams every row of the query
+        order_by: Order of a full export
+    """
+    if not ids:
+        result = await db.stream(query.order_by(*order_by).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield rows
+        return
+
+    for chunk in chunked(list(dict.fromkeys(ids)), min(EXPORT_BATCH_SIZE, get_chunk_size(db))):
+        result = await db.execute(query.where(id_column.in_(chunk)))
+        rows = {row.id: row for row in result.all()}
+        yield [rows[row_id] for row_id in chunk if row_id in rows]
+
+
+async def encode_export(
+    batches: AsyncIterator[Sequence[Any]],
+    encode: RowEncoder,
+    key: str,
+    export_type: str,
+) -> AsyncIterator[bytes]:
+    """Encode row batches as one JSON document ({"export_type", key: [...]}) or as NDJSON"""
+    if export_type == NDJSON:
+        async for rows in batches:
+            if rows:
+                yield "".join(f"{encode(row, True)}\n" for row in rows).encode()
+        return
+
+    yield f'{{"export_type":{json.dumps(export_type)},{json.dumps(key)}:['.encode()
+    separator = ""
+    async for rows in batches:
+        if rows:
+            yield (separator + ",".join(encode(row, False) for row in rows)).encode()
+            separator = ","
+    yield b"]}"
@@ -1,15 +1,50 @@
 """
 File Service for file upload, download, and management
 """
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
+from functools import partial
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import asyncio
 import uuid
 import os
+import re
 from pathlib import Path
+from urllib.parse import quote
 
-from app.core.minio import minio_client
+from app.core.minio import minio_client, UploadTooLargeError
 from app.core.config import settings
 from app.core.logging import logger
+from app.utils.zip_stream import ZipEntry, stream_zip
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size setting such as "600MB" into bytes"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    number, unit = match.groups()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def content_disposition(file_name: str) -> str:
+    """
+    Content-Disposition of an attachment (RFC 6266)
+
+    Header values must be Latin-1, so the name is sent percent-encoded as
+    filename*=UTF-8''... (RFC 5987) with an ASCII filename fallback for old
+    clients; quotes, backslashes and control characters never reach the
+    header.
+    """
+    fallback = "".join(
+        char if " " <= char <= "~" and char not in '"\\' else "_" for char in file_name
+    ) or "download"
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name, safe='')}"
 
 
 class FileService:
@@ -31,6 +66,9 @@ class FileService:
     
     # Max file sizes (in bytes)
     MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE  # 1GB default
+    BATCH_DOWNLOAD_MAX_SIZE = parse_size(settings.BATCH_DOWNLOAD_MAX)  # Total per zip download
+    BATCH_DOWNLOAD_MAX_FILES = 1000
+    PRESIGNED_URL_MAX_EXPIRES = 7 * 24 * 3600  # S3/MinIO reject presigned URLs valid longer than 7 days
     
     def __init__(self):
         self.minio = minio_client
@@ -55,13 +93,17 @@ class FileService:
         
         return False
     
+    def _file_too_large(self) -> HTTPException:
+        """Error for files over MAX_FILE_SIZE"""
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {self.MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+    
     def _validate_file_size(self, file_size: int) -> None:
         """Validate file size"""
         if file_size > self.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {self.MAX_FILE_SIZE / (1024*1024)}MB"
-            )
+            raise self._file_too_large()
     
     def _validate_file_type(self, filename: str, allowed_types: Optional[list] = None) -> None:
         """Validate file type"""
@@ -95,12 +137,9 @@ class FileService:
         # Validate file type
         self._validate_file_type(file.filename, allowed_types)
         
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-        
-        # Validate file size
-        self._validate_file_size(file_size)
+        # Reject early when the multipart parser already knows the size
+        if file.size is not None:
+            self._validate_file_size(file.size)
         
         # Generate file ID and path
         file_id = str(uuid.uuid4())
@@ -117,23 +156,33 @@ class FileService:
         else:
             file_path = f"{folder}/{file_name}"
         
-        # Upload to MinIO
+        # Stream the spooled upload to MinIO in parts on a worker thread
         try:
-            minio_client.upload_file(
-                file_path=file_path,
-                file_data=content,
-                content_type=file.content_type,
+            await file.seek(0)
+            loop = asyncio.get_event_loop()
+            uploaded = await loop.run_in_executor(
+                None,
+                partial(
+                    minio_client.upload_stream,
+                    file_path,
+                    file.file,
+                    content_type=file.content_type,
+                    max_size=self.MAX_FILE_SIZE,
+                ),
             )
             
-            logger.info(f"File uploaded: {file_path}, size: {file_size}")
+            logger.info(f"File uploaded: {file_path}, size: {uploaded['size']}")
             
             return {
                 "file_id": file_id,
                 "file_path": file_path,
                 "file_name": file.filename,
-                "file_size": file_size,
+                "file_size": uploaded["size"],
                 "content_type": file.content_type,
+                "checksum": uploaded["sha256"],
             }
+        except UploadTooLargeError:
+            raise self._file_too_large()
         except Exception as e:
             logger.error(f"Error uploading file: {e}")
             raise HTTPException(
@@ -169,6 +218,252 @@ class FileService:
                 detail=f"File not found: {file_path}"
             )
     
+    async def stat_file(self, file_path: str) -> dict:
+        """
+        Get download metadata of a file without reading it
+        
+        Args:
+            file_path: File path in MinIO
+        
+        Returns:
+            Dict with file_name, content_type, size, etag and last_modified
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            info = await loop.run_in_executor(None, minio_client.stat_file, file_path)
+        except Exception as e:
+            logger.error(f"Error getting file stat: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"File not found: {file_path}"
+            )
+        
+        file_name = os.path.basename(file_path)
+        content_type = self._get_content_type(self._get_file_extension(file_name))
+        if content_type == 'application/octet-stream' and info.get("content_type"):
+            content_type = info["content_type"]
+        return {**info, "file_name": file_name, "content_type": content_type}
+    
+    def use_presigned_redirect(self, info: dict, redirect: Optional[bool] = None) -> bool:
+        """Whether a download should be redirected to a presigned URL
+        
+        An explicit ``redirect`` wins; otherwise files of at least
+        FILE_DOWNLOAD_REDIRECT_SIZE bytes are redirected (when configured).
+        """
+        if redirect is not None:
+            return redirect
+        threshold = settings.FILE_DOWNLOAD_REDIRECT_SIZE
+        return bool(threshold) and info["size"] >= threshold
+    
+    def plan_download(
+        self,
+        info: dict,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None,
+        if_range: Optional[str] = None,
+    ) -> dict:
+        """
+        Resolve the conditional and Range headers of a download
+        
+        Args:
+            info: File metadata from stat_file
+            range_header: Range request header (single byte range)
+            if_none_match: If-None-Match request header
+            if_modified_since: If-Modified-Since request header
+            if_range: If-Range request header
+        
+        Returns:
+            Dict with status_code (200, 206 or 304), response headers, and
+            the offset and length of the bytes to send
+        """
+        etag = f'"{info["etag"]}"'
+        headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+        last_modified = info.get("last_modified")
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+        
+        if self._is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+            return {"status_code": status.HTTP_304_NOT_MODIFIED, "headers": headers, "offset": 0, "length": 0}
+        
+        size = info["size"]
+        byte_range = None
+        # A stale If-Range validator means the client gets the whole new file
+        if range_header and (not if_range or if_range.strip() in (etag, headers.get("Last-Modified"))):
+            byte_range = self._parse_range(range_header, size)
+        
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return {"status_code": status.HTTP_200_OK, "headers": headers, "offset": 0, "length": size}
+        
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return {
+            "status_code": status.HTTP_206_PARTIAL_CONTENT,
+            "headers": headers,
+            "offset": start,
+            "length": end - start + 1,
+        }
+    
+    def _is_not_modified(
+        self,
+        etag: str,
+        last_modified: Optional[datetime],
+        if_none_match: Optional[str],
+        if_modified_since: Optional[str],
+    ) -> bool:
+        """Evaluate If-None-Match, or If-Modified-Since when there is no If-None-Match"""
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # HTTP dates have second precision
+            return last_modified.replace(microsecond=0) <= since
+        return False
+    
+    def _parse_range(self, range_header: str, size: int) -> Optional[Tuple[int, int]]:
+        """
+        Parse a single byte range into inclusive (start, end)
+        
+        Returns None for headers that should be ignored (other units,
+        multiple ranges, malformed values) so the whole file is sent.
+        Raises 416 when the range lies outside the file.
+        """
+        unit, _, spec = range_header.partition("=")
+        if unit.strip().lower() != "bytes" or "," in spec:
+            return None
+        start_text, _, end_text = spec.strip().partition("-")
+        try:
+            if not start_text:
+                # Suffix range: the last N bytes
+                suffix = int(end_text)
+                if suffix <= 0 or size == 0:
+                    raise self._range_not_satisfiable(size)
+                return (max(size - suffix, 0), size - 1)
+            start = int(start_text)
+            end = int(end_text) if end_text else None
+        except ValueError:
+            return None
+        if end is not None and end < start:
+            return None
+        if start >= size:
+            raise self._range_not_satisfiable(size)
+        return (start, size - 1 if end is None else min(end, size - 1))
+    
+    def _range_not_satisfiable(self, size: int) -> HTTPException:
+        """Error for ranges outside the file"""
+        return HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    
+    def stream_file(self, file_path: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Iterate over a file's bytes in chunks straight from MinIO
+        
+        Blocking iterator; StreamingResponse runs it in the threadpool.
+        """
+        return minio_client.iter_file(file_path, offset=offset, length=length)
+    
+    async def prepare_batch_download(
+        self,
+        file_paths: Optional[List[str]] = None,
+        folder: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Resolve the files of a zip download
+        
+        Files are stat'ed (or listed, for a folder) concurrently; the total
+        size must stay within BATCH_DOWNLOAD_MAX.
+        
+        Args:
+            file_paths: Files to include, named by base name in the archive
+            folder: Folder whose files are included, named relative to it
+        
+        Returns:
+            List of dicts with name, file_path, size and last_modified
+        """
+        if not file_paths and not folder:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No files to download"
+            )
+        
+        entries = []
+        if folder:
+            prefix = folder.rstrip("/") + "/"
+            async for page in minio_client.iter_objects(prefix):
+                entries.extend(
+                    {"name": obj["name"][len(prefix):], "file_path": obj["name"],
+                     "size": obj["size"], "last_modified": obj["last_modified"]}
+                    for obj in page
+                )
+                if len(entries) > self.BATCH_DOWNLOAD_MAX_FILES:
+                    break
+        
+        if file_paths:
+            unique_paths = list(dict.fromkeys(file_paths))
+            stats = await minio_client.stat_many(unique_paths)
+            missing = [path for path, stat in stats.items() if stat is None]
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Files not found: {', '.join(missing[:10])}"
+                )
+            entries.extend(
+                {"name": os.path.basename(path), "file_path": path,
+                 "size": stat["size"], "last_modified": stat["last_modified"]}
+                for path, stat in stats.items()
+            )
+        
+        if len(entries) > self.BATCH_DOWNLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many files, at most {self.BATCH_DOWNLOAD_MAX_FILES} per download"
+            )
+        total_size = sum(entry["size"] for entry in entries)
+        if total_size > self.BATCH_DOWNLOAD_MAX_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Total size {total_size} exceeds batch download limit {settings.BATCH_DOWNLOAD_MAX}"
+            )
+        
+        self._deduplicate_names(entries)
+        return entries
+    
+    def _deduplicate_names(self, entries: List[dict]) -> None:
+        """Rename entries whose archive names collide: a.txt, a (1).txt, ..."""
+        used = set()
+        for entry in entries:
+            name = entry["name"]
+            stem, dot, ext = name.rpartition(".") if "." in name else (name, "", "")
+            counter = 1
+            while name in used:
+                name = f"{stem} ({counter}){dot}{ext}"
+                counter += 1
+            used.add(name)
+            entry["name"] = name
+    
+    def stream_zip(self, entries: List[dict]) -> Iterator[bytes]:
+        """
+        Zip files from MinIO on the fly
+        
+        Blocking iterator reading one object at a time; StreamingResponse
+        runs it in the threadpool.
+        """
+        return stream_zip(
+            ZipEntry(entry["name"], minio_client.iter_file(entry["file_path"]), entry["size"], entry["last_modified"])
+            for entry in entries
+        )
+    
     async def delete_file(self, file_path: str) -> None:
         """Delete file from MinIO"""
         try:
@@ -224,13 +519,25 @@ class FileService:
         }
         return content_types.get(extension.lower(), 'application/octet-stream')
     
-    async def get_presigned_url(self, file_path: str, expires_seconds: int = 3600) -> str:
-        """Get presigned URL for file access"""
+    async def get_presigned_url(
+        self,
+        file_path: str,
+        expires_seconds: int = 3600,
+        file_name: Optional[str] = None,
+    ) -> str:
+        """Get presigned URL for file access
+        
+        With ``file_name`` the URL serves the file as an attachment of that name.
+        """
         try:
             from datetime import timedelta
+            response_headers = None
+            if file_name:
+                response_headers = {"response-content-disposition": content_disposition(file_name)}
             url = minio_client.get_presigned_url(
                 file_path,
-                expires=timedelta(seconds=expires_seconds)
+                expires=timedelta(seconds=expires_seconds),
+                response_headers=response_headers,
             )
             return url
         except Exception as e:
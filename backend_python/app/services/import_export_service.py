@@ -1,15 +1,16 @@
 """
 Import/Export Service for Excel, XMind, Postman, Swagger, etc.
 """
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional
 from fastapi import UploadFile, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
-import zipfile
 import io
 from pathlib import Path
 
 from app.core.logging import logger
 from app.services.file_service import FileService
+from app.services.openapi_parser import load_spec
 
 
 class ImportExportService:
@@ -24,6 +25,10 @@ class ImportExportService:
         file: UploadFile,
         project_id: str,
         import_type: str = "functional_case",  # functional_case, api_test, etc.
+        db: Optional[AsyncSession] = None,
+        version_id: Optional[str] = None,
+        template_id: Optional[str] = None,
+        create_user: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Import data from Excel file
@@ -32,6 +37,10 @@ class ImportExportService:
             file: Excel file
             project_id: Project ID
             import_type: Type of import (functional_case, api_test, etc.)
+            db: Database session (required for functional_case)
+            version_id: Version of imported functional cases
+            template_id: Template of functional case rows without 模板ID
+            create_user: Creator of imported rows
         
         Returns:
             Dict with success_count, fail_count, error_messages
@@ -44,14 +53,13 @@ class ImportExportService:
                     detail="File must be Excel format (.xlsx or .xls)"
                 )
             
-            # Read file content
-            content = await file.read()
-            
             # Parse Excel based on import type
             if import_type == "functional_case":
-                return await self._import_functional_case_excel(content, project_id)
+                return await self._import_functional_case_excel(
+                    file.file, file.filename, project_id, db, version_id, template_id, create_user
+                )
             elif import_type == "api_test":
-                return await self._import_api_test_excel(content, project_id)
+                return await self._import_api_test_excel(await file.read(), project_id)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,21 +95,23 @@ class ImportExportService:
         """
         try:
             from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, Alignment
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Data"
+            # Write-only: rows are serialized as they are appended
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Data")
             
             if export_type == "functional_case":
                 # Add headers for functional case
                 headers = ["ID", "名称", "模块", "状态", "优先级", "创建时间"]
-                ws.append(headers)
-                
-                # Style headers
-                for cell in ws[1]:
+                header_cells = []
+                for header in headers:
+                    cell = WriteOnlyCell(ws, header)
                     cell.font = Font(bold=True)
                     cell.alignment = Alignment(horizontal='center')
+                    header_cells.append(cell)
+                ws.append(header_cells)
                 
                 # Add data rows
                 for item in data:
@@ -138,13 +148,23 @@ class ImportExportService:
         self,
         file: UploadFile,
         project_id: str,
+        db: Optional[AsyncSession] = None,
+        module_id: Optional[str] = None,
+        version_id: Optional[str] = None,
+        template_id: Optional[str] = None,
+        create_user: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Import data from XMind file
+        Import functional cases from an XMind file
         
         Args:
             file: XMind file
             project_id: Project ID
+            db: Database session
+            module_id: Parent module of the map's modules
+            version_id: Version of imported cases
+            template_id: Template of imported cases
+            create_user: Creator of imported rows
         
         Returns:
             Dict with success_count, fail_count, error_messages
@@ -157,11 +177,10 @@ class ImportExportService:
                     detail="File must be XMind format (.xmind)"
                 )
             
-            # Read file content
-            content = await file.read()
-            
             # Parse XMind file
-            return await self._parse_xmind(content, project_id)
+            return await self._parse_xmind(
+                file.file, file.filename, project_id, db, module_id, version_id, template_id, create_user
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -171,52 +190,37 @@ class ImportExportService:
                 detail=f"Failed to import XMind: {str(e)}"
             )
     
-    async def _parse_xmind(self, content: bytes, project_id: str) -> Dict[str, Any]:
-        """Parse XMind file content"""
-        try:
-            # XMind files are ZIP archives
-            with zipfile.ZipFile(io.BytesIO(content), 'r') as zip_file:
-                # Look for content.json (XMind Zen) or content.xml (XMind Classic)
-                if 'content.json' in zip_file.namelist():
-                    # XMind Zen format
-                    content_json = json.loads(zip_file.read('content.json'))
-                    return await self._parse_xmind_zen(content_json, project_id)
-                elif 'content.xml' in zip_file.namelist():
-                    # XMind Classic format
-                    content_xml = zip_file.read('content.xml').decode('utf-8')
-                    return await self._parse_xmind_classic(content_xml, project_id)
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invalid XMind file format"
-                    )
-        except zipfile.BadZipFile:
+    async def _parse_xmind(
+        self,
+        content: BinaryIO,
+        file_name: str,
+        project_id: str,
+        db: Optional[AsyncSession],
+        module_id: Optional[str],
+        version_id: Optional[str],
+        template_id: Optional[str],
+        create_user: Optional[str],
+    ) -> Dict[str, Any]:
+        """Import the cases of an XMind Zen (content.json) or Classic (content.xml) file"""
+        from app.services.case_management_service import CaseManagementService
+
+        if db is None or not project_id or not version_id or not template_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid XMind file: not a valid ZIP archive"
+                detail="project_id, version_id and template_id are required for XMind import"
             )
-        except Exception as e:
-            logger.error(f"Error parsing XMind: {e}")
-            raise
-    
-    async def _parse_xmind_zen(self, content_json: dict, project_id: str) -> Dict[str, Any]:
-        """Parse XMind Zen format"""
-        # TODO: Implement XMind Zen parsing
-        # This is a placeholder implementation
-        return {
-            "success_count": 0,
-            "fail_count": 0,
-            "error_messages": ["XMind Zen parsing not yet implemented"],
-        }
-    
-    async def _parse_xmind_classic(self, content_xml: str, project_id: str) -> Dict[str, Any]:
-        """Parse XMind Classic format"""
-        # TODO: Implement XMind Classic parsing using xml parsing
-        # This is a placeholder implementation
+        try:
+            result = await CaseManagementService(db).import_cases_from_xmind(
+                content, file_name, project_id,
+                module_id=module_id, version_id=version_id, template_id=template_id, create_user=create_user,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         return {
-            "success_count": 0,
-            "fail_count": 0,
-            "error_messages": ["XMind Classic parsing not yet implemented"],
+            "success_count": result["imported_count"],
+            "fail_count": result["fail_count"],
+            "error_messages": [f"{error['topic']}: {error['message']}" for error in result["errors"]],
+            "module_count": result["module_count"],
         }
     
     # Postman Import
@@ -224,6 +228,9 @@ class ImportExportService:
         self,
         file: UploadFile,
         project_id: str,
+        db: Optional[AsyncSession] = None,
+        module_id: Optional[str] = None,
+        create_user: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Import Postman collection
@@ -231,9 +238,13 @@ class ImportExportService:
         Args:
             file: Postman collection JSON file
             project_id: Project ID
+            db: Database session
+            module_id: Parent module of the collection's folders
+            create_user: Creator of imported rows
         
         Returns:
-            Dict with imported API definitions
+            Dict with success_count, fail_count, error_messages and the
+            import summary
         """
         try:
             # Validate file type
@@ -255,7 +266,9 @@ class ImportExportService:
                 )
             
             # Convert Postman collection to API definitions
-            return await self._convert_postman_to_api_definitions(collection, project_id)
+            return await self._convert_postman_to_api_definitions(
+                collection, project_id, db, module_id, create_user
+            )
         except json.JSONDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -274,14 +287,29 @@ class ImportExportService:
         self,
         collection: dict,
         project_id: str,
+        db: Optional[AsyncSession],
+        module_id: Optional[str],
+        create_user: Optional[str],
     ) -> Dict[str, Any]:
-        """Convert Postman collection to API definitions"""
-        # TODO: Implement Postman to API definition conversion
-        # This should parse the Postman collection and create ApiDefinition objects
+        """Import Postman requests as API definitions and test cases"""
+        from app.services.api_test_service import ApiTestService
+
+        if db is None or not project_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="project_id is required for Postman import"
+            )
+        try:
+            result = await ApiTestService(db).import_postman_collection(
+                collection, project_id, module_id=module_id, create_user=create_user,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         return {
-            "success_count": 0,
-            "fail_count": 0,
-            "error_messages": ["Postman import not yet fully implemented"],
+            "success_count": result["case_count"],
+            "fail_count": len(result["errors"]),
+            "error_messages": result["errors"],
+            **result,
         }
     
     # Swagger/OpenAPI Import
@@ -289,6 +317,10 @@ class ImportExportService:
         self,
         file: UploadFile,
         project_id: str,
+        db: Optional[AsyncSession] = None,
+        module_id: Optional[str] = None,
+        cover_data: bool = False,
+        create_user: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Import Swagger/OpenAPI specification
@@ -296,37 +328,26 @@ class ImportExportService:
         Args:
             file: Swagger/OpenAPI JSON or YAML file
             project_id: Project ID
+            db: Database session
+            module_id: Module of imported API definitions
+            cover_data: Update changed and delete removed operations
+            create_user: Creator of imported rows
         
         Returns:
-            Dict with imported API definitions
+            Dict with success_count, fail_count, error_messages and the
+            import summary
         """
         try:
             content = await file.read()
-            content_str = content.decode('utf-8')
-            
-            # Try to parse as JSON first
             try:
-                spec = json.loads(content_str)
-            except json.JSONDecodeError:
-                # Try YAML
-                try:
-                    import yaml
-                    spec = yaml.safe_load(content_str)
-                except Exception:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invalid Swagger/OpenAPI format (must be JSON or YAML)"
-                    )
-            
-            # Validate OpenAPI spec
-            if 'openapi' not in spec and 'swagger' not in spec:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid OpenAPI/Swagger specification"
-                )
+                spec = load_spec(content)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
             
             # Convert to API definitions
-            return await self._convert_swagger_to_api_definitions(spec, project_id)
+            return await self._convert_swagger_to_api_definitions(
+                spec, project_id, db, module_id, cover_data, create_user
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -340,14 +361,30 @@ class ImportExportService:
         self,
         spec: dict,
         project_id: str,
+        db: Optional[AsyncSession],
+        module_id: Optional[str],
+        cover_data: bool,
+        create_user: Optional[str],
     ) -> Dict[str, Any]:
-        """Convert Swagger/OpenAPI spec to API definitions"""
-        # TODO: Implement Swagger to API definition conversion
-        # This should parse paths and create ApiDefinition objects
+        """Sync Swagger/OpenAPI operations into API definitions"""
+        from app.services.api_test_service import ApiTestService
+
+        if db is None or not project_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="project_id is required for Swagger/OpenAPI import"
+            )
+        try:
+            result = await ApiTestService(db).import_openapi_spec(
+                spec, project_id, module_id=module_id, cover_data=cover_data, create_user=create_user,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         return {
-            "success_count": 0,
-            "fail_count": 0,
-            "error_messages": ["Swagger import not yet fully implemented"],
+            "success_count": result["imported_count"] + result["updated_count"],
+            "fail_count": len(result["errors"]),
+            "error_messages": result["errors"],
+            **result,
         }
     
     # JMeter Import
@@ -402,16 +439,33 @@ class ImportExportService:
     # Helper methods for specific import types
     async def _import_functional_case_excel(
         self,
-        content: bytes,
+        content: BinaryIO,
+        file_name: str,
         project_id: str,
+        db: Optional[AsyncSession],
+        version_id: Optional[str],
+        template_id: Optional[str],
+        create_user: Optional[str],
     ) -> Dict[str, Any]:
         """Import functional cases from Excel"""
-        # TODO: Implement functional case Excel import using openpyxl
-        # This should parse Excel rows and create FunctionalCase objects
+        from app.services.case_management_service import CaseManagementService
+
+        if db is None or not project_id or not version_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="project_id and version_id are required for functional case import"
+            )
+        try:
+            result = await CaseManagementService(db).import_cases_from_excel(
+                content, file_name, project_id,
+                version_id=version_id, template_id=template_id, create_user=create_user,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         return {
-            "success_count": 0,
-            "fail_count": 0,
-            "error_messages": ["Functional case Excel import not yet fully implemented"],
+            "success_count": result["imported_count"],
+            "fail_count": result["fail_count"],
+            "error_messages": [f"Row {error['row']}: {error['message']}" for error in result["errors"]],
         }
     
     async def _import_api_test_excel(
@@ -0,0 +1,642 @@
+"""
+Import Job Service
+
+Runs imports in the background instead of inside the HTTP request. The
+uploaded file is stored in MinIO and a job id is returned at once; a Celery
+task then parses and inserts the file in chunks, recording a checkpoint,
+counters and row errors in Redis after each committed chunk.
+
+Job state lives in the hash ``import_job:{id}`` (errors in
+``import_job:{id}:errors``). Active jobs are indexed by heartbeat in the
+sorted set ``import_jobs:active``: a job whose worker died stops sending
+heartbeats and is resumed from its checkpoint by the next run that claims
+it (a redelivered task, the periodic sweep or the resume endpoint).
+"""
+from typing import Any, BinaryIO, Callable, Awaitable, Dict, List, Optional, Tuple
+from functools import partial
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from fastapi import UploadFile, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.minio import minio_client, UploadTooLargeError
+
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+
+# Import type -> accepted file extensions
+IMPORT_JOB_TYPES = {
+    "functional_case_excel": (".xlsx",),
+    "api_test_excel": (".xlsx",),
+    "xmind": (".xmind",),
+    "postman": (".json",),
+    "swagger": (".json", ".yaml", ".yml"),
+    "jmeter": (".jmx",),
+}
+
+ACTIVE_JOBS_KEY = "import_jobs:active"
+IMPORT_SPOOL_SIZE = 16 * 1024 * 1024  # Downloaded import files larger than this are kept on disk
+
+_INT_FIELDS = ("processed", "success_count", "fail_count", "attempts", "create_time", "update_time", "heartbeat")
+
+# Take a pending job, or a running one whose worker stopped sending heartbeats
+CLAIM_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    return 'missing'
+end
+if status == 'RUNNING' then
+    local heartbeat = tonumber(redis.call('HGET', KEYS[1], 'heartbeat') or '0')
+    if tonumber(ARGV[2]) - heartbeat < tonumber(ARGV[3]) then
+        return 'busy'
+    end
+elseif status ~= 'PENDING' then
+    return 'finished'
+end
+if redis.call('HGET', KEYS[1], 'cancel_requested') == '1' then
+    redis.call('HSET', KEYS[1], 'status', 'CANCELLED', 'update_time', ARGV[2])
+    return 'cancelled'
+end
+if redis.call('HINCRBY', KEYS[1], 'attempts', 1) > tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[1], 'status', 'FAILED', 'error', 'Too many attempts', 'update_time', ARGV[2])
+    return 'failed'
+end
+redis.call('HSET', KEYS[1], 'status', 'RUNNING', 'owner', ARGV[1], 'heartbeat', ARGV[2], 'update_time', ARGV[2])
+return 'claimed'
+"""
+
+# Record a committed chunk; only the owning run may report
+REPORT_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'RUNNING' then
+    return 'lost'
+end
+redis.call('HSET', KEYS[1], 'processed', ARGV[2], 'heartbeat', ARGV[5], 'update_time', ARGV[5])
+if ARGV[6] ~= '' then
+    redis.call('HSET', KEYS[1], 'total', ARGV[6])
+end
+redis.call('HINCRBY', KEYS[1], 'success_count', ARGV[3])
+redis.call('HINCRBY', KEYS[1], 'fail_count', ARGV[4])
+local room = tonumber(ARGV[7]) - redis.call('LLEN', KEYS[2])
+for i = 9, math.min(#ARGV, 8 + room) do
+    redis.call('RPUSH', KEYS[2], ARGV[i])
+end
+redis.call('PEXPIRE', KEYS[2], ARGV[8])
+if redis.call('HGET', KEYS[1], 'cancel_requested') == '1' then
+    return 'cancelled'
+end
+return 'ok'
+"""
+
+# Keep a running job's stall deadline ahead while its handler works
+HEARTBEAT_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'RUNNING' then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'heartbeat', ARGV[2])
+return 1
+"""
+
+# Set the final status unless another run took the job over
+FINISH_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'error', ARGV[3], 'update_time', ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+# Cancel a pending job at once; flag a running one for its worker
+CANCEL_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    return nil
+end
+if status == 'PENDING' then
+    redis.call('HSET', KEYS[1], 'status', 'CANCELLED', 'cancel_requested', '1', 'update_time', ARGV[1])
+    return 'CANCELLED'
+end
+if status == 'RUNNING' then
+    redis.call('HSET', KEYS[1], 'cancel_requested', '1', 'update_time', ARGV[1])
+end
+return status
+"""
+
+
+class ImportJobCancelled(Exception):
+    """The job was cancelled while running"""
+
+
+class ImportJobLost(Exception):
+    """Another run took over the job (this one was considered stalled)"""
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+class ImportJobStore:
+    """Import job state in Redis"""
+
+    def __init__(self, client, ttl: int = settings.IMPORT_JOB_TTL):
+        self.client = client
+        self.ttl_ms = ttl * 1000
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        # Hash tag keeps a job's keys in one cluster slot (scripts touch both)
+        return f"import_job:{{{job_id}}}"
+
+    def _errors_key(self, job_id: str) -> str:
+        return f"{self._key(job_id)}:errors"
+
+    async def create(self, job: Dict[str, Any]):
+        """Store a new pending job and index it as active"""
+        key = self._key(job["id"])
+        fields = {name: json.dumps(value) if name == "params" else value for name, value in job.items()}
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(key, mapping={name: "" if value is None else value for name, value in fields.items()})
+        pipe.pexpire(key, self.ttl_ms)
+        pipe.zadd(ACTIVE_JOBS_KEY, {job["id"]: job["create_time"]})
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job (None if unknown or expired)"""
+        data = await self.client.hgetall(self._key(job_id))
+        if not data:
+            return None
+        job = {name: value if value != "" else None for name, value in data.items()}
+        for name in _INT_FIELDS + ("total",):
+            if job.get(name) is not None:
+                job[name] = int(job[name])
+        for name in ("processed", "success_count", "fail_count", "attempts"):
+            job.setdefault(name, 0)
+            job[name] = job[name] or 0
+        job["params"] = json.loads(job["params"]) if job.get("params") else {}
+        job["cancel_requested"] = job.get("cancel_requested") == "1"
+        return job
+
+    async def errors(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get recorded row errors"""
+        values = await self.client.lrange(self._errors_key(job_id), offset, offset + limit - 1)
+        return [json.loads(value) for value in values]
+
+    async def claim(self, job_id: str, owner: str, stall_ms: int, max_attempts: int) -> str:
+        """
+        Take a job for a run
+
+        Returns:
+            claimed, busy (another run is alive), finished, cancelled,
+            failed (attempts exhausted) or missing
+        """
+        return await self.client.eval(
+            CLAIM_SCRIPT, 1, self._key(job_id), owner, _now(), stall_ms, max_attempts,
+        )
+
+    async def report(
+        self,
+        job_id: str,
+        owner: str,
+        processed: int,
+        success: int,
+        failures: List[Tuple[Optional[int], str]],
+        total: Optional[int] = None,
+        max_errors: int = settings.IMPORT_JOB_MAX_ERRORS,
+    ) -> str:
+        """
+        Record a committed chunk: checkpoint, counters, errors and heartbeat
+
+        Returns:
+            ok, cancelled (cancel requested) or lost (no longer the owner)
+        """
+        now = _now()
+        errors = [json.dumps({"row": row, "message": message}, ensure_ascii=False) for row, message in failures]
+        result = await self.client.eval(
+            REPORT_SCRIPT, 2, self._key(job_id), self._errors_key(job_id),
+            owner, processed, success, len(failures), now,
+            "" if total is None else total, max_errors, self.ttl_ms, *errors,
+        )
+        if result != "lost":
+            await self.client.zadd(ACTIVE_JOBS_KEY, {job_id: now})
+        return result
+
+    async def heartbeat(self, job_id: str, owner: str) -> bool:
+        """Refresh a running job's heartbeat (False if no longer the owner)"""
+        now = _now()
+        alive = await self.client.eval(HEARTBEAT_SCRIPT, 1, self._key(job_id), owner, now)
+        if alive:
+            await self.client.zadd(ACTIVE_JOBS_KEY, {job_id: now})
+        return bool(alive)
+
+    async def finish(self, job_id: str, owner: str, job_status: str, error: Optional[str] = None) -> bool:
+        """Mark a job finished and drop it from the active index (False if no longer the owner)"""
+        finished = await self.client.eval(
+            FINISH_SCRIPT, 1, self._key(job_id), owner, job_status, error or "", _now(), self.ttl_ms,
+        )
+        if finished:
+            await self.client.zrem(ACTIVE_JOBS_KEY, job_id)
+        return bool(finished)
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """Request cancellation; returns the job status afterwards (None if unknown)"""
+        result = await self.client.eval(CANCEL_SCRIPT, 1, self._key(job_id), _now())
+        if result == CANCELLED:
+            await self.client.zrem(ACTIVE_JOBS_KEY, job_id)
+        return result
+
+    async def reset(self, job_id: str):
+        """Make a failed job pending again (keeps its checkpoint and counters)"""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._key(job_id), mapping={"status": PENDING, "attempts": 0, "error": "", "update_time": _now()})
+        pipe.zadd(ACTIVE_JOBS_KEY, {job_id: _now()})
+        await pipe.execute()
+
+    async def stalled(self, older_than_ms: int, limit: int = 100) -> List[str]:
+        """Active jobs without a heartbeat (or not started) since older_than_ms ago"""
+        return await self.client.zrangebyscore(ACTIVE_JOBS_KEY, 0, _now() - older_than_ms, start=0, num=limit)
+
+    async def touch(self, job_id: str):
+        """Push back a job's stall deadline (after re-enqueueing it)"""
+        await self.client.zadd(ACTIVE_JOBS_KEY, {job_id: _now()})
+
+    async def forget(self, job_id: str):
+        """Drop an expired job from the active index"""
+        await self.client.zrem(ACTIVE_JOBS_KEY, job_id)
+
+
+class ImportJobContext:
+    """Checkpoint and progress reporting of one run, handed to an importer"""
+
+    def __init__(self, store: ImportJobStore, job: Dict[str, Any], owner: str):
+        self.store = store
+        self.job = job
+        self.owner = owner
+        # Items (e.g. data rows) fully processed by earlier runs
+        self.checkpoint = job["processed"]
+
+    async def report(
+        self,
+        processed: int,
+        success: int,
+        failures: List[Tuple[Optional[int], str]],
+        total: Optional[int] = None,
+    ):
+        """
+        Record a committed chunk
+
+        Raises:
+            ImportJobCancelled: If cancellation was requested
+            ImportJobLost: If another run took over the job
+        """
+        result = await self.store.report(self.job["id"], self.owner, processed, success, failures, total)
+        if result == "lost":
+            raise ImportJobLost(self.job["id"])
+        self.checkpoint = processed
+        if result == "cancelled":
+            raise ImportJobCancelled(self.job["id"])
+
+
+ImportHandler = Callable[[AsyncSession, Dict[str, Any], BinaryIO, ImportJobContext], Awaitable[None]]
+
+
+async def _import_functional_case_excel(
+    db: AsyncSession,
+    job: Dict[str, Any],
+    source: BinaryIO,
+    context: ImportJobContext,
+):
+    """Chunked functional case import resuming at the checkpoint row"""
+    from app.services.case_management_service import CaseManagementService
+
+    async def on_batch(progress: Dict[str, Any]):
+        await context.report(progress["processed"], progress["imported"], progress["failures"], progress["total"])
+
+    params = job["params"]
+    await CaseManagementService(db).import_cases_from_excel(
+        source,
+        job["file_name"],
+        job["project_id"],
+        module_id=params.get("module_id"),
+        version_id=params.get("version_id"),
+        template_id=params.get("template_id"),
+        create_user=job.get("create_user"),
+        start_row=context.checkpoint,
+        job_id=job["id"],
+        on_batch=on_batch,
+    )
+
+
+def _whole_file_handler(method: str, job_options: Tuple[str, ...] = (), **kwargs) -> ImportHandler:
+    """
+    Run an ImportExportService importer over the whole file as one chunk
+
+    job_options names keyword arguments taken from the run: db (the job's
+    session), create_user, or a submitted parameter such as module_id.
+    """
+
+    async def handler(db: AsyncSession, job: Dict[str, Any], source: BinaryIO, context: ImportJobContext):
+        from app.services.import_export_service import ImportExportService
+
+        available = {
+            **job["params"],
+            "db": db,
+            "create_user": job.get("create_user"),
+            "cover_data": bool(job["params"].get("cover_data")),
+        }
+        options = {**kwargs, **{name: available.get(name) for name in job_options}}
+        upload = UploadFile(source, filename=job["file_name"])
+        result = await getattr(ImportExportService(), method)(upload, job["project_id"], **options)
+        failures = [(None, message) for message in result.get("error_messages", [])]
+        success = result.get("success_count", 0)
+        processed = success + result.get("fail_count", 0)
+        await context.report(processed, success, failures, processed)
+
+    return handler
+
+
+# Import type -> handler; chunked handlers report after every committed chunk
+IMPORT_JOB_HANDLERS: Dict[str, ImportHandler] = {
+    "functional_case_excel": _import_functional_case_excel,
+    "api_test_excel": _whole_file_handler("import_excel", import_type="api_test"),
+    "xmind": _whole_file_handler("import_xmind", ("db", "module_id", "version_id", "template_id", "create_user")),
+    "postman": _whole_file_handler("import_postman", ("db", "module_id", "create_user")),
+    "swagger": _whole_file_handler("import_swagger", ("db", "module_id", "cover_data", "create_user")),
+    "jmeter": _whole_file_handler("import_jmeter"),
+}
+
+
+def _download(file_path: str, target: BinaryIO):
+    """Copy a stored import file into a local file (blocking)"""
+    for chunk in minio_client.iter_file(file_path):
+        target.write(chunk)
+    target.seek(0)
+
+
+def _enqueue(job_id: str) -> bool:
+    """Queue a run of a job (the sweep retries if the broker is unavailable)"""
+    from app.tasks.import_jobs import run_import_job_task
+
+    try:
+        run_import_job_task.delay(job_id)
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to enqueue import job {job_id}: {e}")
+        return False
+
+
+class ImportJobService:
+    """Background import jobs"""
+
+    def __init__(self, store: ImportJobStore):
+        self.store = store
+
+    async def submit(
+        self,
+        file: UploadFile,
+        import_type: str,
+        project_id: str,
+        params: Optional[Dict[str, Any]] = None,
+        create_user: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store the upload and queue an import job
+
+        Args:
+            file: Uploaded file
+            import_type: One of IMPORT_JOB_TYPES
+            project_id: Project ID
+            params: Importer options (e.g. version_id, template_id, module_id)
+            create_user: Submitting user
+
+        Returns:
+            The pending job
+        """
+        extensions = IMPORT_JOB_TYPES.get(import_type)
+        if extensions is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported import type: {import_type}"
+            )
+        file_name = os.path.basename(file.filename or "")
+        if not file_name.lower().endswith(extensions):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{import_type} import requires a {'/'.join(extensions)} file"
+            )
+
+        job_id = str(uuid.uuid4())
+        file_path = f"import/{project_id}/{job_id}/{file_name}"
+        loop = asyncio.get_event_loop()
+        try:
+            await file.seek(0)
+            await loop.run_in_executor(
+                None,
+                partial(
+                    minio_client.upload_stream,
+                    file_path,
+                    file.file,
+                    content_type=file.content_type,
+                    max_size=settings.MAX_UPLOAD_SIZE,
+                ),
+            )
+        except UploadTooLargeError:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
+            )
+
+        now = _now()
+        job = {
+            "id": job_id,
+            "import_type": import_type,
+            "project_id": project_id,
+            "file_name": file_name,
+            "file_path": file_path,
+            "params": params or {},
+            "status": PENDING,
+            "processed": 0,
+            "success_count": 0,
+            "fail_count": 0,
+            "attempts": 0,
+            "create_user": create_user,
+            "create_time": now,
+            "update_time": now,
+        }
+        await self.store.create(job)
+        await loop.run_in_executor(None, _enqueue, job_id)
+        logger.info(f"Import job {job_id} ({import_type}) submitted for project {project_id}")
+        return self._public(job)
+
+    async def get(self, job_id: str, error_offset: int = 0, error_limit: int = 100) -> Optional[Dict[str, Any]]:
+        """Get job progress with a page of its row errors"""
+        job = await self.store.get(job_id)
+        if job is None:
+            return None
+        result = self._public(job)
+        result["errors"] = await self.store.errors(job_id, error_offset, error_limit)
+        return result
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job
+
+        A pending job is cancelled at once; a running job stops after its
+        current chunk (chunks already committed stay imported).
+        """
+        job_status = await self.store.cancel(job_id)
+        if job_status is None:
+            return None
+        job = await self.store.get(job_id)
+        if job_status == CANCELLED and job:
+            await _delete_upload(job)
+        return self._public(job)
+
+    async def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Re-queue a failed or stalled job; it continues from its checkpoint"""
+        job = await self.store.get(job_id)
+        if job is None:
+            return None
+        stalled = job["status"] == RUNNING and _now() - (job.get("heartbeat") or 0) >= settings.IMPORT_JOB_STALL_SECONDS * 1000
+        if job["status"] == FAILED:
+            await self.store.reset(job_id)
+        elif not stalled and job["status"] != PENDING:
+            raise ValueError(f"Job is {job['status'].lower()} and cannot be resumed")
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, _enqueue, job_id)
+        return self._public(await self.store.get(job_id))
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job fields returned to clients"""
+        return {
+            "id": job["id"],
+            "import_type": job["import_type"],
+            "project_id": job["project_id"],
+            "file_name": job["file_name"],
+            "status": job["status"],
+            "processed": job.get("processed", 0),
+            "total": job.get("total"),
+            "success_count": job.get("success_count", 0),
+            "fail_count": job.get("fail_count", 0),
+            "attempts": job.get("attempts", 0),
+            "cancel_requested": bool(job.get("cancel_requested")),
+            "error": job.get("error"),
+            "create_user": job.get("create_user"),
+            "create_time": job.get("create_time"),
+            "update_time": job.get("update_time"),
+        }
+
+
+async def _delete_upload(job: Dict[str, Any]):
+    """Remove a finished job's stored file"""
+    try:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, minio_client.delete_file, job["file_path"])
+    except Exception as e:
+        logger.warning(f"Failed to delete import file {job['file_path']}: {e}")
+
+
+async def _keep_alive(store: ImportJobStore, job_id: str, owner: str, run: asyncio.Task, interval: float):
+    """
+    Send heartbeats while a run works, so long downloads and whole-file
+    handlers (which report once, at the end) aren't taken for stalled.
+    Cancels the run if another run took the job over.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            alive = await store.heartbeat(job_id, owner)
+        except Exception as e:
+            logger.warning(f"Import job {job_id} heartbeat failed: {e}")
+            continue
+        if not alive:
+            run.cancel()
+            return
+
+
+async def run_import_job(
+    store: ImportJobStore,
+    job_id: str,
+    owner: str,
+    session_factory: Callable[[], Any],
+) -> Optional[str]:
+    """
+    Run (or resume) a job until it finishes, is cancelled or is taken over
+
+    Args:
+        store: Job store
+        job_id: Job ID
+        owner: Unique id of this run
+        session_factory: Creates database sessions (async context managers)
+
+    Returns:
+        Final status, or None if this run did not (or no longer) own the job
+    """
+    claimed = await store.claim(
+        job_id, owner, settings.IMPORT_JOB_STALL_SECONDS * 1000, settings.IMPORT_JOB_MAX_ATTEMPTS,
+    )
+    if claimed in ("cancelled", "failed"):
+        await store.forget(job_id)
+        job = await store.get(job_id)
+        if job and claimed == "cancelled":
+            await _delete_upload(job)
+        return CANCELLED if claimed == "cancelled" else FAILED
+    if claimed != "claimed":
+        logger.info(f"Import job {job_id} not run: {claimed}")
+        return None
+
+    job = await store.get(job_id)
+    handler = IMPORT_JOB_HANDLERS[job["import_type"]]
+    context = ImportJobContext(store, job, owner)
+    if context.checkpoint:
+        logger.info(f"Resuming import job {job_id} at item {context.checkpoint} (attempt {job['attempts']})")
+
+    error = None
+    keep_alive = asyncio.create_task(_keep_alive(
+        store, job_id, owner, asyncio.current_task(), settings.IMPORT_JOB_STALL_SECONDS / 3,
+    ))
+    try:
+        loop = asyncio.get_event_loop()
+        with tempfile.SpooledTemporaryFile(IMPORT_SPOOL_SIZE) as source:
+            await loop.run_in_executor(None, _download, job["file_path"], source)
+            async with session_factory() as session:
+                await handler(session, job, source, context)
+        job_status = SUCCEEDED
+    except ImportJobCancelled:
+        job_status = CANCELLED
+    except ImportJobLost:
+        logger.warning(f"Import job {job_id} was taken over by another run")
+        return None
+    except asyncio.CancelledError:
+        if not keep_alive.done():
+            raise
+        # Cancelled by _keep_alive: another run owns the job now
+        asyncio.current_task().uncancel()
+        logger.warning(f"Import job {job_id} was taken over by another run")
+        return None
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {e}")
+        job_status = FAILED
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+    finally:
+        keep_alive.cancel()
+
+    if not await store.finish(job_id, owner, job_status, error):
+        logger.warning(f"Import job {job_id} was taken over by another run")
+        return None
+    # Failed jobs keep their file so they can be resumed
+    if job_status != FAILED:
+        await _delete_upload(job)
+    logger.info(f"Import job {job_id} finished: {job_status}")
+    return job_status
@@ -0,0 +1,117 @@
+"""
+Module Tree - In-memory module lookup for imports
+
+Module tables (functional_case_module, api_definition_module) share the
+columns id, project_id, name, parent_id and pos, with top-level modules
+under MODULE_ROOT_PARENT.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import uuid
+import time
+
+from app.core.sequence import POS_STEP
+
+MODULE_ROOT_PARENT = "NONE"
+MAX_MODULE_NAME_LENGTH = 255
+
+
+class ModuleTree:
+    """
+    Module lookup of one project for an import
+
+    Loaded with a single query; modules that don't exist yet are created in
+    memory and handed out for insertion with the next batch.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        modules: Iterable[Tuple[str, str, str, int]],
+        create_user: Optional[str],
+        root_ids: Iterable[str] = (),
+    ):
+        self.project_id = project_id
+        self.create_user = create_user
+        self.ids = set(root_ids)
+        self.children: Dict[Tuple[str, str], str] = {}
+        self.last_pos: Dict[str, int] = {}
+        self.pending: List[Dict[str, Any]] = []
+        for module_id, name, parent_id, pos in modules:
+            self.ids.add(module_id)
+            self.children[(parent_id, name)] = module_id
+            self.last_pos[parent_id] = max(self.last_pos.get(parent_id, 0), pos or 0)
+
+    @classmethod
+    async def load(
+        cls,
+        db: AsyncSession,
+        model: type,
+        project_id: str,
+        create_user: Optional[str] = None,
+        root_ids: Iterable[str] = (),
+    ) -> "ModuleTree":
+        """
+        Prefetch all modules of a project
+
+        Args:
+            db: Database session
+            model: Module model class
+            project_id: Project ID
+            create_user: Creator of new modules
+            root_ids: Valid module IDs without a row (e.g. a default module)
+        """
+        result = await db.execute(
+            select(model.id, model.name, model.parent_id, model.pos).where(model.project_id == project_id)
+        )
+        return cls(project_id, result.all(), create_user, root_ids)
+
+    def child(self, parent_id: str, name: str) -> str:
+        """Get the module ID of a child by name, creating it if missing"""
+        if len(name) > MAX_MODULE_NAME_LENGTH:
+            raise ValueError(f"Module name exceeds {MAX_MODULE_NAME_LENGTH} characters")
+        module_id = self.children.get((parent_id, name))
+        if module_id is None:
+            module_id = str(uuid.uuid4())
+            pos = self.last_pos.get(parent_id, 0) + POS_STEP
+            now = int(time.time() * 1000)
+            self.pending.append({
+                "id": module_id,
+                "project_id": self.project_id,
+                "name": name,
+                "parent_id": parent_id,
+                "pos": pos,
+                "create_time": now,
+                "update_time": now,
+                "create_user": self.create_user,
+                "update_user": self.create_user,
+            })
+            self.ids.add(module_id)
+            self.children[(parent_id, name)] = module_id
+            self.last_pos[parent_id] = pos
+        return module_id
+
+    def resolve_names(self, names: Sequence[str], parent_id: str = MODULE_ROOT_PARENT) -> str:
+        """Get the module ID of a name path below parent_id, creating missing modules"""
+        for name in names:
+            parent_id = self.child(parent_id, name)
+        return parent_id
+
+    def resolve(self, path: str) -> str:
+        """Get the module ID of a path like /模块/子模块, creating missing modules"""
+        names = [name.strip() for name in path.split("/") if name.strip()]
+        if not names:
+            raise ValueError(f"Invalid module path: {path}")
+        return self.resolve_names(names)
+
+    def take_pending(self) -> List[Dict[str, Any]]:
+        """Modules created since the last call"""
+        pending, self.pending = self.pending, []
+        return pending
+
+    def discard(self, modules: List[Dict[str, Any]]):
+        """Forget created modules whose insert was rolled back"""
+        for module in modules:
+            self.ids.discard(module["id"])
+            self.children.pop((module["parent_id"], module["name"]), None)
@@ -0,0 +1,282 @@
+"""
+OpenAPI Parser - Convert Swagger 2 / OpenAPI 3 specs to API definitions
+
+Each operation gets a fingerprint of its method, path and schema so that a
+re-import can skip unchanged operations without loading stored bodies. The
+fingerprint hashes the operation as written plus the digest of every
+component reachable through its $refs, so schemas are never expanded just
+to be compared; only operations that are written are expanded, with every
+$ref resolved once per spec.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import hashlib
+import json
+
+import yaml
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+# Part of every fingerprint; bump when the stored layout of a definition changes
+FINGERPRINT_VERSION = "1"
+
+MAX_NAME_LENGTH = 255
+MAX_PATH_LENGTH = 500
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_spec(content: bytes) -> Dict[str, Any]:
+    """
+    Parse a JSON or YAML spec
+
+    Raises:
+        ValueError: Not JSON/YAML, or not a Swagger/OpenAPI document
+    """
+    try:
+        spec = json.loads(content)
+    except ValueError:
+        try:
+            spec = yaml.load(content, Loader=_YAML_LOADER)
+        except yaml.YAMLError:
+            raise ValueError("Invalid Swagger/OpenAPI format (must be JSON or YAML)")
+    if not isinstance(spec, dict) or ("openapi" not in spec and "swagger" not in spec):
+        raise ValueError("Invalid Swagger/OpenAPI specification")
+    return spec
+
+
+def _canonical(node: Any) -> bytes:
+    """Stable serialization for hashing (YAML dates fall back to str)"""
+    return json.dumps(node, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def _iter_refs(node: Any) -> Iterator[str]:
+    """Yield the $ref strings within a node (not following them)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+class RefResolver:
+    """Local $ref lookup, expansion and digests, memoized per ref"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self._resolved: Dict[str, Any] = {}
+        self._digests: Dict[str, str] = {}
+        self._children: Dict[str, Tuple[str, ...]] = {}
+
+    def target(self, ref: str) -> Any:
+        """Node a local JSON pointer ref points at"""
+        node: Any = self.spec
+        for token in ref[2:].split("/") if ref != "#" else ():
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(token)] if isinstance(node, list) else node[token]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise ValueError(f"Unresolvable $ref: {ref}")
+        return node
+
+    def resolve(self, node: Any, _active: Tuple[str, ...] = ()) -> Any:
+        """
+        Expand the $refs of a node
+
+        Expanded refs are shared between callers, so the result must not be
+        mutated. A ref back into a schema being expanded (a recursive schema)
+        and external refs are kept as {"$ref": ...}.
+        """
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                if not ref.startswith("#") or ref in _active:
+                    return {"$ref": ref}
+                if ref not in self._resolved:
+                    self._resolved[ref] = self.resolve(self.target(ref), _active + (ref,))
+                return self._resolved[ref]
+            return {key: self.resolve(value, _active) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self.resolve(item, _active) for item in node]
+        return node
+
+    def digest(self, node: Any) -> str:
+        """Hash of a node and every component reachable from it"""
+        digest = hashlib.sha256(_canonical(node))
+        for ref in sorted(self._reachable(node)):
+            digest.update(ref.encode())
+            digest.update(self._ref_digest(ref).encode())
+        return digest.hexdigest()
+
+    def _reachable(self, node: Any) -> Set[str]:
+        """Refs reachable from a node, cycles included (iterative walk)"""
+        seen: Set[str] = set()
+        stack = list(_iter_refs(node))
+        while stack:
+            ref = stack.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            stack.extend(self._ref_children(ref))
+        return seen
+
+    def _ref_children(self, ref: str) -> Tuple[str, ...]:
+        if ref not in self._children:
+            self._children[ref] = tuple(_iter_refs(self.target(ref))) if ref.startswith("#") else ()
+        return self._children[ref]
+
+    def _ref_digest(self, ref: str) -> str:
+        if ref not in self._digests:
+            # External refs are not fetched; only the ref itself is hashed
+            node = self.target(ref) if ref.startswith("#") else ref
+            self._digests[ref] = hashlib.sha256(_canonical(node)).hexdigest()
+        return self._digests[ref]
+
+
+class SpecOperation:
+    """One operation of a spec; definition fields are built on demand"""
+
+    __slots__ = ("parser", "method", "path", "source", "fingerprint")
+
+    def __init__(self, parser: "OpenApiParser", method: str, path: str, source: Dict[str, Any], fingerprint: str):
+        self.parser = parser
+        self.method = method
+        self.path = path
+        self.source = source
+        self.fingerprint = fingerprint
+
+    def to_definition(self) -> Dict[str, Any]:
+        """ApiDefinition column values (bodies as JSON text)"""
+        return self.parser.build_definition(self)
+
+
+class OpenApiParser:
+    """Swagger 2.0 / OpenAPI 3.x operations with fingerprints"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        version = str(spec.get("openapi") or spec.get("swagger") or "")
+        if not (version.startswith("3.") or version.startswith("2.")):
+            raise ValueError(f"Unsupported Swagger/OpenAPI version: {version or 'missing'}")
+        self.spec = spec
+        self.swagger2 = version.startswith("2.")
+        self.resolver = RefResolver(spec)
+
+    def operations(self) -> Tuple[List[SpecOperation], List[str]]:
+        """
+        Fingerprint every operation of the spec
+
+        Returns:
+            (operations, error messages of skipped operations)
+        """
+        operations: List[SpecOperation] = []
+        errors: List[str] = []
+        paths = self.spec.get("paths") or {}
+        if not isinstance(paths, dict):
+            raise ValueError("Invalid Swagger/OpenAPI specification: paths must be an object")
+
+        for path, path_item in paths.items():
+            if not isinstance(path_item, dict):
+                continue
+            if "$ref" in path_item:
+                errors.append(f"{path}: path item $ref is not supported")
+                continue
+            path_level = path_item.get("parameters") or []
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if not isinstance(operation, dict):
+                    continue
+                label = f"{method.upper()} {path}"
+                if len(path) > MAX_PATH_LENGTH:
+                    errors.append(f"{label[:100]}...: path is longer than {MAX_PATH_LENGTH} characters")
+                    continue
+                try:
+                    source = {"parameters": path_level, "operation": operation}
+                    if self.swagger2:
+                        source["consumes"] = operation.get("consumes", self.spec.get("consumes"))
+                        source["produces"] = operation.get("produces", self.spec.get("produces"))
+                    fingerprint = self.resolver.digest([FINGERPRINT_VERSION, method.upper(), path, source])
+                except ValueError as e:
+                    errors.append(f"{label}: {e}")
+                    continue
+                operations.append(SpecOperation(self, method.upper(), path, source, fingerprint))
+        return operations, errors
+
+    def build_definition(self, operation: SpecOperation) -> Dict[str, Any]:
+        """Expand an operation into ApiDefinition fields"""
+        resolve = self.resolver.resolve
+        source = operation.source
+        spec_operation = source["operation"]
+
+        # Operation parameters override path-level ones with the same name and location
+        parameters: Dict[Tuple[Any, Any], Any] = {}
+        for parameter in list(source["parameters"]) + list(spec_operation.get("parameters") or []):
+            parameter = resolve(parameter)
+            if isinstance(parameter, dict):
+                parameters[(parameter.get("name"), parameter.get("in"))] = parameter
+
+        if self.swagger2:
+            body = self._swagger2_body(list(parameters.values()), source["consumes"])
+            parameters = {key: value for key, value in parameters.items() if key[1] not in ("body", "formData")}
+            responses = {
+                code: self._swagger2_response(resolve(response), source["produces"])
+                for code, response in (spec_operation.get("responses") or {}).items()
+            }
+        else:
+            body = resolve(spec_operation.get("requestBody"))
+            responses = resolve(spec_operation.get("responses") or {})
+
+        name = spec_operation.get("summary") or spec_operation.get("operationId") or f"{operation.method} {operation.path}"
+        request_body = {"parameters": list(parameters.values()), "body": body}
+        return {
+            "name": str(name)[:MAX_NAME_LENGTH],
+            "method": operation.method,
+            "path": operation.path,
+            "description": spec_operation.get("description"),
+            "request_body": json.dumps(request_body, ensure_ascii=False, default=str),
+            "response_body": json.dumps(responses, ensure_ascii=False, default=str),
+        }
+
+    @staticmethod
+    def _swagger2_body(parameters: List[Dict[str, Any]], consumes: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+        """Swagger 2 body/formData parameters as an OpenAPI 3 request body"""
+        for parameter in parameters:
+            if parameter.get("in") == "body":
+                media_types = consumes or ["application/json"]
+                body = {"content": {media_type: {"schema": parameter.get("schema")} for media_type in media_types}}
+                for field in ("description", "required"):
+                    if field in parameter:
+                        body[field] = parameter[field]
+                return body
+
+        form = [parameter for parameter in parameters if parameter.get("in") == "formData"]
+        if not form:
+            return None
+        properties = {
+            parameter.get("name"): {key: value for key, value in parameter.items() if key not in ("name", "in", "required")}
+            for parameter in form
+        }
+        schema = {"type": "object", "properties": properties}
+        required = [parameter.get("name") for parameter in form if parameter.get("required")]
+        if required:
+            schema["required"] = required
+        if consumes:
+            media_types = consumes
+        elif any(parameter.get("type") == "file" for parameter in form):
+            media_types = ["multipart/form-data"]
+        else:
+            media_types = ["application/x-www-form-urlencoded"]
+        return {"content": {media_type: {"schema": schema} for media_type in media_types}}
+
+    @staticmethod
+    def _swagger2_response(response: Any, produces: Optional[List[str]]) -> Any:
+        """Swagger 2 response schema as OpenAPI 3 content"""
+        if not isinstance(response, dict) or "schema" not in response:
+            return response
+        converted = {key: value for key, value in response.items() if key != "schema"}
+        media_types = produces or ["application/json"]
+        converted["content"] = {media_type: {"schema": response["schema"]} for media_type in media_types}
+        return converted
@@ -0,0 +1,155 @@
+"""
+Postman Parser - Convert Postman v2.0 / v2.1 collections to API definitions
+
+Items are walked with an explicit stack, so deeply nested folders don't hit
+the recursion limit. Folders come out in document order with the index of
+their parent folder (parents before children), requests with the index of
+their folder, normalized method and path, and their bodies already
+serialized, so the caller only maps folders to modules and inserts rows.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+import json
+import re
+
+# Folder index of items at the top level of a collection
+ROOT_FOLDER = -1
+
+SUPPORTED_SCHEMAS = ("v2.0.0", "v2.1.0")
+DEFAULT_FOLDER_NAME = "未命名模块"
+MAX_NAME_LENGTH = 255
+MAX_PATH_LENGTH = 500
+
+_PATH_VARIABLE = re.compile(r"(?<=/):([A-Za-z_][\w.-]*)")
+
+
+def _text(value: Any) -> Optional[str]:
+    """Description fields are a string or {"content": ...}"""
+    if isinstance(value, dict):
+        value = value.get("content")
+    return value if isinstance(value, str) and value else None
+
+
+def _path_from_raw(raw: str) -> str:
+    """Path of a raw URL like {{baseUrl}}/users/:id?x=1"""
+    raw = raw.split("#", 1)[0].split("?", 1)[0].strip()
+    if "://" in raw:
+        raw = raw.split("://", 1)[1]
+    if not raw.startswith("/"):
+        # Drop the host (or host variable) before the first slash
+        slash = raw.find("/")
+        raw = raw[slash:] if slash >= 0 else "/"
+    return raw
+
+
+def _url_parts(url: Any) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """(raw URL, path, query parameters) of a v2.0 string or v2.1 object URL"""
+    if isinstance(url, dict):
+        raw = url.get("raw") or ""
+        segments = url.get("path")
+        if isinstance(segments, list):
+            path = "/" + "/".join(
+                segment if isinstance(segment, str) else str(segment.get("value", "")) for segment in segments
+            )
+        elif isinstance(segments, str):
+            path = segments if segments.startswith("/") else "/" + segments
+        else:
+            path = _path_from_raw(raw)
+        query = [parameter for parameter in url.get("query") or [] if isinstance(parameter, dict)]
+    else:
+        raw = url if isinstance(url, str) else ""
+        path = _path_from_raw(raw)
+        query_string = raw.split("#", 1)[0].partition("?")[2]
+        query = [{"key": key, "value": value} for key, value in parse_qsl(query_string, keep_blank_values=True)]
+    # Postman path variables (:id) as OpenAPI templates ({id})
+    return raw, _PATH_VARIABLE.sub(r"{\1}", path) or "/", query
+
+
+def _convert_request(item: Dict[str, Any], folder: int) -> Dict[str, Any]:
+    request = item["request"]
+    if isinstance(request, str):
+        request = {"url": request, "method": "GET"}
+    if not isinstance(request, dict):
+        raise ValueError("invalid request")
+
+    method = str(request.get("method") or "GET").upper()
+    raw, path, query = _url_parts(request.get("url"))
+    if len(path) > MAX_PATH_LENGTH:
+        raise ValueError(f"path is longer than {MAX_PATH_LENGTH} characters")
+    headers = request.get("header")
+    if not isinstance(headers, list):
+        headers = []
+    body = request.get("body") if isinstance(request.get("body"), dict) else None
+
+    example = None
+    responses = item.get("response")
+    if isinstance(responses, list) and responses and isinstance(responses[0], dict):
+        response = responses[0]
+        example = {
+            "name": response.get("name"),
+            "code": response.get("code"),
+            "status": response.get("status"),
+            "headers": response.get("header") if isinstance(response.get("header"), list) else [],
+            "body": response.get("body"),
+        }
+
+    name = item.get("name") or f"{method} {path}"
+    case_request = {
+        "method": method,
+        "url": raw,
+        "path": path,
+        "headers": headers,
+        "query": query,
+        "body": body,
+        "auth": request.get("auth"),
+    }
+    expected_response = json.dumps(example, ensure_ascii=False) if example else None
+    return {
+        "folder": folder,
+        "name": str(name)[:MAX_NAME_LENGTH],
+        "method": method,
+        "path": path,
+        "description": _text(item.get("description")) or _text(request.get("description")),
+        "request_body": json.dumps({"headers": headers, "query": query, "body": body}, ensure_ascii=False),
+        "response_body": expected_response,
+        "case_request": json.dumps(case_request, ensure_ascii=False),
+        "expected_response": expected_response,
+    }
+
+
+def parse_collection(collection: Any) -> Tuple[List[Tuple[int, str]], List[Dict[str, Any]], List[str]]:
+    """
+    Flatten a Postman collection
+
+    Returns:
+        (folders as (parent folder index, name), requests, error messages of
+        skipped requests)
+
+    Raises:
+        ValueError: Not a v2.0 / v2.1 collection
+    """
+    if not isinstance(collection, dict) or not isinstance(collection.get("info"), dict):
+        raise ValueError("Invalid Postman collection format")
+    schema = str(collection["info"].get("schema") or "")
+    if not isinstance(collection.get("item"), list) or (schema and not any(version in schema for version in SUPPORTED_SCHEMAS)):
+        raise ValueError("Unsupported Postman collection (v2.0 and v2.1 are supported)")
+
+    folders: List[Tuple[int, str]] = []
+    requests: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    stack = [(ROOT_FOLDER, item) for item in reversed(collection["item"])]
+    while stack:
+        folder, item = stack.pop()
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get("item"), list):
+            name = str(item.get("name") or "").strip() or DEFAULT_FOLDER_NAME
+            folders.append((folder, name[:MAX_NAME_LENGTH]))
+            index = len(folders) - 1
+            stack.extend((index, child) for child in reversed(item["item"]))
+        elif "request" in item:
+            try:
+                requests.append(_convert_request(item, folder))
+            except (ValueError, TypeError, AttributeError) as e:
+                errors.append(f"{item.get('name') or 'Unnamed request'}: {e}")
+    return folders, requests, errors
@@ -0,0 +1,222 @@
+"""
+Project Statistics Service
+
+Maintains the materialized `project_statistics` counters. Service write paths
+call `adjust` inside their own transaction, so a counter changes atomically
+with the row it counts; `reconcile` recounts the source tables in a single
+correlated UPDATE to repair drift from writes that bypass the services.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, literal, union, union_all
+from sqlalchemy.sql import Select
+from typing import Dict, List, Optional, Any
+import time
+
+from app.models.project_statistics import ProjectStatistics
+from app.models.bug import Bug
+from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.functional_case import FunctionalCase
+from app.models.test_plan import TestPlan
+from app.utils.batch_operations import chunked, get_chunk_size
+
+# Counter column -> (model, extra filters besides "not deleted")
+COUNTED_RESOURCES = {
+    "bug_count": (Bug, ()),
+    "api_definition_count": (ApiDefinition, ()),
+    "api_test_case_count": (ApiTestCase, ()),
+    "api_scenario_count": (ApiScenario, ()),
+    "functional_case_count": (FunctionalCase, (FunctionalCase.latest == True,)),
+    "test_plan_count": (TestPlan, ()),
+}
+
+STATISTICS_FIELDS = tuple(COUNTED_RESOURCES)
+
+
+def counted_filters(field: str) -> List[Any]:
+    """Filters selecting the rows a counter counts"""
+    model, extra = COUNTED_RESOURCES[field]
+    return [model.deleted == False, *extra]
+
+
+class ProjectStatisticsService:
+    """Project statistics service"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, project_id: str) -> Optional[ProjectStatistics]:
+        """Get the counters of a project"""
+        result = await self.db.execute(
+            select(ProjectStatistics).where(ProjectStatistics.project_id == project_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def adjust(self, project_id: Optional[str], field: str, delta: int = 1):
+        """
+        Adjust a project counter in the caller's transaction
+
+        Call before the caller commits. A project without a counter row yet is
+        counted from the source tables instead (including the caller's
+        pending changes).
+
+        Args:
+            project_id: Project ID
+            field: Counter column (one of STATISTICS_FIELDS)
+            delta: Amount to add
+        """
+        if not project_id or not delta:
+            return
+        column = getattr(ProjectStatistics, field)
+        result = await self.db.execute(
+            update(ProjectStatistics)
+            .where(ProjectStatistics.project_id == project_id)
+            .values({field: column + delta, "update_time": int(time.time() * 1000)})
+        )
+        if result.rowcount == 0:
+            await self.reconcile([project_id])
+
+    def counts_query(self, project_ids: Optional[List[str]] = None) -> Select:
+        """
+        Per-project counts of all counted resources in one query
+
+        Each branch of the UNION ALL counts one table grouped by project and
+        fills the other counters with zeros; the outer query folds the
+        branches into one row per project.
+        """
+        branches = []
+        for field, (model, _) in COUNTED_RESOURCES.items():
+            columns = [
+                (func.count() if other == field else literal(0)).label(other)
+                for other in STATISTICS_FIELDS
+            ]
+            branch = select(model.project_id.label("project_id"), *columns).where(*counted_filters(field))
+            if project_ids is not None:
+                branch = branch.where(model.project_id.in_(project_ids))
+            branches.append(branch.group_by(model.project_id))
+
+        counts = union_all(*branches).subquery()
+        return select(
+            counts.c.project_id,
+            *(func.sum(counts.c[field]).label(field) for field in STATISTICS_FIELDS),
+        ).group_by(counts.c.project_id)
+
+    async def compute(self, project_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count resources per project from the source tables
+
+        Args:
+            project_ids: Projects to count (all projects if None)
+
+        Returns:
+            Dictionary mapping project ID to counters
+        """
+        result = await self.db.execute(self.counts_query(project_ids))
+        return {
+            row.project_id: {field: int(row._mapping[field] or 0) for field in STATISTICS_FIELDS}
+            for row in result
+        }
+
+    async def reconcile(self, project_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Recompute counters from the source tables and store them
+
+        Projects without a counter row get one, then a single UPDATE sets each
+        counter to a correlated COUNT. Counting and writing happen in one
+        statement under the row lock, so an `adjust` by a concurrent
+        transaction is either already counted or applied on top afterwards
+        instead of being overwritten. Does not commit; the caller owns the
+        transaction.
+
+        Args:
+            project_ids: Projects to reconcile (all projects if None)
+
+        Returns:
+            Dictionary mapping each reconciled project ID to its counters
+        """
+        await self.db.flush()
+        now = int(time.time() * 1000)
+        await self._insert_missing(project_ids, now)
+
+        recount = update(ProjectStatistics).values({
+            **{
+                field: select(func.count())
+                .select_from(model)
+                .where(model.project_id == ProjectStatistics.project_id, *counted_filters(field))
+                .scalar_subquery()
+                for field, (model, _) in COUNTED_RESOURCES.items()
+            },
+            "update_time": now,
+        })
+        stored = select(ProjectStatistics)
+        if project_ids is None:
+            # Also zeroes projects whose resources are all gone
+            await self.db.execute(recount)
+            result = await self.db.execute(stored)
+            rows = list(result.scalars())
+        else:
+            rows = []
+            for chunk in chunked(list(dict.fromkeys(project_ids)), get_chunk_size(self.db)):
+                await self.db.execute(recount.where(ProjectStatistics.project_id.in_(chunk)))
+                result = await self.db.execute(stored.where(ProjectStatistics.project_id.in_(chunk)))
+                rows.extend(result.scalars())
+        return {
+            row.project_id: {field: getattr(row, field) for field in STATISTICS_FIELDS}
+            for row in rows
+        }
+
+    async def _insert_missing(self, project_ids: Optional[List[str]], now: int):
+        """Create zeroed counter rows for projects that have none yet"""
+        if project_ids is None:
+            counted = union(*(
+                select(model.project_id.label("project_id")).where(*counted_filters(field))
+                for field, (model, _) in COUNTED_RESOURCES.items()
+            )).subquery()
+            result = await self.db.execute(
+                select(counted.c.project_id).where(
+                    counted.c.project_id.is_not(None),
+                    counted.c.project_id.not_in(select(ProjectStatistics.project_id)),
+                )
+            )
+            missing = list(result.scalars())
+        else:
+            missing = []
+            for chunk in chunked(list(dict.fromkeys(project_ids)), get_chunk_size(self.db)):
+                result = await self.db.execute(
+                    select(ProjectStatistics.project_id).where(ProjectStatistics.project_id.in_(chunk))
+                )
+                existing = set(result.scalars())
+                missing.extend(project_id for project_id in chunk if project_id not in existing)
+        if missing:
+            zeros = {field: 0 for field in STATISTICS_FIELDS}
+            await self._upsert(
+                [{"project_id": project_id, **zeros, "update_time": now} for project_id in missing],
+                overwrite=False,
+            )
+
+    async def _upsert(self, rows: List[Dict[str, Any]], overwrite: bool = True):
+        """Insert counter rows, overwriting existing ones (or leaving them as they are)"""
+        table = ProjectStatistics.__table__
+        dialect = self.db.bind.dialect.name
+        updated = (*STATISTICS_FIELDS, "update_time") if overwrite else ("project_id",)
+
+        for chunk in chunked(rows, get_chunk_size(self.db, len(table.columns))):
+            if dialect == "mysql":
+                from sqlalchemy.dialects.mysql import insert
+                statement = insert(table).values(list(chunk))
+                statement = statement.on_duplicate_key_update(
+                    {name: statement.inserted[name] for name in updated}
+                )
+            else:
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                statement = insert(table).values(list(chunk))
+                if overwrite:
+                    statement = statement.on_conflict_do_update(
+                        index_elements=[table.c.project_id],
+                        set_={name: statement.excluded[name] for name in updated},
+                    )
+                else:
+                    statement = statement.on_conflict_do_nothing(index_elements=[table.c.project_id])
+            await self.db.execute(statement)
@@ -2,7 +2,7 @@
 Test Plan Service
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import List, Optional, Dict
 import uuid
 import time
@@ -10,6 +10,13 @@ import json
 
 from app.models.test_plan import TestPlan, TestPlanReport
 from app.schemas.test_plan import TestPlan as TestPlanSchema
+from app.core.database_optimization import KeysetPaginationHelper
+from app.core.sequence import sequence_allocator
+from app.core.count_strategy import count_strategy
+from app.services.project_statistics_service import ProjectStatisticsService
+
+# List order; backed by idx_test_plan_project_list
+TEST_PLAN_LIST_KEYS = (TestPlan.pos, TestPlan.create_time, TestPlan.id)
 
 
 class TestPlanService:
@@ -17,6 +24,7 @@ class TestPlanService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.statistics = ProjectStatisticsService(db)
     
     async def get_test_plans(
         self,
@@ -25,9 +33,15 @@ class TestPlanService:
         limit: int = 100,
         keyword: Optional[str] = None,
         status: Optional[str] = None,
-        type: Optional[str] = None
+        type: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[TestPlan]:
-        """Get test plans"""
+        """
+        Get test plans
+        
+        When a cursor is given, skip is ignored and the page starts right
+        after the cursor (keyset pagination).
+        """
         query = select(TestPlan).where(TestPlan.deleted == False)
         
         if project_id:
@@ -42,7 +56,10 @@ class TestPlanService:
         if type:
             query = query.where(TestPlan.type == type)
         
-        query = query.offset(skip).limit(limit).order_by(TestPlan.pos.desc(), TestPlan.create_time.desc())
+        if cursor:
+            query = KeysetPaginationHelper.apply(query, TEST_PLAN_LIST_KEYS, cursor, limit)
+        else:
+            query = KeysetPaginationHelper.apply(query, TEST_PLAN_LIST_KEYS, limit=limit).offset(skip)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -70,19 +87,8 @@ class TestPlanService:
         """Create test plan"""
         plan_id = str(uuid.uuid4())
         
-        # Get next num (plan number) for the project
-        result = await self.db.execute(
-            select(func.max(TestPlan.num)).where(TestPlan.project_id == project_id)
-        )
-        max_num = result.scalar_one_or_none() or 0
-        next_num = max_num + 1
-        
-        # Get next pos (position) for sorting
-        result = await self.db.execute(
-            select(func.max(TestPlan.pos)).where(TestPlan.project_id == project_id)
-        )
-        max_pos = result.scalar_one_or_none() or 0
-        next_pos = max_pos + 5000  # Interval of 5000
+        # Allocate num (display number) and pos (sort order, interval 5000)
+        next_num, next_pos = await sequence_allocator.next(self.db, TestPlan, project_id)
         
         # Parse tags if provided as list
         tags = kwargs.get("tags")
@@ -108,8 +114,10 @@ class TestPlanService:
         )
         
         self.db.add(test_plan)
+        await self.statistics.adjust(project_id, "test_plan_count", 1)
         await self.db.commit()
         await self.db.refresh(test_plan)
+        await count_strategy.on_created(TestPlan.__tablename__, project_id)
         return test_plan
     
     async def update_test_plan(
@@ -136,6 +144,7 @@ class TestPlanService:
         
         await self.db.commit()
         await self.db.refresh(test_plan)
+        await count_strategy.invalidate(TestPlan.__tablename__)
         return test_plan
     
     async def delete_test_plan(self, plan_id: str, delete_user: Optional[str] = None) -> bool:
@@ -147,8 +156,10 @@ class TestPlanService:
         test_plan.deleted = True
         test_plan.delete_time = int(time.time() * 1000)
         test_plan.delete_user = delete_user
+        await self.statistics.adjust(test_plan.project_id, "test_plan_count", -1)
         
         await self.db.commit()
+        await count_strategy.on_deleted(TestPlan.__tablename__, test_plan.project_id)
         return True
     
     async def get_test_plan_report_by_id(self, report_id: str) -> Optional[TestPlanReport]:
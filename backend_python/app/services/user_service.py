@@ -4,11 +4,15 @@ User Service
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional, Dict, Any
+from collections import Counter
 import uuid
 import time
 
 from app.models.user import User
 from app.services.auth_service import AuthService
+from app.core.database_optimization import PaginationHelper
+from app.core.count_strategy import count_strategy
+from app.utils.batch_operations import BulkOperations
 
 
 class UserService:
@@ -55,6 +59,33 @@ class UserService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def get_users_paginated(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        organization_id: Optional[str] = None,
+        keyword: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get users with page-based pagination and a cached total
+        
+        Returns:
+            Dictionary with items, total, total_exact, page, page_size, pages
+        """
+        query = select(User).where(User.deleted == False)
+        
+        if organization_id:
+            query = query.where(User.last_organization_id == organization_id)
+        
+        if keyword:
+            query = query.where(
+                (User.name.like(f"%{keyword}%")) | 
+                (User.email.like(f"%{keyword}%"))
+            )
+        
+        query = query.order_by(User.create_time.desc(), User.id.desc())
+        return await PaginationHelper.paginate(self.db, query, page=page, page_size=page_size)
+    
     async def count_users(
         self,
         organization_id: Optional[str] = None,
@@ -115,6 +146,7 @@ class UserService:
         self.db.add(user)
         await self.db.commit()
         await self.db.refresh(user)
+        await count_strategy.on_created(User.__tablename__)
         return user
     
     async def update_user(
@@ -142,6 +174,7 @@ class UserService:
         
         await self.db.commit()
         await self.db.refresh(user)
+        await count_strategy.invalidate(User.__tablename__)
         return user
     
     async def delete_user(self, user_id: str, delete_user: Optional[str] = None) -> bool:
@@ -155,8 +188,118 @@ class UserService:
         user.delete_user = delete_user
         
         await self.db.commit()
+        await count_strategy.on_deleted(User.__tablename__)
         return True
     
+    async def get_users_by_ids(self, user_ids: List[str]) -> Dict[str, User]:
+        """Get users by IDs (missing or deleted users are omitted)"""
+        return await BulkOperations.bulk_get(self.db, User, user_ids)
+
+    async def create_users_bulk(
+        self,
+        items: List[Dict[str, Any]],
+        create_user: Optional[str] = None
+    ) -> List[User]:
+        """
+        Create users with one existence check and multi-row inserts
+
+        Args:
+            items: User data dictionaries (name, email, password, optional fields)
+            create_user: Creator user ID
+
+        Returns:
+            Created users in input order
+        """
+        emails = [item["email"] for item in items]
+        duplicates = {email for email, seen in Counter(emails).items() if seen > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate emails in request: {', '.join(sorted(duplicates))}")
+
+        # Email is unique across soft-deleted users too
+        existing = await BulkOperations.bulk_get(self.db, User, emails, key="email", include_deleted=True)
+        if existing:
+            raise ValueError(f"Users with emails already exist: {', '.join(sorted(existing))}")
+
+        import secrets
+        now = int(time.time() * 1000)
+        rows = []
+        for item in items:
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "name": item["name"],
+                "email": item["email"],
+                "password": self.auth_service.get_password_hash(item["password"]),
+                "enable": True,
+                "language": item.get("language"),
+                "phone": item.get("phone"),
+                "source": item.get("source") or "LOCAL",
+                "cft_token": secrets.token_urlsafe(32),
+                "create_user": create_user,
+                "update_user": create_user,
+                "create_time": now,
+                "update_time": now,
+                "deleted": False,
+            })
+
+        await BulkOperations.bulk_insert(self.db, User, rows)
+        await count_strategy.on_created(User.__tablename__, count=len(rows))
+
+        users = await BulkOperations.bulk_get(self.db, User, [row["id"] for row in rows])
+        return [users[row["id"]] for row in rows]
+
+    async def update_users_bulk(
+        self,
+        updates: Dict[str, Dict[str, Any]],
+        update_user: Optional[str] = None
+    ) -> int:
+        """
+        Update users with one executemany UPDATE per set of changed columns
+
+        Args:
+            updates: Mapping of user ID to changed fields (None values are ignored)
+            update_user: Updater user ID
+
+        Returns:
+            Number of updated users
+
+        Raises:
+            ValueError: If a new email is used twice or by another user
+        """
+        new_emails = {user_id: data["email"] for user_id, data in updates.items() if data.get("email")}
+        duplicates = {email for email, seen in Counter(new_emails.values()).items() if seen > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate emails in request: {', '.join(sorted(duplicates))}")
+        if new_emails:
+            existing = await BulkOperations.bulk_get(
+                self.db, User, list(new_emails.values()), key="email", include_deleted=True
+            )
+            taken = {
+                email for user_id, email in new_emails.items()
+                if email in existing and existing[email].id != user_id
+            }
+            if taken:
+                raise ValueError(f"Users with emails already exist: {', '.join(sorted(taken))}")
+
+        now = int(time.time() * 1000)
+        rows = []
+        for user_id, data in updates.items():
+            row = {key: value for key, value in data.items() if value is not None}
+            if "password" in row:
+                row["password"] = self.auth_service.get_password_hash(row["password"])
+            row.update(id=user_id, update_user=update_user, update_time=now)
+            rows.append(row)
+
+        updated_count = await BulkOperations.bulk_update(self.db, User, rows)
+        await count_strategy.invalidate(User.__tablename__)
+        return updated_count
+
+    async def delete_users_bulk(self, user_ids: List[str], delete_user: Optional[str] = None) -> int:
+        """Soft delete users with one UPDATE per chunk of IDs"""
+        deleted_count = await BulkOperations.bulk_soft_delete(self.db, User, user_ids, delete_user)
+        if deleted_count:
+            await count_strategy.on_deleted(User.__tablename__, count=deleted_count)
+        return deleted_count
+
     async def enable_user(self, user_id: str) -> bool:
         """Enable user"""
         user = await self.get_user_by_id(user_id)
@@ -0,0 +1,239 @@
+"""
+XMind Parser - Flatten XMind Zen / Classic mind maps into modules and cases
+
+Both formats are first flattened into topics in document order, each with
+the index of its parent topic: Zen's content.json with an explicit stack,
+Classic's content.xml with iterparse (elements are cleared as they close).
+The topics are then mapped in one pass, so neither step recurses however
+deep the map is:
+
+- A topic titled ``case-``/``tc:`` (any case) is a functional case; every
+  other topic above it is a module (the central topic included)
+- Children of a case: ``pc:`` prerequisite, ``rc:`` remark, ``tag:`` tags
+  (split on , ;); any other child is a step whose children are its
+  expected result
+- Topic labels become tags and notes the remark of a case without ``rc:``
+"""
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+import io
+import json
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+# Parent index of top-level topics and module index of top-level cases
+ROOT = -1
+
+CASE_PREFIXES = ("case-", "case:", "case：", "tc:", "tc：", "tc-")
+PREREQUISITE_PREFIXES = ("pc:", "pc：")
+REMARK_PREFIXES = ("rc:", "rc：")
+TAG_PREFIXES = ("tag:", "tag：")
+TAG_SEPARATORS = re.compile(r"[,;，；]")
+MAX_NAME_LENGTH = 255
+MAX_TAGS_LENGTH = 500
+
+# (parent topic index, title, notes, labels)
+Topic = Tuple[int, str, Optional[str], List[str]]
+
+_MODULE, _CASE, _STEP, _IGNORED = range(4)
+_SKIPPED = -2
+
+
+def _strip_prefix(title: str, prefixes: Iterable[str]) -> Optional[str]:
+    lowered = title.lower()
+    for prefix in prefixes:
+        if lowered.startswith(prefix):
+            return title[len(prefix):].strip()
+    return None
+
+
+def _field(value: Any, *names: str) -> Any:
+    """Nested dict field, None where the document has another type"""
+    for name in names:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return value
+
+
+def parse_xmind_zen(content: Any) -> List[Topic]:
+    """Topics of a Zen content.json (a list of sheets); fields of other types are ignored"""
+    sheets = content if isinstance(content, list) else [content]
+    topics: List[Topic] = []
+    stack = [
+        (ROOT, sheet["rootTopic"]) for sheet in reversed(sheets)
+        if isinstance(sheet, dict) and isinstance(sheet.get("rootTopic"), dict)
+    ]
+    while stack:
+        parent, topic = stack.pop()
+        notes = _field(topic, "notes", "plain", "content")
+        labels = topic.get("labels")
+        labels = [str(label) for label in labels] if isinstance(labels, list) else []
+        topics.append((parent, str(topic.get("title") or ""), notes if isinstance(notes, str) else None, labels))
+        index = len(topics) - 1
+        children = _field(topic, "children", "attached")
+        if not isinstance(children, list):
+            continue
+        stack.extend((index, child) for child in reversed(children) if isinstance(child, dict))
+    return topics
+
+
+def parse_xmind_classic(stream: BinaryIO) -> List[Topic]:
+    """Topics of a Classic content.xml, streamed with iterparse"""
+    topics: List[list] = []
+    elements: List[str] = []  # Local names of the open elements
+    containers: List[Optional[str]] = []  # Types of the open <topics> elements
+    open_topics: List[int] = []  # Indexes of the open <topic> elements (_SKIPPED for skipped ones)
+
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        name = element.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if name == "topic":
+                # Only attached topics; detached (floating) and summary topics are skipped with their children
+                in_container = bool(elements) and elements[-1] == "topics"
+                if (open_topics and open_topics[-1] == _SKIPPED) or (in_container and containers[-1] != "attached"):
+                    open_topics.append(_SKIPPED)
+                else:
+                    topics.append([open_topics[-1] if open_topics else ROOT, "", None, []])
+                    open_topics.append(len(topics) - 1)
+            elif name == "topics":
+                containers.append(element.get("type"))
+            elements.append(name)
+            continue
+
+        elements.pop()
+        if name == "topic":
+            open_topics.pop()
+            element.clear()
+            continue
+        if name == "topics":
+            containers.pop()
+            continue
+        current = open_topics[-1] if open_topics else _SKIPPED
+        if current == _SKIPPED:
+            continue
+        if name == "title" and elements[-1:] == ["topic"]:
+            topics[current][1] = element.text or ""
+        elif name == "plain" and elements[-2:] == ["topic", "notes"]:
+            topics[current][2] = element.text
+        elif name == "label" and elements[-2:] == ["topic", "labels"] and element.text:
+            topics[current][3].append(element.text)
+    return [tuple(topic) for topic in topics]
+
+
+def build_cases(topics: List[Topic]) -> Tuple[List[Tuple[int, str]], List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Map flattened topics to modules and cases
+
+    Returns:
+        (modules as (parent module index, name) with parents first, cases
+        with a module index and FunctionalCase fields, errors as
+        {topic, message} of skipped topics)
+    """
+    kinds: List[int] = []
+    owners: List[Any] = []  # Module index, case index or (case index, step index) per topic
+    modules: List[Tuple[int, str]] = []
+    cases: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+
+    for parent, title, notes, labels in topics:
+        title = title.strip()
+        parent_kind = kinds[parent] if parent != ROOT else _MODULE
+        kind, owner = _IGNORED, None
+        if parent_kind == _MODULE:
+            module = owners[parent] if parent != ROOT else ROOT
+            name = _strip_prefix(title, CASE_PREFIXES)
+            if name is not None:
+                if not name:
+                    errors.append({"topic": title, "message": "Name is required"})
+                elif len(name) > MAX_NAME_LENGTH:
+                    errors.append({"topic": name[:50], "message": f"Name exceeds {MAX_NAME_LENGTH} characters"})
+                else:
+                    cases.append({
+                        "module": module,
+                        "name": name,
+                        "prerequisite": [],
+                        "remark": [],
+                        "notes": notes,
+                        "tags": list(labels),
+                        "steps": [],
+                    })
+                    kind, owner = _CASE, len(cases) - 1
+            elif len(title) > MAX_NAME_LENGTH:
+                errors.append({"topic": title[:50], "message": f"Module name exceeds {MAX_NAME_LENGTH} characters; its topics were skipped"})
+            elif title:
+                modules.append((module, title))
+                kind, owner = _MODULE, len(modules) - 1
+        elif parent_kind == _CASE:
+            case = cases[owners[parent]]
+            for prefixes, field in ((PREREQUISITE_PREFIXES, "prerequisite"), (REMARK_PREFIXES, "remark")):
+                value = _strip_prefix(title, prefixes)
+                if value is not None:
+                    if value:
+                        case[field].append(value)
+                    break
+            else:
+                value = _strip_prefix(title, TAG_PREFIXES)
+                if value is not None:
+                    case["tags"].extend(TAG_SEPARATORS.split(value))
+                elif title:
+                    case["steps"].append({"num": len(case["steps"]) + 1, "desc": title, "result": ""})
+                    kind, owner = _STEP, (owners[parent], len(case["steps"]) - 1)
+        elif parent_kind == _STEP and title:
+            case_index, step_index = owners[parent]
+            step = cases[case_index]["steps"][step_index]
+            step["result"] = f"{step['result']}\n{title}" if step["result"] else title
+        kinds.append(kind)
+        owners.append(owner)
+
+    valid_cases = []
+    for case in cases:
+        tags = [tag.strip() for tag in case.pop("tags") if tag.strip()]
+        case["tags"] = json.dumps(list(dict.fromkeys(tags)), ensure_ascii=False) if tags else None
+        if case["tags"] and len(case["tags"]) > MAX_TAGS_LENGTH:
+            errors.append({"topic": case["name"], "message": f"Tags exceed {MAX_TAGS_LENGTH} characters"})
+            continue
+        notes = case.pop("notes")
+        remark = case.pop("remark")
+        case["description"] = "\n".join(remark) or (notes.strip() if notes and notes.strip() else None)
+        case["prerequisite"] = "\n".join(case["prerequisite"]) or None
+        case["steps"] = json.dumps(case["steps"], ensure_ascii=False) if case["steps"] else None
+        case["case_edit_type"] = "STEP"
+        case["review_status"] = "UN_REVIEWED"
+        case["text_description"] = None
+        case["expected_result"] = None
+        valid_cases.append(case)
+    return modules, valid_cases, errors
+
+
+def read_xmind(source: Union[bytes, BinaryIO]):
+    """
+    Parse an .xmind archive (Zen or Classic) into modules and cases
+
+    Returns:
+        See build_cases
+
+    Raises:
+        ValueError: Not an XMind file
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        with zipfile.ZipFile(source) as archive:
+            names = set(archive.namelist())
+            # Zen files also carry a placeholder content.xml
+            if "content.json" in names:
+                try:
+                    topics = parse_xmind_zen(json.loads(archive.read("content.json")))
+                except RecursionError:
+                    raise ValueError("XMind content is nested too deeply")
+            elif "content.xml" in names:
+                with archive.open("content.xml") as stream:
+                    topics = parse_xmind_classic(stream)
+            else:
+                raise ValueError("Invalid XMind file format")
+    except zipfile.BadZipFile:
+        raise ValueError("Invalid XMind file: not a valid ZIP archive")
+    except (json.JSONDecodeError, ET.ParseError, AttributeError, TypeError) as e:
+        raise ValueError(f"Invalid XMind content: {e}")
+    return build_cases(topics)
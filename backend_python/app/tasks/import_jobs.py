@@ -0,0 +1,80 @@
+"""
+Import Job Tasks
+"""
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.logging import logger
+from typing import Any, Optional
+import asyncio
+import uuid
+
+
+@celery_app.task(
+    bind=True,
+    name="app.tasks.import_jobs.run_import_job",
+    acks_late=True,  # Redelivered if the worker dies mid-import
+    reject_on_worker_lost=True,
+)
+def run_import_job_task(self, job_id: str):
+    """Run a background import job from its last checkpoint"""
+    logger.info(f"Running import job: {job_id}")
+    try:
+        job_status = asyncio.run(_run_import_job(job_id))
+        return {"job_id": job_id, "status": job_status}
+    except Exception as e:
+        logger.error(f"Error running import job {job_id}: {e}")
+        raise
+
+
+@celery_app.task(bind=True, name="app.tasks.import_jobs.resume_stalled_import_jobs")
+def resume_stalled_import_jobs_task(self):
+    """Re-queue import jobs that stopped sending heartbeats or never started"""
+    try:
+        resumed = asyncio.run(_resume_stalled_import_jobs())
+        if resumed:
+            logger.info(f"Re-queued {resumed} stalled import jobs")
+        return {"resumed": resumed}
+    except Exception as e:
+        logger.error(f"Error resuming stalled import jobs: {e}")
+        raise
+
+
+async def _with_store(work) -> Any:
+    """Run ``work(store)`` with connections of this run's event loop"""
+    from app.core.database import async_engine
+    from app.core.redis import redis_client
+    from app.services.import_job_service import ImportJobStore
+
+    try:
+        return await work(ImportJobStore(await redis_client.get_client()))
+    finally:
+        # Pooled connections belong to this run's event loop
+        await redis_client.disconnect()
+        await async_engine.dispose()
+
+
+async def _run_import_job(job_id: str) -> Optional[str]:
+    from app.core.database import AsyncSessionLocal
+    from app.services.import_job_service import run_import_job
+
+    async def work(store):
+        # Unique per run, so a redelivered task is a different owner
+        return await run_import_job(store, job_id, uuid.uuid4().hex, AsyncSessionLocal)
+
+    return await _with_store(work)
+
+
+async def _resume_stalled_import_jobs() -> int:
+    async def work(store):
+        resumed = 0
+        for job_id in await store.stalled(settings.IMPORT_JOB_STALL_SECONDS * 1000):
+            if await store.get(job_id) is None:
+                # State expired
+                await store.forget(job_id)
+                continue
+            await store.touch(job_id)
+            run_import_job_task.delay(job_id)
+            resumed += 1
+        return resumed
+
+    return await _with_store(work)
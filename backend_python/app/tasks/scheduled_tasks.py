@@ -3,8 +3,9 @@ Scheduled Tasks
 """
 from app.core.celery_app import celery_app
 from app.core.logging import logger
-from typing import List, Dict
+from typing import Any, List, Dict
 import asyncio
+import time
 
 
 @celery_app.task(bind=True, name="app.tasks.scheduled_tasks.execute_scheduled_test_plans")
@@ -46,20 +47,91 @@ def cleanup_old_reports_task(self, days_to_keep: int = 90):
 
 @celery_app.task(bind=True, name="app.tasks.scheduled_tasks.generate_daily_statistics")
 def generate_daily_statistics_task(self):
-    """Generate daily statistics"""
+    """Reconcile project statistics and summarize yesterday's executions"""
     logger.info("Generating daily statistics")
     try:
-        # TODO: Aggregate statistics from various sources
-        # Store in database or cache
-        statistics = {
-            "total_tests": 0,
-            "passed_tests": 0,
-            "failed_tests": 0,
-            "total_bugs": 0,
-        }
-        logger.info("Daily statistics generated")
+        statistics = asyncio.run(_generate_daily_statistics())
+        logger.info(f"Daily statistics generated for {statistics['projects']} projects")
         return statistics
     except Exception as e:
         logger.error(f"Error generating daily statistics: {e}")
         raise
 
+
+@celery_app.task(bind=True, name="app.tasks.scheduled_tasks.rollup_execution_history")
+def rollup_execution_history_task(self):
+    """Fold newly finished reports into the execution rollups"""
+    try:
+        result = asyncio.run(_rollup_execution_history())
+        logger.info(f"Rolled up {result['consumed']} reports, pruned {result['pruned']} buckets")
+        return result
+    except Exception as e:
+        logger.error(f"Error rolling up execution history: {e}")
+        raise
+
+
+@celery_app.task(bind=True, name="app.tasks.scheduled_tasks.collect_file_blobs")
+def collect_file_blobs_task(self):
+    """Delete stored file blobs no longer referenced by any record"""
+    try:
+        removed = asyncio.run(_collect_file_blobs())
+        logger.info(f"Deleted {removed} unreferenced file blobs")
+        return {"removed": removed}
+    except Exception as e:
+        logger.error(f"Error collecting file blobs: {e}")
+        raise
+
+
+async def _run_in_session(work) -> Any:
+    """Run ``work(session)`` in a fresh session of this run's event loop"""
+    from app.core.database import AsyncSessionLocal, async_engine
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            return await work(session)
+    finally:
+        # Pooled connections belong to this run's event loop
+        await async_engine.dispose()
+
+
+async def _generate_daily_statistics() -> Dict:
+    """Recompute all project counters and summarize the previous UTC day"""
+    from app.services.project_statistics_service import ProjectStatisticsService, STATISTICS_FIELDS
+    from app.services.execution_rollup_service import ExecutionRollupService, RESOLUTIONS
+    
+    async def work(session):
+        counts = await ProjectStatisticsService(session).reconcile()
+        await session.commit()
+        
+        day = RESOLUTIONS["day"]
+        day_end = int(time.time() * 1000) // day * day
+        executions = await ExecutionRollupService(session).get_summary(None, day_end - day, day_end)
+        return counts, executions
+    
+    counts, executions = await _run_in_session(work)
+    totals = {field: sum(values[field] for values in counts.values()) for field in STATISTICS_FIELDS}
+    return {"projects": len(counts), **totals, "executions": executions}
+
+
+async def _rollup_execution_history() -> Dict:
+    """Consume all report sources, then drop buckets past their retention"""
+    from app.services.execution_rollup_service import ExecutionRollupService
+    
+    async def work(session):
+        service = ExecutionRollupService(session)
+        consumed = await service.consume_all()
+        pruned = await service.prune()
+        await session.commit()
+        return {"consumed": sum(consumed.values()), "pruned": pruned, "sources": consumed}
+    
+    return await _run_in_session(work)
+
+
+async def _collect_file_blobs() -> int:
+    """Remove blobs unreferenced for longer than the grace period"""
+    from app.services.blob_storage_service import BlobStorageService
+    
+    async def work(session):
+        return await BlobStorageService(session).collect_garbage()
+    
+    return await _run_in_session(work)
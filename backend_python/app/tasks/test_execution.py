@@ -2,6 +2,7 @@
 Test Execution Tasks
 """
 from app.core.celery_app import celery_app
+from app.core.execution_progress import ExecutionProgressReporter
 from app.core.logging import logger
 from typing import Optional, Dict
 import asyncio
@@ -11,18 +12,23 @@ import asyncio
 def execute_api_test_task(self, test_case_id: str, environment_id: Optional[str] = None):
     """Execute API test asynchronously"""
     logger.info(f"Executing API test: {test_case_id}")
+    # Start is announced by ApiTestService.execute_api_test
+    progress = ExecutionProgressReporter(test_case_id)
     try:
         # TODO: Implement actual API test execution
-        # This should call the API test service to execute the test
+        # This should call the API test service to execute the test,
+        # reporting each request/assertion through progress.step()
         result = {
             "test_case_id": test_case_id,
             "status": "success",
             "environment_id": environment_id,
         }
+        progress.finished(result["status"])
         logger.info(f"API test execution completed: {test_case_id}")
         return result
     except Exception as e:
         logger.error(f"Error executing API test {test_case_id}: {e}")
+        progress.finished("error", error=str(e))
         raise
 
 
@@ -30,18 +36,23 @@ def execute_api_test_task(self, test_case_id: str, environment_id: Optional[str]
 def execute_test_plan_task(self, plan_id: str, environment_id: Optional[str] = None):
     """Execute test plan asynchronously"""
     logger.info(f"Executing test plan: {plan_id}")
+    progress = ExecutionProgressReporter(plan_id)
     try:
+        progress.started(task_id=self.request.id, environment_id=environment_id)
         # TODO: Implement actual test plan execution
-        # This should call the test plan service to execute all tests in the plan
+        # This should call the test plan service to execute all tests in the plan,
+        # reporting each case through progress.step()
         result = {
             "plan_id": plan_id,
             "status": "success",
             "environment_id": environment_id,
         }
+        progress.finished(result["status"])
         logger.info(f"Test plan execution completed: {plan_id}")
         return result
     except Exception as e:
         logger.error(f"Error executing test plan {plan_id}: {e}")
+        progress.finished("error", error=str(e))
         raise
 
 
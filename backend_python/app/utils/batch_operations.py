@@ -1,251 +1,218 @@
 """
 Batch operation utilities for performance optimization
+
+Set-based bulk operations: each chunk is one statement (``IN (...)`` select,
+multi-row INSERT, executemany UPDATE, single-statement soft delete), with
+chunk sizes derived from the driver's bound-parameter limit.
 """
-from typing import List, TypeVar, Callable, Awaitable, Dict, Any
-import asyncio
+from typing import List, TypeVar, Dict, Any, Iterator, Sequence, Optional
+import time
+
+from sqlalchemy import select, insert, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import logger
 
 T = TypeVar('T')
 
+# Maximum bound parameters per statement by dialect
+MAX_PARAMS_BY_DIALECT = {
+    "mysql": 65535,
+    "postgresql": 32767,
+    "sqlite": 999,
+}
+DEFAULT_MAX_PARAMS = 999
 
-class BatchProcessor:
-    """Batch processor for bulk operations"""
-    
-    def __init__(self, batch_size: int = 100):
-        """
-        Initialize batch processor
-        
-        Args:
-            batch_size: Size of each batch
-        """
-        self.batch_size = batch_size
-    
-    async def batch_get(
-        self,
-        get_func: Callable[[str], Awaitable[Optional[T]]],
+# Upper bound on rows per statement regardless of parameter headroom
+MAX_ROWS_PER_STATEMENT = 1000
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """Split a sequence into chunks of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def get_chunk_size(db: AsyncSession, params_per_row: int = 1) -> int:
+    """
+    Get rows per statement that stay within the driver's parameter limit
+
+    Args:
+        db: Database session
+        params_per_row: Bound parameters each row contributes
+
+    Returns:
+        Rows per statement
+    """
+    dialect = db.bind.dialect.name if db.bind is not None else None
+    max_params = MAX_PARAMS_BY_DIALECT.get(dialect, DEFAULT_MAX_PARAMS)
+    return max(1, min(MAX_ROWS_PER_STATEMENT, max_params // max(1, params_per_row)))
+
+
+class BulkOperations:
+    """Set-based bulk operations"""
+
+    @staticmethod
+    async def bulk_get(
+        db: AsyncSession,
+        model_class: type,
         ids: List[str],
-    ) -> Dict[str, T]:
+        key: str = "id",
+        include_deleted: bool = False,
+    ) -> Dict[str, Any]:
         """
-        Batch get items
-        
+        Get rows by IDs with one ``IN (...)`` query per chunk
+
         Args:
-            get_func: Async function to get single item by ID
+            db: Database session
+            model_class: SQLAlchemy model class
             ids: List of IDs
-        
+            key: Key column name
+            include_deleted: Whether to include soft-deleted rows
+
         Returns:
-            Dictionary mapping ID to item
+            Dictionary mapping ID to instance (missing IDs are omitted)
         """
+        key_column = getattr(model_class, key)
+        unique_ids = list(dict.fromkeys(ids))
         results = {}
-        
-        # Process in batches
-        for i in range(0, len(ids), self.batch_size):
-            batch_ids = ids[i:i + self.batch_size]
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(
-                *[get_func(id) for id in batch_ids],
-                return_exceptions=True
-            )
-            
-            # Collect results
-            for id, result in zip(batch_ids, batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error getting item {id}: {result}")
-                elif result is not None:
-                    results[id] = result
-        
-        return results
-    
-    async def batch_create(
-        self,
-        create_func: Callable[[Any], Awaitable[T]],
-        items: List[Any],
-    ) -> List[T]:
-        """
-        Batch create items
-        
-        Args:
-            create_func: Async function to create single item
-            items: List of items to create
-        
-        Returns:
-            List of created items
-        """
-        results = []
-        
-        # Process in batches
-        for i in range(0, len(items), self.batch_size):
-            batch_items = items[i:i + self.batch_size]
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(
-                *[create_func(item) for item in batch_items],
-                return_exceptions=True
-            )
-            
-            # Collect results
-            for item, result in zip(batch_items, batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error creating item: {result}")
-                else:
-                    results.append(result)
-        
-        return results
-    
-    async def batch_update(
-        self,
-        update_func: Callable[[str, Any], Awaitable[T]],
-        updates: Dict[str, Any],
-    ) -> List[T]:
-        """
-        Batch update items
-        
-        Args:
-            update_func: Async function to update single item
-            updates: Dictionary mapping ID to update data
-        
-        Returns:
-            List of updated items
-        """
-        results = []
-        items = list(updates.items())
-        
-        # Process in batches
-        for i in range(0, len(items), self.batch_size):
-            batch_items = items[i:i + self.batch_size]
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(
-                *[update_func(id, data) for id, data in batch_items],
-                return_exceptions=True
-            )
-            
-            # Collect results
-            for (id, _), result in zip(batch_items, batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error updating item {id}: {result}")
-                else:
-                    results.append(result)
-        
-        return results
-    
-    async def batch_delete(
-        self,
-        delete_func: Callable[[str], Awaitable[bool]],
-        ids: List[str],
-    ) -> int:
-        """
-        Batch delete items
-        
-        Args:
-            delete_func: Async function to delete single item
-            ids: List of IDs to delete
-        
-        Returns:
-            Number of successfully deleted items
-        """
-        deleted_count = 0
-        
-        # Process in batches
-        for i in range(0, len(ids), self.batch_size):
-            batch_ids = ids[i:i + self.batch_size]
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(
-                *[delete_func(id) for id in batch_ids],
-                return_exceptions=True
-            )
-            
-            # Count successes
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Error deleting item: {result}")
-                elif result:
-                    deleted_count += 1
-        
-        return deleted_count
 
+        for chunk in chunked(unique_ids, get_chunk_size(db)):
+            query = select(model_class).where(key_column.in_(chunk))
+            if not include_deleted and hasattr(model_class, "deleted"):
+                query = query.where(model_class.deleted == False)
+            rows = await db.execute(query)
+            for instance in rows.scalars():
+                results[getattr(instance, key)] = instance
+
+        return results
 
-class BulkInsert:
-    """Bulk insert utilities"""
-    
     @staticmethod
     async def bulk_insert(
         db: AsyncSession,
         model_class: type,
         items: List[Dict[str, Any]],
-        batch_size: int = 1000,
+        commit: bool = True,
     ) -> int:
         """
-        Bulk insert items
-        
+        Insert rows with one executemany INSERT per chunk (multi-row on MySQL)
+
+        Python-side column defaults (e.g. create_time) are applied per row.
+
         Args:
             db: Database session
             model_class: SQLAlchemy model class
-            items: List of item dictionaries
-            batch_size: Size of each batch
-        
+            items: List of row dictionaries (all with the same keys)
+            commit: Whether to commit after inserting
+
         Returns:
-            Number of inserted items
+            Number of inserted rows
         """
+        if not items:
+            return 0
+
+        table = model_class.__table__
+        # Defaulted columns add parameters too, so size chunks on the full width
+        chunk_size = get_chunk_size(db, len(table.columns))
         inserted_count = 0
-        
-        # Process in batches
-        for i in range(0, len(items), batch_size):
-            batch_items = items[i:i + batch_size]
-            
-            # Create model instances
-            instances = [model_class(**item) for item in batch_items]
-            
-            # Bulk insert
-            db.add_all(instances)
-            await db.flush()
-            
-            inserted_count += len(instances)
-        
-        await db.commit()
+
+        for chunk in chunked(items, chunk_size):
+            # executemany keeps one cached compiled statement; the MySQL
+            # driver rewrites it into a multi-row INSERT
+            await db.execute(insert(table), list(chunk))
+            inserted_count += len(chunk)
+
+        if commit:
+            await db.commit()
         return inserted_count
-    
+
     @staticmethod
     async def bulk_update(
         db: AsyncSession,
         model_class: type,
         updates: List[Dict[str, Any]],
         update_key: str = "id",
-        batch_size: int = 1000,
+        commit: bool = True,
     ) -> int:
         """
-        Bulk update items
-        
+        Update rows with executemany UPDATE ... WHERE key = :key
+
+        Rows are grouped by the set of columns they change, so each group is
+        one prepared statement executed with a list of parameter sets.
+
         Args:
             db: Database session
             model_class: SQLAlchemy model class
             updates: List of update dictionaries (must include update_key)
-            update_key: Key to identify items to update
-            batch_size: Size of each batch
-        
+            update_key: Key to identify rows to update
+            commit: Whether to commit after updating
+
         Returns:
-            Number of updated items
+            Number of updated rows
         """
+        table = model_class.__table__
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+
+        for update_data in updates:
+            columns = tuple(sorted(column for column in update_data if column != update_key))
+            if not columns:
+                continue
+            # Bind names must not collide with column names in UPDATE ... SET
+            params = {f"b_{column}": update_data[column] for column in columns}
+            params["b_key"] = update_data[update_key]
+            groups.setdefault(columns, []).append(params)
+
         updated_count = 0
-        
-        # Process in batches
-        for i in range(0, len(updates), batch_size):
-            batch_updates = updates[i:i + batch_size]
-            
-            for update_data in batch_updates:
-                key_value = update_data.pop(update_key)
-                await db.execute(
-                    db.query(model_class)
-                    .filter(getattr(model_class, update_key) == key_value)
-                    .update(update_data)
-                )
-            
-            await db.flush()
-            updated_count += len(batch_updates)
-        
-        await db.commit()
+        for columns, params_list in groups.items():
+            statement = (
+                update(table)
+                .where(table.c[update_key] == bindparam("b_key"))
+                .values({column: bindparam(f"b_{column}") for column in columns})
+            )
+            for chunk in chunked(params_list, MAX_ROWS_PER_STATEMENT):
+                result = await db.execute(statement, list(chunk))
+                updated_count += result.rowcount if result.rowcount and result.rowcount > 0 else 0
+
+        if commit:
+            await db.commit()
         return updated_count
 
+    @staticmethod
+    async def bulk_soft_delete(
+        db: AsyncSession,
+        model_class: type,
+        ids: List[str],
+        delete_user: Optional[str] = None,
+        key: str = "id",
+        commit: bool = True,
+    ) -> int:
+        """
+        Soft delete rows with one UPDATE ... WHERE key IN (...) per chunk
+
+        Args:
+            db: Database session
+            model_class: SQLAlchemy model class with SoftDeleteMixin
+            ids: List of IDs to delete
+            delete_user: User performing the deletion
+            key: Key column name
+            commit: Whether to commit after deleting
+
+        Returns:
+            Number of rows deleted (already deleted rows are not counted)
+        """
+        table = model_class.__table__
+        delete_time = int(time.time() * 1000)
+        deleted_count = 0
+
+        for chunk in chunked(list(dict.fromkeys(ids)), get_chunk_size(db)):
+            result = await db.execute(
+                update(table)
+                .where(table.c[key].in_(chunk), table.c.deleted == False)
+                .values(deleted=True, delete_time=delete_time, delete_user=delete_user)
+            )
+            deleted_count += result.rowcount
+
+        if commit:
+            await db.commit()
+        logger.debug(f"Soft deleted {deleted_count} rows from {table.name}")
+        return deleted_count
@@ -38,6 +38,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page: int
     page_size: int
     pages: int
+    total_exact: bool = True  # False when total is an estimate
     
     @property
     def has_next(self) -> bool:
@@ -0,0 +1,85 @@
+"""
+Streaming ZIP Archives
+
+Builds a ZIP archive on the fly from entries whose content arrives in
+chunks, yielding archive bytes as they are produced. Nothing is written to
+disk; memory holds about one chunk. Entries use data descriptors (the
+output is not seekable) and ZIP64 when they may exceed 4GB.
+"""
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple, Optional
+import time
+import zipfile
+
+# Already compressed formats are stored as-is
+STORED_EXTENSIONS = {
+    'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'jar',
+    'png', 'jpg', 'jpeg', 'gif', 'webp',
+    'xlsx', 'docx', 'pptx', 'xmind', 'pdf',
+}
+
+
+class ZipEntry(NamedTuple):
+    """A file to add to a streamed archive"""
+    name: str
+    chunks: Iterable[bytes]
+    size: Optional[int] = None
+    modified: Optional[datetime] = None
+
+
+class _StreamBuffer:
+    """Write-only file object holding archive bytes until they are yielded"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(entry: ZipEntry) -> zipfile.ZipInfo:
+    """Archive header of an entry"""
+    modified = entry.modified.timestamp() if entry.modified else time.time()
+    # ZIP timestamps start in 1980
+    info = zipfile.ZipInfo(entry.name, date_time=max(time.localtime(modified)[:6], (1980, 1, 1, 0, 0, 0)))
+    extension = entry.name.rsplit('.', 1)[-1].lower() if '.' in entry.name else ''
+    info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    if entry.size is not None:
+        info.file_size = entry.size
+    return info
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of the entries chunk by chunk
+
+    Entries and their chunks are consumed lazily, one entry at a time.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for entry in entries:
+            try:
+                with archive.open(_zip_info(entry), "w", force_zip64=entry.size is None) as target:
+                    for chunk in entry.chunks:
+                        target.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+            finally:
+                # Release the source (e.g. a pooled connection) even if the client went away
+                close = getattr(entry.chunks, "close", None)
+                if close is not None:
+                    close()
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
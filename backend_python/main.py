@@ -4,22 +4,28 @@ MeterSphere Python Backend - Main Application Entry Point
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, read_replica_router
 from app.core.logging import setup_logging
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models import *  # noqa: F401, F403
 from app.core.redis import redis_client
-from app.core.kafka import kafka_producer
+from app.core.kafka import kafka_producer, kafka_async_producer
+from app.core.event_bus import event_bus
+from app.core.execution_progress import progress_hub
 from app.core.minio import minio_client
 from app.core.rate_limit import RateLimitMiddleware
 from app.core.request_validation import RequestValidationMiddleware
+from app.core.gzip_middleware import SelectiveGZipMiddleware
 from app.core.i18n_middleware import I18nMiddleware
 from app.core.metrics_middleware import MetricsMiddleware, StructuredLoggingMiddleware
+from app.core.health import health_checker
+from app.core.metrics import metrics_collector
+from app.core.metrics_registry import mark_process_dead
 from app.api.v1 import api_router
+from app.api.v1.endpoints.health import root_router
 
 
 @asynccontextmanager
@@ -43,13 +49,36 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"✗ MinIO connection failed: {e}")
     
-    # Kafka producer is lazy-initialized, no need to connect here
+    # Initialize Kafka async producer (the blocking producer is lazy-initialized)
+    try:
+        await kafka_async_producer.start()
+        print("✓ Kafka producer started")
+    except Exception as e:
+        print(f"✗ Kafka producer start failed: {e}")
+    
+    # Start event bus after its backend's connections
+    try:
+        await event_bus.start()
+        print(f"✓ Event bus started ({event_bus.backend.name})")
+    except Exception as e:
+        print(f"✗ Event bus start failed: {e}")
+    
+    # Background metrics sampler and health refresher
+    await metrics_collector.start()
+    await health_checker.start()
     
     yield
     
     # Shutdown
+    await health_checker.stop()
+    await metrics_collector.stop()
+    await read_replica_router.dispose()
+    await progress_hub.stop()
+    await event_bus.stop()
     await redis_client.disconnect()
+    await kafka_async_producer.stop()
     kafka_producer.close()
+    mark_process_dead()
     print("✓ Cleaned up connections")
 
 
@@ -88,10 +117,11 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Exact"],
     )
 
-    # GZip Middleware
-    app.add_middleware(GZipMiddleware, minimum_size=2048)
+    # GZip Middleware (downloads and event streams are sent uncompressed)
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=2048)
 
     # i18n Middleware (should be early in the stack)
     app.add_middleware(I18nMiddleware)
@@ -115,6 +145,7 @@ def create_application() -> FastAPI:
 
     # Include routers
     app.include_router(api_router, prefix="/api/v1")
+    app.include_router(root_router)
 
     return app
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Event bus throughput benchmark
+
+Publishes events through each backend while one subscriber consumes them,
+and reports publish throughput, end-to-end throughput and delivery latency.
+Redis and Kafka must be reachable with the configured settings.
+
+Usage:
+    python scripts/benchmark_event_bus.py --backends memory redis kafka --events 50000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.core.event_bus import EventBus, create_backend  # noqa: E402
+
+
+async def consume(subscription, expected: int, latencies: list):
+    """Collect delivery latencies until every event has arrived"""
+    async for batch in subscription:
+        now = time.perf_counter()
+        latencies.extend(now - event.value["sent_at"] for event in batch)
+        if len(latencies) >= expected:
+            return
+
+
+async def run_backend(name: str, events: int, payload_bytes: int) -> dict:
+    """Benchmark one backend"""
+    from app.core.kafka import kafka_async_producer
+    from app.core.redis import redis_client
+
+    if name == "kafka":
+        await kafka_async_producer.start()
+    if name == "redis":
+        await (await redis_client.get_client()).ping()
+    bus = EventBus(backend=create_backend(name), max_buffered=events)
+    await bus.start()
+
+    topic = f"benchmark_{uuid.uuid4().hex[:8]}"
+    latencies: list = []
+    subscription = bus.subscribe([topic], max_batch=1000, block_ms=100)
+    consumer = asyncio.create_task(consume(subscription, events, latencies))
+    # Let the subscriber attach (Kafka joins the topic, Redis records its start id)
+    await asyncio.sleep(3 if name == "kafka" else 0.2)
+
+    padding = "x" * payload_bytes
+    start = time.perf_counter()
+    for i in range(events):
+        bus.publish_nowait(topic, {"seq": i, "sent_at": time.perf_counter(), "padding": padding})
+        if i % 1000 == 999:
+            await asyncio.sleep(0)  # Let the flusher and subscriber run
+    await bus.flush()
+    published = time.perf_counter() - start
+    try:
+        await asyncio.wait_for(consumer, timeout=60)
+    except asyncio.TimeoutError:
+        pass
+    delivered = time.perf_counter() - start
+
+    await bus.stop()
+    if name == "kafka":
+        await kafka_async_producer.stop()
+    if name == "redis":
+        client = await redis_client.get_client()
+        await client.delete(f"events:{topic}")
+        await redis_client.disconnect()
+
+    latencies.sort()
+    return {
+        "backend": name,
+        "received": len(latencies),
+        "publish_per_sec": events / published,
+        "end_to_end_per_sec": len(latencies) / delivered,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None,
+        "dropped": bus.stats["dropped"],
+    }
+
+
+async def main_async(args) -> int:
+    print(f"{'backend':<8} {'received':>9} {'publish/s':>11} {'e2e/s':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for name in args.backends:
+        try:
+            result = await run_backend(name, args.events, args.payload_bytes)
+        except Exception as e:
+            print(f"{name:<8} unavailable: {e}")
+            continue
+        print(
+            f"{result['backend']:<8} {result['received']:>9} {result['publish_per_sec']:>11.0f} "
+            f"{result['end_to_end_per_sec']:>11.0f} {result['p50_ms'] or 0:>8.2f} {result['p99_ms'] or 0:>8.2f}"
+        )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare event bus backends")
+    parser.add_argument("--backends", nargs="+", default=["memory", "redis", "kafka"])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--payload-bytes", type=int, default=256)
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
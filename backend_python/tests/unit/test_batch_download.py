@@ -0,0 +1,227 @@
+"""
+Unit tests for bulk MinIO operations and streamed zip downloads
+"""
+import asyncio
+import io
+import threading
+import zipfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from minio.deleteobjects import DeleteError
+from minio.error import S3Error
+
+from app.core.minio import MinIOClient
+from app.services import file_service as file_service_module
+from app.schemas.file import BatchDownloadRequest
+from app.services.file_service import FileService, content_disposition, parse_size
+from app.utils.zip_stream import ZipEntry, stream_zip
+
+MODIFIED = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def not_found(name):
+    return S3Error("NoSuchKey", "Object does not exist", name, None, None, None)
+
+
+class FakeMinio:
+    """In-memory bucket recording bulk requests"""
+
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.delete_batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False):
+        for name in sorted(self.objects):
+            if name.startswith(prefix or ""):
+                yield SimpleNamespace(object_name=name, size=len(self.objects[name]),
+                                      last_modified=MODIFIED, etag="e")
+
+    def remove_objects(self, bucket_name, delete_object_list):
+        # Like the SDK: lazily sends requests of up to 1000 keys
+        objects = iter(delete_object_list)
+        while True:
+            batch = [obj._name for _, obj in zip(range(1000), objects)]
+            if not batch:
+                return
+            self.delete_batches.append(len(batch))
+            for name in batch:
+                if name.startswith("locked/"):
+                    yield DeleteError("AccessDenied", "Access Denied", name, None)
+                else:
+                    self.objects.pop(name, None)
+
+    def stat_object(self, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise not_found(object_name)
+        return SimpleNamespace(size=len(self.objects[object_name]), etag="e",
+                               last_modified=MODIFIED, content_type="text/plain")
+
+    def copy_object(self, bucket_name, object_name, source):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            threading.Event().wait(0.01)
+            if source.object_name not in self.objects:
+                raise not_found(source.object_name)
+            self.objects[object_name] = self.objects[source.object_name]
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        data = self.objects[object_name]
+        return SimpleNamespace(
+            stream=lambda amt: (data[i:i + amt] for i in range(0, len(data), amt)),
+            close=lambda: None,
+            release_conn=lambda: None,
+        )
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    client = MinIOClient()
+    client._client = FakeMinio({})
+    monkeypatch.setattr(file_service_module, "minio_client", client)
+    return client
+
+
+def test_stream_zip_round_trip():
+    """Streamed archives open with zipfile; compressed formats are stored"""
+    payload = b"timestamp,elapsed,label\n" * 5000
+    archive = b"".join(stream_zip([
+        ZipEntry("results.jtl", [payload[:4096], payload[4096:]], len(payload), MODIFIED),
+        ZipEntry("report/index.zip", iter([b"PK..."])),
+    ]))
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert zf.read("results.jtl") == payload
+        assert zf.read("report/index.zip") == b"PK..."
+        assert zf.getinfo("results.jtl").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("report/index.zip").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("results.jtl").date_time[0] == 2024
+
+
+def test_stream_zip_is_lazy():
+    """Archive bytes are yielded before later entries are read"""
+    opened = []
+
+    def chunks(name):
+        opened.append(name)
+        for _ in range(64):
+            yield bytes(range(256)) * 64
+
+    archive = stream_zip(ZipEntry(f"file{i}.bin", chunks(f"file{i}.bin")) for i in range(3))
+    next(archive)
+
+    assert opened == ["file0.bin"]
+    archive.close()
+
+
+def test_parse_size():
+    assert parse_size("600MB") == 600 * 1024 * 1024
+    assert parse_size("1GB") == 1024 ** 3
+    assert parse_size("512") == 512
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+async def test_iter_objects_yields_pages(storage):
+    storage._client.objects = {f"reports/{i:04d}.html": b"x" for i in range(25)}
+
+    pages = [page async for page in storage.iter_objects("reports/", page_size=10)]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert pages[0][0]["name"] == "reports/0000.html"
+
+
+async def test_delete_prefix_uses_multi_object_delete(storage):
+    """Listed pages are deleted with 1000-key requests; failures are not counted"""
+    storage._client.objects = {f"run/{i:05d}.jtl": b"x" for i in range(2500)}
+    storage._client.objects["other/keep.txt"] = b"x"
+
+    deleted = await storage.delete_prefix("run/")
+
+    assert deleted == 2500
+    assert storage._client.delete_batches == [1000, 1000, 500]
+    assert list(storage._client.objects) == ["other/keep.txt"]
+
+
+async def test_delete_many_reports_failures(storage):
+    storage._client.objects = {"a.txt": b"1", "locked/b.txt": b"2"}
+
+    failed = await storage.delete_many(["a.txt", "locked/b.txt"])
+
+    assert failed == ["locked/b.txt"]
+    assert list(storage._client.objects) == ["locked/b.txt"]
+
+
+async def test_copy_many_is_bounded(storage):
+    """Copies run in parallel up to the concurrency limit"""
+    storage._client.objects = {f"src/{i}.txt": b"x" for i in range(12)}
+    pairs = [(f"src/{i}.txt", f"dst/{i}.txt") for i in range(12)] + [("src/missing.txt", "dst/missing.txt")]
+
+    failed = await storage.copy_many(pairs, concurrency=4)
+
+    assert failed == [("src/missing.txt", "dst/missing.txt")]
+    assert 1 < storage._client.max_in_flight <= 4
+    assert all(f"dst/{i}.txt" in storage._client.objects for i in range(12))
+
+
+async def test_batch_download_of_files_and_folder(storage):
+    """Folder entries are named relative to it, files by base name without collisions"""
+    storage._client.objects = {
+        "project/1/data.csv": b"a,b\n",
+        "project/1/reports/index.html": b"<html/>",
+        "bug/9/data.csv": b"c,d\n",
+    }
+    service = FileService()
+
+    entries = await service.prepare_batch_download(["bug/9/data.csv"], folder="project/1")
+    archive = b"".join(await asyncio.to_thread(lambda: list(service.stream_zip(entries))))
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert sorted(zf.namelist()) == ["data (1).csv", "data.csv", "reports/index.html"]
+        assert zf.read("data (1).csv") == b"c,d\n"
+
+
+async def test_batch_download_limits(storage, monkeypatch):
+    storage._client.objects = {"a.bin": b"x" * 100, "b.bin": b"x" * 100}
+    service = FileService()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.prepare_batch_download(["a.bin", "missing.bin"])
+    assert exc_info.value.status_code == 404
+
+    monkeypatch.setattr(FileService, "BATCH_DOWNLOAD_MAX_SIZE", 150)
+    with pytest.raises(HTTPException) as exc_info:
+        await service.prepare_batch_download(["a.bin", "b.bin"])
+    assert exc_info.value.status_code == 413
+
+
+def test_archive_names_are_encoded_for_the_header():
+    header = content_disposition("用例 \"v2\".zip")
+
+    assert header == "attachment; filename=\"__ _v2_.zip\"; filename*=UTF-8''%E7%94%A8%E4%BE%8B%20%22v2%22.zip"
+    # Starlette encodes header values as Latin-1
+    response = StreamingResponse(iter([b""]), headers={"Content-Disposition": header})
+    assert response.headers["content-disposition"] == header
+    assert "\r" not in content_disposition("a\r\nb") and "\n" not in content_disposition("a\r\nb")
+
+
+@pytest.mark.parametrize("file_name", ["", 'a"b.zip', "a\r\nb.zip", "../b.zip", "x" * 256])
+def test_batch_download_rejects_unsafe_archive_names(file_name):
+    with pytest.raises(ValidationError):
+        BatchDownloadRequest(file_name=file_name)
+
+
+def test_batch_download_accepts_unicode_archive_names():
+    assert BatchDownloadRequest(file_name="用例.zip").file_name == "用例.zip"
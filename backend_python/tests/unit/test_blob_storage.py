@@ -0,0 +1,217 @@
+"""
+Unit tests for content-addressed blob storage
+"""
+from datetime import datetime, timedelta, timezone
+import hashlib
+import io
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.bug import Bug
+from app.models.bug_attachment import BugLocalAttachment
+from app.models.file_blob import FileBlob
+from app.services import blob_storage_service
+from app.services.bug_management_service import BugManagementService
+from app.services.blob_storage_service import STAGING_PREFIX, BlobStorageService, blob_path
+
+
+class FakeMinio:
+    """In-memory stand-in for the MinIO calls made by the blob store"""
+
+    def __init__(self):
+        self.objects = {}
+        self.modified = {}
+        self.uploads = 0
+        self.tamper = False
+
+    def upload_stream(self, file_path, stream, content_type=None, max_size=None):
+        data = stream.read()
+        if self.tamper:
+            # The stream changed after it was hashed
+            data += b" changed"
+        self.put(file_path, data)
+        self.uploads += 1
+        return {"file_path": file_path, "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+    def put(self, file_path, data, modified=None):
+        self.objects[file_path] = data
+        self.modified[file_path] = modified or datetime.now(timezone.utc)
+
+    def copy_file(self, source_path, target_path):
+        self.put(target_path, self.objects[source_path])
+
+    def file_exists(self, file_path):
+        return file_path in self.objects
+
+    def delete_file(self, file_path):
+        self.objects.pop(file_path, None)
+
+    async def iter_objects(self, prefix=""):
+        yield [
+            {"name": name, "last_modified": self.modified[name]}
+            for name in list(self.objects) if name.startswith(prefix)
+        ]
+
+    async def delete_many(self, file_paths):
+        for file_path in file_paths:
+            self.delete_file(file_path)
+        return []
+
+
+CONTENT = b"attachment bytes"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def minio(monkeypatch):
+    fake = FakeMinio()
+    monkeypatch.setattr(blob_storage_service, "minio_client", fake)
+    return fake
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """File database: rows are reserved on a second connection"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'blobs.db'}")
+    async with engine.begin() as conn:
+        for model in (FileBlob, Bug, BugLocalAttachment):
+            await conn.run_sync(model.__table__.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def ref_count(session_factory):
+    async with session_factory() as session:
+        blob = await session.get(FileBlob, DIGEST)
+        return blob and blob.ref_count
+
+
+async def test_store_uploads_once_and_counts_references(session_factory, minio):
+    async with session_factory() as session:
+        blobs = BlobStorageService(session)
+        first = await blobs.store(io.BytesIO(CONTENT), content_type="text/plain")
+        await session.commit()
+        second = await blobs.store(io.BytesIO(CONTENT))
+        await session.commit()
+
+    assert first.file_path == second.file_path == blob_path(DIGEST)
+    assert first.size == len(CONTENT) and first.content_type == "text/plain"
+    assert minio.uploads == 1
+    assert minio.objects == {blob_path(DIGEST): CONTENT}
+    assert await ref_count(session_factory) == 2
+
+
+async def test_add_reference_and_release(session_factory, minio):
+    async with session_factory() as session:
+        blobs = BlobStorageService(session)
+        assert await blobs.add_reference(DIGEST) is None
+        await blobs.store(io.BytesIO(CONTENT))
+        assert (await blobs.add_reference(DIGEST.upper())).ref_count == 2
+        await blobs.release(DIGEST)
+        await blobs.release(DIGEST)
+        await blobs.release(DIGEST)  # Never below zero
+        await session.commit()
+
+    assert await ref_count(session_factory) == 0
+
+
+async def test_rolled_back_upload_is_collected(session_factory, minio):
+    async with session_factory() as session:
+        await BlobStorageService(session).store(io.BytesIO(CONTENT))
+        await session.rollback()
+
+    # The object is uploaded but unreferenced; its row survived the rollback
+    assert await ref_count(session_factory) == 0
+    async with session_factory() as session:
+        assert await BlobStorageService(session).collect_garbage(grace_seconds=-1) == 1
+
+    assert await ref_count(session_factory) is None
+    assert minio.objects == {}
+
+
+async def test_row_without_object_is_uploaded_again(session_factory, minio):
+    async with session_factory() as session:
+        await BlobStorageService(session).store(io.BytesIO(CONTENT))
+        await session.commit()
+    minio.objects.clear()
+
+    async with session_factory() as session:
+        await BlobStorageService(session).store(io.BytesIO(CONTENT))
+        await session.commit()
+
+    assert minio.uploads == 2
+    assert minio.objects == {blob_path(DIGEST): CONTENT}
+    assert await ref_count(session_factory) == 2
+
+
+async def test_changed_content_is_not_stored_under_the_digest(session_factory, minio):
+    minio.tamper = True
+    async with session_factory() as session:
+        with pytest.raises(ValueError, match="changed"):
+            await BlobStorageService(session).store(io.BytesIO(CONTENT))
+        await session.rollback()
+    assert minio.objects == {}
+
+    # The reserved row has no object, so the next upload of the content stores it
+    minio.tamper = False
+    async with session_factory() as session:
+        await BlobStorageService(session).store(io.BytesIO(CONTENT))
+        await session.commit()
+    assert minio.objects == {blob_path(DIGEST): CONTENT}
+    assert await ref_count(session_factory) == 1
+
+
+async def test_collect_garbage_sweeps_stale_staged_uploads(session_factory, minio):
+    minio.put(f"{STAGING_PREFIX}old", b"x", modified=datetime.now(timezone.utc) - timedelta(hours=2))
+    minio.put(f"{STAGING_PREFIX}new", b"x")
+
+    async with session_factory() as session:
+        assert await BlobStorageService(session).collect_garbage(grace_seconds=3600) == 0
+
+    assert list(minio.objects) == [f"{STAGING_PREFIX}new"]
+
+
+async def test_collect_garbage_keeps_referenced_and_recent_blobs(session_factory, minio):
+    other = b"other bytes"
+    async with session_factory() as session:
+        blobs = BlobStorageService(session)
+        await blobs.store(io.BytesIO(CONTENT))
+        # SQLite locks the whole file: no reservation while this transaction writes
+        await session.commit()
+        await blobs.store(io.BytesIO(other))
+        await blobs.release(hashlib.sha256(other).hexdigest())
+        await session.commit()
+
+        # Released just now: within the grace period
+        assert await blobs.collect_garbage(grace_seconds=3600) == 0
+        await session.execute(update(FileBlob).values(update_time=0))
+        await session.commit()
+        assert await blobs.collect_garbage(grace_seconds=3600) == 1
+
+        result = await session.execute(select(FileBlob.sha256))
+        assert result.scalars().all() == [DIGEST]
+    assert list(minio.objects) == [blob_path(DIGEST)]
+
+
+async def test_digest_attach_needs_the_content_in_the_project(session_factory, minio):
+    async with session_factory() as session:
+        session.add_all([
+            Bug(id=bug_id, project_id=project_id, title=bug_id, handle_user="u", template_id="t",
+                platform="Local", status="new")
+            for bug_id, project_id in (("b1", "p1"), ("b2", "p1"), ("other", "p2"))
+        ])
+        await session.commit()
+        bugs = BugManagementService(session)
+        await bugs.upload_bug_attachment("b1", "data.csv", file=io.BytesIO(CONTENT))
+
+        # Knowing the digest is enough only where the project already has the bytes
+        assert await bugs.upload_bug_attachment("other", "copy.csv", sha256=DIGEST) is None
+        attachment = await bugs.upload_bug_attachment("b2", "copy.csv", sha256=DIGEST.upper())
+        assert attachment.file_id == blob_path(DIGEST)
+        with pytest.raises(ValueError):
+            await bugs.upload_bug_attachment("b2", "copy.csv", sha256="not-a-digest")
+
+    assert minio.uploads == 1
+    assert await ref_count(session_factory) == 2
@@ -0,0 +1,127 @@
+"""
+Unit tests for set-based bulk operations
+"""
+import time
+
+import pytest
+from sqlalchemy import BigInteger, Boolean, Column, String, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.utils.batch_operations import BulkOperations, get_chunk_size
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """Minimal soft-deletable table"""
+    __tablename__ = "bulk_item"
+
+    id = Column(String(50), primary_key=True)
+    name = Column(String(255))
+    status = Column(String(50))
+    create_time = Column(BigInteger, default=lambda: int(time.time() * 1000))
+    deleted = Column(Boolean, default=False, nullable=False)
+    delete_time = Column(BigInteger)
+    delete_user = Column(String(50))
+
+
+@pytest.fixture
+async def engine():
+    """In-memory database engine"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine):
+    """Session on the in-memory database"""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+
+
+def count_statements(engine):
+    """Record executed SQL statements (executemany counts once)"""
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_uses_chunked_multi_row_inserts(engine, db):
+    """Test rows are inserted in parameter-limited chunks with per-row defaults"""
+    statements = count_statements(engine)
+    rows = [{"id": f"item-{i:04d}", "name": f"n{i}", "status": "NEW"} for i in range(500)]
+
+    inserted = await BulkOperations.bulk_insert(db, Item, rows)
+
+    chunk_size = get_chunk_size(db, len(Item.__table__.columns))
+    inserts = [s for s in statements if s.startswith("INSERT")]
+    assert inserted == 500
+    assert len(inserts) == -(-500 // chunk_size)
+    items = (await db.execute(select(Item))).scalars().all()
+    assert len(items) == 500
+    assert all(item.create_time and item.deleted is False for item in items)
+
+
+@pytest.mark.asyncio
+async def test_bulk_get_skips_missing_and_deleted(db):
+    """Test bulk get maps found IDs only"""
+    await BulkOperations.bulk_insert(db, Item, [
+        {"id": "a", "name": "a", "status": "NEW", "deleted": False},
+        {"id": "b", "name": "b", "status": "NEW", "deleted": True},
+    ])
+
+    found = await BulkOperations.bulk_get(db, Item, ["a", "b", "missing", "a"])
+
+    assert list(found) == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_groups_by_changed_columns(engine, db):
+    """Test one executemany UPDATE per distinct set of changed columns"""
+    await BulkOperations.bulk_insert(db, Item, [
+        {"id": f"item-{i}", "name": f"n{i}", "status": "NEW"} for i in range(6)
+    ])
+    statements = count_statements(engine)
+
+    updated = await BulkOperations.bulk_update(db, Item, [
+        {"id": "item-0", "status": "DONE"},
+        {"id": "item-1", "status": "DONE"},
+        {"id": "item-2", "status": "OPEN", "name": "renamed"},
+        {"id": "missing", "status": "DONE"},
+    ])
+
+    updates = [s for s in statements if s.startswith("UPDATE")]
+    assert len(updates) == 2
+    assert updated == 3
+    items = {item.id: item for item in (await db.execute(select(Item))).scalars()}
+    assert items["item-0"].status == "DONE"
+    assert (items["item-2"].status, items["item-2"].name) == ("OPEN", "renamed")
+    assert items["item-3"].status == "NEW"
+
+
+@pytest.mark.asyncio
+async def test_bulk_soft_delete_is_single_statement(engine, db):
+    """Test soft delete marks rows in one UPDATE and skips deleted rows"""
+    await BulkOperations.bulk_insert(db, Item, [
+        {"id": f"item-{i}", "name": f"n{i}", "status": "NEW"} for i in range(5)
+    ])
+    statements = count_statements(engine)
+
+    deleted = await BulkOperations.bulk_soft_delete(db, Item, ["item-0", "item-1", "missing"], "admin")
+    deleted_again = await BulkOperations.bulk_soft_delete(db, Item, ["item-0"], "admin")
+
+    assert deleted == 2
+    assert deleted_again == 0
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 2
+    item = (await db.execute(select(Item).where(Item.id == "item-0"))).scalar_one()
+    assert item.deleted is True and item.delete_user == "admin" and item.delete_time
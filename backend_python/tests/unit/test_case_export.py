@@ -0,0 +1,110 @@
+"""
+Unit tests for exporting functional cases to Excel
+"""
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.functional_case import FunctionalCase, FunctionalCaseBlob
+from app.services.case_management_service import CASE_EXCEL_COLUMNS, CaseManagementService
+
+CREATE_TIME = 1700000000000
+
+
+def case(case_id, pos, **values):
+    return {
+        "id": case_id,
+        "num": 100 + pos,
+        "module_id": "root",
+        "project_id": "p1",
+        "template_id": "default",
+        "name": f"Case {case_id}",
+        "review_status": "UN_REVIEWED",
+        "tags": '["smoke"]',
+        "case_edit_type": "STEP",
+        "pos": pos,
+        "version_id": "v1",
+        "ref_id": case_id,
+        "last_execute_result": "UN_EXECUTED",
+        "create_user": "admin",
+        "create_time": CREATE_TIME + pos,
+        **values,
+    }
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with a few cases and their blobs"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(FunctionalCase.__table__.create)
+        await conn.run_sync(FunctionalCaseBlob.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            FunctionalCase(**case("c2", 2, name="Login\x01 with\x1b bad chars")),
+            FunctionalCase(**case("c1", 1)),
+            FunctionalCase(**case("c3", 3)),
+            FunctionalCase(**case("old", 0, latest=False)),
+            FunctionalCase(**case("gone", 4, deleted=True)),
+            FunctionalCaseBlob(
+                id="c1",
+                steps='[{"desc": "open", "result": "ok"}]',
+                prerequisite="Logged out",
+                expected_result="Home page",
+                description="note\x07",
+            ),
+            FunctionalCaseBlob(id="c2", text_description="Type the password"),
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def read_back(output):
+    try:
+        workbook = load_workbook(output, read_only=True)
+        rows = [list(row) for row in workbook["用例"].iter_rows(values_only=True)]
+        workbook.close()
+        return rows
+    finally:
+        output.close()
+
+
+def column(header):
+    return [title for title, _ in CASE_EXCEL_COLUMNS].index(header)
+
+
+async def test_project_export_reads_back(db):
+    rows = await read_back(await CaseManagementService(db).export_cases_to_excel(project_id="p1"))
+
+    assert rows[0] == [title for title, _ in CASE_EXCEL_COLUMNS]
+    # Latest, undeleted cases in list order
+    assert [row[0] for row in rows[1:]] == ["c1", "c2", "c3"]
+
+    first, second, third = rows[1:]
+    assert first[column("编号")] == 101
+    assert first[column("步骤")] == '[{"desc": "open", "result": "ok"}]'
+    assert first[column("前置条件")] == "Logged out"
+    assert first[column("预期结果")] == "Home page"
+    assert first[column("备注")] == "note"
+    assert second[column("名称")] == "Login with bad chars"
+    assert second[column("步骤描述")] == "Type the password"
+    assert second[column("步骤")] is None
+    # No blob row at all
+    assert [third[column(title)] for title in ("前置条件", "步骤", "步骤描述", "预期结果", "备注")] == [None] * 5
+    assert first[column("创建时间")] == datetime.fromtimestamp((CREATE_TIME + 1) / 1000)
+
+
+async def test_selected_case_export(db):
+    rows = await read_back(await CaseManagementService(db).export_cases_to_excel(case_ids=["c3", "old", "gone"]))
+
+    # Older versions can be exported by ID; deleted cases cannot
+    assert [row[0] for row in rows[1:]] == ["old", "c3"]
+
+
+async def test_export_requires_a_selection(db):
+    with pytest.raises(ValueError):
+        await CaseManagementService(db).export_cases_to_excel()
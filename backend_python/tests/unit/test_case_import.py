@@ -0,0 +1,204 @@
+"""
+Unit tests for importing functional cases from Excel
+"""
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.core import sequence
+from app.core.sequence import SequenceAllocator
+from app.models.functional_case import FunctionalCase, FunctionalCaseBlob, FunctionalCaseModule
+from app.models.project_statistics import ProjectStatistics
+from app.models.bug import Bug
+from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.test_plan import TestPlan as Plan
+from app.services import case_management_service
+from app.services.case_management_service import CASE_IMPORT_HEADERS, CaseManagementService, _parse_case_row
+from app.services.module_tree import MODULE_ROOT_PARENT
+from app.utils.batch_operations import BulkOperations
+
+MODELS = (
+    FunctionalCase, FunctionalCaseBlob, FunctionalCaseModule,
+    ProjectStatistics, Bug, ApiDefinition, ApiTestCase, ApiScenario, Plan,
+)
+HEADERS = ["名称", "所属模块", "模块ID", "编辑模式", "评审结果", "标签", "步骤"]
+COLUMNS = {index: CASE_IMPORT_HEADERS[header] for index, header in enumerate(HEADERS)}
+
+
+@compiles(LONGTEXT, "sqlite")
+def _longtext_on_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+def parse(**values):
+    return _parse_case_row([values.get(CASE_IMPORT_HEADERS[header]) for header in HEADERS], COLUMNS)
+
+
+def test_parse_applies_defaults():
+    case = parse(name="  Login  ", case_edit_type="text", steps=None)
+
+    assert case["name"] == "Login"
+    assert case["case_edit_type"] == "TEXT"
+    assert case["review_status"] == "UN_REVIEWED"
+    assert case["tags"] is None and case["steps"] is None
+    assert parse(name=" ", tags="") is None
+    # Short rows and non-text cells
+    assert _parse_case_row([12345], COLUMNS)["name"] == "12345"
+
+
+def test_parse_tags():
+    assert json.loads(parse(name="a", tags="smoke, 登录；p0,,")["tags"]) == ["smoke", "登录", "p0"]
+    assert json.loads(parse(name="a", tags='["x", 1]')["tags"]) == ["x", "1"]
+    with pytest.raises(ValueError, match="valid JSON list"):
+        parse(name="a", tags='["x"')
+    with pytest.raises(ValueError, match="500"):
+        parse(name="a", tags=",".join(["tag"] * 200))
+
+
+def test_parse_steps():
+    steps = '[{"desc": "open", "result": "ok"}]'
+    assert parse(name="a", steps=steps)["steps"] == steps
+    with pytest.raises(ValueError, match="JSON list"):
+        parse(name="a", steps="open the page")
+    with pytest.raises(ValueError, match="JSON list"):
+        parse(name="a", steps='{"desc": "open"}')
+
+
+@pytest.mark.parametrize("values, message", [
+    ({"module_path": "/a"}, "Name is required"),
+    ({"name": "x" * 256}, "Name exceeds"),
+    ({"name": "a", "module_id": "m" * 51}, "module_id exceeds"),
+    ({"name": "a", "case_edit_type": "MIND"}, "Invalid edit type: MIND"),
+    ({"name": "a", "review_status": "done"}, "Invalid review status: DONE"),
+])
+def test_parse_rejects_invalid_rows(values, message):
+    with pytest.raises(ValueError, match=message):
+        parse(**values)
+
+
+def workbook(*rows):
+    book = Workbook()
+    book.active.append(HEADERS)
+    for row in rows:
+        book.active.append(row)
+    output = io.BytesIO()
+    book.save(output)
+    return output.getvalue()
+
+
+@pytest.fixture
+async def db(monkeypatch):
+    """In-memory database; Redis is unavailable, so nums come from the table"""
+    async def no_redis():
+        raise ConnectionError("redis down")
+
+    async def on_created(table, project_id=None, count=1):
+        pass
+
+    monkeypatch.setattr(sequence.redis_client, "get_client", no_redis)
+    monkeypatch.setattr(case_management_service, "sequence_allocator", SequenceAllocator())
+    monkeypatch.setattr(case_management_service.count_strategy, "on_created", on_created)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        for model in MODELS:
+            await conn.run_sync(model.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def import_rows(db, *rows):
+    return await CaseManagementService(db).import_cases_from_excel(
+        workbook(*rows), "cases.xlsx", "p1", version_id="v1", template_id="default", create_user="admin"
+    )
+
+
+async def modules(db):
+    result = await db.execute(select(FunctionalCaseModule))
+    return {module.name: module for module in result.scalars()}
+
+
+async def cases(db):
+    result = await db.execute(
+        select(FunctionalCase, FunctionalCaseBlob.steps)
+        .join(FunctionalCaseBlob, FunctionalCaseBlob.id == FunctionalCase.id)
+        .order_by(FunctionalCase.num)
+    )
+    return result.all()
+
+
+async def test_import_creates_module_paths_and_reports_invalid_rows(db):
+    steps = '[{"desc": "open"}]'
+    result = await import_rows(
+        db,
+        ["Login", "/登录/表单", None, None, None, "smoke", steps],
+        ["Logout", " 登录 / 表单 ", None, "TEXT", "PASS", None, None],
+        ["Bad", None, None, "MIND", None, None, None],
+        [None, None, None, None, None, None, None],
+        ["Lost", None, "missing", None, None, None, None],
+        ["Home", "/首页", None, None, None, None, None],
+        ["Root", None, None, None, None, None, None],
+    )
+
+    assert result == {
+        "imported_count": 4,
+        "fail_count": 2,
+        "errors": [
+            {"row": 4, "message": "Invalid edit type: MIND"},
+            {"row": 6, "message": "Module not found: missing"},
+        ],
+    }
+    created = await modules(db)
+    assert set(created) == {"登录", "表单", "首页"}
+    assert created["登录"].parent_id == created["首页"].parent_id == MODULE_ROOT_PARENT
+    assert created["表单"].parent_id == created["登录"].id
+
+    imported = await cases(db)
+    assert [(case.num, case.name, case.module_id) for case, _ in imported] == [
+        (1, "Login", created["表单"].id),
+        (2, "Logout", created["表单"].id),
+        (3, "Home", created["首页"].id),
+        (4, "Root", "root"),
+    ]
+    assert imported[0][1] == steps
+    assert imported[1][0].review_status == "PASS"
+    assert (await db.get(ProjectStatistics, "p1")).functional_case_count == 4
+
+
+async def test_failed_insert_reports_every_row_of_the_batch(db, monkeypatch):
+    monkeypatch.setattr(case_management_service, "IMPORT_BATCH_SIZE", 2)
+    original = BulkOperations.bulk_insert
+    failures = []
+
+    async def bulk_insert(db, model_class, items, commit=True):
+        if model_class is FunctionalCaseBlob and not failures:
+            failures.append(len(items))
+            raise RuntimeError("disk full\nsecond line")
+        return await original(db, model_class, items, commit)
+
+    monkeypatch.setattr(BulkOperations, "bulk_insert", staticmethod(bulk_insert))
+
+    result = await import_rows(
+        db,
+        ["First", "/新模块", None, None, None, None, None],
+        ["Second", None, None, None, None, None, None],
+        ["Third", "/新模块", None, None, None, None, None],
+    )
+
+    assert result["imported_count"] == 1
+    assert result["errors"] == [
+        {"row": 2, "message": "Insert failed: disk full"},
+        {"row": 3, "message": "Insert failed: disk full"},
+    ]
+    # The module of the rolled-back batch is created again with the next one
+    created = await modules(db)
+    assert list(created) == ["新模块"]
+    assert [(case.name, case.module_id) for case, _ in await cases(db)] == [("Third", created["新模块"].id)]
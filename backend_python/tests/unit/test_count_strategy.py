@@ -0,0 +1,169 @@
+"""
+Unit tests for listing count strategies
+"""
+import pytest
+from sqlalchemy import Boolean, Column, String, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core import count_strategy as count_module
+from app.core.count_strategy import CountStrategy, COUNT_CACHED, COUNT_COUNTER, COUNT_ESTIMATE
+
+Base = declarative_base()
+
+
+class Row(Base):
+    """Minimal project-scoped table"""
+    __tablename__ = "count_row"
+
+    id = Column(String(50), primary_key=True)
+    project_id = Column(String(50))
+    deleted = Column(Boolean, default=False)
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by the count layer"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+
+    async def get(self, key):
+        value = self.values.get(key)
+        return None if value is None else str(value)
+
+    async def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+
+    async def hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return None if value is None else str(value)
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hexists(self, key, field):
+        return field in self.hashes.get(key, {})
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        """Emulates the seed and adjust scripts"""
+        (counters, seeds), (project_id, *args) = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        counters, seeds = self.hashes.setdefault(counters, {}), self.hashes.setdefault(seeds, {})
+        if script == count_module.SEED_SCRIPT:
+            token, total, _ = args
+            if seeds.get(project_id) != token:
+                return 0
+            del seeds[project_id]
+            counters.setdefault(project_id, total)
+            return 1
+        if project_id in counters:
+            counters[project_id] = int(counters[project_id]) + int(args[0])
+            return counters[project_id]
+        seeds.pop(project_id, None)
+        return None
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Route the count layer to an in-memory Redis"""
+    client = FakeRedis()
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(count_module.redis_client, "get_client", get_client)
+    return client
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with three rows in project p1"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([Row(id=f"r{i}", project_id="p1", deleted=False) for i in range(3)])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def _insert_behind_cache(db, row_id):
+    """Insert a row without going through the count layer"""
+    await db.execute(insert(Row).values(id=row_id, project_id="p1", deleted=False))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_cached_count_until_table_is_written(db, fake_redis):
+    """Test cached counts are reused per filter and invalidated on writes"""
+    strategy = CountStrategy()
+    query = select(Row).where(Row.project_id == "p1", Row.deleted == False)
+
+    assert await strategy.count(db, query, COUNT_CACHED) == (3, True)
+    await _insert_behind_cache(db, "r3")
+    assert await strategy.count(db, query, COUNT_CACHED) == (3, True)
+
+    # A different filter gets its own cache entry
+    other = select(Row).where(Row.project_id == "p2", Row.deleted == False)
+    assert await strategy.count(db, other, COUNT_CACHED) == (0, True)
+
+    await strategy.invalidate("count_row")
+    assert await strategy.count(db, query, COUNT_CACHED) == (4, True)
+
+
+@pytest.mark.asyncio
+async def test_project_counter_tracks_creates_and_deletes(db, fake_redis):
+    """Test per-project counters are seeded once and then adjusted"""
+    strategy = CountStrategy()
+    query = select(Row).where(Row.project_id == "p1", Row.deleted == False)
+
+    assert await strategy.count(db, query, COUNT_COUNTER, project_id="p1") == (3, True)
+
+    await strategy.on_created("count_row", "p1", count=2)
+    await strategy.on_deleted("count_row", "p1")
+    assert await strategy.count(db, query, COUNT_COUNTER, project_id="p1") == (4, True)
+
+    # Unseeded projects are not created by writes
+    await strategy.on_created("count_row", "p9")
+    assert not await fake_redis.hexists("count:project:{count_row}", "p9")
+
+
+@pytest.mark.asyncio
+async def test_write_during_seeding_is_not_lost(db, fake_redis, monkeypatch):
+    """Test a counter counted while a row was created is not stored"""
+    strategy = CountStrategy()
+    query = select(Row).where(Row.project_id == "p1", Row.deleted == False)
+    exact_count = strategy.exact_count
+
+    async def count_then_create(db, query):
+        total = await exact_count(db, query)
+        # Committed after the count, adjusted before the seed is stored
+        await _insert_behind_cache(db, "r3")
+        await strategy.on_created("count_row", "p1")
+        return total
+
+    monkeypatch.setattr(strategy, "exact_count", count_then_create)
+    assert await strategy.count(db, query, COUNT_COUNTER, project_id="p1") == (3, True)
+    assert not await fake_redis.hexists("count:project:{count_row}", "p1")
+
+    monkeypatch.setattr(strategy, "exact_count", exact_count)
+    assert await strategy.count(db, query, COUNT_COUNTER, project_id="p1") == (4, True)
+    await strategy.on_created("count_row", "p1")
+    assert await fake_redis.hget("count:project:{count_row}", "p1") == "5"
+
+
+@pytest.mark.asyncio
+async def test_estimate_falls_back_to_exact_without_explain(db, fake_redis):
+    """Test the estimate strategy reports an exact total when no estimate is available"""
+    strategy = CountStrategy(estimate_threshold=1)
+    query = select(Row).where(Row.project_id == "p1")
+
+    assert await strategy.count(db, query, COUNT_ESTIMATE) == (3, True)
@@ -0,0 +1,155 @@
+"""
+Unit tests for the event bus
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core import kafka
+from app.core.event_bus import Event, EventBackend, EventBus, InMemoryBackend, KafkaBackend, create_backend
+from app.core.kafka import AsyncKafkaProducer
+
+
+class RecordingBackend(EventBackend):
+    """Backend that records the batches it is handed"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def publish_batch(self, events):
+        await self.release.wait()
+        self.batches.append(list(events))
+
+    def subscribe(self, topics, group=None, max_batch=100, block_ms=1000):
+        raise AssertionError("publish-only backend")
+
+
+def test_backends_must_implement_publish_and_subscribe():
+    """A backend missing an abstract method can't be created"""
+    class PublishOnly(EventBackend):
+        async def publish_batch(self, events):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+
+async def next_batch(subscription):
+    return await asyncio.wait_for(subscription.__anext__(), timeout=1)
+
+
+async def test_memory_backend_fans_out_and_splits_groups():
+    """Plain subscribers see every event; a group shares one stream of events"""
+    backend = InMemoryBackend()
+    first = backend.subscribe(["results"])
+    second = backend.subscribe(["results", "progress"])
+    worker_a = backend.subscribe(["results"], group="ingest")
+    worker_b = backend.subscribe(["results"], group="ingest")
+
+    await backend.publish_batch([Event("results", {"n": i}) for i in range(3)] + [Event("progress", {"p": 1})])
+
+    assert [event.value["n"] for event in await next_batch(first)] == [0, 1, 2]
+    assert [event.topic for event in await next_batch(second)] == ["results"] * 3 + ["progress"]
+    grouped = await next_batch(worker_a)
+    assert [event.value["n"] for event in grouped] == [0, 1, 2]
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(worker_b.__anext__(), timeout=0.05)
+
+
+async def test_memory_backend_respects_max_batch():
+    """Queued events are delivered in batches of at most max_batch"""
+    backend = InMemoryBackend()
+    subscription = backend.subscribe(["results"], max_batch=4)
+    await backend.publish_batch([Event("results", {"n": i}) for i in range(10)])
+
+    sizes = [len(await next_batch(subscription)) for _ in range(3)]
+    assert sizes == [4, 4, 2]
+
+
+async def test_bus_forwards_buffered_events_in_batches():
+    """Events published while the backend is busy go out as one batch"""
+    backend = RecordingBackend()
+    bus = EventBus(backend=backend, batch_size=100)
+    await bus.start()
+    backend.release.clear()
+
+    bus.publish_nowait("results", {"n": 0})
+    await asyncio.sleep(0)  # Flusher takes the first event and waits on the backend
+    for i in range(1, 6):
+        bus.publish_nowait("results", {"n": i}, key=f"k{i}")
+    backend.release.set()
+    await bus.stop()
+
+    assert [[event.value["n"] for event in batch] for batch in backend.batches] == [[0], [1, 2, 3, 4, 5]]
+    assert bus.stats == {"published": 6, "failed": 0, "dropped": 0}
+
+
+async def test_bus_drops_when_buffer_is_full():
+    """publish_nowait drops instead of blocking; publish waits for room"""
+    backend = RecordingBackend()
+    bus = EventBus(backend=backend, max_buffered=2)
+    await bus.start()
+    backend.release.clear()
+    bus.publish_nowait("results", {"n": 0})
+    await asyncio.sleep(0)
+
+    assert bus.publish_nowait("results", {"n": 1}) and bus.publish_nowait("results", {"n": 2})
+    assert bus.publish_nowait("results", {"n": 3}) is False
+    waiting = asyncio.create_task(bus.publish("results", {"n": 4}))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    backend.release.set()
+    await waiting
+    await bus.stop()
+    assert [event.value["n"] for batch in backend.batches for event in batch] == [0, 1, 2, 4]
+    assert bus.stats["dropped"] == 1
+
+
+async def test_publish_from_worker_thread_reaches_subscriber():
+    """Sync code in a thread (e.g. background tasks) publishes onto the bus loop"""
+    bus = EventBus(backend=InMemoryBackend())
+    await bus.start()
+    subscription = bus.subscribe(["results"])
+
+    thread = threading.Thread(target=bus.publish_nowait, args=("results", {"status": "success"}, "t1"))
+    thread.start()
+    thread.join()
+
+    batch = await next_batch(subscription)
+    assert batch[0].value == {"status": "success"} and batch[0].key == "t1"
+    await bus.stop()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("rabbitmq")
+
+
+async def test_kafka_backend_without_producer_sends_blocking(monkeypatch):
+    """Before the async producer starts, events are sent off the loop and failures are counted"""
+    loop_thread = threading.get_ident()
+    sent = []
+
+    def send_kafka_message(topic, message, key=None):
+        sent.append((topic, threading.get_ident()))
+        return topic != "broken"
+
+    monkeypatch.setattr(kafka, "kafka_async_producer", AsyncKafkaProducer())
+    monkeypatch.setattr(kafka, "send_kafka_message", send_kafka_message)
+    bus = EventBus(backend=KafkaBackend())
+    await bus.start()
+
+    await bus.publish("results", {"n": 1})
+    await bus.flush()
+    await bus.publish("broken", {"n": 2})
+    await bus.stop()
+
+    assert [topic for topic, _ in sent] == ["results", "broken"]
+    assert all(thread != loop_thread for _, thread in sent)
+    assert bus.stats == {"published": 1, "failed": 1, "dropped": 0}
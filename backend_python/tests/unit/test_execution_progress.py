@@ -0,0 +1,115 @@
+"""
+Unit tests for live execution progress
+"""
+import asyncio
+
+import pytest
+
+from app.core.event_bus import Event, EventBus, InMemoryBackend, TEST_EXECUTION_RESULTS_TOPIC
+from app.core.execution_progress import EXECUTION_PROGRESS_TOPIC, ProgressHub
+
+
+def progress_event(execution_id, event_type, **data):
+    return {"execution_id": execution_id, "type": event_type, "data": data}
+
+
+@pytest.fixture
+async def hub():
+    backend = InMemoryBackend()
+    hub = ProgressHub(bus=EventBus(backend=backend), max_pending=3)
+    hub.backend = backend
+    yield hub
+    await hub.stop()
+
+
+async def publish(hub, *events, topic=EXECUTION_PROGRESS_TOPIC):
+    """Publish through the bus and let the hub dispatch"""
+    await hub.bus.publish_many(
+        Event(topic, event, event.get("execution_id") or event.get("test_id")) for event in events
+    )
+    await asyncio.sleep(0.01)
+
+
+async def collect(iterator, limit=20):
+    """Read events until the watch ends (heartbeats skipped)"""
+    events = []
+    async for event in iterator:
+        if event is not None:
+            events.append(event)
+        if len(events) >= limit:
+            break
+    return events
+
+
+async def test_watcher_receives_events_until_finished(hub):
+    """Events of the watched execution arrive in order; others are ignored"""
+    watch = asyncio.create_task(collect(hub.watch("run-1", heartbeat=0.05)))
+    await asyncio.sleep(0.01)
+
+    await publish(
+        hub,
+        progress_event("run-1", "started"),
+        progress_event("run-2", "started"),
+        progress_event("run-1", "step", name="login", status="success"),
+        progress_event("run-1", "progress", completed=1),
+        progress_event("run-1", "finished", status="success"),
+    )
+
+    events = await asyncio.wait_for(watch, timeout=1)
+    assert [event["type"] for event in events] == ["started", "step", "progress", "finished"]
+    assert hub.watcher_count == 0
+
+
+async def test_slow_client_gets_coalesced_updates(hub):
+    """Pending aggregates collapse to the latest and excess steps are skipped"""
+    watch = hub.watch("run-1", heartbeat=1)
+    first = asyncio.create_task(watch.__anext__())
+    await asyncio.sleep(0.01)
+    await publish(hub, progress_event("run-1", "started"))
+    assert (await first)["type"] == "started"
+
+    # The client is not reading while these arrive
+    await publish(
+        hub,
+        *[progress_event("run-1", "step", name=f"s{i}", status="success") for i in range(6)],
+        *[progress_event("run-1", "progress", completed=i) for i in range(5)],
+        progress_event("run-1", "finished", status="success"),
+    )
+
+    events = await collect(watch)
+    assert events[0] == {"type": "steps_skipped", "data": {"count": 3}}
+    assert [event["type"] for event in events[1:]] == ["step", "step", "step", "finished"]
+
+
+async def test_late_joiner_gets_snapshot(hub):
+    """Known executions start with their latest state; finished ones end there"""
+    hub.start()
+    await publish(hub, progress_event("run-1", "started"), progress_event("run-1", "progress", completed=7))
+
+    watch = hub.watch("run-1", heartbeat=1)
+    snapshot = await watch.__anext__()
+    assert snapshot["type"] == "snapshot" and snapshot["data"]["progress"] == {"completed": 7}
+    await watch.aclose()
+
+    await publish(hub, progress_event("run-1", "finished", status="failed"))
+    events = await collect(hub.watch("run-1", heartbeat=1))
+    assert len(events) == 1 and events[0]["data"]["status"] == "failed"
+
+
+async def test_many_watchers_share_one_subscription(hub):
+    """Every client of a worker is served from the hub's single bus subscription"""
+    watches = [asyncio.create_task(collect(hub.watch("run-1", heartbeat=1))) for _ in range(50)]
+    await asyncio.sleep(0.01)
+
+    assert len(hub.backend._members) == 1
+    await publish(
+        hub,
+        {"test_id": "run-1", "test_type": "api_test", "status": "running", "result": {}},
+        {"test_id": "run-1", "test_type": "api_test", "status": "success", "result": {"passed": 3}},
+        topic=TEST_EXECUTION_RESULTS_TOPIC,
+    )
+
+    results = await asyncio.wait_for(asyncio.gather(*watches), timeout=1)
+    assert all([event["type"] for event in events] == ["started", "finished"] for events in results)
+    assert results[0][1]["data"]["result"] == {"passed": 3}
+
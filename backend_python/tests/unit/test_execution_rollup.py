@@ -0,0 +1,192 @@
+"""
+Unit tests for execution rollups
+"""
+import pytest
+from sqlalchemy import BigInteger, Boolean, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.api_report import ApiReport
+from app.models.execution_rollup import ExecutionRollup, ExecutionRollupState
+from app.services.execution_rollup_service import (
+    ExecutionRollupService,
+    ExecutionSample,
+    LATENCY_COLUMNS,
+    MAX_COLUMNS,
+    PROJECT_SUBJECT,
+    SOURCE_API_REPORT,
+    SUM_COLUMNS,
+    aggregate,
+    choose_resolution,
+    estimate_percentile,
+    plan_segments,
+)
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+BASE = 20000 * DAY  # A day boundary
+NOW = BASE + 3 * DAY
+
+
+def sample(timestamp, status="SUCCESS", duration=5, subject_id="c1", project_id="p1"):
+    return ExecutionSample(project_id, SOURCE_API_REPORT, subject_id, timestamp, status, duration)
+
+
+def histogram(**counts):
+    row = dict.fromkeys((*SUM_COLUMNS, *MAX_COLUMNS), 0)
+    row.update(counts)
+    return row
+
+
+def test_aggregate_fills_every_resolution_for_subject_and_project():
+    rows = aggregate([
+        sample(BASE + 10, "SUCCESS", 5),
+        sample(BASE + 20, "ERROR", 300, subject_id=""),
+        sample(BASE + HOUR, "PENDING", -7),
+    ])
+
+    assert {key[0] for key in rows} == {"minute", "hour", "day"}
+    project_day = rows[("day", "p1", PROJECT_SUBJECT, SOURCE_API_REPORT, BASE)]
+    assert (project_day["total"], project_day["passed"], project_day["failed"]) == (3, 1, 1)
+    assert project_day["duration_sum"] == 305
+    assert project_day["duration_max"] == 300
+    assert project_day["latency_b00"] == 2  # 5ms and the clamped negative duration
+    assert project_day["latency_b05"] == 1  # 300ms
+    case_minute = rows[("minute", "p1", "c1", SOURCE_API_REPORT, BASE)]
+    assert case_minute["total"] == 1
+    # Minute and hour buckets split at the hour; the day bucket does not
+    assert rows[("minute", "p1", "c1", SOURCE_API_REPORT, BASE + HOUR)]["total"] == 1
+    assert rows[("hour", "p1", PROJECT_SUBJECT, SOURCE_API_REPORT, BASE)]["total"] == 2
+    assert len(rows) == 3 * 2 + 2 * 2  # Minute/hour twice per subject, day once
+
+
+def test_estimate_percentile_reads_histogram_bounds():
+    row = histogram(latency_b00=50, latency_b03=45, latency_b12=5, duration_max=90000)
+
+    assert estimate_percentile(row, 50) == 10
+    assert estimate_percentile(row, 95) == 100
+    assert estimate_percentile(row, 99) == 90000  # Unbounded bucket: the observed max
+    # A bound above the observed max is capped by it
+    assert estimate_percentile(histogram(latency_b06=1, duration_max=700), 50) == 700
+    assert estimate_percentile(histogram(), 50) is None
+
+
+def test_choose_resolution():
+    assert choose_resolution(NOW - 3 * HOUR, NOW, now=NOW) == "minute"
+    assert choose_resolution(NOW - 7 * DAY + HOUR, NOW, now=NOW) == "hour"
+    assert choose_resolution(NOW - 365 * DAY, NOW, now=NOW) == "day"
+    assert choose_resolution(NOW - 3 * HOUR, NOW, max_points=10, now=NOW) == "hour"
+    # Minute buckets of a range older than their retention are gone
+    assert choose_resolution(NOW - 30 * DAY, NOW - 30 * DAY + HOUR, now=NOW) == "hour"
+    # Too many points at every resolution: the coarsest
+    assert choose_resolution(NOW - 365 * DAY, NOW, max_points=2, now=NOW) == "day"
+
+
+def test_plan_segments_use_coarse_buckets_inside_fine_edges():
+    start = BASE + HOUR + 30 * MINUTE + 15000
+    end = BASE + 2 * DAY + 3 * HOUR + 5 * MINUTE
+
+    assert plan_segments(start, end, now=NOW) == [
+        ("day", BASE + DAY, BASE + 2 * DAY),
+        ("hour", BASE + 2 * HOUR, BASE + DAY),
+        ("minute", BASE + HOUR + 30 * MINUTE, BASE + 2 * HOUR),
+        ("hour", BASE + 2 * DAY, BASE + 2 * DAY + 3 * HOUR),
+        ("minute", BASE + 2 * DAY + 3 * HOUR, end),
+    ]
+    assert plan_segments(start, start, now=NOW) == []
+
+
+def test_plan_segments_round_old_edges_to_hours():
+    start = BASE - 30 * DAY + 90 * MINUTE
+    end = BASE - 30 * DAY + 3 * HOUR
+
+    assert plan_segments(start, end, now=NOW) == [("hour", BASE - 30 * DAY + HOUR, end)]
+
+
+def placeholder(column):
+    """A value for a required column the tests do not care about"""
+    if isinstance(column.type, Boolean):
+        return False
+    if isinstance(column.type, BigInteger):
+        return 0
+    return "x"
+
+
+async def add_report(db, report_id, end_time, status="SUCCESS", duration=5, case_id="c1"):
+    required = {
+        column.key: placeholder(column)
+        for column in ApiReport.__table__.columns
+        if not column.nullable and column.default is None and not column.primary_key
+    }
+    await db.execute(insert(ApiReport).values({
+        **required,
+        "id": report_id,
+        "project_id": "p1",
+        "test_plan_case_id": case_id,
+        "end_time": end_time,
+        "status": status,
+        "request_duration": duration,
+    }))
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with the rollup tables and api_report"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        for model in (ExecutionRollup, ExecutionRollupState, ApiReport):
+            await conn.run_sync(model.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def buckets(db):
+    result = await db.execute(select(ExecutionRollup).order_by(
+        ExecutionRollup.resolution, ExecutionRollup.subject_id, ExecutionRollup.bucket_start
+    ))
+    return [
+        (row.resolution, row.subject_id, row.bucket_start, row.total, row.duration_sum, row.duration_max)
+        for row in result.scalars()
+    ]
+
+
+async def test_record_adds_to_existing_buckets(db):
+    service = ExecutionRollupService(db)
+    await service.record([sample(BASE, duration=40)])
+    await service.record([sample(BASE + 1, "ERROR", 30)])
+
+    rows = await buckets(db)
+    assert len(rows) == 6
+    assert all(row[3:] == (2, 70, 40) for row in rows)
+
+    summary = await service.get_summary("p1", BASE, BASE + DAY)
+    assert summary["total"] == 2 and summary["passed"] == 1 and summary["failed"] == 1
+    assert summary["avg_duration"] == 35
+    assert summary["latency_histogram"][LATENCY_COLUMNS.index("latency_b02")] == 2
+
+
+async def test_consume_rerun_does_not_count_twice(db):
+    await add_report(db, "r1", BASE + 10, duration=5)
+    await add_report(db, "r2", BASE + 10, "ERROR", 300)
+    await add_report(db, "r3", BASE + HOUR, duration=50, case_id="c2")
+    await add_report(db, "late", BASE + 2 * HOUR)
+    await db.commit()
+    service = ExecutionRollupService(db)
+
+    assert await service.consume(SOURCE_API_REPORT, until=BASE + HOUR, batch_size=2) == 3
+    first = await buckets(db)
+    assert await service.consume(SOURCE_API_REPORT, until=BASE + HOUR) == 0
+    assert await buckets(db) == first
+
+    # The next run picks up only what is past the watermark
+    assert await service.consume(SOURCE_API_REPORT, until=BASE + 2 * HOUR) == 1
+    result = await db.execute(
+        select(func.sum(ExecutionRollup.total)).where(
+            ExecutionRollup.resolution == "day", ExecutionRollup.subject_id == PROJECT_SUBJECT
+        )
+    )
+    assert result.scalar() == 4
+    state = await db.get(ExecutionRollupState, SOURCE_API_REPORT)
+    assert (state.watermark_time, state.watermark_id) == (BASE + 2 * HOUR, "late")
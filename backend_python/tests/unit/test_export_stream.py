@@ -0,0 +1,112 @@
+"""
+Unit tests for streamed JSON / NDJSON exports
+"""
+import json
+
+import pytest
+from sqlalchemy import Column, String, Text, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.services import export_stream
+from app.services.export_stream import encode_export, encode_object, iter_rows, json_fragment
+
+Base = declarative_base()
+
+
+class Definition(Base):
+    """Minimal table with a stored JSON body"""
+    __tablename__ = "export_definition"
+
+    id = Column(String(50), primary_key=True)
+    name = Column(String(255))
+    body = Column(Text)
+
+
+BODIES = {
+    "d0": '{"a": 1}',
+    "d1": '{\n  "headers": [],\n  "note": "x\\ny"\n}',
+    "d2": "{{token}}",
+    "d3": "plain text",
+    "d4": None,
+    "d5": "[NaN]",
+}
+
+
+def encode(row, single_line):
+    return encode_object({"id": row.id, "name": row.name}, {"body": row.body}, single_line)
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with one row per body"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([Definition(id=row_id, name=f"名{row_id}", body=body) for row_id, body in BODIES.items()])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def export(db, export_type, ids=None):
+    query = select(Definition.id, Definition.name, Definition.body)
+    batches = iter_rows(db, query, Definition.id, ids, (Definition.id,))
+    return b"".join([chunk async for chunk in encode_export(batches, encode, "definitions", export_type)]).decode()
+
+
+def test_json_fragment_passes_valid_bodies_through():
+    assert json_fragment(' {"a": [1, 2]} ') == '{"a": [1, 2]}'
+    assert json_fragment(None) == "null"
+    # Not JSON (templates, text, non-standard constants): encoded as a string
+    assert json_fragment("{{token}}") == '"{{token}}"'
+    assert json_fragment("[NaN]") == '"[NaN]"'
+    assert json_fragment("ok") == '"ok"'
+    # Line breaks only occur between tokens of valid JSON
+    assert json_fragment('{\n"a": "x\\ny"\r\n}', single_line=True) == '{ "a": "x\\ny"  }'
+
+
+async def test_json_document_is_valid(db):
+    document = json.loads(await export(db, "json"))
+
+    assert document["export_type"] == "json"
+    bodies = {item["id"]: item["body"] for item in document["definitions"]}
+    assert bodies == {
+        "d0": {"a": 1},
+        "d1": {"headers": [], "note": "x\ny"},
+        "d2": "{{token}}",
+        "d3": "plain text",
+        "d4": None,
+        "d5": "[NaN]",
+    }
+    assert document["definitions"][0]["name"] == "名d0"
+
+
+async def test_ndjson_has_one_record_per_line(db):
+    lines = (await export(db, "ndjson")).splitlines()
+
+    assert [json.loads(line)["id"] for line in lines] == list(BODIES)
+    assert json.loads(lines[1])["body"] == {"headers": [], "note": "x\ny"}
+
+
+async def test_selected_ids_use_chunked_queries_in_request_order(db, monkeypatch):
+    monkeypatch.setattr(export_stream, "EXPORT_BATCH_SIZE", 2)
+    statements = []
+    event.listen(
+        db.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    document = json.loads(await export(db, "json", ["d5", "d3", "missing", "d0", "d3", "d1"]))
+
+    assert [item["id"] for item in document["definitions"]] == ["d5", "d3", "d0", "d1"]
+    # Unique IDs d5, d3, missing, d0, d1 in chunks of two
+    assert len(statements) == 3
+
+
+async def test_empty_export(db):
+    assert json.loads(await export(db, "json", ["missing"])) == {"export_type": "json", "definitions": []}
+    assert await export(db, "ndjson", ["missing"]) == ""
@@ -0,0 +1,187 @@
+"""
+Unit tests for streaming and range downloads
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.minio import MinIOClient
+from app.services.file_service import FileService
+
+INFO = {
+    "file_name": "report.zip",
+    "content_type": "application/zip",
+    "size": 1000,
+    "etag": "abc123",
+    "last_modified": datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc),
+}
+
+
+class FakeObjectResponse:
+    def __init__(self, data):
+        self.data = data
+        self.released = False
+
+    def stream(self, amt):
+        for start in range(0, len(self.data), amt):
+            yield self.data[start:start + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+class FakeMinio:
+    def __init__(self, data):
+        self.data = data
+        self.requests = []
+        self.responses = []
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        self.requests.append((offset, length))
+        end = offset + length if length else len(self.data)
+        response = FakeObjectResponse(self.data[offset:end])
+        self.responses.append(response)
+        return response
+
+
+@pytest.fixture
+def service():
+    return FileService()
+
+
+def test_full_download_has_validators(service):
+    """Plain requests get 200 with ETag, Last-Modified and the full length"""
+    plan = service.plan_download(INFO)
+
+    assert plan["status_code"] == 200
+    assert (plan["offset"], plan["length"]) == (0, 1000)
+    assert plan["headers"]["ETag"] == '"abc123"'
+    assert plan["headers"]["Last-Modified"] == "Tue, 02 Jan 2024 03:04:05 GMT"
+    assert plan["headers"]["Accept-Ranges"] == "bytes"
+    assert plan["headers"]["Content-Length"] == "1000"
+
+
+@pytest.mark.parametrize(
+    "range_header, expected",
+    [
+        ("bytes=0-99", (0, 100, "bytes 0-99/1000")),
+        ("bytes=900-", (900, 100, "bytes 900-999/1000")),
+        ("bytes=-10", (990, 10, "bytes 990-999/1000")),
+        ("bytes=500-5000", (500, 500, "bytes 500-999/1000")),
+    ],
+)
+def test_range_requests_get_partial_content(service, range_header, expected):
+    """Single byte ranges are served as 206 with Content-Range"""
+    plan = service.plan_download(INFO, range_header=range_header)
+
+    offset, length, content_range = expected
+    assert plan["status_code"] == 206
+    assert (plan["offset"], plan["length"]) == (offset, length)
+    assert plan["headers"]["Content-Range"] == content_range
+    assert plan["headers"]["Content-Length"] == str(length)
+
+
+@pytest.mark.parametrize("range_header", ["items=0-1", "bytes=0-1,5-6", "bytes=abc", "bytes=50-10"])
+def test_unsupported_ranges_fall_back_to_full_file(service, range_header):
+    """Ignored Range headers yield the whole file"""
+    assert service.plan_download(INFO, range_header=range_header)["status_code"] == 200
+
+
+def test_range_outside_file_is_not_satisfiable(service):
+    """Ranges starting past the end fail with 416 and the file size"""
+    with pytest.raises(HTTPException) as exc_info:
+        service.plan_download(INFO, range_header="bytes=1000-")
+
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == "bytes */1000"
+
+
+def test_stale_if_range_sends_whole_file(service):
+    """A resume against a changed file restarts from the beginning"""
+    resumed = service.plan_download(INFO, range_header="bytes=100-", if_range='"abc123"')
+    restarted = service.plan_download(INFO, range_header="bytes=100-", if_range='"old"')
+
+    assert resumed["status_code"] == 206
+    assert restarted["status_code"] == 200
+
+
+@pytest.mark.parametrize(
+    "headers, status_code",
+    [
+        ({"if_none_match": '"abc123"'}, 304),
+        ({"if_none_match": 'W/"abc123", "other"'}, 304),
+        ({"if_none_match": "*"}, 304),
+        ({"if_none_match": '"other"'}, 200),
+        ({"if_modified_since": "Tue, 02 Jan 2024 03:04:05 GMT"}, 304),
+        ({"if_modified_since": "Tue, 02 Jan 2024 03:04:04 GMT"}, 200),
+        # If-None-Match takes precedence over If-Modified-Since
+        ({"if_none_match": '"other"', "if_modified_since": "Tue, 02 Jan 2024 03:04:05 GMT"}, 200),
+    ],
+)
+def test_conditional_requests(service, headers, status_code):
+    """Matching validators answer 304 without a body"""
+    plan = service.plan_download(INFO, **headers)
+
+    assert plan["status_code"] == status_code
+    if status_code == 304:
+        assert plan["length"] == 0 and plan["headers"]["ETag"] == '"abc123"'
+
+
+def test_redirect_threshold(service, monkeypatch):
+    """Large files are redirected when configured; the query flag overrides"""
+    from app.core.config import settings
+
+    assert service.use_presigned_redirect(INFO) is False
+    monkeypatch.setattr(settings, "FILE_DOWNLOAD_REDIRECT_SIZE", 1000)
+    assert service.use_presigned_redirect(INFO) is True
+    assert service.use_presigned_redirect(INFO, redirect=False) is False
+    assert service.use_presigned_redirect({**INFO, "size": 999}) is False
+
+
+async def test_presigned_url_names_the_attachment(service, monkeypatch):
+    """The MinIO response header carries the RFC 5987 encoded name"""
+    from app.services import file_service
+
+    calls = []
+
+    class FakeClient:
+        def get_presigned_url(self, file_path, expires, response_headers=None):
+            calls.append(response_headers)
+            return "http://minio/x"
+
+    monkeypatch.setattr(file_service, "minio_client", FakeClient())
+
+    await service.get_presigned_url("system/a.zip", 60, file_name='报告 "1".zip')
+    assert calls == [{
+        "response-content-disposition":
+            "attachment; filename=\"__ _1_.zip\"; filename*=UTF-8''%E6%8A%A5%E5%91%8A%20%221%22.zip"
+    }]
+
+
+def test_iter_file_streams_requested_range():
+    """Objects are read lazily in chunks and the connection is released"""
+    storage = MinIOClient()
+    storage._client = FakeMinio(bytes(range(256)) * 4)
+
+    chunks = storage.iter_file("reports/a.zip", offset=100, length=250, chunk_size=100)
+    assert storage._client.requests == []
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert storage._client.requests == [(100, 250)]
+    assert storage._client.responses[0].released
+
+
+def test_iter_file_releases_connection_when_closed_early():
+    """Aborted downloads still return the connection to the pool"""
+    storage = MinIOClient()
+    storage._client = FakeMinio(b"x" * 1000)
+
+    chunks = storage.iter_file("reports/a.zip", chunk_size=100)
+    next(chunks)
+    chunks.close()
+
+    assert storage._client.responses[0].released
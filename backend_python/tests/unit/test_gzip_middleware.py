@@ -0,0 +1,73 @@
+"""
+Unit tests for the selective GZip middleware
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.gzip_middleware import SelectiveGZipMiddleware
+
+BODY = "metersphere " * 1000
+
+
+async def chunks():
+    for _ in range(4):
+        yield BODY
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=100)
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse(BODY)
+
+    @app.get("/zip")
+    async def archive():
+        return StreamingResponse(chunks(), media_type="application/zip")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(chunks(), media_type="text/event-stream; charset=utf-8")
+
+    @app.get("/download")
+    async def download():
+        return PlainTextResponse(BODY, headers={"Accept-Ranges": "bytes"})
+
+    @app.get("/partial")
+    async def partial():
+        return PlainTextResponse(
+            BODY[:100], status_code=206, headers={"Content-Range": f"bytes 0-99/{len(BODY)}"}
+        )
+
+    @app.get("/attachment")
+    async def attachment():
+        return StreamingResponse(chunks(), headers={"Content-Disposition": 'attachment; filename="a.txt"'})
+
+    return TestClient(app)
+
+
+def test_other_responses_are_compressed(client):
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+@pytest.mark.parametrize("path", ["/zip", "/events", "/download", "/partial", "/attachment"])
+def test_downloads_and_streams_are_sent_as_is(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "accept-encoding" not in response.headers.get("vary", "").lower()
+
+
+def test_ranged_response_keeps_its_length(client):
+    response = client.get("/partial", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "100"
+    assert response.text == BODY[:100]
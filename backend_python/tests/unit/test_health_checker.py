@@ -0,0 +1,88 @@
+"""
+Unit tests for dependency health checks
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.health import HealthChecker, HEALTHY, UNHEALTHY, DEGRADED, UNKNOWN
+
+
+def _make_checks(calls):
+    """Build probes that record how often they run"""
+
+    async def slow_ok():
+        calls.append("database")
+        await asyncio.sleep(0.2)
+
+    async def also_slow_ok():
+        calls.append("redis")
+        await asyncio.sleep(0.2)
+
+    async def hangs():
+        calls.append("minio")
+        await asyncio.sleep(10)
+
+    async def not_configured():
+        calls.append("kafka")
+        return UNKNOWN
+
+    return {
+        "database": slow_ok,
+        "redis": also_slow_ok,
+        "minio": hangs,
+        "kafka": not_configured,
+    }
+
+
+@pytest.mark.asyncio
+async def test_probes_run_concurrently_with_timeouts():
+    """Test probes run in parallel and a hanging dependency is cut off"""
+    calls = []
+    checker = HealthChecker(checks=_make_checks(calls), interval=60, timeout=0.3)
+
+    start = time.perf_counter()
+    report = await checker.refresh()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6
+    checks = report["checks"]
+    assert checks["database"]["status"] == HEALTHY
+    assert checks["database"]["latency_ms"] >= 200
+    assert checks["minio"]["status"] == UNHEALTHY
+    assert "Timed out" in checks["minio"]["message"]
+    assert checks["kafka"]["status"] == UNKNOWN
+    assert report["status"] == DEGRADED
+
+
+@pytest.mark.asyncio
+async def test_report_is_cached_and_shared():
+    """Test concurrent readers share one probe round and reuse the cached report"""
+    calls = []
+    checker = HealthChecker(checks=_make_checks(calls), interval=60, timeout=0.3)
+
+    reports = await asyncio.gather(*(checker.get_report() for _ in range(10)))
+    await checker.get_report()
+
+    assert calls.count("database") == 1
+    assert all(report is reports[0] for report in reports)
+
+
+@pytest.mark.asyncio
+async def test_critical_dependency_failure_is_not_ready():
+    """Test a failing database makes the instance unready"""
+
+    async def database_down():
+        raise ConnectionError("connection refused")
+
+    async def ok():
+        return None
+
+    checker = HealthChecker(checks={"database": database_down, "redis": ok}, timeout=0.3)
+
+    report = await checker.get_report()
+
+    assert report["status"] == UNHEALTHY
+    assert report["checks"]["database"]["message"] == "connection refused"
+    assert not await checker.is_ready()
@@ -0,0 +1,209 @@
+"""
+Unit tests for background import job runs
+"""
+import asyncio
+
+import pytest
+
+from app.services import import_job_service
+from app.services.import_job_service import (
+    CANCELLED,
+    FAILED,
+    PENDING,
+    RUNNING,
+    SUCCEEDED,
+    run_import_job,
+)
+
+
+class FakeStore:
+    """In-memory stand-in emulating the job store scripts"""
+
+    def __init__(self, job):
+        self.job = dict(job)
+        self.errors = []
+        self.finished = []
+        self.heartbeats = 0
+
+    async def claim(self, job_id, owner, stall_ms, max_attempts):
+        if self.job["status"] == RUNNING and not self.job.get("stalled"):
+            return "busy"
+        if self.job["status"] not in (PENDING, RUNNING):
+            return "finished"
+        if self.job.get("cancel_requested"):
+            self.job["status"] = CANCELLED
+            return "cancelled"
+        self.job.update(status=RUNNING, owner=owner, stalled=False, attempts=self.job["attempts"] + 1)
+        return "claimed"
+
+    async def get(self, job_id):
+        return dict(self.job)
+
+    async def report(self, job_id, owner, processed, success, failures, total=None):
+        if self.job.get("owner") != owner:
+            return "lost"
+        self.job["processed"] = processed
+        self.job["success_count"] += success
+        self.errors.extend(failures)
+        return "cancelled" if self.job.get("cancel_requested") else "ok"
+
+    async def heartbeat(self, job_id, owner):
+        if self.job.get("owner") != owner or self.job["status"] != RUNNING:
+            return False
+        self.heartbeats += 1
+        return True
+
+    async def finish(self, job_id, owner, job_status, error=None):
+        if self.job.get("owner") != owner:
+            return False
+        self.job.update(status=job_status, error=error)
+        self.finished.append(job_status)
+        return True
+
+    async def forget(self, job_id):
+        pass
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def new_job(**fields):
+    job = {
+        "id": "job-1", "import_type": "chunked", "project_id": "p1", "file_name": "cases.xlsx",
+        "file_path": "import/p1/job-1/cases.xlsx", "params": {}, "status": PENDING,
+        "processed": 0, "success_count": 0, "fail_count": 0, "attempts": 0,
+    }
+    job.update(fields)
+    return job
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Stored import files; deletions are recorded"""
+    deleted = []
+    monkeypatch.setattr(import_job_service, "_download", lambda path, target: target.write(b"data"))
+    monkeypatch.setattr(import_job_service.minio_client, "delete_file", deleted.append)
+    return deleted
+
+
+def chunked_handler(items, chunk=10, crash_after=None, seen=None):
+    """Handler importing `items` in chunks from the checkpoint"""
+
+    async def handler(db, job, source, context):
+        if seen is not None:
+            seen.append(context.checkpoint)
+        reports = 0
+        for start in range(context.checkpoint, items, chunk):
+            if crash_after is not None and reports == crash_after:
+                raise SystemExit("worker died")
+            processed = min(items, start + chunk)
+            await context.report(processed, processed - start, [(start + 1, "bad row")])
+            reports += 1
+
+    return handler
+
+
+async def test_resumes_from_checkpoint_after_crash(monkeypatch, storage):
+    """A stalled job continues at the last reported chunk in a new run"""
+    store = FakeStore(new_job())
+    seen = []
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", chunked_handler(50, crash_after=2, seen=seen))
+
+    with pytest.raises(SystemExit):
+        await run_import_job(store, "job-1", "run-1", FakeSession)
+    assert store.job["processed"] == 20
+    assert await run_import_job(store, "job-1", "run-2", FakeSession) is None  # still alive
+
+    store.job["stalled"] = True
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", chunked_handler(50, seen=seen))
+    assert await run_import_job(store, "job-1", "run-3", FakeSession) == SUCCEEDED
+
+    assert seen == [0, 20]
+    assert store.job["processed"] == 50
+    assert store.job["success_count"] == 50
+    assert store.job["attempts"] == 2
+    assert [row for row, _ in store.errors] == [1, 11, 21, 31, 41]
+    assert storage == ["import/p1/job-1/cases.xlsx"]
+
+
+async def test_cancel_stops_after_current_chunk(monkeypatch, storage):
+    store = FakeStore(new_job())
+
+    async def handler(db, job, source, context):
+        await context.report(10, 10, [])
+        store.job["cancel_requested"] = True
+        await context.report(20, 10, [])
+        await context.report(30, 10, [])
+
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", handler)
+
+    assert await run_import_job(store, "job-1", "run-1", FakeSession) == CANCELLED
+    assert store.job["processed"] == 20
+    assert storage == ["import/p1/job-1/cases.xlsx"]
+
+
+async def test_taken_over_run_does_not_finish(monkeypatch, storage):
+    """A run whose job was claimed by another run stops without touching its state"""
+    store = FakeStore(new_job())
+
+    async def handler(db, job, source, context):
+        store.job["owner"] = "run-2"
+        await context.report(10, 10, [])
+
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", handler)
+
+    assert await run_import_job(store, "job-1", "run-1", FakeSession) is None
+    assert store.finished == []
+    assert storage == []
+
+
+async def test_failure_keeps_file_for_resume(monkeypatch, storage):
+    store = FakeStore(new_job())
+
+    async def handler(db, job, source, context):
+        raise ValueError("Missing required column: 名称")
+
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", handler)
+
+    assert await run_import_job(store, "job-1", "run-1", FakeSession) == FAILED
+    assert store.job["error"] == "Missing required column: 名称"
+    assert storage == []
+
+
+async def test_whole_file_handler_sends_heartbeats(monkeypatch, storage):
+    """A handler that reports only at the end keeps its job alive meanwhile"""
+    monkeypatch.setattr(import_job_service.settings, "IMPORT_JOB_STALL_SECONDS", 0.03)
+    store = FakeStore(new_job())
+
+    async def handler(db, job, source, context):
+        await asyncio.sleep(0.1)
+        await context.report(1, 1, [])
+
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", handler)
+
+    assert await run_import_job(store, "job-1", "run-1", FakeSession) == SUCCEEDED
+    assert store.heartbeats >= 3
+
+
+async def test_heartbeat_stops_a_taken_over_run(monkeypatch, storage):
+    """A run that lost its job is cancelled instead of importing the file again"""
+    monkeypatch.setattr(import_job_service.settings, "IMPORT_JOB_STALL_SECONDS", 0.03)
+    store = FakeStore(new_job())
+    steps = []
+
+    async def handler(db, job, source, context):
+        steps.append("started")
+        store.job["owner"] = "run-2"
+        await asyncio.sleep(1)
+        steps.append("inserted")
+
+    monkeypatch.setitem(import_job_service.IMPORT_JOB_HANDLERS, "chunked", handler)
+
+    assert await run_import_job(store, "job-1", "run-1", FakeSession) is None
+    assert steps == ["started"]
+    assert store.finished == [] and storage == []
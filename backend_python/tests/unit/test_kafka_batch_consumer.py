@@ -0,0 +1,243 @@
+"""
+Unit tests for the batch Kafka consumer
+"""
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+from kafka import TopicPartition
+
+from app.core import kafka
+from app.core.kafka import KafkaConsumerClient, consumer_metrics
+
+Message = namedtuple("Message", ["offset", "key", "value"])
+
+
+class FakeConsumer:
+    """In-memory stand-in for KafkaConsumer over fixed partition logs"""
+
+    def __init__(self, logs):
+        self.logs = logs
+        self.positions = {tp: 0 for tp in logs}
+        self.committed = {}
+        self.paused = set()
+        self.commits = 0
+        self.closed_by = []
+        self.lock = threading.Lock()
+
+    def poll(self, timeout_ms=0, max_records=None):
+        with self.lock:
+            pack = {}
+            budget = max_records or 500
+            for tp, log in self.logs.items():
+                if tp in self.paused or budget <= 0:
+                    continue
+                start = self.positions[tp]
+                records = log[start:start + budget]
+                if records:
+                    pack[tp] = records
+                    self.positions[tp] += len(records)
+                    budget -= len(records)
+        if not pack:
+            time.sleep(timeout_ms / 1000)
+        return pack
+
+    def pause(self, *partitions):
+        self.paused.update(partitions)
+
+    def resume(self, *partitions):
+        self.paused.difference_update(partitions)
+
+    def seek(self, partition, offset):
+        self.positions[partition] = offset
+
+    def commit(self, offsets):
+        self.commits += 1
+        for tp, offset_and_metadata in offsets.items():
+            assert offset_and_metadata.offset >= self.committed.get(tp, 0)
+            self.committed[tp] = offset_and_metadata.offset
+
+    def assignment(self):
+        return set(self.logs)
+
+    def highwater(self, partition):
+        return len(self.logs[partition])
+
+    def position(self, partition):
+        return self.positions[partition]
+
+    def close(self):
+        self.closed_by.append(threading.current_thread().name)
+
+
+def make_logs(partitions=2, per_partition=50, keys=3):
+    """Partition logs where each key lives in one partition with increasing seq"""
+    logs = {}
+    for p in range(partitions):
+        tp = TopicPartition("results", p)
+        logs[tp] = [
+            Message(offset, f"k{p}-{offset % keys}", {"key": f"k{p}-{offset % keys}", "seq": offset})
+            for offset in range(per_partition)
+        ]
+    return logs
+
+
+def wait_until(condition, timeout=5):
+    """Poll a condition from the test thread"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.fixture
+def client():
+    client = KafkaConsumerClient(["results"], group_id="ingest")
+    yield client
+    client.stop_consuming()
+
+
+def test_batches_commit_per_partition_and_keep_key_order(client):
+    """Every message is handled once, in order per key, with batched commits"""
+    logs = make_logs()
+    consumer = client._consumer = FakeConsumer(logs)
+    seen = []
+    lock = threading.Lock()
+
+    def handler(values):
+        with lock:
+            seen.extend(values)
+
+    client.start_batch_consuming(handler, max_records=20)
+    wait_until(lambda: client.stats["processed"] == 100)
+    wait_until(lambda: len(consumer.committed) == 2 and all(offset == 50 for offset in consumer.committed.values()))
+
+    assert len(seen) == 100
+    for key in {value["key"] for value in seen}:
+        sequence = [value["seq"] for value in seen if value["key"] == key]
+        assert sequence == sorted(sequence)
+    assert consumer.commits < 100
+    assert client.get_metrics()["total_lag"] == 0
+
+
+def test_partitions_are_processed_concurrently(client):
+    """Batches of different partitions run on separate workers"""
+    client._consumer = FakeConsumer(make_logs(partitions=2, per_partition=5))
+    barrier = threading.Barrier(2, timeout=2)
+
+    def handler(values):
+        # Both partitions must be inside the handler at the same time
+        barrier.wait()
+
+    client.start_batch_consuming(handler, max_workers=2)
+    wait_until(lambda: client.stats["processed"] == 10)
+    assert client.stats["failed_batches"] == 0
+
+
+def test_failed_batch_is_redelivered(client):
+    """A failing batch is not committed and comes back on the next poll"""
+    tp = TopicPartition("results", 0)
+    consumer = client._consumer = FakeConsumer({tp: make_logs(partitions=1, per_partition=10)[tp]})
+    attempts = []
+
+    def handler(values):
+        attempts.append([value["seq"] for value in values])
+        if len(attempts) == 1:
+            raise ValueError("database unavailable")
+
+    client.start_batch_consuming(handler, retry_backoff_ms=10)
+    wait_until(lambda: consumer.committed.get(tp) == 10)
+
+    assert attempts[0] == attempts[1] == list(range(10))
+    assert client.stats["failed_batches"] == 1
+    assert client.stats["processed"] == 10
+
+
+def test_lag_metrics_while_batch_runs(client):
+    """Lag counts messages from the unfinished batch onwards"""
+    tp = TopicPartition("results", 0)
+    client._consumer = FakeConsumer({tp: make_logs(partitions=1, per_partition=30)[tp]})
+    release = threading.Event()
+
+    client.start_batch_consuming(lambda values: release.wait(2), max_records=10)
+    wait_until(lambda: client.get_metrics()["in_flight"] == 1 and client.get_metrics()["lag"])
+
+    assert client.get_metrics()["lag"] == {"results:0": 30}
+    assert consumer_metrics()["ingest"]["total_lag"] == 30
+
+    release.set()
+    wait_until(lambda: client.stats["processed"] == 30 and client.get_metrics()["total_lag"] == 0)
+
+
+def test_poison_message_is_dead_lettered_after_backoff(client, monkeypatch):
+    """A message that always fails is retried with backoff, then moved aside"""
+    tp = TopicPartition("results", 0)
+    consumer = client._consumer = FakeConsumer({tp: make_logs(partitions=1, per_partition=10)[tp]})
+    dead_letters = []
+    monkeypatch.setattr(kafka, "send_kafka_message", lambda topic, value, key=None: dead_letters.append((topic, value, key)) or True)
+    calls = []
+    handled = []
+
+    def handler(values):
+        calls.append((time.monotonic(), len(values)))
+        if any(value["seq"] == 3 for value in values):
+            raise ValueError("bad record")
+        handled.extend(value["seq"] for value in values)
+
+    client.start_batch_consuming(handler, max_retries=2, retry_backoff_ms=50)
+    wait_until(lambda: consumer.committed.get(tp) == 10)
+
+    # Three batch attempts with growing delays, then one message at a time
+    assert [size for _, size in calls[:3]] == [10, 10, 10] and len(calls) == 13
+    assert calls[1][0] - calls[0][0] >= 0.05 and calls[2][0] - calls[1][0] >= 0.1
+    assert handled == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    [(topic, record, key)] = dead_letters
+    assert topic == "results.dlq" and key == "k0-0"
+    assert (record["offset"], record["value"]["seq"], record["error"]) == (3, 3, "bad record")
+    assert client.stats == {"processed": 9, "batches": 1, "failed_batches": 3, "dead_lettered": 1}
+
+
+def test_failed_dead_letter_send_does_not_duplicate_earlier_ones(client, monkeypatch):
+    """A retry after a failed dead-letter send skips the messages already sent"""
+    tp = TopicPartition("results", 0)
+    consumer = client._consumer = FakeConsumer({tp: make_logs(partitions=1, per_partition=10)[tp]})
+    dead_letters = []
+    failing_sends = [6]  # The first send of offset 6 fails
+
+    def send_kafka_message(topic, value, key=None):
+        if value["offset"] in failing_sends:
+            failing_sends.remove(value["offset"])
+            return False
+        dead_letters.append(value["offset"])
+        return True
+
+    monkeypatch.setattr(kafka, "send_kafka_message", send_kafka_message)
+    handled = []
+
+    def handler(values):
+        if any(value["seq"] in (3, 6) for value in values):
+            raise ValueError("bad record")
+        handled.extend(value["seq"] for value in values)
+
+    client.start_batch_consuming(handler, max_retries=0, retry_backoff_ms=10)
+    wait_until(lambda: consumer.committed.get(tp) == 10)
+
+    assert dead_letters == [3, 6]
+    # Messages handled before the failed send are redelivered (at least once)
+    assert handled == [0, 1, 2, 4, 5, 7, 8, 9] * 2
+    assert client.stats == {"processed": 8, "batches": 1, "failed_batches": 2, "dead_lettered": 2}
+
+
+def test_stop_closes_consumer_on_its_own_thread(client):
+    """Only the consuming thread closes the (not thread-safe) consumer"""
+    consumer = client._consumer = FakeConsumer(make_logs(partitions=1, per_partition=5))
+    client.start_batch_consuming(lambda values: None)
+    wait_until(lambda: client.stats["processed"] == 5)
+
+    client.stop_consuming()
+
+    assert len(consumer.closed_by) == 1 and consumer.closed_by[0] != threading.current_thread().name
+    assert client._consumer is None
@@ -0,0 +1,161 @@
+"""
+Unit tests for the batched async Kafka producer
+"""
+import asyncio
+import threading
+from collections import namedtuple
+
+import pytest
+
+from app.core import kafka
+from app.core.kafka import AsyncKafkaProducer, publish_kafka_message
+
+RecordMetadata = namedtuple("RecordMetadata", ["topic", "partition", "offset"])
+
+
+class FakeBroker:
+    """In-process stand-in for AIOKafkaProducer that acks on flush"""
+
+    def __init__(self, failing_topics=()):
+        self.failing_topics = set(failing_topics)
+        self.log = []
+        self.pending = []
+        self.started = False
+        self.stopped = False
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def start(self):
+        self.started = True
+
+    async def send(self, topic, value=None, key=None):
+        # Like a full partition batch, hold the sender until released
+        await self.release.wait()
+        delivery = asyncio.get_running_loop().create_future()
+        self.pending.append((delivery, topic, value, key))
+        return delivery
+
+    async def flush(self):
+        pending, self.pending = self.pending, []
+        for delivery, topic, value, key in pending:
+            if topic in self.failing_topics:
+                delivery.set_exception(ConnectionError(f"{topic} unavailable"))
+            else:
+                self.log.append((topic, key, value))
+                delivery.set_result(RecordMetadata(topic, 0, len(self.log) - 1))
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+async def broker():
+    return FakeBroker(failing_topics={"broken"})
+
+
+@pytest.fixture
+async def producer(broker):
+    producer = AsyncKafkaProducer(producer_factory=lambda: broker, max_buffered=3)
+    await producer.start()
+    yield producer
+    await producer.stop(timeout=1)
+
+
+async def test_publish_is_delivered_in_order_with_callbacks(producer, broker):
+    """Fire-and-forget messages reach the broker in order and report delivery"""
+    outcomes = []
+
+    for i in range(3):
+        assert producer.publish("results", {"n": i}, key=f"k{i}", callback=lambda m, e: outcomes.append((m, e)))
+    await producer.flush()
+
+    assert broker.log == [("results", f"k{i}", {"n": i}) for i in range(3)]
+    assert [metadata.offset for metadata, error in outcomes] == [0, 1, 2]
+    assert all(error is None for _, error in outcomes)
+    assert producer.get_metrics() == {"sent": 3, "failed": 0, "dropped": 0, "buffered": 0, "in_flight": 0}
+
+
+async def test_failed_delivery_reaches_callback(producer, broker):
+    """Broker errors are counted and passed to the callback, not raised"""
+    outcomes = []
+
+    await producer.send("broken", {"n": 1}, callback=lambda m, e: outcomes.append((m, e)))
+    await producer.flush()
+
+    assert len(outcomes) == 1
+    assert outcomes[0][0] is None and isinstance(outcomes[0][1], ConnectionError)
+    assert producer.stats["failed"] == 1
+
+
+async def test_full_buffer_drops_publish_and_blocks_send(producer, broker):
+    """A stalled broker fills the buffer: publish drops, send waits"""
+    broker.release.clear()
+    producer.publish("results", {"n": 0})
+    await asyncio.sleep(0)  # Sender takes the first message and stalls
+
+    assert all(producer.publish("results", {"n": i}) for i in range(1, 4))
+    errors = []
+    assert producer.publish("results", {"n": 4}, callback=lambda m, e: errors.append(e)) is False
+    assert producer.stats["dropped"] == 1 and isinstance(errors[0], BufferError)
+
+    waiting = asyncio.create_task(producer.send("results", {"n": 5}))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    broker.release.set()
+    await waiting
+    await producer.flush()
+    assert [value["n"] for _, _, value in broker.log] == [0, 1, 2, 3, 5]
+
+
+async def test_publish_from_another_thread(producer, broker):
+    """Sync code running in a worker thread hands messages to the loop"""
+    thread = threading.Thread(target=producer.publish, args=("results", {"n": 1}))
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0)
+    await producer.flush()
+
+    assert broker.log == [("results", None, {"n": 1})]
+
+
+async def test_stop_flushes_buffered_messages(broker):
+    """Shutdown delivers everything buffered before disconnecting"""
+    producer = AsyncKafkaProducer(producer_factory=lambda: broker)
+    await producer.start()
+    for i in range(5):
+        producer.publish("results", {"n": i})
+
+    await producer.stop()
+
+    assert len(broker.log) == 5
+    assert broker.stopped and not producer.started
+    assert producer.publish("results", {"n": 6}) is False
+
+
+async def test_default_compression_needs_no_extra_codec():
+    """The default compression type is usable with the pinned requirements"""
+    producer = kafka._create_aiokafka_producer()
+    await producer.stop()
+
+
+async def test_publish_without_producer_sends_in_executor(monkeypatch):
+    """Before the producer starts, loop code sends on a worker thread instead of dropping"""
+    loop_thread = threading.get_ident()
+    sent = []
+
+    def send_kafka_message(topic, message, key=None):
+        sent.append((topic, message, key, threading.get_ident()))
+        return topic != "broken"
+
+    monkeypatch.setattr(kafka, "send_kafka_message", send_kafka_message)
+    monkeypatch.setattr(kafka, "kafka_async_producer", AsyncKafkaProducer())
+    outcomes = asyncio.Queue()
+
+    assert publish_kafka_message("results", {"n": 1}, key="k", callback=lambda m, e: outcomes.put_nowait(e))
+    assert publish_kafka_message("broken", {"n": 2}, callback=lambda m, e: outcomes.put_nowait(e))
+
+    errors = [await outcomes.get(), await outcomes.get()]
+    assert sorted((topic, message) for topic, message, _, _ in sent) == [("broken", {"n": 2}), ("results", {"n": 1})]
+    assert all(thread != loop_thread for *_, thread in sent)
+    assert sum(error is None for error in errors) == 1
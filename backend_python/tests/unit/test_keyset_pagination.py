@@ -0,0 +1,108 @@
+"""
+Unit tests for keyset (cursor) pagination
+"""
+import pytest
+from sqlalchemy import BigInteger, Column, String, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.database_optimization import KeysetPaginationHelper
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """Minimal table with the list sort columns"""
+    __tablename__ = "keyset_item"
+
+    id = Column(String(50), primary_key=True)
+    project_id = Column(String(50))
+    pos = Column(BigInteger)
+    create_time = Column(BigInteger)
+
+
+KEYS = (Item.pos, Item.create_time, Item.id)
+
+
+@pytest.fixture
+async def db():
+    """In-memory database seeded with rows sharing pos/create_time values"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            Item(id=f"item-{i:03d}", project_id="p1", pos=(i // 4) * 5000, create_time=1000 + i // 2)
+            for i in range(23)
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_cover_all_rows_in_order(db):
+    """Test walking every page by cursor matches the full ordered result"""
+    query = select(Item).where(Item.project_id == "p1")
+    expected = [item.id for item in (await db.execute(KeysetPaginationHelper.apply(query, KEYS))).scalars()]
+
+    seen = []
+    cursor = None
+    while True:
+        page = await KeysetPaginationHelper.paginate(db, query, KEYS, cursor=cursor, page_size=5)
+        seen.extend(item.id for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(seen) == 23
+
+
+@pytest.mark.asyncio
+async def test_rows_with_null_keys_are_not_skipped(db):
+    """Test NULL create_time rows sort last within their pos and are all reached"""
+    db.add_all([
+        Item(id=f"null-{i}", project_id="p1", pos=pos, create_time=None)
+        for i, pos in enumerate((10000, 10000, 0, 25000))
+    ])
+    await db.commit()
+    query = select(Item).where(Item.project_id == "p1")
+
+    seen = []
+    cursor = None
+    while True:
+        page = await KeysetPaginationHelper.paginate(db, query, KEYS, cursor=cursor, page_size=3)
+        seen.extend(item.id for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 27
+    assert seen[seen.index("null-3") - 1] == "item-020"
+    start = seen.index("item-008") + 1
+    assert seen[start:start + 2] == ["null-1", "null-0"]
+    assert seen[-1] == "null-2"
+
+
+def test_cursor_query_seeks_instead_of_offset():
+    """Test a cursor page uses a key predicate rather than OFFSET"""
+    last = Item(id="item-010", pos=10000, create_time=1005)
+    cursor = KeysetPaginationHelper.encode_cursor(last, KEYS)
+
+    sql = str(KeysetPaginationHelper.apply(select(Item), KEYS, cursor, 5))
+
+    assert "OFFSET" not in sql.upper()
+    assert "keyset_item.pos <" in sql
+    assert KeysetPaginationHelper.decode_cursor(cursor, KEYS) == [10000, 1005, "item-010"]
+
+
+def test_invalid_cursor_raises_value_error():
+    """Test malformed cursors are rejected"""
+    with pytest.raises(ValueError):
+        KeysetPaginationHelper.decode_cursor("not-a-cursor", KEYS)
+    with pytest.raises(ValueError):
+        KeysetPaginationHelper.decode_cursor(
+            KeysetPaginationHelper.encode_cursor(Item(id="x", pos=1, create_time=1), KEYS[:2]), KEYS
+        )
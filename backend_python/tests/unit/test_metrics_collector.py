@@ -0,0 +1,49 @@
+"""
+Unit tests for the background metrics sampler
+"""
+import asyncio
+
+import pytest
+
+from app.core.metrics import MetricsCollector
+
+
+class _FakeRedis:
+    """Redis stub counting INFO calls"""
+
+    def __init__(self):
+        self.info_calls = 0
+
+    async def info(self):
+        self.info_calls += 1
+        return {"connected_clients": 3, "keyspace_hits": 3, "keyspace_misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_sampler_publishes_read_only_snapshot(monkeypatch):
+    """Test one INFO per sample and snapshot reads without I/O"""
+    from app.core import metrics
+
+    fake_redis = _FakeRedis()
+
+    async def get_client():
+        return fake_redis
+
+    monkeypatch.setattr(metrics.redis_client, "get_client", get_client)
+
+    collector = MetricsCollector(interval=3600)
+    await collector.start()
+    await asyncio.sleep(0.1)
+    snapshot = collector.snapshot
+    await collector.stop()
+
+    assert fake_redis.info_calls == 1
+    assert snapshot["redis"]["connected_clients"] == 3
+    assert snapshot["cache"]["hit_rate"] == 75.0
+    assert "cpu_percent" in snapshot["system"]
+    with pytest.raises(TypeError):
+        snapshot["cache"]["hit_rate"] = 0
+
+    # Reads are served from the published snapshot
+    assert await collector.get_snapshot() is snapshot
+    assert fake_redis.info_calls == 1
@@ -0,0 +1,73 @@
+"""
+Unit tests for the Prometheus metrics registry
+"""
+import pytest
+from prometheus_client import CollectorRegistry
+
+from app.core.metrics_registry import RequestMetricsRegistry
+
+
+def test_observe_records_counter_and_histogram():
+    """Test per-route counters and latency histograms"""
+    metrics = RequestMetricsRegistry(registry=CollectorRegistry())
+
+    metrics.observe("/api/v1/bug/bugs/{bug_id}", "GET", 200, 0.02)
+    metrics.observe("/api/v1/bug/bugs/{bug_id}", "GET", 200, 0.3)
+    metrics.observe("/api/v1/bug/bugs/{bug_id}", "GET", 404, 0.001)
+
+    registry = metrics.registry
+    labels = {"route": "/api/v1/bug/bugs/{bug_id}", "method": "GET"}
+    assert registry.get_sample_value("metersphere_http_requests_total", {**labels, "status": "200"}) == 2
+    assert registry.get_sample_value("metersphere_http_requests_total", {**labels, "status": "404"}) == 1
+    assert registry.get_sample_value("metersphere_http_request_duration_seconds_count", labels) == 3
+    assert registry.get_sample_value(
+        "metersphere_http_request_duration_seconds_bucket", {**labels, "le": "0.025"}
+    ) == 2
+
+
+def test_render_prometheus_text():
+    """Test rendering in Prometheus text format"""
+    metrics = RequestMetricsRegistry(registry=CollectorRegistry())
+    metrics.observe("/api/v1/health", "GET", 200, 0.01)
+
+    text = metrics.render().decode("utf-8")
+
+    assert "# TYPE metersphere_http_requests_total counter" in text
+    assert 'route="/api/v1/health"' in text
+    assert "metersphere_http_request_duration_seconds_bucket" in text
+
+
+def test_middleware_uses_route_template(monkeypatch):
+    """Test the middleware labels requests by route template, not raw path"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core import metrics_middleware
+    from app.core.metrics_registry import UNMATCHED_ROUTE
+
+    metrics = RequestMetricsRegistry(registry=CollectorRegistry())
+    monkeypatch.setattr(metrics_middleware, "metrics_registry", metrics)
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    app.add_middleware(metrics_middleware.MetricsMiddleware)
+    client = TestClient(app)
+
+    response = client.get("/items/42")
+    client.get("/items/43")
+    client.get("/missing")
+
+    assert "X-Response-Time" in response.headers
+    registry = metrics.registry
+    assert registry.get_sample_value(
+        "metersphere_http_requests_total",
+        {"route": "/items/{item_id}", "method": "GET", "status": "200"},
+    ) == 2
+    assert registry.get_sample_value(
+        "metersphere_http_requests_total",
+        {"route": UNMATCHED_ROUTE, "method": "GET", "status": "404"},
+    ) == 1
@@ -0,0 +1,115 @@
+"""
+Unit tests for streaming multipart uploads to MinIO
+"""
+import hashlib
+import io
+import threading
+from tempfile import SpooledTemporaryFile
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from minio import Minio
+from minio.datatypes import CompleteMultipartUploadResult
+
+from app.core.config import settings
+from app.core.minio import MinIOClient, UploadTooLargeError
+from app.services import file_service as file_service_module
+from app.services.file_service import FileService
+
+MB = 1024 * 1024
+
+
+class RecordingMinio(Minio):
+    """Minio client whose S3 calls are recorded instead of sent"""
+
+    def __init__(self):
+        super().__init__("localhost:9000", access_key="test", secret_key="test", secure=False)
+        self.parts = {}
+        self.objects = {}
+        self.aborted = []
+        self.lock = threading.Lock()
+
+    def _put_object(self, bucket_name, object_name, data, headers, query_params=None):
+        self.objects[object_name] = bytes(data)
+        return type("Result", (), {"etag": "single"})()
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        return "upload-1"
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        with self.lock:
+            self.parts[part_number] = bytes(data)
+        return f"etag-{part_number}"
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        self.objects[object_name] = b"".join(self.parts[part.part_number] for part in parts)
+        return CompleteMultipartUploadResult(
+            type("Response", (), {"data": b"<CompleteMultipartUploadResult><ETag>multi</ETag>"
+                                           b"</CompleteMultipartUploadResult>", "headers": {}})()
+        )
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self.aborted.append(upload_id)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setattr(settings, "MINIO_PART_SIZE", 5 * MB)
+    client = MinIOClient()
+    client._client = RecordingMinio()
+    return client
+
+
+def test_stream_is_uploaded_in_parts_with_checksum(storage):
+    """A large stream becomes fixed-size parts; size and hash are computed on the fly"""
+    data = bytes(range(256)) * (12 * MB // 256)
+
+    result = storage.upload_stream("system/big.bin", io.BytesIO(data), max_size=20 * MB)
+
+    assert [len(part) for _, part in sorted(storage._client.parts.items())] == [5 * MB, 5 * MB, 2 * MB]
+    assert storage._client.objects["system/big.bin"] == data
+    assert result["size"] == len(data)
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_small_stream_uses_single_put(storage):
+    """Streams smaller than one part are sent in one request"""
+    result = storage.upload_stream("system/small.txt", io.BytesIO(b"hello"))
+
+    assert storage._client.objects["system/small.txt"] == b"hello"
+    assert storage._client.parts == {}
+    assert result["size"] == 5
+
+
+def test_size_limit_aborts_multipart_upload(storage):
+    """Exceeding max_size stops reading and aborts the upload"""
+    with pytest.raises(UploadTooLargeError):
+        storage.upload_stream("system/big.bin", io.BytesIO(b"x" * (12 * MB)), max_size=7 * MB)
+
+    assert storage._client.aborted == ["upload-1"]
+    assert "system/big.bin" not in storage._client.objects
+
+
+async def test_file_service_streams_upload_file(storage, monkeypatch):
+    """FileService uploads the spooled file and reports its checksum"""
+    monkeypatch.setattr(file_service_module, "minio_client", storage)
+    spool = SpooledTemporaryFile(max_size=1024)
+    spool.write(b"a,b\n1,2\n")
+    upload = UploadFile(file=spool, filename="data.csv", size=8)
+
+    result = await FileService().upload_file(upload, folder="system")
+
+    assert result["file_size"] == 8
+    assert result["checksum"] == hashlib.sha256(b"a,b\n1,2\n").hexdigest()
+    assert storage._client.objects[result["file_path"]] == b"a,b\n1,2\n"
+
+
+async def test_file_service_rejects_oversized_upload(storage, monkeypatch):
+    """Uploads over MAX_FILE_SIZE fail with 413 even when the size is unknown"""
+    monkeypatch.setattr(file_service_module, "minio_client", storage)
+    monkeypatch.setattr(FileService, "MAX_FILE_SIZE", 4)
+    upload = UploadFile(file=io.BytesIO(b"0123456789"), filename="data.csv")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await FileService().upload_file(upload, folder="system")
+    assert exc_info.value.status_code == 413
@@ -0,0 +1,126 @@
+"""
+Unit tests for Swagger/OpenAPI operation parsing and fingerprints
+"""
+import copy
+import json
+
+import pytest
+
+from app.services.openapi_parser import OpenApiParser, load_spec
+
+
+def openapi_spec():
+    return {
+        "openapi": "3.0.3",
+        "paths": {
+            "/pets": {
+                "get": {"summary": "List pets", "responses": {"200": {"$ref": "#/components/responses/Pets"}}},
+                "post": {
+                    "operationId": "createPet",
+                    "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                    "responses": {"201": {"description": "Created"}},
+                },
+            },
+            "/owners/{id}": {
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+                "get": {"responses": {"200": {"description": "Owner"}}},
+            },
+        },
+        "components": {
+            "schemas": {
+                # Pet -> Owner -> Pet is a recursive schema
+                "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+                "Owner": {"type": "object", "properties": {"pets": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}}},
+            },
+            "responses": {
+                "Pets": {"description": "Pets", "content": {"application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}}}},
+            },
+        },
+    }
+
+
+def fingerprints(spec):
+    operations, errors = OpenApiParser(spec).operations()
+    assert errors == []
+    return {(operation.method, operation.path): operation.fingerprint for operation in operations}
+
+
+def test_fingerprints_are_stable_and_follow_refs():
+    spec = openapi_spec()
+    before = fingerprints(spec)
+    assert before == fingerprints(copy.deepcopy(spec))
+    assert set(before) == {("GET", "/pets"), ("POST", "/pets"), ("GET", "/owners/{id}")}
+
+    # A change two refs away reaches every operation using the schema, and only those
+    spec["components"]["schemas"]["Owner"]["properties"]["name"] = {"type": "string"}
+    after = fingerprints(spec)
+    assert after[("GET", "/pets")] != before[("GET", "/pets")]
+    assert after[("POST", "/pets")] != before[("POST", "/pets")]
+    assert after[("GET", "/owners/{id}")] == before[("GET", "/owners/{id}")]
+
+
+def test_definition_expands_refs_and_path_parameters():
+    operations, _ = OpenApiParser(openapi_spec()).operations()
+    definitions = {(operation.method, operation.path): operation.to_definition() for operation in operations}
+
+    create = definitions[("POST", "/pets")]
+    assert create["name"] == "createPet"
+    schema = json.loads(create["request_body"])["body"]["content"]["application/json"]["schema"]
+    # The recursive reference back to Pet is kept as a $ref
+    assert schema["properties"]["owner"]["properties"]["pets"]["items"] == {"$ref": "#/components/schemas/Pet"}
+
+    owner = definitions[("GET", "/owners/{id}")]
+    assert owner["name"] == "GET /owners/{id}"
+    assert [parameter["name"] for parameter in json.loads(owner["request_body"])["parameters"]] == ["id"]
+
+
+def test_swagger2_body_and_responses_use_openapi3_layout():
+    spec = {
+        "swagger": "2.0",
+        "consumes": ["application/json"],
+        "paths": {
+            "/login": {
+                "post": {
+                    "parameters": [
+                        {"name": "body", "in": "body", "required": True, "schema": {"$ref": "#/definitions/Login"}},
+                        {"name": "trace", "in": "header", "type": "string"},
+                    ],
+                    "responses": {"200": {"description": "OK", "schema": {"type": "string"}}},
+                },
+            },
+            "/upload": {
+                "post": {
+                    "consumes": [],
+                    "parameters": [{"name": "file", "in": "formData", "type": "file", "required": True}],
+                    "responses": {},
+                },
+            },
+        },
+        "definitions": {"Login": {"type": "object", "properties": {"user": {"type": "string"}}}},
+    }
+    operations, errors = OpenApiParser(spec).operations()
+    assert errors == []
+    login, upload = (json.loads(operation.to_definition()["request_body"]) for operation in operations)
+
+    assert [parameter["name"] for parameter in login["parameters"]] == ["trace"]
+    assert login["body"]["required"] is True
+    assert login["body"]["content"]["application/json"]["schema"]["properties"] == {"user": {"type": "string"}}
+    assert upload["body"]["content"]["multipart/form-data"]["schema"]["required"] == ["file"]
+
+    responses = json.loads(operations[0].to_definition()["response_body"])
+    assert responses["200"]["content"]["application/json"]["schema"] == {"type": "string"}
+
+
+def test_unresolvable_ref_skips_only_that_operation():
+    spec = openapi_spec()
+    spec["paths"]["/pets"]["get"]["responses"]["200"]["$ref"] = "#/components/responses/Missing"
+    operations, errors = OpenApiParser(spec).operations()
+
+    assert [(operation.method, operation.path) for operation in operations] == [("POST", "/pets"), ("GET", "/owners/{id}")]
+    assert errors == ["GET /pets: Unresolvable $ref: #/components/responses/Missing"]
+
+
+def test_load_spec_accepts_yaml_and_rejects_other_documents():
+    assert load_spec(b"openapi: 3.0.0\npaths: {}\n")["openapi"] == "3.0.0"
+    with pytest.raises(ValueError):
+        load_spec(b'{"name": "not a spec"}')
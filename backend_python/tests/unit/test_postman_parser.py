@@ -0,0 +1,81 @@
+"""
+Unit tests for Postman collection flattening
+"""
+import json
+
+import pytest
+
+from app.services.postman_parser import ROOT_FOLDER, parse_collection
+
+V21 = "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"
+
+
+def collection(items, schema=V21):
+    return {"info": {"name": "Shop", "schema": schema}, "item": items}
+
+
+def request(name, method="GET", url="{{baseUrl}}/users", **fields):
+    return {"name": name, "request": {"method": method, "url": url, **fields}}
+
+
+def test_folders_and_requests_keep_document_order():
+    folders, requests, errors = parse_collection(collection([
+        request("health"),
+        {"name": "Users", "item": [
+            request("list users"),
+            {"name": "Admin", "item": [request("promote", "POST", "{{baseUrl}}/users/:id/promote")]},
+        ]},
+        {"name": "Orders", "item": []},
+    ]))
+
+    assert errors == []
+    assert folders == [(ROOT_FOLDER, "Users"), (0, "Admin"), (ROOT_FOLDER, "Orders")]
+    assert [(item["name"], item["folder"]) for item in requests] == [("health", ROOT_FOLDER), ("list users", 0), ("promote", 1)]
+    assert requests[2]["method"] == "POST"
+    assert requests[2]["path"] == "/users/{id}/promote"
+
+
+def test_deep_nesting_does_not_recurse():
+    items = [request("leaf")]
+    for depth in range(5000):
+        items = [{"name": f"level {depth}", "item": items}]
+    folders, requests, _ = parse_collection(collection(items))
+
+    assert len(folders) == 5000
+    assert requests[0]["folder"] == 4999
+
+
+def test_url_forms_of_both_versions():
+    _, requests, _ = parse_collection(collection([
+        request("v2.0 string", url="https://api.example.com/v1/items?page=2&q="),
+        request("v2.1 object", url={
+            "raw": "{{host}}/v1/items/:itemId",
+            "host": ["{{host}}"],
+            "path": ["v1", "items", ":itemId"],
+            "query": [{"key": "expand", "value": "tags"}],
+        }),
+        {"name": "bare", "request": "{{host}}/ping"},
+    ], schema="https://schema.getpostman.com/json/collection/v2.0.0/collection.json"))
+
+    assert [(item["method"], item["path"]) for item in requests] == [
+        ("GET", "/v1/items"), ("GET", "/v1/items/{itemId}"), ("GET", "/ping"),
+    ]
+    assert json.loads(requests[0]["case_request"])["query"] == [{"key": "page", "value": "2"}, {"key": "q", "value": ""}]
+    assert json.loads(requests[1]["request_body"])["query"] == [{"key": "expand", "value": "tags"}]
+
+
+def test_saved_response_becomes_expected_response():
+    item = request("get user", description={"content": "Fetch one user"})
+    item["response"] = [{"name": "ok", "code": 200, "status": "OK", "body": "{\"id\": 1}"}]
+    _, requests, _ = parse_collection(collection([item]))
+
+    assert requests[0]["description"] == "Fetch one user"
+    assert json.loads(requests[0]["expected_response"])["code"] == 200
+    assert requests[0]["response_body"] == requests[0]["expected_response"]
+
+
+def test_rejects_v1_collections():
+    with pytest.raises(ValueError):
+        parse_collection({"info": {"schema": "https://schema.getpostman.com/json/collection/v1.0.0/collection.json"}, "requests": []})
+    with pytest.raises(ValueError):
+        parse_collection({"name": "no info"})
@@ -0,0 +1,166 @@
+"""
+Unit tests for materialized project statistics
+"""
+import pytest
+from sqlalchemy import BigInteger, Boolean, event, insert, select, update
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.models.project_statistics import ProjectStatistics
+from app.models.bug import Bug
+from app.models.api_test import ApiDefinition, ApiTestCase, ApiScenario
+from app.models.functional_case import FunctionalCase
+from app.models.test_plan import TestPlan as Plan
+from app.services.project_statistics_service import ProjectStatisticsService, STATISTICS_FIELDS
+
+MODELS = (ProjectStatistics, Bug, ApiDefinition, ApiTestCase, ApiScenario, FunctionalCase, Plan)
+
+
+@compiles(LONGTEXT, "sqlite")
+def _longtext_on_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+def placeholder(column):
+    """A value for a required column the tests do not care about"""
+    if isinstance(column.type, Boolean):
+        return False
+    if isinstance(column.type, BigInteger):
+        return 0
+    return "x"
+
+
+async def add(db, model, row_id, project_id, **values):
+    required = {
+        column.key: placeholder(column)
+        for column in model.__table__.columns
+        if not column.nullable and column.default is None and not column.primary_key
+    }
+    await db.execute(insert(model).values({**required, "id": row_id, "project_id": project_id, **values}))
+
+
+def counters(**values):
+    return {field: values.get(field, 0) for field in STATISTICS_FIELDS}
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with the counter table and the counted tables"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        for model in MODELS:
+            await conn.run_sync(model.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+async def stored(db, project_id):
+    result = await db.execute(select(ProjectStatistics).where(ProjectStatistics.project_id == project_id))
+    row = result.scalar_one_or_none()
+    return row and {field: getattr(row, field) for field in STATISTICS_FIELDS}
+
+
+async def test_reconcile_counts_live_rows_only(db):
+    await add(db, Bug, "b1", "p1")
+    await add(db, Bug, "b2", "p1", deleted=True)
+    await add(db, ApiDefinition, "d1", "p1")
+    await add(db, ApiTestCase, "c1", "p1", api_definition_id="d1")
+    await add(db, ApiScenario, "s1", "p2")
+    await add(db, FunctionalCase, "f1", "p1", latest=True)
+    await add(db, FunctionalCase, "f2", "p1", latest=False)
+    await add(db, Plan, "t1", "p2")
+    await add(db, Plan, "t2", "p2")
+
+    counts = await ProjectStatisticsService(db).reconcile()
+
+    expected = {
+        "p1": counters(bug_count=1, api_definition_count=1, api_test_case_count=1, functional_case_count=1),
+        "p2": counters(api_scenario_count=1, test_plan_count=2),
+    }
+    assert counts == expected
+    assert await stored(db, "p1") == expected["p1"]
+    assert await stored(db, "p2") == expected["p2"]
+
+
+async def test_reconcile_all_zeroes_projects_without_resources(db):
+    await add(db, Bug, "b1", "p1")
+    service = ProjectStatisticsService(db)
+    await service.reconcile()
+
+    await db.execute(update(Bug).values(deleted=True))
+    counts = await service.reconcile()
+
+    assert counts == {"p1": counters()}
+    assert await stored(db, "p1") == counters()
+
+
+async def test_reconcile_selected_projects(db):
+    await add(db, Bug, "b1", "p1")
+    await add(db, Bug, "b2", "p2")
+
+    counts = await ProjectStatisticsService(db).reconcile(["p1", "empty", "p1"])
+
+    assert counts == {"p1": counters(bug_count=1), "empty": counters()}
+    assert await stored(db, "p2") is None
+
+
+async def test_reconcile_counts_inside_the_update(db):
+    """The counter row is written from a correlated COUNT, not from values read earlier"""
+    await add(db, Bug, "b1", "p1")
+    service = ProjectStatisticsService(db)
+    await service.reconcile(["p1"])
+    statements = []
+    event.listen(
+        db.bind.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    await service.reconcile(["p1"])
+
+    writes = [statement for statement in statements if not statement.lstrip().upper().startswith("SELECT")]
+    assert len(writes) == 1
+    assert writes[0].startswith("UPDATE project_statistics") and "count(*)" in writes[0]
+
+
+async def test_adjust_existing_counter(db):
+    service = ProjectStatisticsService(db)
+    await service.reconcile(["p1"])
+
+    await service.adjust("p1", "bug_count", 3)
+    await service.adjust("p1", "bug_count", -1)
+    await service.adjust("p1", "test_plan_count")
+    await service.adjust(None, "bug_count")
+    await service.adjust("p1", "bug_count", 0)
+
+    assert await stored(db, "p1") == counters(bug_count=2, test_plan_count=1)
+
+
+async def test_adjust_without_counter_row_counts_pending_changes(db):
+    service = ProjectStatisticsService(db)
+    db.add(Bug(id="b1", project_id="p1", title="t", handle_user="u", template_id="x", platform="Local", status="new"))
+
+    # The pending bug is flushed and counted; the delta is not added on top
+    await service.adjust("p1", "bug_count")
+
+    assert await stored(db, "p1") == counters(bug_count=1)
+
+
+async def test_upsert_overwrites_or_keeps_rows(db):
+    service = ProjectStatisticsService(db)
+    await service._upsert([{"project_id": "p1", **counters(bug_count=5), "update_time": 1}])
+    await service._upsert([{"project_id": "p1", **counters(bug_count=7), "update_time": 2}])
+    assert await stored(db, "p1") == counters(bug_count=7)
+
+    await service._upsert(
+        [
+            {"project_id": "p1", **counters(), "update_time": 3},
+            {"project_id": "p2", **counters(), "update_time": 3},
+        ],
+        overwrite=False,
+    )
+    assert await stored(db, "p1") == counters(bug_count=7)
+    assert await stored(db, "p2") == counters()
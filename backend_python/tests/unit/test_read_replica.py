@@ -0,0 +1,123 @@
+"""
+Unit tests for read replica routing
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import Column, String, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.read_replica import ReadReplicaRouter, begin_request_scope
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """Row whose value tells which database served a read"""
+    __tablename__ = "replica_item"
+
+    id = Column(String(50), primary_key=True)
+    source = Column(String(50))
+
+
+async def make_engine(path, source):
+    """File-backed SQLite engine seeded with one row naming the database"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(Item.__table__.insert().values(id="item", source=source))
+    return engine
+
+
+async def read_source(session):
+    """Read the source marker through a session"""
+    return (await session.execute(select(Item.source).where(Item.id == "item"))).scalar_one()
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    """Primary and two replica engines backed by separate SQLite files"""
+    primary = await make_engine(tmp_path / "primary.db", "primary")
+    replicas = [
+        await make_engine(tmp_path / "replica1.db", "replica1"),
+        await make_engine(tmp_path / "replica2.db", "replica2"),
+    ]
+    yield primary, replicas
+    for engine in [primary, *replicas]:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_replicas_and_writes_go_to_primary(engines):
+    """Test each session reads from the next replica and writes reach the primary"""
+    primary, replicas = engines
+    factory = ReadReplicaRouter(primary, replicas).sessionmaker(expire_on_commit=False)
+
+    sources = []
+    for _ in range(4):
+        async with factory() as session:
+            sources.append(await read_source(session))
+    assert sources == ["replica1", "replica2", "replica1", "replica2"]
+
+    async with factory() as session:
+        session.add(Item(id="new", source="written"))
+        await session.commit()
+    async with primary.connect() as conn:
+        assert (await conn.execute(select(Item.source).where(Item.id == "new"))).scalar_one() == "written"
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_a_write_in_the_same_request(engines):
+    """Test read-your-writes within a session and across sessions of a request"""
+    primary, replicas = engines
+    factory = ReadReplicaRouter(primary, replicas).sessionmaker(expire_on_commit=False)
+
+    async def request():
+        begin_request_scope()
+        async with factory() as session:
+            assert await read_source(session) == "replica1"
+            await session.execute(update(Item).where(Item.id == "item").values(source="updated"))
+            assert await read_source(session) == "updated"
+            await session.commit()
+        async with factory() as session:
+            return await read_source(session)
+
+    # Each request runs in its own task, like under the ASGI server
+    assert await asyncio.create_task(request()) == "updated"
+    async with factory() as session:
+        assert await read_source(session) == "replica2"
+
+
+@pytest.mark.asyncio
+async def test_failed_replica_is_ejected_and_reinstated(engines, tmp_path):
+    """Test connection failures eject a replica until a probe succeeds"""
+    primary, replicas = engines
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    router = ReadReplicaRouter(primary, [broken, replicas[0]], eject_seconds=60)
+    factory = router.sessionmaker(expire_on_commit=False)
+
+    with pytest.raises(Exception):
+        async with factory() as session:
+            await read_source(session)
+
+    assert router.healthy_replicas() == [replicas[0]]
+    for _ in range(2):
+        async with factory() as session:
+            assert await read_source(session) == "replica1"
+
+    (tmp_path / "missing").mkdir()
+    results = await router.check()
+    assert all(results.values())
+    assert router.healthy_replicas() == [broken, replicas[0]]
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_without_replicas_reads_use_primary(engines):
+    """Test the router degrades to the primary when no replica is configured"""
+    primary, _ = engines
+    factory = ReadReplicaRouter(primary).sessionmaker(expire_on_commit=False)
+
+    async with factory() as session:
+        assert await read_source(session) == "primary"
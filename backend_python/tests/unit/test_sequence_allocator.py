@@ -0,0 +1,193 @@
+"""
+Unit tests for the per-project sequence allocator
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import BigInteger, Column, String
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core import sequence
+from app.core.sequence import SequenceAllocator, POS_STEP
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """Minimal project-scoped table with num and pos"""
+    __tablename__ = "sequence_item"
+
+    id = Column(String(50), primary_key=True)
+    project_id = Column(String(50))
+    num = Column(BigInteger)
+    pos = Column(BigInteger)
+
+
+class FakePipeline:
+    """Pipeline collecting SET NX calls"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, key, value, nx=False):
+        self.calls.append((key, value))
+
+    async def execute(self):
+        for key, value in self.calls:
+            self.redis.values.setdefault(key, int(value))
+
+
+class FakeRedis:
+    """In-memory stand-in emulating the allocation script"""
+
+    def __init__(self):
+        self.values = {}
+        self.verified = set()  # :verified keys that have not expired
+        self.eval_calls = 0
+        self.down = False
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        self.eval_calls += 1
+        if self.down:
+            raise ConnectionError("redis down")
+        (*keys, verified_key), args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if any(key not in self.values for key in keys):
+            return None
+        if int(args[4]) == 0:
+            if verified_key not in self.verified:
+                return 0
+        else:
+            self.verified.add(verified_key)
+        amounts, floors = args[:2], args[2:4]
+        for key, amount, floor in zip(keys, amounts, floors):
+            self.values[key] = max(self.values[key], int(floor)) + int(amount)
+        return [self.values[key] for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Route the allocator to an in-memory Redis"""
+    client = FakeRedis()
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(sequence.redis_client, "get_client", get_client)
+    return client
+
+
+@pytest.fixture
+async def db():
+    """In-memory database with existing rows up to num 7"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            Item(id=f"i{n}", project_id="p1", num=n, pos=n * POS_STEP) for n in range(1, 8)
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_seeds_from_table_and_allocates_ranges(db, fake_redis):
+    """Test counters continue after existing rows and bulk ranges are contiguous"""
+    allocator = SequenceAllocator(lease_size=1)
+
+    assert await allocator.next(db, Item, "p1") == (8, 8 * POS_STEP)
+    assert await allocator.allocate(db, Item, "p1", 5) == (9, 9 * POS_STEP)
+    assert await allocator.next(db, Item, "p1") == (14, 14 * POS_STEP)
+
+    # Other projects start from their own maximum
+    assert await allocator.next(db, Item, "p2") == (1, POS_STEP)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_allocations_are_unique(db, fake_redis):
+    """Test concurrent creates never share a number"""
+    allocator = SequenceAllocator(lease_size=1)
+
+    results = await asyncio.gather(*(allocator.next(db, Item, "p1") for _ in range(50)))
+
+    nums = [num for num, _ in results]
+    assert len(set(nums)) == 50
+    assert sorted(nums) == list(range(8, 58))
+
+
+@pytest.mark.asyncio
+async def test_leased_blocks_save_round_trips(db, fake_redis):
+    """Test a process hands out its leased block locally"""
+    allocator = SequenceAllocator(lease_size=10)
+
+    results = await asyncio.gather(*(allocator.next(db, Item, "p1") for _ in range(25)))
+
+    assert len({num for num, _ in results}) == 25
+    # One unseeded attempt plus three leases
+    assert fake_redis.eval_calls == 4
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_table_max_without_redis(db, monkeypatch):
+    """Test allocation still works when Redis is unavailable"""
+
+    async def get_client():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(sequence.redis_client, "get_client", get_client)
+    allocator = SequenceAllocator(lease_size=10)
+
+    assert await allocator.next(db, Item, "p1") == (8, 8 * POS_STEP)
+
+
+@pytest.mark.asyncio
+async def test_recovery_continues_after_fallback_numbers(db, fake_redis):
+    """Test numbers handed out during an outage are not reused after recovery"""
+    allocator = SequenceAllocator(lease_size=1)
+    assert await allocator.next(db, Item, "p1") == (8, 8 * POS_STEP)
+    db.add(Item(id="i8", project_id="p1", num=8, pos=8 * POS_STEP))
+    await db.commit()
+
+    fake_redis.down = True
+    # Two concurrent imports (rows not inserted yet) must not share a range
+    first, second = await asyncio.gather(
+        allocator.allocate(db, Item, "p1", 100),
+        allocator.allocate(db, Item, "p1", 100),
+    )
+    assert sorted([first[0], second[0]]) == [9, 109]
+    # Another process inserted a row during the outage
+    db.add(Item(id="other", project_id="p1", num=300, pos=300 * POS_STEP))
+    await db.commit()
+
+    fake_redis.down = False
+    assert await allocator.next(db, Item, "p1") == (301, 301 * POS_STEP)
+    assert await allocator.next(db, Item, "p1") == (302, 302 * POS_STEP)
+
+
+@pytest.mark.asyncio
+async def test_other_processes_reconcile_once_verification_expires(db, fake_redis):
+    """Test numbers another process committed during an outage are not reused"""
+    fallback, other = SequenceAllocator(lease_size=1), SequenceAllocator(lease_size=1)
+    assert await other.next(db, Item, "p1") == (8, 8 * POS_STEP)
+    db.add(Item(id="i8", project_id="p1", num=8, pos=8 * POS_STEP))
+    await db.commit()
+
+    fake_redis.down = True
+    for n in range(3):
+        num, pos = await fallback.next(db, Item, "p1")
+        db.add(Item(id=f"outage{n}", project_id="p1", num=num, pos=pos))
+        await db.commit()
+    fake_redis.down = False
+    # The outage outlasted the verify TTL
+    fake_redis.verified.clear()
+
+    # The first process back is not the one that fell back
+    assert await other.next(db, Item, "p1") == (12, 12 * POS_STEP)
+    assert await fallback.next(db, Item, "p1") == (13, 13 * POS_STEP)
@@ -0,0 +1,78 @@
+"""
+Unit tests for bulk user creation and updates
+"""
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user import User
+from app.services import user_service
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+async def db(monkeypatch):
+    """In-memory database with an active and a soft-deleted user"""
+    async def invalidate(table):
+        pass
+
+    async def on_created(table, project_id=None, count=1):
+        pass
+
+    monkeypatch.setattr(user_service.count_strategy, "invalidate", invalidate)
+    monkeypatch.setattr(user_service.count_strategy, "on_created", on_created)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all([
+            User(id=user_id, name=user_id, email=f"{user_id}@example.com", password="x", cft_token=user_id,
+                 source="LOCAL", create_time=0, update_time=0, deleted=deleted)
+            for user_id, deleted in (("active", False), ("gone", True))
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(db, monkeypatch):
+    service = UserService(db)
+    monkeypatch.setattr(service.auth_service, "get_password_hash", lambda password: f"hashed:{password}")
+    return service
+
+
+def new_user(email):
+    return {"name": email, "email": email, "password": "secret"}
+
+
+async def test_create_rejects_emails_of_deleted_users(service):
+    with pytest.raises(ValueError, match="gone@example.com"):
+        await service.create_users_bulk([new_user("new@example.com"), new_user("gone@example.com")])
+
+    created = await service.create_users_bulk([new_user("new@example.com")], create_user="admin")
+    assert [(user.email, user.password) for user in created] == [("new@example.com", "hashed:secret")]
+
+
+@pytest.mark.parametrize("updates, message", [
+    ({"active": {"email": "gone@example.com"}}, "already exist: gone@example.com"),
+    ({"active": {"email": "x@example.com"}, "gone": {"email": "x@example.com"}}, "Duplicate emails"),
+])
+async def test_update_rejects_email_collisions(db, service, updates, message):
+    with pytest.raises(ValueError, match=message):
+        await service.update_users_bulk(updates)
+
+    assert (await db.get(User, "active")).email == "active@example.com"
+
+
+async def test_update_keeps_or_changes_own_email(db, service):
+    updated = await service.update_users_bulk({
+        "active": {"email": "active@example.com", "name": "Renamed"},
+        "gone": {"email": "back@example.com"},
+    })
+
+    assert updated == 2
+    db.expire_all()
+    assert (await db.get(User, "active")).name == "Renamed"
+    assert (await db.get(User, "gone")).email == "back@example.com"
@@ -0,0 +1,131 @@
+"""
+Unit tests for XMind topic flattening and case mapping
+"""
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.services.xmind_parser import ROOT, build_cases, parse_xmind_classic, read_xmind
+
+XMAP_NS = "urn:xmind:xmap:xmlns:content:2.0"
+
+
+def xmind(files):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return output.getvalue()
+
+
+def zen_topic(title, *children, **fields):
+    topic = {"title": title, **fields}
+    if children:
+        topic["children"] = {"attached": list(children)}
+    return topic
+
+
+def test_zen_map_to_modules_and_cases():
+    root = zen_topic(
+        "登录",
+        zen_topic(
+            "账号",
+            zen_topic(
+                "tc:密码错误",
+                zen_topic("pc:已注册"),
+                zen_topic("tag:冒烟, 回归"),
+                zen_topic("输入错误密码", zen_topic("提示密码错误")),
+                zen_topic("RC：手工"),
+                labels=["P1"],
+            ),
+        ),
+        zen_topic("case-验证码", notes={"plain": {"content": "备用说明"}}),
+    )
+    modules, cases, errors = read_xmind(xmind({"content.json": json.dumps([{"rootTopic": root}])}))
+
+    assert errors == []
+    assert modules == [(ROOT, "登录"), (0, "账号")]
+    wrong_password, captcha = cases
+    assert wrong_password["module"] == 1
+    assert wrong_password["name"] == "密码错误"
+    assert wrong_password["prerequisite"] == "已注册"
+    assert wrong_password["description"] == "手工"
+    assert json.loads(wrong_password["tags"]) == ["P1", "冒烟", "回归"]
+    assert json.loads(wrong_password["steps"]) == [{"num": 1, "desc": "输入错误密码", "result": "提示密码错误"}]
+    assert captcha["module"] == 0
+    assert captcha["description"] == "备用说明"
+    assert captcha["steps"] is None
+
+
+def test_classic_skips_detached_topics():
+    content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<xmap-content xmlns="{XMAP_NS}"><sheet><title>Sheet 1</title>
+  <topic><title>支付</title>
+    <labels><label>核心</label></labels>
+    <children>
+      <topics type="attached">
+        <topic><title>tc:余额不足</title>
+          <notes><plain>余额为 0</plain></notes>
+          <children><topics type="attached"><topic><title>下单</title></topic></topics></children>
+        </topic>
+      </topics>
+      <topics type="detached"><topic><title>tc:浮动</title></topic></topics>
+    </children>
+  </topic>
+</sheet></xmap-content>"""
+    modules, cases, errors = read_xmind(xmind({"content.xml": content}))
+
+    assert errors == []
+    assert modules == [(ROOT, "支付")]
+    assert [case["name"] for case in cases] == ["余额不足"]
+    assert cases[0]["description"] == "余额为 0"
+    assert json.loads(cases[0]["steps"]) == [{"num": 1, "desc": "下单", "result": ""}]
+
+
+def test_classic_deep_map_does_not_recurse():
+    depth = 20000
+    content = (
+        f'<xmap-content xmlns="{XMAP_NS}"><sheet>'
+        + "".join(f'<topic><title>m{level}</title><children><topics type="attached">' for level in range(depth))
+        + "<topic><title>tc:leaf</title></topic>"
+        + "</topics></children></topic>" * depth
+        + "</sheet></xmap-content>"
+    )
+    topics = parse_xmind_classic(io.BytesIO(content.encode()))
+    modules, cases, _ = build_cases(topics)
+
+    assert len(modules) == depth
+    assert modules[-1] == (depth - 2, f"m{depth - 1}")
+    assert cases[0]["module"] == depth - 1
+
+
+def test_invalid_topics_are_reported():
+    topics = [(ROOT, "tc:", None, []), (ROOT, "m" * 300, None, []), (1, "tc:lost", None, [])]
+    modules, cases, errors = build_cases(topics)
+
+    assert modules == [] and cases == []
+    assert [error["message"] for error in errors] == [
+        "Name is required", "Module name exceeds 255 characters; its topics were skipped",
+    ]
+
+
+def test_rejects_other_archives():
+    with pytest.raises(ValueError):
+        read_xmind(xmind({"manifest.json": "{}"}))
+    with pytest.raises(ValueError):
+        read_xmind(b"not a zip")
+
+
+def test_zen_fields_of_other_types_are_ignored():
+    root = zen_topic("模块", zen_topic("tc:用例", notes="x", labels="P1"), notes={"plain": "x"})
+    root["children"]["detached"] = "x"
+    leaf = zen_topic("tc:叶子", children="x")
+    root["children"]["attached"].append(leaf)
+    modules, cases, errors = read_xmind(xmind({"content.json": json.dumps({"rootTopic": root})}))
+
+    assert errors == [] and modules == [(ROOT, "模块")]
+    assert [(case["name"], case["description"], case["tags"]) for case in cases] == [("用例", None, None), ("叶子", None, None)]
+    sheets = [{"rootTopic": {"title": 1, "labels": 1, "children": {"attached": 1}}}, 5, "x"]
+    assert read_xmind(xmind({"content.json": json.dumps(sheets)}))[0] == [(ROOT, "1")]